@@ -3,11 +3,16 @@
 分析项目迭代和任务数据，提取项目进度、任务状态等信息
 """
 
-import json
 import sys
 import argparse
+from pathlib import Path
 from typing import Dict, List, Any
 
+# 添加 shared 到路径，导入 JSON 编解码模块（安装了 orjson 或 msgspec 时自动使用）
+shared_dir = Path(__file__).parent.parent.parent / "shared"
+sys.path.insert(0, str(shared_dir))
+import json_codec
+
 
 class ProjectDataAnalyzer:
     """项目数据分析器"""
@@ -25,8 +30,7 @@ class ProjectDataAnalyzer:
     def analyze(self) -> Dict[str, Any]:
         """分析项目数据"""
         try:
-            with open(self.input_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = json_codec.load_file(self.input_file)
             
             # 分析项目基本信息
             self._analyze_project_info(data)
@@ -47,7 +51,7 @@ class ProjectDataAnalyzer:
             
         except FileNotFoundError:
             raise Exception(f"项目数据文件不存在: {self.input_file}")
-        except json.JSONDecodeError as e:
+        except json_codec.JSONDecodeError as e:
             raise Exception(f"JSON解析失败: {str(e)}")
         except Exception as e:
             raise Exception(f"分析项目数据失败: {str(e)}")
@@ -144,6 +148,7 @@ def main():
     parser = argparse.ArgumentParser(description='分析项目迭代和任务数据')
     parser.add_argument('--input', required=True, help='项目数据JSON文件路径')
     parser.add_argument('--output', required=True, help='输出分析结果JSON文件路径')
+    parser.add_argument('--compact', action='store_true', help='以紧凑格式（不缩进）写入输出文件')
     
     args = parser.parse_args()
     
@@ -151,8 +156,7 @@ def main():
         analyzer = ProjectDataAnalyzer(args.input)
         analysis = analyzer.analyze()
         
-        with open(args.output, 'w', encoding='utf-8') as f:
-            json.dump(analysis, f, indent=2, ensure_ascii=False)
+        json_codec.dump_file(analysis, args.output, args.compact)
         
         print(f"项目数据分析完成，输出文件: {args.output}")
         print(f"迭代数量: {analysis['project_info']['total_iterations']}")
@@ -3,12 +3,17 @@
 解析Prometheus指标数据，提取性能指标
 """
 
-import json
 import re
 import sys
 import argparse
+from pathlib import Path
 from typing import Dict, List, Any, Tuple
 
+# 添加 shared 到路径，导入 JSON 编解码模块（安装了 orjson 或 msgspec 时自动使用）
+shared_dir = Path(__file__).parent.parent.parent / "shared"
+sys.path.insert(0, str(shared_dir))
+import json_codec
+
 
 class PrometheusParser:
     """Prometheus指标解析器"""
@@ -134,6 +139,7 @@ def main():
     parser = argparse.ArgumentParser(description='解析Prometheus指标数据')
     parser.add_argument('--prom-file', required=True, help='Prometheus指标文件路径')
     parser.add_argument('--output', required=True, help='输出JSON文件路径')
+    parser.add_argument('--compact', action='store_true', help='以紧凑格式（不缩进）写入输出文件')
     
     args = parser.parse_args()
     
@@ -141,8 +147,7 @@ def main():
         prom_parser = PrometheusParser(args.prom_file)
         parsed_data = prom_parser.parse()
         
-        with open(args.output, 'w', encoding='utf-8') as f:
-            json.dump(parsed_data, f, indent=2, ensure_ascii=False)
+        json_codec.dump_file(parsed_data, args.output, args.compact)
         
         print(f"Prometheus指标解析完成，输出文件: {args.output}")
         print(f"Gauge指标: {parsed_data['summary']['total_gauge_metrics']}")
@@ -4,12 +4,16 @@
 用于验证和导出可观测数据
 """
 
-import json
 import sys
 import argparse
 from pathlib import Path
 from datetime import datetime
 
+# 添加 shared 到路径，导入 JSON 编解码模块（安装了 orjson 或 msgspec 时自动使用）
+shared_dir = Path(__file__).parent.parent.parent / "shared"
+sys.path.insert(0, str(shared_dir))
+import json_codec
+
 
 class DataValidator:
     """数据格式验证器"""
@@ -326,12 +330,11 @@ class DataValidator:
 def load_json_file(file_path):
     """加载JSON文件"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return json_codec.load_file(file_path)
     except FileNotFoundError:
         print(f"错误: 文件不存在: {file_path}")
         sys.exit(1)
-    except json.JSONDecodeError as e:
+    except json_codec.JSONDecodeError as e:
         print(f"错误: JSON格式错误: {file_path}")
         print(f"详情: {e}")
         sys.exit(1)
@@ -361,6 +364,7 @@ def main():
     update_module_parser.add_argument('--status', required=True, choices=['pending', 'developed', 'confirmed', 'optimized'], help='模块状态')
     update_module_parser.add_argument('--rate', type=float, default=1.0, help='完成率 (0.0-1.0)')
     update_module_parser.add_argument('--notes', default='', help='备注说明')
+    update_module_parser.add_argument('--compact', action='store_true', help='以紧凑格式（不缩进）写回文件')
 
     args = parser.parse_args()
 
@@ -498,8 +502,7 @@ def main():
         app_data['last_updated'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
         # 写回文件
-        with open(args.app, 'w', encoding='utf-8') as f:
-            json.dump(app_data, f, ensure_ascii=False, indent=2)
+        json_codec.dump_file(app_data, args.app, args.compact)
 
         print(f"[OK] 模块 '{args.module}' 状态已更新为 {args.status} (完成率: {args.rate*100}%)")
 
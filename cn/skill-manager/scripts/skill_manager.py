@@ -7,10 +7,16 @@
 
 import json
 import os
+import sys
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 
+# 添加 shared 到路径，导入 JSON 编解码模块（安装了 orjson 或 msgspec 时自动使用）
+shared_dir = Path(__file__).parent.parent.parent / "shared"
+sys.path.insert(0, str(shared_dir))
+import json_codec
+
 
 class SkillStorage:
     """
@@ -44,15 +50,13 @@ class SkillStorage:
     def _load_data(self) -> Dict[str, Any]:
         """加载所有数据"""
         try:
-            with open(self.data_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
+            return json_codec.load_file(self.data_path)
+        except (FileNotFoundError, json_codec.JSONDecodeError):
             return {}
 
     def _save_data(self, data: Dict[str, Any]):
         """保存所有数据"""
-        with open(self.data_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        json_codec.dump_file(data, self.data_path)
 
     def save_config(self, skill_name: str, config: Dict[str, Any]):
         """
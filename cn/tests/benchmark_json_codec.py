@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+基准测试：大型数据文件上的 JSON 编解码后端
+
+测试目标：
+1. 生成约 10 MB 的模拟项目数据文件（大型真实项目的规模）
+2. 对 shared/json_codec 的每个可用后端测量解析、缩进序列化和紧凑序列化
+3. 报告耗时中位数以及各后端相对标准库的加速比
+
+用法：
+    python tests/benchmark_json_codec.py
+    python tests/benchmark_json_codec.py --size-mb 50 --repeat 3
+
+安装 orjson 或 msgspec 后可与标准库比较：
+    pip install orjson msgspec
+"""
+
+import sys
+import time
+import argparse
+import statistics
+from pathlib import Path
+
+# 添加项目根目录和 shared 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'shared'))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import json_codec
+from benchmark_web_observability import make_dataset
+
+# 用于估算目标文件大小所需任务数的样本任务数
+SAMPLE_TASKS = 1000
+
+
+def make_document(size_mb, seed=0):
+    """生成缩进 JSON 约为 size_mb MB 的项目数据"""
+    sample = json_codec.BACKENDS['json'][1](make_dataset(SAMPLE_TASKS, seed)['project'])
+    task_count = max(SAMPLE_TASKS, round(size_mb * 1024 * 1024 / len(sample) * SAMPLE_TASKS))
+    return make_dataset(task_count, seed)['project'], task_count
+
+
+def time_call(run, repeat):
+    """返回调用 run() repeat 次的耗时中位数"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def run_benchmarks(document, repeat):
+    """测量每个后端，返回 {后端: {操作: 秒}}"""
+    raw = json_codec.BACKENDS['json'][1](document)
+    results = {}
+    for name, (loads, dumps) in json_codec.BACKENDS.items():
+        # 每个后端都必须与标准库生成完全相同的文件
+        if dumps(document) != raw or loads(raw) != document:
+            raise AssertionError(f'{name} 的输出与标准库不一致')
+        results[name] = {
+            'loads': time_call(lambda: loads(raw), repeat),
+            'dumps_indent': time_call(lambda: dumps(document), repeat),
+            'dumps_compact': time_call(lambda: dumps(document, True), repeat)
+        }
+    return results, len(raw), len(json_codec.BACKENDS['json'][1](document, True))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='在大型数据文件上测试 JSON 编解码后端')
+    parser.add_argument('--size-mb', type=float, default=10, help='数据文件的大致大小（MB，默认: 10）')
+    parser.add_argument('--repeat', type=int, default=5, help='每项操作的计时次数（默认: 5）')
+    parser.add_argument('--seed', type=int, default=0, help='模拟数据的随机种子')
+    args = parser.parse_args()
+
+    document, task_count = make_document(args.size_mb, args.seed)
+    results, indent_size, compact_size = run_benchmarks(document, args.repeat)
+    print(f'[INFO] {task_count} 个任务: 缩进格式 {indent_size / 1024 / 1024:.1f} MB, '
+          f'紧凑格式 {compact_size / 1024 / 1024:.1f} MB')
+    print(f"[INFO] 默认后端: {json_codec.BACKEND}（可用: {', '.join(results)}）")
+
+    baseline = results['json']
+    for operation in baseline:
+        print(f'\n{operation}')
+        for name, timings in results.items():
+            speedup = baseline[operation] / timings[operation]
+            print(f'  {name:<10} {timings[operation] * 1000:10.1f} ms {speedup:6.1f}x')
+
+
+if __name__ == '__main__':
+    main()
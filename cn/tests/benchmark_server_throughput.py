@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+基准测试：Live 模式（标准库服务器）与 Web 模式（Flask）的 HTTP 吞吐量
+
+测试目标：
+1. 在模拟数据集上以独立进程分别启动各模式的 run_web_observability.py
+2. 多个客户端进程并发请求 /、/api/data（gzip）、/api/data（304）和 /api/summary，
+   服务器保持连接时每个客户端复用同一个 HTTP 连接
+3. 报告各模式每秒请求数和平均延迟，以及 live 模式相对 web 模式的倍数
+
+用法：
+    python tests/benchmark_server_throughput.py
+    python tests/benchmark_server_throughput.py --tasks 10000 --clients 8 --duration 5
+
+未安装 Flask 时跳过 web 模式。
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import tempfile
+import subprocess
+import http.client
+from multiprocessing import Pool
+from pathlib import Path
+
+# 添加项目根目录和测试目录到Python路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from cox.scripts import run_web_observability as observability
+from benchmark_web_observability import write_dataset
+
+SCRIPT = Path(__file__).parent.parent / 'cox' / 'scripts' / 'run_web_observability.py'
+# 各场景的请求：(方法, 路径, 请求头)；304 场景会填入当前的 ETag
+SCENARIOS = {
+    'index': ('GET', '/', {'Accept-Encoding': 'gzip'}),
+    'api_data_gzip': ('GET', '/api/data', {'Accept-Encoding': 'gzip'}),
+    'api_data_304': ('GET', '/api/data', {'Accept-Encoding': 'gzip'}),
+    'api_summary': ('GET', '/api/summary', {}),
+}
+STARTUP_TIMEOUT = 30
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(mode, files, port):
+    """以指定模式启动面板，并等待其开始接受连接"""
+    project, app, test = files
+    process = subprocess.Popen([sys.executable, str(SCRIPT), '--mode', mode, '--port', str(port),
+                                '--project', project, '--app', app, '--test', test],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f'{mode} 服务器未在 {STARTUP_TIMEOUT} 秒内启动')
+
+
+def run_client(job):
+    """在一个连接上持续发送 duration 秒的请求，返回 (请求数, 建立连接数)"""
+    port, method, path, headers, duration = job
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    requests = connects = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        if connection.sock is None:
+            connects += 1
+        connection.request(method, path, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        if response.status not in (200, 304):
+            raise RuntimeError(f'{path} 返回 {response.status}')
+        requests += 1
+    connection.close()
+    return requests, connects
+
+
+def measure(port, scenario, clients, duration):
+    method, path, headers = SCENARIOS[scenario]
+    if scenario == 'api_data_304':
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+        connection.request(method, path, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        headers = dict(headers, **{'If-None-Match': response.getheader('ETag')})
+        connection.close()
+    with Pool(clients) as pool:
+        results = pool.map(run_client, [(port, method, path, headers, duration)] * clients)
+    requests = sum(count for count, _ in results)
+    connects = sum(count for _, count in results)
+    return {
+        'requests_per_s': requests / duration,
+        'mean_latency_ms': clients * duration / requests * 1000 if requests else None,
+        'connections_per_request': connects / requests if requests else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='比较 live 模式和 web 模式的 HTTP 吞吐量')
+    parser.add_argument('--tasks', type=int, default=1000, help='模拟数据集的任务数（默认: 1000）')
+    parser.add_argument('--clients', type=int, default=max(2, os.cpu_count() or 1),
+                        help='并发客户端进程数（默认: CPU 核数，至少 2）')
+    parser.add_argument('--duration', type=float, default=3, help='每个场景的测试秒数（默认: 3）')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='逗号分隔的场景（默认: 全部）')
+    parser.add_argument('--output', help='将结果写入该 JSON 文件')
+    args = parser.parse_args()
+
+    scenarios = [name for name in args.scenarios.split(',') if name]
+    modes = ['live'] + (['web'] if observability.FLASK_AVAILABLE else [])
+    if 'web' not in modes:
+        print('[INFO] 未安装 Flask，跳过 web 模式')
+    print(f'[INFO] {args.tasks} 个任务，{args.clients} 个客户端，每个场景 {args.duration:g} 秒')
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        files = write_dataset(workdir, args.tasks)
+        for mode in modes:
+            port = free_port()
+            process = start_server(mode, files, port)
+            try:
+                results[mode] = {scenario: measure(port, scenario, args.clients, args.duration)
+                                 for scenario in scenarios}
+            finally:
+                process.terminate()
+                process.wait()
+
+    print(f"\n{'scenario':<16} {'mode':<6} {'req/s':>10} {'latency':>12} {'conn/req':>9}")
+    for scenario in scenarios:
+        for mode in modes:
+            result = results[mode][scenario]
+            relative = ''
+            if mode == 'live' and 'web' in results:
+                relative = f"  {result['requests_per_s'] / results['web'][scenario]['requests_per_s']:.1f}x web"
+            print(f"{scenario:<16} {mode:<6} {result['requests_per_s']:10.0f} "
+                  f"{result['mean_latency_ms']:9.2f} ms {result['connections_per_request']:9.2f}{relative}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'tasks': args.tasks, 'clients': args.clients, 'duration': args.duration,
+                       'results': results}, f, indent=2)
+        print(f'[OK] 结果已写入 {args.output}')
+
+
+if __name__ == '__main__':
+    main()
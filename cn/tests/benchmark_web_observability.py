@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+基准测试：面板数据加载、接口序列化、更新操作与静态生成
+
+测试目标：
+1. 生成任务数为 10、1k、100k、1M 的确定性模拟数据集
+2. 测量 ObservabilityData.get_all_data、/api/data 序列化、更新接口、/api/search 和 generate_static_html
+3. 报告每项测试的耗时中位数/最小值和峰值内存（tracemalloc）
+4. 结果保存为 JSON 基线，之后的运行可与基线比较以发现性能回退
+
+用法：
+    python tests/benchmark_web_observability.py --sizes 10,1000,100000 --output baseline.json
+    python tests/benchmark_web_observability.py --sizes 10,1000,100000 --compare baseline.json
+
+1M 数据集需要数分钟和数 GB 内存。
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import statistics
+import tempfile
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from cox.scripts import run_web_observability as observability
+
+DEFAULT_SIZES = (10, 1000, 100000, 1000000)
+TASKS_PER_ITERATION = 100
+STATUSES = ('todo', 'in_progress', 'completed', 'blocked')
+PRIORITIES = ('low', 'medium', 'high', 'critical')
+MODULE_STATUSES = ('pending', 'developed', 'confirmed', 'optimized', 'has_issue')
+OWNERS = tuple(f'dev{i:02d}' for i in range(20))
+# 与基线比较时，低于这些阈值的差异视为噪声
+TIME_NOISE_FLOOR = 0.001
+MEMORY_NOISE_FLOOR = 1.0
+
+
+def make_dataset(task_count, seed=0):
+    """生成包含 task_count 个任务的确定性项目/应用/测试数据"""
+    rng = random.Random(seed)
+    iterations = []
+    iteration_count = max(1, -(-task_count // TASKS_PER_ITERATION))
+    for i in range(iteration_count):
+        first = i * TASKS_PER_ITERATION
+        tasks = [{
+            'task_id': f'TASK-{n:07d}',
+            'task_name': f'Task {n}',
+            'status': rng.choice(STATUSES),
+            'priority': rng.choice(PRIORITIES),
+            'assignee': rng.choice(OWNERS),
+            'risk_level': rng.choice(('low', 'high')),
+            'estimated_hours': rng.randint(1, 40),
+            'description': f'Synthetic task {n} used by the dashboard benchmark suite'
+        } for n in range(first, min(first + TASKS_PER_ITERATION, task_count))]
+        iterations.append({
+            'iteration_id': f'ITER-{i:05d}',
+            'iteration_name': f'Iteration {i}',
+            'start_date': '2026-01-01',
+            'end_date': '2026-01-14',
+            'status': 'in_progress' if i == iteration_count - 1 else 'completed',
+            'tasks': tasks,
+            'assumptions': [{
+                'assumption_id': f'ASM-{i:05d}-{j}',
+                'hypothesis': f'Assumption {j} of iteration {i}',
+                'status': 'pending'
+            } for j in range(3)]
+        })
+    project = {
+        'project_name': f'Benchmark {task_count}',
+        'current_iteration': iterations[-1]['iteration_id'],
+        'iterations': iterations,
+        'last_updated': '2026-01-01 00:00:00'
+    }
+    app = {
+        'app_name': 'Benchmark App',
+        'version': '1.0.0',
+        'modules': [{
+            'module_id': f'MOD-{k:05d}',
+            'module_name': f'Module {k}',
+            'status': rng.choice(MODULE_STATUSES),
+            'owner': rng.choice(OWNERS),
+            'completion_rate': round(rng.random(), 2),
+            'issue_description': ''
+        } for k in range(max(5, task_count // 50))],
+        'last_updated': '2026-01-01 00:00:00'
+    }
+    test = {
+        'test_suites': [{
+            'suite_name': f'Suite {k}',
+            'total_tests': 100,
+            'passed_tests': 95,
+            'failed_tests': 5,
+            'skipped_tests': 0
+        } for k in range(max(1, task_count // 1000))],
+        'anomalies': [{
+            'anomaly_id': f'ANOM-{k:05d}',
+            'type': rng.choice(('performance', 'functional', 'integration', 'security')),
+            'description': f'Anomaly {k}',
+            'severity': rng.choice(('low', 'medium', 'high')),
+            'status': rng.choice(('open', 'resolved')),
+            'occurrence_count': rng.randint(1, 50)
+        } for k in range(max(3, task_count // 100))],
+        'performance_history': [],
+        'last_updated': '2026-01-01 00:00:00'
+    }
+    return {'project': project, 'app': app, 'test': test}
+
+
+def write_dataset(directory, task_count, seed=0):
+    """把数据集写入 directory，返回 (project, app, test) 文件路径"""
+    files = {}
+    for key, data in make_dataset(task_count, seed).items():
+        files[key] = os.path.join(directory, f'{key}_{task_count}.json')
+        with open(files[key], 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+    return files['project'], files['app'], files['test']
+
+
+class BenchmarkContext:
+    """一个数据集的共享状态：已加载的数据管理器和 Flask 测试客户端"""
+
+    def __init__(self, files, workdir):
+        self.files = files
+        self.workdir = workdir
+        self.data_manager = observability.ObservabilityData(*files)
+        # 更新测试不包含落盘，落盘单独测量
+        self.data_manager.writer.flush_interval = 3600
+        self.data_manager.get_all_data()
+        self.client = None
+        if observability.FLASK_AVAILABLE:
+            observability.data_manager = self.data_manager
+            self.client = observability.app.test_client()
+        self.toggle = 0
+
+    def next_status(self, choices):
+        self.toggle += 1
+        return choices[self.toggle % len(choices)]
+
+    def close(self):
+        self.data_manager.writer.flush()
+
+
+# 每项测试返回 (setup, run)：setup 在每次 run 之前执行且不计时，run 计时
+def bench_load(ctx):
+    return None, lambda: observability.ObservabilityData(*ctx.files).get_all_data()
+
+
+def bench_get_all_data(ctx):
+    return None, ctx.data_manager.get_all_data
+
+
+def bench_serialize(encoding):
+    def bench(ctx):
+        def setup():
+            ctx.data_manager.snapshot.encoded.clear()
+        return setup, lambda: ctx.data_manager.get_encoded_payload(encoding)
+    return bench
+
+
+def bench_api_data(ctx):
+    def run():
+        response = ctx.client.get('/api/data', headers={'Accept-Encoding': 'gzip'})
+        assert response.status_code == 200
+    return None, run
+
+
+def bench_update_module(ctx):
+    def run():
+        response = ctx.client.post('/api/update/module', json={
+            'module_name': 'Module 0', 'status': ctx.next_status(('confirmed', 'optimized'))})
+        assert response.get_json()['success']
+    return None, run
+
+
+def bench_update_assumption(ctx):
+    def run():
+        response = ctx.client.post('/api/update/assumption', json={
+            'assumption_id': 'ASM-00000-0', 'status': ctx.next_status(('validated', 'pending'))})
+        assert response.get_json()['success']
+    return None, run
+
+
+def bench_flush(ctx):
+    def setup():
+        # 把最大的文件标记为待写入，每次都重写 project_data.json
+        ctx.data_manager.writer.update('project', lambda data: (dict(data, last_updated=str(ctx.toggle)), True))
+        ctx.toggle += 1
+    return setup, ctx.data_manager.writer.flush
+
+
+def bench_search_index(ctx):
+    def setup():
+        # 丢弃搜索索引，每次运行都从当前快照重新建立
+        ctx.data_manager.snapshot.searches.clear()
+    return setup, lambda: ctx.data_manager.search('task')
+
+
+def bench_search(ctx):
+    # 索引只建立一次，只统计查询耗时
+    ctx.data_manager.search('task')
+
+    def run():
+        response = ctx.client.get('/api/search', query_string={'q': 'synthetic task'})
+        assert response.get_json()['total']
+    return None, run
+
+
+def bench_static_html(ctx):
+    output = os.path.join(ctx.workdir, 'benchmark.html')
+
+    def setup():
+        # 删除上一次的输出，避免输入哈希未变化时跳过生成
+        if os.path.exists(output):
+            os.remove(output)
+
+    def run():
+        with redirect_stdout(io.StringIO()):
+            observability.generate_static_html(ctx.data_manager, output)
+    return setup, run
+
+
+BENCHMARKS = {
+    'load': (bench_load, False),
+    'get_all_data': (bench_get_all_data, False),
+    'serialize_identity': (bench_serialize('identity'), False),
+    'serialize_gzip': (bench_serialize('gzip'), False),
+    'api_data': (bench_api_data, True),
+    'update_module': (bench_update_module, True),
+    'update_assumption': (bench_update_assumption, True),
+    'search_index': (bench_search_index, False),
+    'search': (bench_search, True),
+    'flush': (bench_flush, False),
+    'static_html': (bench_static_html, False),
+}
+
+
+def measure(setup, run, repeat, memory=True):
+    """计时执行 run() repeat 次，再在 tracemalloc 下执行一次以测量峰值内存"""
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    result = {'median_s': statistics.median(times), 'min_s': min(times), 'runs': repeat}
+    if memory:
+        if setup:
+            setup()
+        tracemalloc.start()
+        try:
+            run()
+            result['peak_mb'] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def run_benchmarks(sizes, names, repeat, memory=True, seed=0, log=print):
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in sizes:
+            log(f'[INFO] 数据集: {size} 个任务')
+            files = write_dataset(workdir, size, seed)
+            ctx = BenchmarkContext(files, workdir)
+            # 大数据集减少重复次数，使完整运行的耗时保持可接受
+            size_repeat = repeat if size < 1000000 else 1
+            results[str(size)] = {}
+            try:
+                for name in names:
+                    bench, needs_flask = BENCHMARKS[name]
+                    if needs_flask and ctx.client is None:
+                        log(f'  {name:<20} 已跳过（未安装 Flask）')
+                        continue
+                    setup, run = bench(ctx)
+                    result = measure(setup, run, size_repeat, memory)
+                    results[str(size)][name] = result
+                    peak = f"{result['peak_mb']:10.1f} MB" if 'peak_mb' in result else ''
+                    log(f"  {name:<20} {result['median_s'] * 1000:12.3f} ms {peak}")
+            finally:
+                ctx.close()
+            for path in files:
+                os.remove(path)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """与基线比较，返回性能回退的描述列表"""
+    regressions = []
+    for size, benchmarks in results.items():
+        for name, current in benchmarks.items():
+            base = baseline.get('results', {}).get(size, {}).get(name)
+            if base is None:
+                continue
+            checks = [('median_s', TIME_NOISE_FLOOR, 1000, 'ms')]
+            if 'peak_mb' in current and 'peak_mb' in base:
+                checks.append(('peak_mb', MEMORY_NOISE_FLOOR, 1, 'MB'))
+            for key, floor, scale, unit in checks:
+                old, new = base[key], current[key]
+                change = (new - old) / old if old else 0.0
+                marker = ''
+                if new > old * (1 + threshold) and new - old > floor:
+                    marker = '  REGRESSION'
+                    regressions.append(f'{size} tasks / {name} / {key}: {old * scale:.3f} -> {new * scale:.3f} {unit}')
+                print(f'{size:>8} {name:<20} {key:<9} {old * scale:12.3f} -> {new * scale:12.3f} {unit:<2} '
+                      f'{change:+8.1%}{marker}')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='在模拟数据集上对可观测性面板进行基准测试')
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help='逗号分隔的任务数（默认: 10,1000,100000,1000000）')
+    parser.add_argument('--benchmarks', default=','.join(BENCHMARKS),
+                        help='逗号分隔的测试名称（默认: 全部）')
+    parser.add_argument('--repeat', type=int, default=5, help='每项测试的计时次数（1M 任务始终只运行一次）')
+    parser.add_argument('--seed', type=int, default=0, help='模拟数据集的随机种子')
+    parser.add_argument('--no-memory', action='store_true', help='跳过 tracemalloc 峰值内存测量')
+    parser.add_argument('--output', help='把结果写入该 JSON 文件（可作为基线）')
+    parser.add_argument('--compare', help='与该基线 JSON 文件比较，存在回退时以状态码 1 退出')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='判定为回退的相对变慢或内存增长比例（默认: 0.25）')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    names = [name for name in args.benchmarks.split(',') if name]
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"未知的测试: {', '.join(unknown)}（可用: {', '.join(BENCHMARKS)}）")
+
+    results = run_benchmarks(sizes, names, args.repeat, memory=not args.no_memory, seed=args.seed)
+    report = {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'flask': observability.FLASK_AVAILABLE,
+            'seed': args.seed,
+            'repeat': args.repeat
+        },
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f'[OK] 结果已写入 {args.output}')
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f'\n[ERROR] {len(regressions)} 项回退超过 {args.threshold:.0%}:')
+            for line in regressions:
+                print(f'  {line}')
+            sys.exit(1)
+        print('\n[OK] 与基线相比没有性能回退')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+单元测试：run_web_observability 的启动开销
+
+测试目标：
+1. 导入脚本时不导入 Flask，也不替换 sys.stdout
+2. 静态模式生成网页的全过程都不导入 Flask
+3. 用 `python -X importtime` 测得的导入耗时不超过预算
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+import subprocess
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+SCRIPT = PROJECT_ROOT / 'cox' / 'scripts' / 'run_web_observability.py'
+MODULE = 'cox.scripts.run_web_observability'
+
+# 模块累计导入耗时预算（毫秒，已有字节码缓存时）；仅导入 Flask 的耗时就超过该值
+IMPORT_TIME_BUDGET_MS = 100
+
+
+class TestImportTime(unittest.TestCase):
+    """测试面板脚本的启动开销"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        # 与正常使用一样启用字节码缓存，但不写入源码目录
+        self.env = dict(os.environ, PYTHONPYCACHEPREFIX=os.path.join(self.temp_dir, 'pycache'))
+        self.env.pop('PYTHONDONTWRITEBYTECODE', None)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def run_python(self, *args):
+        result = subprocess.run([sys.executable, *args], cwd=PROJECT_ROOT, env=self.env,
+                                capture_output=True, text=True, timeout=60)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        return result
+
+    def test_import_has_no_side_effects(self):
+        """导入模块后 Flask 未被加载，sys.stdout 保持不变"""
+        code = (f"import sys; stdout = sys.stdout; import {MODULE}; "
+                "print('flask' in sys.modules, sys.stdout is stdout)")
+        self.assertEqual(self.run_python('-c', code).stdout.split(), ['False', 'True'])
+
+    def test_static_mode_does_not_import_flask(self):
+        """通过 main() 静态生成时不导入 Flask"""
+        files = []
+        for name in ('project', 'app', 'test'):
+            path = os.path.join(self.temp_dir, f'{name}.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({'project_name': 'Import Test', 'iterations': [], 'modules': []}, f)
+            files += [f'--{name}', path]
+        output = os.path.join(self.temp_dir, 'observability.html')
+        argv = [str(SCRIPT), '--mode', 'static', *files, '--output', output]
+        code = (f"import sys, runpy; sys.argv = {argv!r}; runpy.run_path(sys.argv[0], run_name='__main__'); "
+                "print('FLASK', 'flask' in sys.modules)")
+        result = self.run_python('-c', code)
+        self.assertTrue(os.path.exists(output), "静态网页文件未生成")
+        self.assertIn('FLASK False', result.stdout)
+
+    def test_import_time_budget(self):
+        """-X importtime 报告的累计导入耗时不超过预算"""
+        self.run_python('-c', f'import {MODULE}')  # 预热字节码缓存
+        timings = []
+        for _ in range(3):
+            stderr = self.run_python('-X', 'importtime', '-c', f'import {MODULE}').stderr
+            line = next(line for line in stderr.splitlines() if line.rstrip().endswith(f'| {MODULE}'))
+            timings.append(int(line.split('|')[1]) / 1000)
+        best = min(timings)
+        print(f"\n{MODULE} 导入耗时: {best:.1f} ms（预算 {IMPORT_TIME_BUDGET_MS} ms）")
+        self.assertLess(best, IMPORT_TIME_BUDGET_MS, f"导入耗时 {best:.1f} ms")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+单元测试：JSON 编解码后端（shared/json_codec.py）
+
+测试目标：
+1. 每个可用后端（json、orjson、msgspec）以缩进和紧凑格式输出的数据都能原样解析回来
+2. NaN 和 ±Infinity 与标准库一样写为 NaN/Infinity，不会被静默写成 null
+3. 快速后端无法输出或解析的值退回标准库处理，真正的错误仍然抛出
+4. COX_JSON_BACKEND 指定后端，指定的后端不可用时导入失败
+"""
+
+import os
+import sys
+import math
+import subprocess
+import tempfile
+import shutil
+import unittest
+from unittest import mock
+from contextlib import contextmanager
+from pathlib import Path
+
+SHARED_DIR = Path(__file__).parent.parent / 'shared'
+
+# 添加 shared 目录到Python路径
+sys.path.insert(0, str(SHARED_DIR))
+
+import json_codec
+
+DOCUMENT = {
+    'project_name': '支付系统',
+    'iterations': [
+        {'iteration_id': 'ITER-1', 'progress': 0.625, 'tasks': [
+            {'task_id': 'TASK-1', 'done': True, 'owner': None, 'hours': 12},
+        ]},
+    ],
+    'tags': [],
+}
+
+
+class TestJsonCodec(unittest.TestCase):
+    """通过 json_codec 的入口函数测试各个后端"""
+
+    @staticmethod
+    def backends():
+        """已安装的后端名称"""
+        return [name for name in ('json', 'orjson', 'msgspec') if name in json_codec.BACKENDS]
+
+    @contextmanager
+    def backend(self, name):
+        """在单独的子测试中把 json_codec.loads/dumps 切换到后端 name"""
+        loads, dumps = json_codec.BACKENDS[name]
+        with self.subTest(backend=name), mock.patch.object(json_codec, '_loads', loads), \
+                mock.patch.object(json_codec, '_dumps', dumps):
+            yield
+
+    def test_round_trip(self):
+        """缩进和紧凑格式的输出都能解析回相同的数据，非 ASCII 字符不转义"""
+        for name in self.backends():
+            with self.backend(name):
+                indented = json_codec.dumps(DOCUMENT)
+                compact = json_codec.dumps(DOCUMENT, compact=True)
+                self.assertIsInstance(indented, bytes)
+                self.assertEqual(json_codec.loads(indented), DOCUMENT)
+                self.assertEqual(json_codec.loads(compact.decode('utf-8')), DOCUMENT)
+                self.assertIn('支付系统'.encode('utf-8'), compact)
+                self.assertIn(b'\n  "project_name": ', indented)
+                self.assertNotIn(b'\n', compact)
+                self.assertNotIn(b': ', compact)
+
+    def test_file_round_trip(self):
+        """dump_file 写入的数据由 load_file 原样读回"""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        path = os.path.join(temp_dir, 'data.json')
+        for name in self.backends():
+            with self.backend(name):
+                json_codec.dump_file(DOCUMENT, path)
+                self.assertEqual(json_codec.load_file(path), DOCUMENT)
+
+    def test_non_finite_floats(self):
+        """NaN 和 ±Infinity 的写法与标准库相同，并能解析回来"""
+        data = {'rate': float('nan'), 'limits': [float('inf'), float('-inf'), None, 1.5]}
+        expected = json_codec.BACKENDS['json'][1](data, True)
+        self.assertEqual(expected, b'{"rate":NaN,"limits":[Infinity,-Infinity,null,1.5]}')
+        for name in self.backends():
+            with self.backend(name):
+                self.assertEqual(json_codec.dumps(data, compact=True), expected)
+                self.assertEqual(json_codec.dumps(data), json_codec.BACKENDS['json'][1](data))
+                parsed = json_codec.loads(expected)
+                self.assertTrue(math.isnan(parsed['rate']))
+                self.assertEqual(parsed['limits'], [float('inf'), float('-inf'), None, 1.5])
+                # 真正的 null 仍由快速后端自己输出
+                self.assertEqual(json_codec.loads(json_codec.dumps({'owner': None})), {'owner': None})
+
+    def test_fallback_and_errors(self):
+        """超出 64 位的整数退回标准库处理，格式错误的 JSON 和不支持的类型仍然抛出异常"""
+        big = {'id': 2 ** 70}
+        for name in self.backends():
+            with self.backend(name):
+                self.assertEqual(json_codec.dumps(big, compact=True), b'{"id":1180591620717411303424}')
+                self.assertEqual(json_codec.loads(b'{"id":1180591620717411303424}'), big)
+                with self.assertRaises(json_codec.JSONDecodeError):
+                    json_codec.loads(b'{"id": ')
+                with self.assertRaises(TypeError):
+                    json_codec.dumps({'when': object()})
+
+    def test_backend_selection(self):
+        """COX_JSON_BACKEND 在导入时选择后端，不可用的后端抛出 ImportError"""
+        code = 'import json_codec; print(json_codec.BACKEND)'
+        for name in ('json', 'orjson', 'msgspec'):
+            with self.subTest(backend=name):
+                result = subprocess.run([sys.executable, '-c', code], cwd=SHARED_DIR, capture_output=True,
+                                        text=True, timeout=60, env=dict(os.environ, COX_JSON_BACKEND=name))
+                if name in json_codec.BACKENDS:
+                    self.assertEqual(result.stdout.strip(), name, result.stderr)
+                else:
+                    self.assertNotEqual(result.returncode, 0)
+                    self.assertIn('ImportError', result.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
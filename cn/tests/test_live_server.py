@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+测试：Live 模式服务器（仅用标准库，无需 Flask）
+
+测试目标：
+1. 没有 Flask 时 live 服务器可以启动
+2. 页面和数据以 gzip 压缩返回，支持 ETag/304，多个请求复用同一个 keep-alive 连接
+3. 更新接口修改数据，/api/data?since= 返回这次修改的 JSON Patch
+4. /api/stream 以 patch 事件推送修改
+5. Content-Length 不合法或请求体不是 JSON 对象的更新请求返回 400
+6. /api/summary 能处理空集合，用数据 ETag 重新验证，并随修改更新
+"""
+
+import os
+import sys
+import json
+import gzip
+import shutil
+import socket
+import tempfile
+import unittest
+import threading
+import subprocess
+import http.client
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from cox.scripts import run_web_observability as observability
+
+MODULE = 'cox.scripts.run_web_observability'
+
+
+class TestLiveServer(unittest.TestCase):
+    """测试 live 模式的 HTTP 服务器"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        files = []
+        for name, data in (
+                ('project', {'project_name': 'Live', 'iterations': [{'iteration_id': 'ITER-1', 'tasks': [],
+                                                                     'assumptions': [{'assumption_id': 'ASM-1',
+                                                                                      'hypothesis': 'Users pay',
+                                                                                      'status': 'pending'}]}]}),
+                ('app', {'modules': [{'module_name': 'Payment', 'status': 'pending'}]}),
+                ('test', {'test_suites': [], 'anomalies': []})):
+            files.append(os.path.join(self.temp_dir, f'{name}.json'))
+            with open(files[-1], 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+        self.previous_manager = observability.data_manager
+        observability.data_manager = observability.ObservabilityData(*files)
+        observability.data_manager.writer.flush_interval = 0
+        self.server = observability.create_live_server('127.0.0.1', 0)
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=10)
+
+    def tearDown(self):
+        self.connection.close()
+        self.server.shutdown()
+        self.server.server_close()
+        observability.data_manager.writer.flush()
+        observability.data_manager = self.previous_manager
+        shutil.rmtree(self.temp_dir)
+
+    def request(self, method, path, body=None, headers=None):
+        payload = json.dumps(body).encode('utf-8') if body is not None else None
+        self.connection.request(method, path, body=payload, headers=headers or {})
+        response = self.connection.getresponse()
+        return response, response.read()
+
+    def post_raw(self, path, body):
+        self.connection.request('POST', path, body=body, headers={'Content-Type': 'application/json'})
+        response = self.connection.getresponse()
+        return response, json.loads(response.read())
+
+    def test_starts_without_flask(self):
+        """无法导入 Flask 时仍可创建 live 服务器"""
+        code = (f"import sys; sys.modules['flask'] = None; import {MODULE} as m; "
+                "server = m.create_live_server('127.0.0.1', 0); server.server_close(); "
+                "print(m.FLASK_AVAILABLE, sys.modules['flask'])")
+        result = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_ROOT, capture_output=True, text=True,
+                                timeout=60)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.split(), ['False', 'None'])
+
+    def test_gzip_etag_and_keep_alive(self):
+        """页面和数据经过 gzip 压缩，可用 304 重新验证，并共用一个连接"""
+        response, body = self.request('GET', '/', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.getheader('Content-Encoding'), 'gzip')
+        self.assertIn(b'<!DOCTYPE html>', gzip.decompress(body))
+        sock = self.connection.sock
+
+        response, body = self.request('GET', '/api/data', headers={'Accept-Encoding': 'gzip, deflate'})
+        self.assertEqual(response.getheader('Content-Encoding'), 'gzip')
+        self.assertEqual(json.loads(gzip.decompress(body))['project']['project_name'], 'Live')
+        etag = response.getheader('ETag')
+        response, body = self.request('GET', '/api/data', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+        self.assertEqual((response.status, body), (304, b''))
+        response, body = self.request('GET', '/api/data')
+        self.assertIsNone(response.getheader('Content-Encoding'))
+        self.assertEqual(json.loads(body)['app']['modules'][0]['module_name'], 'Payment')
+
+        self.assertIs(self.connection.sock, sock, 'keep-alive 连接没有被复用')
+
+    def test_updates_and_patch(self):
+        """更新接口修改数据，?since= 返回补丁，错误以 JSON 返回"""
+        response, _ = self.request('GET', '/api/data')
+        version = response.getheader('X-Data-Version')
+
+        _, body = self.request('POST', '/api/update/module', {'module_name': 'Payment', 'status': 'confirmed'})
+        self.assertEqual(json.loads(body), {'success': True})
+        _, body = self.request('POST', '/api/update/assumption', {'assumption_id': 'ASM-1', 'status': 'validated'})
+        self.assertTrue(json.loads(body)['success'])
+        _, body = self.request('POST', '/api/update/module', {'module_name': 'Missing', 'status': 'confirmed'})
+        self.assertFalse(json.loads(body)['success'])
+        _, body = self.request('POST', '/api/update/batch', {'updates': [
+            {'type': 'module', 'module_name': 'Payment', 'status': 'optimized'}]})
+        self.assertTrue(json.loads(body)['applied'])
+
+        response, body = self.request('GET', f'/api/data?since={version}')
+        self.assertEqual(response.getheader('Content-Type'), 'application/json-patch+json')
+        paths = {op['path'] for op in json.loads(body)}
+        self.assertIn('/app/modules/0/status', paths)
+        self.assertIn('/project/iterations/0/assumptions/0/status', paths)
+
+        self.assertEqual(self.request('GET', '/api/update/module')[0].status, 405)
+        self.assertEqual(self.request('GET', '/api/missing')[0].status, 404)
+        self.connection.request('POST', '/api/update/module', body=b'{not json')
+        response = self.connection.getresponse()
+        response.read()
+        self.assertEqual(response.status, 400)
+
+    def test_stream_pushes_patch(self):
+        """/api/stream 发送相对客户端 Last-Event-ID 的 patch 事件"""
+        response, _ = self.request('GET', '/api/data')
+        version = response.getheader('X-Data-Version')
+        self.request('POST', '/api/update/module', {'module_name': 'Payment', 'status': 'confirmed'})
+
+        with socket.create_connection(('127.0.0.1', self.port), timeout=10) as stream:
+            stream.sendall(f'GET /api/stream HTTP/1.1\r\nHost: localhost\r\nLast-Event-ID: {version}\r\n\r\n'
+                           .encode('ascii'))
+            received = b''
+            while b'\r\n\r\n' not in received or not received.endswith(b'\n\n'):
+                received += stream.recv(65536)
+        headers, event = received.split(b'\r\n\r\n', 1)
+        self.assertIn(b'text/event-stream', headers)
+        self.assertTrue(event.startswith(b'event: patch\n'), event)
+        data = json.loads(event.split(b'data: ', 1)[1])
+        self.assertEqual(data['since'], version)
+        self.assertEqual(data['patch'][0]['path'], '/app/modules/0/status')
+
+    def test_summary(self):
+        """/api/summary 能处理没有任务和测试的数据，可用 304 重新验证，并随修改更新"""
+        response, body = self.request('GET', '/api/summary')
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.getheader('Content-Type'), 'application/json')
+        summary = json.loads(body)
+        etag = response.getheader('ETag')
+        self.assertEqual(etag, f'"{summary["version"]}"')
+        self.assertEqual(summary['tasks'], {'total': 0, 'by_status': {}})
+        self.assertEqual(summary['modules'], {'total': 1, 'by_status': {'pending': 1}})
+        self.assertEqual((summary['tests']['total_tests'], summary['tests']['pass_rate'],
+                          summary['tests']['coverage']), (0, None, None))
+        self.assertEqual(summary['anomalies'], {'total': 0, 'open': 0, 'open_by_severity': {}})
+        self.assertEqual(summary['owners'], {})
+        response, body = self.request('GET', '/api/summary', headers={'If-None-Match': etag})
+        self.assertEqual((response.status, body), (304, b''))
+
+        self.request('POST', '/api/update/module', {'module_name': 'Payment', 'status': 'confirmed'})
+        response, body = self.request('GET', '/api/summary', headers={'If-None-Match': etag})
+        self.assertEqual(response.status, 200)
+        self.assertEqual(json.loads(body)['modules']['by_status'], {'confirmed': 1})
+
+    def test_rejects_invalid_bodies(self):
+        """请求体不是 JSON 对象（批量更新为对象或数组）时返回 400，连接仍可继续使用"""
+        self.request('GET', '/api/data')
+        sock = self.connection.sock
+        for path, body in (('/api/update/module', b'[1, 2]'), ('/api/update/module', b'null'),
+                           ('/api/update/assumption', b'"ASM-1"'), ('/api/update/assumption', b''),
+                           ('/api/update/batch', b'{not json'), ('/api/update/batch', b'5'),
+                           ('/api/update/batch', b'')):
+            with self.subTest(path=path, body=body):
+                response, result = self.post_raw(path, body)
+                self.assertEqual(response.status, 400)
+                self.assertFalse(result['success'])
+                self.assertTrue(result['error'])
+        self.assertIs(self.connection.sock, sock, 'keep-alive 连接没有被复用')
+        _, body = self.request('GET', '/api/data')
+        self.assertEqual(json.loads(body)['app']['modules'][0]['status'], 'pending')
+
+    def test_rejects_invalid_content_length(self):
+        """Content-Length 不是非负整数时返回 400 并关闭连接"""
+        for length in ('abc', '-5', '1.5'):
+            with self.subTest(length=length), socket.create_connection(('127.0.0.1', self.port), timeout=10) as raw:
+                raw.sendall(f'POST /api/update/module HTTP/1.1\r\nHost: localhost\r\n'
+                            f'Content-Length: {length}\r\n\r\n'
+                            '{"module_name": "Payment", "status": "confirmed"}'.encode('ascii'))
+                received = b''
+                # 服务器发送响应后关闭连接，因此一直读取到 EOF
+                while True:
+                    chunk = raw.recv(65536)
+                    if not chunk:
+                        break
+                    received += chunk
+                headers, body = received.split(b'\r\n\r\n', 1)
+                self.assertTrue(headers.startswith(b'HTTP/1.1 400'), headers)
+                self.assertIn(b'Connection: close', headers)
+                self.assertFalse(json.loads(body)['success'])
+        _, body = self.request('GET', '/api/data')
+        self.assertEqual(json.loads(body)['app']['modules'][0]['status'], 'pending')
+
+
+if __name__ == '__main__':
+    unittest.main()
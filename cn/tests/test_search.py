@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+测试：任务、假设、模块和异常的全文搜索
+
+测试目标：
+1. 中英文混合的文本经过分词后，任意中文片段和任意英文单词都能被搜索到
+2. 查询中的每个词都必须匹配，ID 和名称中的匹配排在描述和备注中的匹配之前
+3. 命中带有条目的 JSON Pointer 路径，类型过滤和分页正常工作
+4. 更新一个数据文件只重建该文件的索引
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from cox.scripts import run_web_observability as observability
+
+PROJECT = {
+    'project_name': 'Search',
+    'current_iteration': 'ITER-2',
+    'iterations': [
+        {'iteration_id': 'ITER-1', 'tasks': [
+            {'task_id': 'TASK-1', 'task_name': 'Login page', 'status': 'done', 'notes': 'Payment link in footer'},
+        ], 'assumptions': []},
+        {'iteration_id': 'ITER-2', 'tasks': [
+            {'task_id': 'TASK-2', 'task_name': '修复支付接口超时', 'status': 'todo',
+             'description': 'Retry the payment gateway call'},
+            {'task_id': 'TASK-3', 'task_name': 'Payment refactor', 'status': 'in_progress'},
+        ], 'assumptions': [
+            {'assumption_id': 'ASM-1', 'hypothesis': '用户愿意使用扫码支付', 'status': 'pending'},
+        ]},
+    ],
+}
+APP = {'modules': [
+    {'module_id': 'MOD-1', 'module_name': 'Payment', 'status': 'has_issue', 'issue_description': '回调超时'},
+    {'module_id': 'MOD-2', 'module_name': 'Login', 'status': 'confirmed'},
+]}
+TEST = {'test_suites': [], 'anomalies': [
+    {'anomaly_id': 'ANOM-1', 'description': '支付接口 timeout under load', 'status': 'open'},
+]}
+
+
+class TestSearch(unittest.TestCase):
+    """测试搜索索引和 /api/search 接口"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        files = []
+        for name, data in (('project', PROJECT), ('app', APP), ('test', TEST)):
+            files.append(os.path.join(self.temp_dir, f'{name}.json'))
+            with open(files[-1], 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+        self.data_manager = observability.ObservabilityData(*files)
+        self.data_manager.load_if_changed()
+
+    def tearDown(self):
+        self.data_manager.writer.flush()
+        shutil.rmtree(self.temp_dir)
+
+    def search(self, query, types=None, offset=0, limit=observability.SEARCH_DEFAULT_LIMIT):
+        return self.data_manager.search(query, types, offset, limit)[1:]
+
+    def test_tokenization(self):
+        """英文单词转为小写，中文切分为单字和相邻两字"""
+        self.assertEqual(observability.search_terms('Payment API-v2'), ['payment', 'api', 'v2'])
+        self.assertEqual(observability.search_terms('支付接口 OK'),
+                         ['支', '付', '接', '口', '支付', '付接', '接口', 'ok'])
+        self.assertEqual(observability.search_terms('支付接口', query=True), ['支付', '付接', '接口'])
+        self.assertEqual(observability.search_terms('付', query=True), ['付'])
+
+    def test_chinese_substring(self):
+        """中文查询匹配文本中任意位置包含它的条目"""
+        total, hits = self.search('支付接口')
+        self.assertEqual(total, 2)
+        self.assertEqual({hit['id'] for hit in hits}, {'TASK-2', 'ANOM-1'})
+        total, hits = self.search('支付')
+        self.assertEqual({hit['id'] for hit in hits}, {'TASK-2', 'ASM-1', 'ANOM-1'})
+
+    def test_ranking_and_paths(self):
+        """名称匹配排在前面，每个词都必须匹配，命中路径指向数据中的条目"""
+        total, hits = self.search('payment')
+        self.assertEqual(total, 4)
+        self.assertEqual({hit['id'] for hit in hits[:2]}, {'TASK-3', 'MOD-1'})
+        self.assertEqual({hit['id'] for hit in hits[2:]}, {'TASK-1', 'TASK-2'})
+        paths = {hit['id']: hit['path'] for hit in hits}
+        self.assertEqual(paths['TASK-3'], '/project/iterations/1/tasks/1')
+        self.assertEqual(paths['MOD-1'], '/app/modules/0')
+
+        total, hits = self.search('超时 payment')
+        self.assertEqual([hit['id'] for hit in hits], ['TASK-2', 'MOD-1'])
+        self.assertEqual(self.search('payment nothing'), (0, []))
+
+    def test_type_filter_and_pagination(self):
+        """type 限定条目类型，offset/limit 对排序后的命中分页"""
+        total, hits = self.search('支付', types=['assumptions'])
+        self.assertEqual((total, [hit['id'] for hit in hits]), (1, ['ASM-1']))
+        ranked = [hit['id'] for hit in self.search('payment')[1]]
+        total, hits = self.search('payment', offset=1, limit=2)
+        self.assertEqual(total, 4)
+        self.assertEqual([hit['id'] for hit in hits], ranked[1:3])
+
+    def test_incremental_rebuild(self):
+        """更新模块后重建应用数据的索引，项目数据的索引保持不变"""
+        self.search('payment')
+        project_index = self.data_manager.snapshot.searches['project']
+        ok = self.data_manager.writer.update('app', lambda app: observability.set_module_status(app, 'Payment', 'confirmed'))
+        self.assertTrue(ok)
+        self.assertNotIn('app', self.data_manager.snapshot.searches)
+        self.assertEqual(self.search('回调'), (0, []))
+        self.assertIs(self.data_manager.snapshot.searches['project'], project_index)
+
+    @unittest.skipUnless(observability.FLASK_AVAILABLE, '未安装 Flask')
+    def test_search_endpoint(self):
+        """/api/search 返回排序后的命中，并拒绝不合法的参数"""
+        observability.data_manager = self.data_manager
+        client = observability.get_app().test_client()
+        response = client.get('/api/search', query_string={'q': '支付接口', 'type': 'tasks'})
+        self.assertEqual(response.status_code, 200)
+        body = response.get_json()
+        self.assertEqual((body['total'], body['hits'][0]['id']), (1, 'TASK-2'))
+        self.assertEqual(client.get('/api/search?q=payment', headers={'If-None-Match': response.headers['ETag']})
+                         .status_code, 304)
+        self.assertEqual(client.get('/api/search').status_code, 400)
+        self.assertEqual(client.get('/api/search?q=payment&type=users').status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+压力测试：ObservabilityData 的不可变快照与 single-flight 重新加载
+
+测试目标：
+1. 与写入和文件重新加载并发执行的读取方，永远不会看到来自不同版本的项目数据和应用数据
+2. 每个数据版本只有一份响应体，无论由哪个线程序列化
+3. 多个请求线程同时发现同一文件变化时，只有一个线程解析文件，
+   其余线程不等待，继续使用上一个快照
+4. 已发布、尚未落盘的修改在其它程序改写文件并被重新加载后仍然保留，
+   写回这些修改时既不会覆盖、也不会掩盖该程序的写入
+5. 等待加载锁的写入器不会被不断重新加载变化文件的请求线程饿死
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from cox.scripts import run_web_observability as observability
+
+READER_THREADS = 8
+WRITER_UPDATES = 200
+EDITOR_REWRITES = 200
+# 一致性测试中写入线程和改写线程完成的时间上限（秒）
+STRESS_TIMEOUT = 60
+# single-flight 测试中注入的解析耗时，以及未执行加载的读取方允许的最长耗时
+SLOW_PARSE = 0.5
+FAST_READ = 0.25
+
+
+class TestSnapshotStress(unittest.TestCase):
+    """在并发读取、写入和重新加载下压力测试快照替换"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.files = {name: os.path.join(self.temp_dir, f'{name}.json') for name in ('project', 'app', 'test')}
+        self.write_file('project', {'project_name': 'Stress', 'generation': 0, 'iterations': []})
+        self.write_file('app', {'generation': 0, 'modules': []})
+        self.write_file('test', {'revision': 0, 'test_suites': [], 'anomalies': []})
+        self.data_manager = observability.ObservabilityData(self.files['project'], self.files['app'], self.files['test'])
+        self.data_manager.load_if_changed()
+
+    def tearDown(self):
+        self.data_manager.writer.flush()
+        shutil.rmtree(self.temp_dir)
+
+    def write_file(self, name, data, mtime=None):
+        # 原子替换，重新加载时不会读到写了一半的文件
+        tmp_path = f'{self.files[name]}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.files[name])
+        if mtime is not None:
+            # 确保在时间戳精度较低的文件系统上签名也会变化
+            os.utime(self.files[name], (mtime, mtime))
+
+    def test_readers_see_consistent_snapshots(self):
+        """项目数据和应用数据总是一起发布，每个 etag 只对应一份响应体"""
+        data_manager = self.data_manager
+        data_manager.writer.flush_interval = 0
+        stop = threading.Event()
+        errors = []
+        payloads = {}
+        payloads_lock = threading.Lock()
+
+        def set_generation(generation):
+            return lambda data: (dict(data, generation=generation), True)
+
+        def writer():
+            for generation in range(1, WRITER_UPDATES + 1):
+                if stop.is_set():
+                    return
+                data_manager.writer.update_many([('project', set_generation(generation)),
+                                                 ('app', set_generation(generation))])
+
+        def external_editor():
+            # 其它工具不断改写 test_metrics.json，在更新期间触发重新加载
+            for revision in range(1, EDITOR_REWRITES + 1):
+                if stop.is_set():
+                    return
+                self.write_file('test', {'revision': revision, 'test_suites': [], 'anomalies': []},
+                                mtime=time.time() + revision)
+                time.sleep(0.005)
+
+        def reader():
+            last_version = 0
+            while not stop.is_set():
+                data = data_manager.get_all_data()
+                if data['project']['generation'] != data['app']['generation']:
+                    errors.append(f"mixed data: project {data['project']['generation']}, "
+                                  f"app {data['app']['generation']}")
+                etag, kind, payload = data_manager.get_update()
+                body = json.loads(payload)
+                if body['project']['generation'] != body['app']['generation']:
+                    errors.append(f'mixed payload for {etag}')
+                with payloads_lock:
+                    if payloads.setdefault(etag, payload) != payload:
+                        errors.append(f'two different payloads for {etag}')
+                version = data_manager.version
+                if version < last_version:
+                    errors.append(f'version went back from {last_version} to {version}')
+                last_version = version
+                # 短暂让出，避免读线程抢占 GIL 使写线程饿死
+                time.sleep(0.001)
+
+        workers = [threading.Thread(target=writer), threading.Thread(target=external_editor)]
+        readers = [threading.Thread(target=reader) for _ in range(READER_THREADS)]
+        for thread in workers + readers:
+            thread.start()
+        try:
+            deadline = time.monotonic() + STRESS_TIMEOUT
+            for thread in workers:
+                thread.join(timeout=max(0, deadline - time.monotonic()))
+            unfinished = [thread for thread in workers if thread.is_alive()]
+        finally:
+            # 无论断言是否失败，都在 tearDown 删除文件之前停止所有线程
+            stop.set()
+            for thread in workers + readers:
+                thread.join()
+
+        self.assertEqual(unfinished, [], '写入线程或改写线程未能按时完成')
+        self.assertEqual(errors[:5], [])
+        final = data_manager.get_all_data()
+        self.assertEqual(final['project']['generation'], WRITER_UPDATES)
+        self.assertEqual(final['app']['generation'], WRITER_UPDATES)
+        self.assertEqual(final['test']['revision'], EDITOR_REWRITES)
+        # 每次更新都已写回磁盘
+        with open(self.files['app'], 'r', encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['generation'], WRITER_UPDATES)
+
+    def test_waiting_writer_has_priority(self):
+        """有写入器在等待加载锁时，请求线程使用当前快照，而不是重新加载"""
+        data_manager = self.data_manager
+        self.write_file('app', {'generation': 1, 'modules': []}, mtime=time.time() + 10)
+        data_manager._writers_waiting = 1
+        try:
+            self.assertFalse(data_manager.load_if_changed(wait=False))
+            self.assertEqual(data_manager.get_all_data()['app']['generation'], 0)
+        finally:
+            data_manager._writers_waiting = 0
+        # 写入器本身以及阻塞式加载仍会重新加载
+        self.assertTrue(data_manager.load_if_changed())
+        self.assertEqual(data_manager.get_all_data()['app']['generation'], 1)
+
+    def test_single_flight_reload(self):
+        """只有一个线程解析变化的文件，其余线程继续读取上一个快照"""
+        data_manager = self.data_manager
+        parses = []
+        original_loads = observability.json_codec.loads
+
+        def slow_loads(raw):
+            parses.append(threading.get_ident())
+            time.sleep(SLOW_PARSE)
+            return original_loads(raw)
+
+        self.write_file('project', {'project_name': 'Stress', 'generation': 1, 'iterations': []},
+                        mtime=time.time() + 10)
+        barrier = threading.Barrier(READER_THREADS)
+        results = []
+
+        def reader():
+            barrier.wait()
+            started = time.perf_counter()
+            generation = data_manager.get_all_data()['project']['generation']
+            results.append((time.perf_counter() - started, generation))
+
+        observability.json_codec.loads = slow_loads
+        try:
+            threads = [threading.Thread(target=reader) for _ in range(READER_THREADS)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(timeout=30)
+        finally:
+            observability.json_codec.loads = original_loads
+
+        self.assertEqual(len(parses), 1)
+        self.assertEqual(len(results), READER_THREADS)
+        # 执行加载的线程返回新数据，其余线程立即返回旧数据
+        slow = [result for result in results if result[0] >= SLOW_PARSE]
+        fast = [result for result in results if result[0] < FAST_READ]
+        self.assertEqual(len(slow), 1)
+        self.assertEqual(slow[0][1], 1)
+        self.assertEqual(len(fast), READER_THREADS - 1)
+        self.assertTrue(all(generation == 0 for _, generation in fast))
+        self.assertEqual(data_manager.get_all_data()['project']['generation'], 1)
+
+    def test_writer_waits_for_reload(self):
+        """加载期间发起的更新作用在新加载的数据之上"""
+        data_manager = self.data_manager
+        original_loads = observability.json_codec.loads
+        loading = threading.Event()
+
+        def slow_loads(raw):
+            loading.set()
+            time.sleep(SLOW_PARSE)
+            return original_loads(raw)
+
+        self.write_file('app', {'generation': 5, 'modules': []}, mtime=time.time() + 10)
+        observability.json_codec.loads = slow_loads
+        try:
+            reload_thread = threading.Thread(target=data_manager.get_all_data)
+            reload_thread.start()
+            self.assertTrue(loading.wait(5))
+            ok = data_manager.writer.update('app', lambda app: (dict(app, generation=app['generation'] + 1), True))
+            reload_thread.join()
+        finally:
+            observability.json_codec.loads = original_loads
+
+        self.assertTrue(ok)
+        self.assertEqual(data_manager.get_all_data()['app']['generation'], 6)
+
+
+class TestExternalWrites(unittest.TestCase):
+    """尚未落盘的修改与同时被其它程序改写的文件"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.files = {name: os.path.join(self.temp_dir, f'{name}.json') for name in ('project', 'app', 'test')}
+        self.assumptions = [{'assumption_id': 'ASM-1', 'status': 'pending'},
+                            {'assumption_id': 'ASM-2', 'status': 'pending'}]
+        self.write_file('project', {'iterations': [{'iteration_id': 'ITER-1', 'assumptions': self.assumptions}]})
+        self.write_file('app', self.app_data('pending', 'pending'))
+        self.write_file('test', {'test_suites': [], 'anomalies': []})
+        self.data_manager = observability.ObservabilityData(self.files['project'], self.files['app'], self.files['test'])
+        self.data_manager.load_if_changed()
+
+    def tearDown(self):
+        self.data_manager.stop_watching()
+        self.data_manager.writer.flush()
+        shutil.rmtree(self.temp_dir)
+
+    @staticmethod
+    def app_data(login, payment):
+        return {'modules': [{'module_name': 'Login', 'status': login}, {'module_name': 'Payment', 'status': payment}]}
+
+    def write_file(self, name, data):
+        # 像编辑器或其它工具那样直接原地写入
+        with open(self.files[name], 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+    def click(self, module_name, status):
+        ok = self.data_manager.writer.update(
+            'app', lambda app: observability.set_module_status(app, module_name, status))
+        self.assertTrue(ok)
+
+    def statuses(self):
+        """内存中和磁盘上的模块状态"""
+        memory = [module['status'] for module in self.data_manager.get_all_data(reload=False)['app']['modules']]
+        with open(self.files['app'], 'r', encoding='utf-8') as f:
+            disk = [module['status'] for module in json.load(f)['modules']]
+        return memory, disk
+
+    def test_reload_replays_pending_updates(self):
+        """等待落盘的点击会重放到被外部改写的文件内容上"""
+        self.data_manager.writer.flush_interval = 5
+        self.click('Login', 'confirmed')
+        ok = self.data_manager.writer.update('project', lambda project: observability.set_assumption_status(
+            project, self.data_manager.find_assumption(project, 'ASM-2'), 'validated'))
+        self.assertTrue(ok)
+
+        self.write_file('app', self.app_data('pending', 'has_issue'))
+        # 外部程序还插入了一个假设，ASM-2 的位置随之改变
+        assumptions = [{'assumption_id': 'ASM-0', 'status': 'pending'}] + self.assumptions
+        self.write_file('project', {'iterations': [{'iteration_id': 'ITER-1', 'assumptions': assumptions}]})
+        self.assertTrue(self.data_manager.load_if_changed())
+
+        memory = self.data_manager.get_all_data(reload=False)
+        self.assertEqual([a['status'] for a in memory['project']['iterations'][0]['assumptions']],
+                         ['pending', 'pending', 'validated'])
+        self.assertEqual(self.statuses()[0], ['confirmed', 'has_issue'])
+        self.data_manager.writer.flush()
+        self.assertEqual(self.statuses(), (['confirmed', 'has_issue'], ['confirmed', 'has_issue']))
+        self.assertFalse(self.data_manager.load_if_changed())
+
+    def test_external_write_then_click_with_watcher(self):
+        """紧跟外部写入的点击作用在该写入之上，即使监听线程尚未重新加载它"""
+        self.data_manager.writer.flush_interval = 0
+        self.data_manager.start_watching(debounce=0.05, poll_interval=0.05)
+        self.write_file('app', self.app_data('optimized', 'has_issue'))
+        self.click('Login', 'confirmed')
+        self.assertEqual(self.statuses(), (['confirmed', 'has_issue'], ['confirmed', 'has_issue']))
+        # 让监听线程处理文件事件；它不能把不含这次点击的外部内容重新装回
+        time.sleep(0.5)
+        self.assertEqual(self.statuses(), (['confirmed', 'has_issue'], ['confirmed', 'has_issue']))
+        self.assertFalse(self.data_manager.load_if_changed())
+
+    def test_flush_retries_when_file_changes_during_write(self):
+        """落盘写临时文件期间到达的外部写入被合并，而不是被覆盖"""
+        self.data_manager.writer.flush_interval = 5
+        self.click('Login', 'confirmed')
+        real_fsync = os.fsync
+        external = [self.app_data('pending', 'has_issue')]
+
+        def fsync_then_external_write(fd):
+            real_fsync(fd)
+            if external:
+                self.write_file('app', external.pop())
+
+        with mock.patch('os.fsync', side_effect=fsync_then_external_write):
+            self.data_manager.writer.flush()
+        self.assertEqual(self.statuses(), (['confirmed', 'has_issue'], ['confirmed', 'has_issue']))
+        self.assertFalse(self.data_manager.load_if_changed())
+
+    def test_write_after_flush_is_not_hidden(self):
+        """落盘替换文件之后紧接着到达的外部写入仍会被重新加载"""
+        self.data_manager.writer.flush_interval = 0
+        real_replace = os.replace
+        external = [self.app_data('optimized', 'optimized')]
+
+        def replace_then_external_write(src, dst):
+            real_replace(src, dst)
+            if dst == self.files['app'] and external:
+                self.write_file('app', external.pop())
+
+        with mock.patch('os.replace', side_effect=replace_then_external_write):
+            self.click('Login', 'confirmed')
+        self.assertTrue(self.data_manager.load_if_changed())
+        self.assertEqual(self.statuses(), (['optimized', 'optimized'], ['optimized', 'optimized']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -183,5 +183,155 @@ class TestStaticObservability(unittest.TestCase):
         print(f"3. 第一个迭代包含2个任务：'任务1'和'任务2'")
         print(f"4. 任务状态正确显示（todo/in_progress）")
 
+    def test_static_regeneration_skips_unchanged_input(self):
+        """测试输入未变化时不重写静态网页"""
+        from cox.scripts.run_web_observability import ObservabilityData, generate_static_html, read_static_input_hash
+
+        app_path = os.path.join(self.temp_dir, 'app_status.json')
+        data_manager = ObservabilityData(
+            os.path.join(self.temp_dir, 'project_data.json'),
+            app_path,
+            os.path.join(self.temp_dir, 'test_metrics.json')
+        )
+
+        generate_static_html(data_manager, self.output_html)
+        first_hash = read_static_input_hash(self.output_html)
+        self.assertIsNotNone(first_hash, "HTML中未记录输入哈希")
+
+        # 输入相同：输出文件保持不变
+        first_mtime = os.stat(self.output_html).st_mtime_ns
+        generate_static_html(data_manager, self.output_html)
+        self.assertEqual(os.stat(self.output_html).st_mtime_ns, first_mtime)
+
+        # 数据文件变化：重新生成页面，哈希随之改变
+        with open(app_path, 'r', encoding='utf-8') as f:
+            app_status = json.load(f)
+        app_status['version'] = '1.0.1'
+        with open(app_path, 'w', encoding='utf-8') as f:
+            json.dump(app_status, f, ensure_ascii=False, indent=2)
+        generate_static_html(data_manager, self.output_html)
+        self.assertNotEqual(read_static_input_hash(self.output_html), first_hash)
+        with open(self.output_html, 'r', encoding='utf-8') as f:
+            self.assertIn('1.0.1', f.read(), "更新后的数据未写入HTML")
+
+    def test_static_embeds_rendered_fields_only(self):
+        """测试只内联页面渲染的字段，并可选以 gzip 形式内联"""
+        import base64
+        import gzip
+        from cox.scripts.run_web_observability import ObservabilityData, generate_static_html
+
+        project_path = os.path.join(self.temp_dir, 'project_data.json')
+        with open(project_path, 'r', encoding='utf-8') as f:
+            project_data = json.load(f)
+        project_data['iterations'][0]['tasks'][0]['description'] = 'NOT-RENDERED-FIELD'
+        with open(project_path, 'w', encoding='utf-8') as f:
+            json.dump(project_data, f, ensure_ascii=False, indent=2)
+        data_manager = ObservabilityData(
+            project_path,
+            os.path.join(self.temp_dir, 'app_status.json'),
+            os.path.join(self.temp_dir, 'test_metrics.json')
+        )
+
+        generate_static_html(data_manager, self.output_html)
+        with open(self.output_html, 'r', encoding='utf-8') as f:
+            html_content = f.read()
+        self.assertIn('TASK-001', html_content)
+        self.assertNotIn('NOT-RENDERED-FIELD', html_content, "页面不渲染的字段被内联到了HTML中")
+
+        # gzip 内联：数据只存在于压缩后的数据块中
+        gzip_html = os.path.join(self.temp_dir, 'observability_gzip.html')
+        generate_static_html(data_manager, gzip_html, embed='gzip')
+        with open(gzip_html, 'r', encoding='utf-8') as f:
+            html_content = f.read()
+        self.assertIn('DecompressionStream', html_content)
+        self.assertNotIn('TASK-001', html_content)
+        blob = html_content.split("const staticDataGzip = '", 1)[1].split("'", 1)[0]
+        data = json.loads(gzip.decompress(base64.b64decode(blob)))
+        self.assertEqual(data['project']['iterations'][0]['tasks'][0]['task_id'], 'TASK-001')
+        self.assertNotIn('description', data['project']['iterations'][0]['tasks'][0])
+
+    def test_static_inlines_assets(self):
+        """测试静态网页内联样式表和图标 sprite，且不从 CDN 加载任何资源"""
+        from cox.scripts.run_web_observability import ObservabilityData, generate_static_html, load_dashboard_assets
+
+        data_manager = ObservabilityData(
+            os.path.join(self.temp_dir, 'project_data.json'),
+            os.path.join(self.temp_dir, 'app_status.json'),
+            os.path.join(self.temp_dir, 'test_metrics.json')
+        )
+        generate_static_html(data_manager, self.output_html)
+        with open(self.output_html, 'r', encoding='utf-8') as f:
+            html_content = f.read()
+
+        for cdn in ('cdn.tailwindcss.com', 'unpkg.com', 'lucide@', 'lucide.createIcons'):
+            self.assertNotIn(cdn, html_content, f"静态网页仍引用了 {cdn}")
+        self.assertNotIn('/assets/', html_content, "静态网页引用了离线时无法加载的资源")
+
+        assets = load_dashboard_assets()
+        css = assets['dashboard.css']['content'].decode('utf-8')
+        self.assertIn('<style>\n' + css, html_content, "样式表未内联")
+        # sprite 以隐藏方式内联，图标只通过片段标识引用其中的 symbol
+        sprite = assets['icons.svg']['content'].decode('utf-8').strip()
+        self.assertIn(sprite.replace('<svg ', '<svg style="display: none" ', 1), html_content, "图标 sprite 未内联")
+        self.assertIn("const ICON_SPRITE = '';", html_content)
+
+    def test_watch_regenerates_on_change_and_deletion(self):
+        """测试 --watch 在数据文件被修改或删除后重新生成网页"""
+        import signal
+        import subprocess
+        import time
+
+        script = Path(__file__).parent.parent / 'cox' / 'scripts' / 'run_web_observability.py'
+        app_path = os.path.join(self.temp_dir, 'app_status.json')
+        process = subprocess.Popen([sys.executable, str(script), '--mode', 'static', '--watch', '--debounce', '50',
+                                    '--project', os.path.join(self.temp_dir, 'project_data.json'),
+                                    '--app', app_path, '--test', os.path.join(self.temp_dir, 'test_metrics.json'),
+                                    '--output', self.output_html],
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.addCleanup(process.kill)
+
+        def wait_for_page(check, message):
+            deadline = time.monotonic() + 30
+            while time.monotonic() < deadline:
+                if os.path.exists(self.output_html):
+                    with open(self.output_html, 'r', encoding='utf-8') as f:
+                        if check(f.read()):
+                            return
+                time.sleep(0.1)
+            self.fail(message)
+
+        wait_for_page(lambda html: 'TASK-001' in html and '9.9.9' not in html, "初始网页未生成")
+        with open(app_path, 'r', encoding='utf-8') as f:
+            app_status = json.load(f)
+        app_status['version'] = '9.9.9'
+        with open(app_path, 'w', encoding='utf-8') as f:
+            json.dump(app_status, f)
+        wait_for_page(lambda html: '9.9.9' in html, "数据文件修改后网页未重新生成")
+
+        # 删除数据文件同样算作变化：网页按缺少该文件的数据重新生成
+        os.remove(app_path)
+        wait_for_page(lambda html: '9.9.9' not in html and 'TASK-001' in html,
+                      "数据文件删除后网页未重新生成")
+
+        process.send_signal(signal.SIGINT)
+        self.assertEqual(process.wait(timeout=30), 0)
+
+    def test_watch_does_not_load_data(self):
+        """测试 --watch 只监听文件，不加载数据管理器、也不建立集合索引"""
+        from unittest import mock
+        from cox.scripts import run_web_observability as observability
+
+        data_manager = observability.ObservabilityData(
+            os.path.join(self.temp_dir, 'project_data.json'),
+            os.path.join(self.temp_dir, 'app_status.json'),
+            os.path.join(self.temp_dir, 'test_metrics.json')
+        )
+        with mock.patch.object(observability.DataFileWatcher, 'wait_for_changes', side_effect=KeyboardInterrupt):
+            observability.watch_static_html(data_manager, self.output_html)
+        self.assertTrue(os.path.exists(self.output_html))
+        self.assertEqual(data_manager.version, 0)
+        self.assertEqual(data_manager.snapshot.collections, {})
+        self.assertIsNone(data_manager._watcher)
+
 if __name__ == '__main__':
     unittest.main()
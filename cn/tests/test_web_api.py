@@ -0,0 +1,1183 @@
+#!/usr/bin/env python3
+"""
+测试：Web 模式接口（Flask 测试客户端）
+
+测试目标：
+1. /api/stream 先发送完整数据，之后每次变化发送 patch 事件，空闲时发送 keep-alive 注释
+2. /api/data 带有内容哈希 ETag 和 X-Last-Updated，If-None-Match 一致时返回 304
+3. /api/data 和首页每个版本只压缩一次，按 Accept-Encoding 以 br 或 gzip 发送
+4. 后台监听线程把连续多次写入合并为一次重新加载，没有 inotify 时退回为轮询
+5. JSON Patch 能把旧数据变为新数据，/api/data?since= 与完整数据一样压缩发送补丁，
+   该版本已不在历史中时退回为完整数据
+6. 请求体不是 JSON 对象的更新请求返回 400，收到 SIGTERM 时先写出尚未落盘的修改再退出
+7. 批量更新要么在同一个版本中应用全部条目，要么在任一条目失败时一条也不应用
+8. 通过假设索引按 id 或内容的 base64 编码定位假设，重新加载后重建索引
+9. 面板页面只渲染一次并可用 ETag 重新验证，--dev 模式下每个请求都重新渲染
+10. 集合接口支持过滤、排序和分页，拒绝不合法的参数，并用数据 ETag 重新验证
+11. 项目注册表淘汰最久未访问的项目：先把待写入的修改落盘，
+    之后再针对被淘汰的数据管理器提交的修改一律失败
+12. /metrics 以 Prometheus 文本格式报告请求、缓存、重新加载和落盘指标
+13. /debug/profile 报告最近最慢的请求，以及被采样请求中耗时最多的函数
+14. 多进程（prefork）服务器在工作进程之间共享修改，收到 SIGHUP 时替换工作进程，收到 SIGTERM 时正常退出
+15. 页面引用带版本号的本地资源而不是 CDN，资源按 immutable 缓存，支持 ETag/304 和 gzip
+16. /api/summary 统计任务、模块、测试和异常以及每个负责人的数据，用数据 ETag 重新验证，
+    能处理空集合，并像页面一样对完成率四舍五入（0.5 向上取整）
+"""
+
+import os
+import sys
+import gzip
+import base64
+import copy
+import json
+import shutil
+import signal
+import socket
+import tempfile
+import subprocess
+import http.client
+import time
+import unittest
+from unittest import mock
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from cox.scripts import run_web_observability as observability
+
+SCRIPT = Path(__file__).parent.parent / 'cox' / 'scripts' / 'run_web_observability.py'
+
+PROJECT = {
+    'project_name': 'API',
+    'current_iteration': 'ITER-2',
+    'iterations': [
+        {'iteration_id': 'ITER-1', 'status': 'completed', 'tasks': [
+            {'task_id': 'TASK-1', 'task_name': 'Login page', 'status': 'completed', 'assignee': 'Alice',
+             'priority': 'high'},
+        ], 'assumptions': [
+            {'assumption_id': 'ASM-1', 'hypothesis': 'Users log in daily', 'status': 'pending'},
+        ]},
+        {'iteration_id': 'ITER-2', 'status': 'in_progress', 'tasks': [
+            {'task_id': 'TASK-2', 'task_name': 'Payment', 'status': 'todo', 'assignee': 'Bob', 'priority': 'high'},
+            {'task_id': 'TASK-3', 'task_name': 'Refund', 'status': 'in_progress', 'assignee': 'Alice',
+             'priority': 'low'},
+            {'task_id': 'TASK-4', 'task_name': 'Invoice', 'status': 'todo', 'assignee': 'Alice',
+             'priority': 'medium'},
+        ], 'assumptions': [
+            {'hypothesis': 'Users pay by card', 'status': 'pending'},
+        ]},
+    ],
+}
+APP = {'modules': [
+    {'module_name': 'Login', 'status': 'confirmed', 'owner': 'Alice', 'completion_rate': 100},
+    {'module_name': 'Payment', 'status': 'pending', 'owner': 'Bob', 'completion_rate': 40},
+]}
+TEST = {'test_suites': [], 'anomalies': [
+    {'anomaly_id': 'ANOM-1', 'type': 'error', 'severity': 'high', 'status': 'open'},
+]}
+
+
+class WebApiTestCase(unittest.TestCase):
+    """写入模拟数据文件，并让 Flask 应用使用这些数据"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.files = {}
+        for name, data in (('project', PROJECT), ('app', APP), ('test', TEST)):
+            self.files[name] = os.path.join(self.temp_dir, f'{name}.json')
+            self.write_file(name, data)
+        self.previous_manager = observability.data_manager
+        self.data_manager = observability.ObservabilityData(self.files['project'], self.files['app'],
+                                                            self.files['test'])
+        self.data_manager.writer.flush_interval = 0
+        observability.data_manager = self.data_manager
+        self.client = observability.get_app().test_client() if observability.FLASK_AVAILABLE else None
+        # 每个测试都从零开始统计指标和缓存页面
+        for name, value in (('server_metrics', observability.ServerMetrics(observability.SERVER_METRICS)),
+                            ('dashboard_page', None)):
+            patcher = mock.patch.object(observability, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.data_manager.stop_watching()
+        self.data_manager.writer.flush()
+        observability.data_manager = self.previous_manager
+        shutil.rmtree(self.temp_dir)
+
+    def write_file(self, name, data):
+        with open(self.files[name], 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+    def read_file(self, name):
+        with open(self.files[name], 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def metric(self, sample, text=None):
+        """/metrics 中名称（含标签）为 sample 的样本值，尚未记录时为 0"""
+        if text is None:
+            text = observability.server_metrics.render()
+        for line in text.splitlines():
+            name, _, value = line.rpartition(' ')
+            if name == sample:
+                return float(value)
+        return 0
+
+    @staticmethod
+    def kill_server(process):
+        """结束服务器进程，并通过其进程组结束它 fork 出的全部工作进程"""
+        if hasattr(os, 'killpg'):
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        process.kill()
+        process.wait()
+
+    def run_server(self, mode, *args):
+        """以很长的落盘间隔和额外参数 args 按 mode 启动面板，返回 (进程, 端口)"""
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            port = sock.getsockname()[1]
+        process = subprocess.Popen([sys.executable, str(SCRIPT), '--mode', mode, '--port', str(port),
+                                    '--flush-interval', '60000', '--project', self.files['project'],
+                                    '--app', self.files['app'], '--test', self.files['test'], *args],
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+        self.addCleanup(self.kill_server, process)
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                return process, port
+            except OSError:
+                time.sleep(0.1)
+        self.fail(f'{mode} 服务器未能启动')
+
+    def update_module(self, module_name, status):
+        response = self.client.post('/api/update/module', json={'module_name': module_name, 'status': status})
+        self.assertEqual(response.get_json(), {'success': True})
+
+
+@unittest.skipUnless(observability.FLASK_AVAILABLE, 'Flask is not installed')
+class TestStream(WebApiTestCase):
+    """测试 /api/stream SSE 推送通道"""
+
+    def open_stream(self, headers=None):
+        response = self.client.get('/api/stream', headers=headers, buffered=False)
+        self.addCleanup(response.close)
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        return iter(response.response)
+
+    def test_full_then_patch(self):
+        """第一个事件包含完整数据，下一个事件是相对它的 JSON Patch"""
+        events = self.open_stream()
+        first = next(events)
+        self.assertTrue(first.startswith(b'id: ') and first.endswith(b'\n\n'), first)
+        header, data = first.split(b'\ndata: ', 1)
+        etag = header[len(b'id: '):].decode('ascii')
+        self.assertEqual(etag, self.data_manager.etag)
+        self.assertEqual(json.loads(data)['app']['modules'][1]['status'], 'pending')
+
+        self.update_module('Payment', 'confirmed')
+        event = next(events)
+        lines = event.rstrip(b'\n').split(b'\n')
+        self.assertEqual(lines[0], b'event: patch')
+        self.assertEqual(lines[1], f'id: {self.data_manager.etag}'.encode('ascii'))
+        patch = json.loads(lines[2][len(b'data: '):])
+        self.assertEqual(patch['since'], etag)
+        self.assertIn({'op': 'replace', 'path': '/app/modules/1/status', 'value': 'confirmed'}, patch['patch'])
+
+    def test_reconnect_with_last_event_id(self):
+        """重连的客户端收到相对 Last-Event-ID 的补丁，而不是完整数据"""
+        self.data_manager.load_if_changed()
+        etag = self.data_manager.etag
+        self.update_module('Login', 'has_issue')
+        event = next(self.open_stream({'Last-Event-ID': etag}))
+        self.assertTrue(event.startswith(b'event: patch\n'), event)
+        self.assertEqual(json.loads(event.split(b'data: ', 1)[1])['since'], etag)
+
+    def test_keep_alive_comment(self):
+        """数据没有变化时只发送注释行"""
+        with mock.patch.object(observability, 'SSE_POLL_INTERVAL', 0.01), \
+                mock.patch.object(observability, 'SSE_KEEPALIVE_INTERVAL', 0):
+            events = self.open_stream()
+            next(events)
+            self.assertEqual(next(events), b': keep-alive\n\n')
+            self.assertEqual(next(events), b': keep-alive\n\n')
+
+
+@unittest.skipUnless(observability.FLASK_AVAILABLE, 'Flask is not installed')
+class TestDataRevalidation(WebApiTestCase):
+    """测试 /api/data 的 ETag 重新验证"""
+
+    def test_etag_and_304(self):
+        """ETag 为内容哈希；If-None-Match 一致时返回空的 304"""
+        response = self.client.get('/api/data')
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers['ETag']
+        self.assertEqual(etag, f'"{self.data_manager.etag}"')
+        self.assertRegex(response.headers['X-Last-Updated'], r'^\d{2}:\d{2}:\d{2}$')
+        self.assertEqual(response.headers['Cache-Control'], 'no-cache')
+        self.assertEqual(set(response.get_json()), {'project', 'app', 'test'})
+
+        response = self.client.get('/api/data', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+        self.assertEqual(response.headers['ETag'], etag)
+        self.assertIn('X-Last-Updated', response.headers)
+
+    def test_etag_follows_content(self):
+        """只 touch 文件时 ETag 不变，修改内容后 ETag 随之改变"""
+        etag = self.client.get('/api/data').headers['ETag']
+        os.utime(self.files['test'], (1, 1))
+        self.assertEqual(self.client.get('/api/data', headers={'If-None-Match': etag}).status_code, 304)
+
+        self.write_file('test', dict(TEST, anomalies=[]))
+        response = self.client.get('/api/data', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+        self.assertEqual(response.get_json()['test']['anomalies'], [])
+
+
+@unittest.skipUnless(observability.FLASK_AVAILABLE, 'Flask is not installed')
+class TestCompression(WebApiTestCase):
+    """测试预压缩响应和内容协商"""
+
+    def test_gzip_payload(self):
+        """gzip 响应解压后与未压缩的响应体一致，并有自己的 ETag"""
+        identity = self.client.get('/api/data')
+        response = self.client.get('/api/data', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(response.headers['Vary'], 'Accept-Encoding')
+        self.assertEqual(response.headers['ETag'], f'"{self.data_manager.etag}-gzip"')
+        self.assertEqual(gzip.decompress(response.data), identity.data)
+        self.assertEqual(self.client.get('/api/data', headers={'Accept-Encoding': 'gzip',
+                                                               'If-None-Match': response.headers['ETag']}
+                                         ).status_code, 304)
+        # 未压缩版本的 ETag 不能验证 gzip 版本
+        self.assertEqual(self.client.get('/api/data', headers={'Accept-Encoding': 'gzip',
+                                                               'If-None-Match': identity.headers['ETag']}
+                                         ).status_code, 200)
+
+    def test_negotiation(self):
+        """安装了 brotli 时优先 br，q=0 表示拒绝该编码"""
+        def encoding(accept):
+            return self.client.get('/api/data', headers={'Accept-Encoding': accept}).headers.get('Content-Encoding')
+
+        self.assertEqual(encoding('br, gzip'), 'br' if observability.BROTLI_AVAILABLE else 'gzip')
+        self.assertIsNone(encoding('gzip;q=0'))
+        self.assertIsNone(encoding('deflate'))
+        self.assertIsNone(encoding(''))
+
+    def test_compressed_once_per_version(self):
+        """数据变化之前，重复请求复用已压缩的字节"""
+        with mock.patch.object(observability, 'compress_payload', wraps=observability.compress_payload) as compress:
+            for _ in range(3):
+                self.client.get('/api/data', headers={'Accept-Encoding': 'gzip'})
+            self.assertEqual([call[0][1] for call in compress.call_args_list], ['gzip'])
+            self.update_module('Payment', 'confirmed')
+            response = self.client.get('/api/data', headers={'Accept-Encoding': 'gzip'})
+            self.assertEqual([call[0][1] for call in compress.call_args_list], ['gzip', 'gzip'])
+        self.assertEqual(json.loads(gzip.decompress(response.data))['app']['modules'][1]['status'], 'confirmed')
+
+    def test_page(self):
+        """首页以压缩形式发送，每种编码有各自的 ETag"""
+        response = self.client.get('/', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertIn(b'<!DOCTYPE html>', gzip.decompress(response.data))
+        self.assertTrue(response.headers['ETag'].endswith('-gzip"'))
+        identity = self.client.get('/')
+        self.assertNotIn('Content-Encoding', identity.headers)
+        self.assertEqual(identity.data, gzip.decompress(response.data))
+
+
+class TestWatcher(WebApiTestCase):
+    """测试后台数据文件监听"""
+
+    def start_watching(self, backend):
+        """以指定方式启动监听，并统计重新加载的次数"""
+        inotify = observability.InotifyWatch if backend == 'inotify' else mock.Mock(side_effect=OSError('unavailable'))
+        with mock.patch.object(observability, 'InotifyWatch', inotify):
+            watcher = self.data_manager.start_watching(debounce=0.2, poll_interval=0.02)
+        self.assertEqual(watcher.backend, backend)
+        return mock.patch.object(self.data_manager, 'load_if_changed', wraps=self.data_manager.load_if_changed)
+
+    def wait_for_version(self, version, timeout=5):
+        deadline = time.monotonic() + timeout
+        while self.data_manager.version == version and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertNotEqual(self.data_manager.version, version, '监听线程没有重新加载变化的文件')
+
+    def test_debounce(self):
+        """对多个文件的连续写入在写入停止后只重新加载一次"""
+        backends = ['polling'] + (['inotify'] if sys.platform.startswith('linux') else [])
+        for backend in backends:
+            with self.subTest(backend=backend):
+                self.data_manager.stop_watching()
+                with self.start_watching(backend) as reload:
+                    version = self.data_manager.version
+                    for count in range(5):
+                        self.write_file('test', dict(TEST, anomalies=TEST['anomalies'] * (count + 2), backend=backend))
+                        self.write_file('app', dict(APP, revision=count, backend=backend))
+                        time.sleep(0.02)
+                    self.wait_for_version(version)
+                    time.sleep(0.3)
+                    self.assertEqual(reload.call_count, 1)
+                    self.assertEqual(reload.call_args[1]['force'], {'test', 'app'})
+                data = self.data_manager.get_all_data(reload=False)
+                self.assertEqual(len(data['test']['anomalies']), 6)
+                self.assertEqual(data['app']['revision'], 4)
+
+    def test_polling_fallback(self):
+        """没有 inotify 时监听线程比较文件签名，请求不再检查文件"""
+        self.start_watching('polling')
+        version = self.data_manager.version
+        self.write_file('project', dict(PROJECT, project_name='Polled'))
+        self.wait_for_version(version)
+        self.assertEqual(self.data_manager.get_all_data()['project']['project_name'], 'Polled')
+        with mock.patch.object(observability, 'file_signature') as signature:
+            self.data_manager.get_all_data()
+        signature.assert_not_called()
+
+
+def apply_patch(document, ops):
+    """在 document 的副本上执行 RFC 6902 的 add/remove/replace 操作"""
+    document = copy.deepcopy(document)
+    for op in ops:
+        tokens = [token.replace('~1', '/').replace('~0', '~') for token in op['path'].split('/')[1:]]
+        parent = document
+        for token in tokens[:-1]:
+            parent = parent[int(token) if isinstance(parent, list) else token]
+        key = int(tokens[-1]) if isinstance(parent, list) else tokens[-1]
+        if op['op'] == 'remove':
+            del parent[key]
+        elif op['op'] == 'add' and isinstance(parent, list):
+            parent.insert(key, op['value'])
+        else:
+            parent[key] = op['value']
+    return document
+
+
+class TestJsonPatch(WebApiTestCase):
+    """测试 JSON Patch 的生成和 ?since= 响应"""
+
+    def test_patch_ops(self):
+        """字典逐键比较、列表逐下标比较，键按 JSON Pointer 规则转义"""
+        shared = {'large': list(range(100))}
+        old = {'a': 1, 'gone': True, 'a/b': {'m~n': 1}, 'list': [1, 2, 3], 'shared': shared, 'kind': [1]}
+        new = {'a': 2, 'a/b': {'m~n': 2}, 'list': [1, 5], 'shared': shared, 'kind': {'x': 1}, 'added': None}
+        ops = observability.make_json_patch(old, new)
+        self.assertEqual(ops, [
+            {'op': 'remove', 'path': '/gone'},
+            {'op': 'replace', 'path': '/a', 'value': 2},
+            {'op': 'replace', 'path': '/a~1b/m~0n', 'value': 2},
+            {'op': 'replace', 'path': '/list/1', 'value': 5},
+            {'op': 'remove', 'path': '/list/2'},
+            {'op': 'replace', 'path': '/kind', 'value': {'x': 1}},
+            {'op': 'add', 'path': '/added', 'value': None},
+        ])
+        self.assertEqual(apply_patch(old, ops), new)
+        self.assertEqual(observability.make_json_patch([1], [1, 2, 3], '/x'),
+                         [{'op': 'add', 'path': '/x/1', 'value': 2}, {'op': 'add', 'path': '/x/2', 'value': 3}])
+        self.assertEqual(observability.make_json_patch(old, old), [])
+        # 1 与 True 相等，但是不同的 JSON 值
+        self.assertEqual(observability.make_json_patch({'v': 1}, {'v': True}),
+                         [{'op': 'replace', 'path': '/v', 'value': True}])
+
+    @unittest.skipUnless(observability.FLASK_AVAILABLE, 'Flask is not installed')
+    def test_since(self):
+        """?since= 返回把该版本变为当前版本的补丁，客户端接受时压缩发送"""
+        response = self.client.get('/api/data')
+        old_etag, old_data = response.headers['X-Data-Version'], response.get_json()
+        self.update_module('Payment', 'has_issue')
+        self.client.post('/api/update/assumption', json={'assumption_id': 'ASM-1', 'status': 'validated'})
+        current = self.client.get('/api/data').get_json()
+
+        response = self.client.get(f'/api/data?since={old_etag}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/json-patch+json')
+        self.assertEqual(response.headers['X-Data-Version'], self.data_manager.etag)
+        self.assertEqual(apply_patch(old_data, json.loads(response.data)), current)
+
+        response = self.client.get(f'/api/data?since={old_etag}', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.mimetype, 'application/json-patch+json')
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(apply_patch(old_data, json.loads(gzip.decompress(response.data))), current)
+
+        response = self.client.get(f'/api/data?since={self.data_manager.etag}')
+        self.assertEqual((response.status_code, response.data), (304, b''))
+
+    @unittest.skipUnless(observability.FLASK_AVAILABLE, 'Flask is not installed')
+    def test_since_evicted(self):
+        """已被淘汰出快照环或从未发布过的版本收到完整数据"""
+        old_etag = self.client.get('/api/data').headers['X-Data-Version']
+        for index in range(observability.SNAPSHOT_HISTORY + 1):
+            self.update_module('Payment', 'confirmed' if index % 2 else 'has_issue')
+        self.assertIsNone(self.data_manager.get_patch_payload(old_etag))
+        for since in (old_etag, 'unknown'):
+            response = self.client.get(f'/api/data?since={since}', headers={'Accept-Encoding': 'gzip'})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.mimetype, 'application/json')
+            self.assertEqual(response.headers['ETag'], f'"{self.data_manager.etag}-gzip"')
+            self.assertEqual(json.loads(gzip.decompress(response.data))['app']['modules'][1]['status'], 'has_issue')
+
+
+class TestUpdateRequests(WebApiTestCase):
+    """测试更新接口的请求校验和退出时的落盘"""
+
+    @unittest.skipUnless(observability.FLASK_AVAILABLE, 'Flask is not installed')
+    def test_body_must_be_object(self):
+        """数组、标量和非法 JSON 返回 400，而不是以 500 失败"""
+        for path in ('/api/update/module', '/api/update/assumption'):
+            for body in ('[]', '[{"module_name": "Login"}]', '"Login"', 'null', '{not json'):
+                with self.subTest(path=path, body=body):
+                    response = self.client.post(path, data=body, content_type='application/json')
+                    self.assertEqual(response.status_code, 400)
+                    self.assertFalse(response.get_json()['success'])
+        for body in ('"updates"', '3', '{not json'):
+            with self.subTest(path='/api/update/batch', body=body):
+                response = self.client.post('/api/update/batch', data=body, content_type='application/json')
+                self.assertEqual(response.status_code, 400)
+                self.assertFalse(response.get_json()['applied'])
+        self.assertEqual(self.read_file('app'), APP)
+
+    def test_sigterm_writes_pending_updates(self):
+        """用 SIGTERM 停止服务器时写出仍在等待落盘定时器的修改"""
+        modes = (['web'] if observability.FLASK_AVAILABLE else []) + ['live']
+        for mode in modes:
+            with self.subTest(mode=mode):
+                status = f'{mode}-stopped'
+                process, port = self.run_server(mode)
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+                connection.request('POST', '/api/update/module', json.dumps({'module_name': 'Login', 'status': status}),
+                                   {'Content-Type': 'application/json'})
+                self.assertEqual(json.loads(connection.getresponse().read()), {'success': True})
+                connection.close()
+                self.assertNotEqual(self.read_file('app')['modules'][0]['status'], status)
+                process.send_signal(signal.SIGTERM)
+                self.assertEqual(process.wait(timeout=30), 0)
+                self.assertEqual(self.read_file('app')['modules'][0]['status'], status)
+
+
+class TestBatchUpdates(WebApiTestCase):
+    """测试全部成功或全部不生效的批量更新"""
+
+    def assert_unchanged(self, version, etag):
+        self.assertEqual((self.data_manager.version, self.data_manager.etag), (version, etag))
+        data = self.data_manager.get_all_data()
+        self.assertEqual(data['app'], APP)
+        self.assertEqual(data['project'], PROJECT)
+        self.assertEqual(self.read_file('app'), APP)
+        self.assertEqual(self.read_file('project'), PROJECT)
+
+    def test_writer_rolls_back(self):
+        """第二个修改失败时，第一个修改既不发布也不写盘"""
+        self.data_manager.load_if_changed()
+        version, etag = self.data_manager.version, self.data_manager.etag
+        results = self.data_manager.writer.update_many([
+            ('app', lambda app: observability.set_module_status(app, 'Login', 'has_issue', 'Crash')),
+            ('app', lambda app: observability.set_module_status(app, 'Missing', 'confirmed')),
+        ])
+        self.assertEqual(results, [True, False])
+        self.assert_unchanged(version, etag)
+
+    @unittest.skipUnless(observability.FLASK_AVAILABLE, 'Flask is not installed')
+    def test_batch_endpoint(self):
+        """第二个条目失败或无效时，内存、文件和版本都保持不变"""
+        self.data_manager.load_if_changed()
+        version, etag = self.data_manager.version, self.data_manager.etag
+        first = {'type': 'assumption', 'assumption_id': 'ASM-1', 'status': 'validated'}
+        for second, error in (({'type': 'module', 'module_name': 'Missing', 'status': 'confirmed'}, 'Missing'),
+                              ({'type': 'module', 'module_name': 'Payment'}, 'status'),
+                              ({'type': 'task', 'status': 'done'}, 'task')):
+            with self.subTest(second=second):
+                body = self.client.post('/api/update/batch', json={'updates': [first, second]}).get_json()
+                self.assertEqual((body['success'], body['applied']), (False, False))
+                self.assertFalse(body['results'][1]['success'])
+                self.assertIn(error, body['results'][1]['error'])
+                self.assert_unchanged(version, etag)
+
+        body = self.client.post('/api/update/batch', json={'updates': [
+            first, {'type': 'module', 'module_name': 'Payment', 'status': 'confirmed'}]}).get_json()
+        self.assertEqual(body, {'success': True, 'applied': True, 'results': [{'success': True}, {'success': True}]})
+        # 两个文件在同一个新版本中修改
+        self.assertEqual(self.data_manager.version, version + 1)
+        self.assertEqual(self.read_file('app')['modules'][1]['status'], 'confirmed')
+        self.assertEqual(self.read_file('project')['iterations'][0]['assumptions'][0]['status'], 'validated')
+
+
+class TestAssumptionIndex(WebApiTestCase):
+    """测试通过假设索引定位假设"""
+
+    def set_status(self, assumption_id, status):
+        return observability.apply_update(self.data_manager, {'type': 'assumption', 'assumption_id': assumption_id,
+                                                              'status': status})
+
+    @staticmethod
+    def content_id(text):
+        return base64.b64encode(text.encode('utf-8')).decode('ascii')
+
+    def test_lookup(self):
+        """索引先按 id、再按内容查找，结果与线性扫描一致"""
+        project = copy.deepcopy(PROJECT)
+        # 后出现的重复 ASM-1 不能覆盖第一个
+        project['iterations'][1]['assumptions'].append({'assumption_id': 'ASM-1', 'hypothesis': 'Duplicate'})
+        index = observability.build_assumption_index(project)
+        for assumption_id, position in (('ASM-1', (0, 0)),
+                                        (self.content_id('Users pay by card'), (1, 0)),
+                                        (self.content_id('Users log in daily'), (0, 0)),
+                                        (self.content_id('Nobody'), None),
+                                        ('not base64!', None)):
+            with self.subTest(assumption_id=assumption_id):
+                self.assertEqual(observability.lookup_assumption(index, assumption_id), position)
+                self.assertEqual(observability.find_assumption(project, assumption_id), position)
+
+    def test_index_is_reused_and_rebuilt_after_reload(self):
+        """状态更新复用索引，重写 project_data.json 后重建索引"""
+        build = mock.Mock(wraps=observability.build_assumption_index)
+        with mock.patch.object(observability, 'build_assumption_index', build):
+            self.assertEqual(self.set_status('ASM-1', 'validated'), {'success': True})
+            self.assertEqual(self.set_status('ASM-1', 'invalidated'), {'success': True})
+            self.assertEqual(build.call_count, 1)
+
+            project = self.read_file('project')
+            project['iterations'][0]['assumptions'].insert(0, {'assumption_id': 'ASM-0', 'hypothesis': 'New'})
+            self.write_file('project', project)
+            self.assertEqual(self.set_status('ASM-1', 'validated'), {'success': True})
+            self.assertEqual(build.call_count, 2)
+
+        assumptions = self.read_file('project')['iterations'][0]['assumptions']
+        self.assertEqual([a.get('status') for a in assumptions], [None, 'validated'])
+
+    @unittest.skipUnless(observability.FLASK_AVAILABLE, 'Flask is not installed')
+    def test_update_endpoint(self):
+        """/api/update/assumption 接受两种 id，并报告未知的 id"""
+        for assumption_id, position in (('ASM-1', (0, 0)), (self.content_id('Users pay by card'), (1, 0))):
+            with self.subTest(assumption_id=assumption_id):
+                response = self.client.post('/api/update/assumption',
+                                            json={'assumption_id': assumption_id, 'status': 'validated'})
+                self.assertEqual(response.get_json(), {'success': True})
+                i, j = position
+                assumption = self.read_file('project')['iterations'][i]['assumptions'][j]
+                self.assertEqual(assumption['status'], 'validated')
+                self.assertTrue(assumption['validation_date'])
+
+        body = self.client.post('/api/update/assumption',
+                                json={'assumption_id': 'ASM-9', 'status': 'validated'}).get_json()
+        self.assertFalse(body['success'])
+
+
+@unittest.skipUnless(observability.FLASK_AVAILABLE, 'Flask is not installed')
+class TestDashboardPage(WebApiTestCase):
+    """测试缓存的面板页面"""
+
+    PAGE_HIT = 'cox_dashboard_cache_requests_total{cache="page",result="hit"}'
+    PAGE_MISS = 'cox_dashboard_cache_requests_total{cache="page",result="miss"}'
+
+    def test_rendered_once(self):
+        """页面只在第一个请求时渲染，匹配的 ETag 返回 304"""
+        build = mock.Mock(wraps=observability.build_dashboard_page)
+        with mock.patch.object(observability, 'build_dashboard_page', build):
+            response = self.client.get('/', headers={'Accept-Encoding': 'gzip'})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+            self.assertIn(b'<!DOCTYPE html>', gzip.decompress(response.data))
+            etag = response.headers['ETag']
+
+            self.assertEqual(self.client.get('/', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+                             .status_code, 304)
+            response = self.client.get('/')
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response.headers['ETag'], etag)
+            self.assertIn(b'<!DOCTYPE html>', response.data)
+            # 数据修改不会使页面失效，页面的数据来自 /api/data
+            self.update_module('Payment', 'confirmed')
+            self.assertEqual(self.client.get('/', headers={'If-None-Match': response.headers['ETag']})
+                             .status_code, 304)
+
+        self.assertEqual(build.call_count, 1)
+        self.assertEqual((self.metric(self.PAGE_MISS), self.metric(self.PAGE_HIT)), (1, 3))
+
+    def test_dev_mode_renders_every_request(self):
+        """--dev 模式下每个请求都重新渲染模板，且从不缓存"""
+        build = mock.Mock(wraps=observability.build_dashboard_page)
+        app = observability.get_app()
+        with mock.patch.object(observability, 'build_dashboard_page', build), \
+                mock.patch.dict(app.config, {'DASHBOARD_DEV': True}):
+            for _ in range(2):
+                self.assertEqual(self.client.get('/').status_code, 200)
+        self.assertEqual(build.call_count, 2)
+        self.assertIsNone(observability.dashboard_page)
+        self.assertEqual((self.metric(self.PAGE_MISS), self.metric(self.PAGE_HIT)), (0, 0))
+
+
+@unittest.skipUnless(observability.FLASK_AVAILABLE, 'Flask is not installed')
+class TestDashboardAssets(WebApiTestCase):
+    """测试 /assets/ 下的页面离线资源"""
+
+    def asset_urls(self):
+        """面板页面引用的带版本号的 /assets/ 地址"""
+        page = self.client.get('/').get_data(as_text=True)
+        assets = observability.load_dashboard_assets()
+        return {name: f"/assets/{name}?v={assets[name]['version']}" for name in observability.DASHBOARD_ASSETS
+                if f"/assets/{name}?v={assets[name]['version']}" in page}
+
+    def test_page_uses_local_assets(self):
+        """页面引用带版本号的本地样式表和图标 sprite，而不是 Tailwind 和 Lucide 的 CDN"""
+        page = self.client.get('/').get_data(as_text=True)
+        for cdn in ('cdn.tailwindcss.com', 'unpkg.com', 'lucide@', 'lucide.createIcons'):
+            self.assertNotIn(cdn, page)
+        self.assertEqual(set(self.asset_urls()), set(observability.DASHBOARD_ASSETS))
+        self.assertIn('function createIcons(', page)
+
+    def test_cache_headers_and_304(self):
+        """资源可按 immutable 缓存，并以内容哈希 ETag 重新验证"""
+        for name, url in self.asset_urls().items():
+            with self.subTest(name=name):
+                asset = observability.load_dashboard_assets()[name]
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.mimetype, observability.DASHBOARD_ASSETS[name])
+                self.assertEqual(response.data, asset['content'])
+                self.assertIn('immutable', response.headers['Cache-Control'])
+                self.assertIn(f'max-age={observability.ASSET_MAX_AGE}', response.headers['Cache-Control'])
+                self.assertEqual(response.headers['ETag'], f'"{asset["version"]}"')
+
+                revalidated = self.client.get(url, headers={'If-None-Match': response.headers['ETag']})
+                self.assertEqual(revalidated.status_code, 304)
+                self.assertEqual(revalidated.data, b'')
+                self.assertIn('immutable', revalidated.headers['Cache-Control'])
+
+    def test_gzip_negotiation(self):
+        """客户端接受 gzip 时压缩资源，压缩后的响应体有自己的 ETag"""
+        url = self.asset_urls()['dashboard.css']
+        identity = self.client.get(url)
+        response = self.client.get(url, headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(response.headers['Vary'], 'Accept-Encoding')
+        self.assertEqual(gzip.decompress(response.data), identity.data)
+        self.assertNotEqual(response.headers['ETag'], identity.headers['ETag'])
+        self.assertEqual(self.client.get(url, headers={'Accept-Encoding': 'gzip',
+                                                       'If-None-Match': response.headers['ETag']}).status_code, 304)
+        # 未压缩版本的 ETag 与 gzip 版本不匹配
+        self.assertEqual(self.client.get(url, headers={'Accept-Encoding': 'gzip',
+                                                       'If-None-Match': identity.headers['ETag']}).status_code, 200)
+
+    def test_unknown_asset(self):
+        """不在 DASHBOARD_ASSETS 中的文件名返回 404"""
+        for name in ('missing.css', 'build_dashboard_assets.py', '..%2Frun_web_observability.py'):
+            with self.subTest(name=name):
+                self.assertEqual(self.client.get(f'/assets/{name}').status_code, 404)
+
+
+@unittest.skipUnless(observability.FLASK_AVAILABLE, 'Flask is not installed')
+class TestCollections(WebApiTestCase):
+    """测试分页的 /api/<collection> 接口"""
+
+    def query(self, path):
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200, response.get_json())
+        return response.get_json()
+
+    def ids(self, path, field='task_id'):
+        return [item[field] for item in self.query(path)['items']]
+
+    def test_filters(self):
+        """iteration=current 解析为 current_iteration，逗号分隔的多个取值匹配其中任意一个"""
+        body = self.query('/api/tasks?iteration=current&status=todo')
+        self.assertEqual([item['task_id'] for item in body['items']], ['TASK-2', 'TASK-4'])
+        self.assertEqual(body['total'], 2)
+        # 任务附带所属迭代的 id
+        self.assertEqual({item['iteration_id'] for item in body['items']}, {'ITER-2'})
+
+        self.assertEqual(self.ids('/api/tasks?status=todo,completed&owner=Alice'), ['TASK-1', 'TASK-4'])
+        self.assertEqual(self.ids('/api/tasks?iteration=ITER-1'), ['TASK-1'])
+        self.assertEqual(self.ids('/api/tasks?owner=Nobody'), [])
+        self.assertEqual(self.ids('/api/modules?owner=Bob', 'module_name'), ['Payment'])
+        self.assertEqual(self.ids('/api/iterations?status=completed', 'iteration_id'), ['ITER-1'])
+        self.assertEqual(self.ids('/api/anomalies?severity=high', 'anomaly_id'), ['ANOM-1'])
+
+    def test_sort_and_pages(self):
+        """sort=字段 和 sort=-字段 对条目排序，offset/limit 在同一顺序中取出一页"""
+        self.assertEqual(self.ids('/api/tasks?sort=task_name'), ['TASK-4', 'TASK-1', 'TASK-2', 'TASK-3'])
+        self.assertEqual(self.ids('/api/tasks?sort=-task_name'), ['TASK-3', 'TASK-2', 'TASK-1', 'TASK-4'])
+        self.assertEqual(self.ids('/api/modules?sort=-completion_rate', 'module_name'), ['Login', 'Payment'])
+        # 无论升序降序，相同的值都保持数据文件中的顺序
+        self.assertEqual(self.ids('/api/tasks?sort=assignee'), ['TASK-1', 'TASK-3', 'TASK-4', 'TASK-2'])
+        self.assertEqual(self.ids('/api/tasks?sort=-assignee'), ['TASK-2', 'TASK-1', 'TASK-3', 'TASK-4'])
+
+        body = self.query('/api/tasks?sort=-task_name&offset=1&limit=2')
+        self.assertEqual([item['task_id'] for item in body['items']], ['TASK-2', 'TASK-1'])
+        self.assertEqual((body['total'], body['offset'], body['limit']), (4, 1, 2))
+        self.assertEqual(self.ids('/api/tasks?offset=10'), [])
+        self.assertEqual(self.query(f'/api/tasks?limit={observability.PAGE_MAX_LIMIT + 1}')['limit'],
+                         observability.PAGE_MAX_LIMIT)
+
+    def test_invalid_parameters(self):
+        """不合法的分页参数和未知的排序字段返回带错误信息的 400"""
+        for query in ('limit=abc', 'offset=-1', 'limit=0', 'sort=secret', 'sort=-secret'):
+            with self.subTest(query=query):
+                response = self.client.get(f'/api/tasks?{query}')
+                self.assertEqual(response.status_code, 400)
+                self.assertFalse(response.get_json()['success'])
+        self.assertEqual(self.client.get('/api/unknown').status_code, 404)
+
+    def test_revalidation(self):
+        """分页结果共用数据 ETag，数据修改前重新验证都返回 304"""
+        response = self.client.get('/api/tasks?limit=1')
+        etag = response.headers['ETag']
+        self.assertEqual(response.headers['X-Data-Version'], etag.strip('"'))
+        response = self.client.get('/api/tasks?limit=1', headers={'If-None-Match': etag})
+        self.assertEqual((response.status_code, response.data), (304, b''))
+
+        self.update_module('Payment', 'confirmed')
+        response = self.client.get('/api/modules?status=confirmed', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['module_name'] for item in response.get_json()['items']], ['Login', 'Payment'])
+
+    def test_one_snapshot_per_request(self):
+        """期间发布了新版本时，用于判断 304 的 ETag 与返回的分页结果仍来自同一个快照"""
+        self.data_manager.load_if_changed()
+        for path, method in (('/api/modules?status=pending', 'query_collection'), ('/api/search?q=Payment', 'search')):
+            with self.subTest(path=path):
+                original = getattr(self.data_manager, method)
+
+                def publish_then_query(*args, **kwargs):
+                    # 本请求检查 ETag 之后，另一个请求发布了修改
+                    self.update_module('Payment', 'has_issue')
+                    return original(*args, **kwargs)
+
+                snapshot = self.data_manager.snapshot
+                with mock.patch.object(self.data_manager, method, publish_then_query):
+                    response = self.client.get(path, headers={'If-None-Match': '"stale"'})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.headers['ETag'], f'"{snapshot.etag}"')
+                self.assertNotEqual(self.data_manager.etag, snapshot.etag)
+                if method == 'query_collection':
+                    self.assertEqual([item['module_name'] for item in response.get_json()['items']], ['Payment'])
+                # 客户端随后用该 ETag 重新验证时会得到新版本
+                self.assertEqual(self.client.get(path, headers={'If-None-Match': response.headers['ETag']})
+                                 .status_code, 200)
+
+
+@unittest.skipUnless(observability.FLASK_AVAILABLE, 'Flask is not installed')
+class TestSummary(WebApiTestCase):
+    """测试 /api/summary 接口"""
+
+    def test_summary(self):
+        """汇总统计任务、模块、测试和未关闭的异常，负责人同时统计任务和模块"""
+        response = self.client.get('/api/summary')
+        self.assertEqual(response.status_code, 200)
+        summary = response.get_json()
+        self.assertEqual(summary['version'], self.data_manager.etag)
+        self.assertEqual((summary['project_name'], summary['current_iteration']), ('API', 'ITER-2'))
+        self.assertEqual([(item['iteration_id'], item['total']) for item in summary['iterations']],
+                         [('ITER-1', 1), ('ITER-2', 3)])
+        self.assertEqual(summary['tasks'], {'total': 4, 'by_status': {'completed': 1, 'todo': 2, 'in_progress': 1}})
+        self.assertEqual(summary['modules'], {'total': 2, 'by_status': {'confirmed': 1, 'pending': 1}})
+        self.assertEqual((summary['tests']['pass_rate'], summary['tests']['coverage']), (None, None))
+        self.assertEqual(summary['anomalies'], {'total': 1, 'open': 1, 'open_by_severity': {'high': 1}})
+        self.assertEqual(summary['owners'], {
+            'Alice': {'tasks': 3, 'completed': 1, 'modules': 1, 'completion': 33},
+            'Bob': {'tasks': 1, 'completed': 0, 'modules': 1, 'completion': 0},
+        })
+
+    def test_revalidation(self):
+        """汇总与数据共用 ETag，修改后重新计算"""
+        response = self.client.get('/api/summary')
+        etag = response.headers['ETag']
+        self.assertEqual(etag, f'"{self.data_manager.etag}"')
+        self.assertEqual(response.headers['X-Data-Version'], etag.strip('"'))
+        response = self.client.get('/api/summary', headers={'If-None-Match': etag})
+        self.assertEqual((response.status_code, response.data), (304, b''))
+
+        self.update_module('Payment', 'confirmed')
+        response = self.client.get('/api/summary', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['modules']['by_status'], {'confirmed': 2})
+
+
+class TestSummaryRollups(unittest.TestCase):
+    """测试 /api/summary 背后按数据文件计算的汇总及其合并"""
+
+    def merge(self, project=None, app=None, test=None):
+        return observability.merge_summary({'project': observability.summarize_project(project or {}),
+                                            'app': observability.summarize_app(app or {}),
+                                            'test': observability.summarize_test(test or {})})
+
+    def test_empty_collections(self):
+        """缺失或为空的集合计数为 0，没有比率，也没有负责人"""
+        for project, app, test in (({}, {}, {}),
+                                   ({'iterations': [{'iteration_id': 'ITER-1', 'tasks': None}]},
+                                    {'modules': []}, {'test_suites': [], 'anomalies': []})):
+            with self.subTest(project=project):
+                summary = self.merge(project, app, test)
+                self.assertEqual(summary['tasks'], {'total': 0, 'by_status': {}})
+                self.assertEqual(summary['modules'], {'total': 0, 'by_status': {}})
+                self.assertEqual(summary['tests'], {'total_tests': 0, 'passed_tests': 0, 'failed_tests': 0,
+                                                    'skipped_tests': 0, 'suites': 0, 'pass_rate': None,
+                                                    'coverage': None})
+                self.assertEqual(summary['anomalies'], {'total': 0, 'open': 0, 'open_by_severity': {}})
+                self.assertEqual(summary['owners'], {})
+        self.assertEqual(self.merge({'iterations': [{'iteration_id': 'ITER-1', 'tasks': None}]})['iterations'],
+                         [{'iteration_id': 'ITER-1', 'iteration_name': None, 'status': None, 'total': 0,
+                           'by_status': {}}])
+        # 只有模块、没有任务的负责人完成率为 0
+        summary = self.merge(app={'modules': [{'module_name': 'Login', 'owner': 'Alice'}]})
+        self.assertEqual(summary['owners'], {'Alice': {'tasks': 0, 'completed': 0, 'modules': 1, 'completion': 0}})
+        self.assertEqual(summary['modules']['by_status'], {'unknown': 1})
+
+    def test_completion_rounds_half_up(self):
+        """完成率与页面中的 Math.round 一样 0.5 向上取整，而不是银行家舍入"""
+        for completed, total, completion in ((5, 8, 63), (1, 8, 13), (3, 8, 38), (2, 3, 67), (1, 3, 33),
+                                             (8, 8, 100)):
+            with self.subTest(completed=completed, total=total):
+                tasks = [{'task_id': f'TASK-{index}', 'assignee': 'Alice',
+                          'status': 'done' if index < completed else 'todo'} for index in range(total)]
+                summary = self.merge({'iterations': [{'iteration_id': 'ITER-1', 'tasks': tasks}]})
+                self.assertEqual(summary['owners']['Alice']['completion'], completion)
+
+    def test_test_rollup(self):
+        """覆盖率按测试数加权，已关闭的异常不计入未关闭异常"""
+        rollup = observability.summarize_test({
+            'test_suites': [
+                {'total_tests': 30, 'passed_tests': 27, 'failed_tests': 3, 'coverage': 0.9},
+                {'total_tests': 10, 'passed_tests': 10, 'coverage': 0.5},
+                {'total_tests': 5, 'skipped_tests': 5, 'coverage': None},
+            ],
+            'anomalies': [
+                {'anomaly_id': 'ANOM-1', 'severity': 'high', 'status': 'open'},
+                {'anomaly_id': 'ANOM-2', 'status': 'investigating'},
+                {'anomaly_id': 'ANOM-3', 'severity': 'high', 'status': 'resolved'},
+                {'anomaly_id': 'ANOM-4', 'severity': 'low', 'status': 'ignored'},
+            ]})
+        tests = rollup['tests']
+        self.assertEqual((tests['total_tests'], tests['passed_tests'], tests['failed_tests'], tests['skipped_tests'],
+                          tests['suites']), (45, 37, 3, 5, 3))
+        self.assertAlmostEqual(tests['pass_rate'], 37 / 45)
+        self.assertAlmostEqual(tests['coverage'], 0.8)
+        self.assertEqual(rollup['anomalies'], {'total': 4, 'open': 2, 'open_by_severity': {'high': 1, 'unknown': 1}})
+        # 没有测试数时覆盖率取各测试套件的简单平均
+        coverage = observability.summarize_test({'test_suites': [{'coverage': 0.4}, {'coverage': 0.8}]})
+        self.assertAlmostEqual(coverage['tests']['coverage'], 0.6)
+
+
+class TestProjectRegistry(unittest.TestCase):
+    """测试多项目注册表及其 LRU 淘汰"""
+
+    def setUp(self):
+        self.projects_dir = tempfile.mkdtemp()
+        for name in ('alpha', 'beta', 'gamma'):
+            os.mkdir(os.path.join(self.projects_dir, name))
+            for key, data in (('project', dict(PROJECT, project_name=name)), ('app', APP), ('test', TEST)):
+                with open(self.path(name, key), 'w', encoding='utf-8') as f:
+                    json.dump(data, f)
+        # 各项目的数据文件相同，估算内存也相同；内存上限允许同时加载其中两个
+        manager = observability.ObservabilityData(*(self.path('alpha', key) for key in ('project', 'app', 'test')))
+        manager.load_if_changed()
+        self.registry = observability.ProjectRegistry(self.projects_dir, memory_limit=manager.memory_estimate() * 2,
+                                                      flush_interval=60)
+
+    def tearDown(self):
+        self.registry.close()
+        shutil.rmtree(self.projects_dir)
+
+    def path(self, name, key):
+        return os.path.join(self.projects_dir, name, observability.PROJECT_DATA_FILES[key])
+
+    def module_status(self, name):
+        with open(self.path(name, 'app'), 'r', encoding='utf-8') as f:
+            return json.load(f)['modules'][1]['status']
+
+    @staticmethod
+    def set_payment(manager, status):
+        return observability.apply_update(manager, {'type': 'module', 'module_name': 'Payment', 'status': status})
+
+    def test_least_recently_used_is_evicted(self):
+        """加载第三个项目时淘汰并关闭最久未访问的项目"""
+        self.assertEqual(self.registry.names(), ['alpha', 'beta', 'gamma'])
+        self.assertIsNone(self.registry.get('missing'))
+        alpha = self.registry.get('alpha')
+        beta = self.registry.get('beta')
+        self.assertIs(self.registry.get('alpha'), alpha)
+        self.assertEqual(self.registry.loaded(), ['beta', 'alpha'])
+
+        self.registry.get('gamma')
+        self.assertEqual(self.registry.loaded(), ['alpha', 'gamma'])
+        self.assertTrue(beta.writer.closed)
+        self.assertIsNone(beta._watcher)
+        self.assertFalse(alpha.writer.closed)
+        # 再次访问被淘汰的项目时加载新的数据管理器
+        self.assertIsNot(self.registry.get('beta'), beta)
+        self.assertEqual(self.registry.loaded(), ['gamma', 'beta'])
+
+    def test_eviction_flushes_outside_the_registry_lock(self):
+        """被淘汰项目在释放注册表锁之后才关闭并落盘"""
+        alpha = self.registry.get('alpha')
+        self.registry.get('beta')
+        lock_held = []
+        close = alpha.writer.close
+        with mock.patch.object(alpha.writer, 'close', lambda: lock_held.append(self.registry._lock.locked()) or close()):
+            self.registry.get('gamma')
+        self.assertEqual(lock_held, [False])
+        self.assertTrue(alpha.writer.closed)
+
+    def test_eviction_writes_pending_updates_and_rejects_late_ones(self):
+        """淘汰时写出待写入的修改；仍持有旧管理器的请求不能再修改"""
+        alpha = self.registry.get('alpha')
+        self.assertEqual(self.set_payment(alpha, 'confirmed'), {'success': True})
+        # 落盘间隔内修改只在内存中
+        self.assertEqual(self.module_status('alpha'), 'pending')
+
+        self.registry.get('beta')
+        self.registry.get('gamma')
+        self.assertNotIn('alpha', self.registry.loaded())
+        self.assertEqual(self.module_status('alpha'), 'confirmed')
+
+        result = self.set_payment(alpha, 'has_issue')
+        self.assertFalse(result['success'])
+        self.assertIn('error', result)
+        self.assertEqual(alpha.get_all_data()['app']['modules'][1]['status'], 'confirmed')
+        self.assertEqual(self.module_status('alpha'), 'confirmed')
+
+        reloaded = self.registry.get('alpha')
+        self.assertEqual(reloaded.get_all_data()['app']['modules'][1]['status'], 'confirmed')
+        self.assertEqual(self.set_payment(reloaded, 'optimized'), {'success': True})
+        self.registry.close()
+        self.assertEqual(self.module_status('alpha'), 'optimized')
+
+    @unittest.skipUnless(observability.FLASK_AVAILABLE, 'Flask is not installed')
+    def test_project_routes(self):
+        """/p/<项目名>/api/... 使用项目注册表，/api/projects 报告哪些项目已加载"""
+        client = observability.get_app().test_client()
+        with mock.patch.object(observability, 'project_registry', self.registry):
+            response = client.post('/p/beta/api/update/module', json={'module_name': 'Payment', 'status': 'confirmed'})
+            self.assertEqual(response.get_json(), {'success': True})
+            self.assertEqual(client.get('/p/beta/api/data').get_json()['project']['project_name'], 'beta')
+            self.assertEqual(client.get('/p/missing/api/data').status_code, 404)
+            self.assertEqual(client.get('/api/projects').get_json()['projects'], [
+                {'name': 'alpha', 'loaded': False}, {'name': 'beta', 'loaded': True},
+                {'name': 'gamma', 'loaded': False}])
+
+
+@unittest.skipUnless(observability.FLASK_AVAILABLE, 'Flask is not installed')
+class TestMetrics(WebApiTestCase):
+    """测试 /metrics 接口"""
+
+    def scrape(self):
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        return response.get_data(as_text=True)
+
+    def test_empty_registry(self):
+        """每个指标都带有 HELP 和 TYPE 声明，没有标签的指标从 0 开始"""
+        text = self.scrape()
+        for name, (kind, _, _, _) in observability.SERVER_METRICS.items():
+            with self.subTest(name=name):
+                self.assertIn(f'# TYPE {name} {kind}\n', text)
+                self.assertIn(f'# HELP {name} ', text)
+        self.assertEqual(self.metric('cox_dashboard_reload_errors_total', text), 0)
+
+    def test_requests_and_caches(self):
+        """请求按路由规则和状态码计数，直方图和缓存计数器随请求变化"""
+        for _ in range(2):
+            self.client.get('/api/data')
+        self.client.get('/api/tasks?status=todo')
+        self.client.get('/api/modules?sort=secret')
+        self.client.get('/missing')
+        self.update_module('Payment', 'confirmed')
+        text = self.scrape()
+
+        collection = '/api/<any(iterations, tasks, modules, anomalies):collection>'
+        for sample, value in (
+                ('cox_dashboard_requests_total{route="/api/data",method="GET",status="200"}', 2),
+                (f'cox_dashboard_requests_total{{route="{collection}",method="GET",status="200"}}', 1),
+                (f'cox_dashboard_requests_total{{route="{collection}",method="GET",status="400"}}', 1),
+                ('cox_dashboard_requests_total{route="unmatched",method="GET",status="404"}', 1),
+                ('cox_dashboard_requests_total{route="/api/update/module",method="POST",status="200"}', 1),
+                ('cox_dashboard_request_duration_seconds_count{route="/api/data"}', 2),
+                ('cox_dashboard_request_duration_seconds_bucket{route="/api/data",le="+Inf"}', 2),
+                ('cox_dashboard_response_size_bytes_count{route="/api/data"}', 2),
+                ('cox_dashboard_cache_requests_total{cache="payload",result="miss"}', 1),
+                ('cox_dashboard_cache_requests_total{cache="payload",result="hit"}', 1),
+                ('cox_dashboard_flush_duration_seconds_count', 1)):
+            with self.subTest(sample=sample):
+                self.assertEqual(self.metric(sample, text), value)
+        # 抓取请求本身在生成响应体之后才计数
+        self.assertEqual(self.metric('cox_dashboard_requests_total{route="/metrics",method="GET",status="200"}'), 1)
+
+    def test_reloads(self):
+        """改变数据的重新加载会计时，解析失败的数据文件计为错误"""
+        self.client.get('/api/data')
+        reloads = self.metric('cox_dashboard_reload_duration_seconds_count', self.scrape())
+        self.assertGreaterEqual(reloads, 1)
+        with open(self.files['app'], 'w', encoding='utf-8') as f:
+            f.write('{not json')
+        self.client.get('/api/data')
+        text = self.scrape()
+        self.assertEqual(self.metric('cox_dashboard_reload_errors_total', text), 1)
+        self.assertEqual(self.metric('cox_dashboard_reload_duration_seconds_count', text), reloads)
+
+        self.write_file('app', dict(APP, last_updated='now'))
+        self.client.get('/api/data')
+        self.assertEqual(self.metric('cox_dashboard_reload_duration_seconds_count', self.scrape()), reloads + 1)
+
+
+@unittest.skipUnless(observability.FLASK_AVAILABLE, 'Flask is not installed')
+class TestProfile(WebApiTestCase):
+    """测试请求剖析和 /debug/profile"""
+
+    def profile(self, sample_rate=1):
+        profiler = observability.RequestProfiler(sample_rate)
+        patcher = mock.patch.object(observability, 'request_profiler', profiler)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return profiler
+
+    def test_disabled(self):
+        """未使用 --profile 时该接口不存在"""
+        response = self.client.get('/debug/profile')
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.get_json()['success'])
+
+    def test_report(self):
+        """请求按耗时从慢到快列出，函数按累计耗时或自身耗时排序"""
+        self.profile()
+        for path in ('/api/data', '/api/tasks?status=todo', '/missing'):
+            self.client.get(path)
+        report = self.client.get('/debug/profile?limit=2').get_json()
+        self.assertEqual((report['sample_rate'], report['requests_recorded'], report['requests_profiled']), (1, 3, 3))
+        self.assertEqual(len(report['slowest_requests']), 2)
+        durations = [entry['duration_ms'] for entry in report['slowest_requests']]
+        self.assertEqual(durations, sorted(durations, reverse=True))
+        self.assertTrue(all(entry['profiled'] for entry in report['slowest_requests']))
+        self.assertEqual(len(report['functions']), 2)
+        self.assertGreaterEqual(report['functions'][0]['cumtime_ms'], report['functions'][1]['cumtime_ms'])
+
+        report = self.client.get('/debug/profile?sort=tottime').get_json()
+        # 第一次报告请求本身也被记录
+        self.assertEqual(report['requests_recorded'], 4)
+        self.assertIn('/api/tasks?status=todo', [entry['path'] for entry in report['slowest_requests']])
+        self.assertIn('unmatched', [entry['route'] for entry in report['slowest_requests']])
+        own = [function['tottime_ms'] for function in report['functions']]
+        self.assertEqual(own, sorted(own, reverse=True))
+        self.assertIn('calls', report['functions'][0])
+
+    def test_sampling(self):
+        """每 sample_rate 个请求只剖析一个，但每个请求都计时"""
+        profiler = self.profile(sample_rate=2)
+        for _ in range(4):
+            self.client.get('/api/data')
+        report = profiler.report()
+        self.assertEqual((report['requests_recorded'], report['requests_profiled']), (4, 2))
+        self.assertEqual([entry['profiled'] for entry in profiler._requests], [False, True, False, True])
+
+    def test_invalid_parameters(self):
+        """limit 不是整数或 sort 未知时返回 400"""
+        self.profile()
+        for query in ('limit=abc', 'sort=calls'):
+            with self.subTest(query=query):
+                response = self.client.get(f'/debug/profile?{query}')
+                self.assertEqual(response.status_code, 400)
+                self.assertFalse(response.get_json()['success'])
+
+
+@unittest.skipUnless(observability.FLASK_AVAILABLE and hasattr(os, 'fork') and shutil.which('pgrep'),
+                     'the prefork server needs Flask, os.fork and pgrep')
+class TestPreforkServer(WebApiTestCase):
+    """测试多进程（prefork）服务器"""
+
+    WORKERS = 2
+
+    def workers(self, process):
+        result = subprocess.run(['pgrep', '-P', str(process.pid)], capture_output=True, text=True, timeout=10)
+        return {int(pid) for pid in result.stdout.split()}
+
+    def wait_for_workers(self, process, exclude=()):
+        """等待服务器运行 WORKERS 个不在 exclude 中的工作进程，返回它们的 PID"""
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            workers = self.workers(process)
+            if len(workers) == self.WORKERS and not workers & set(exclude):
+                return workers
+            time.sleep(0.1)
+        self.fail(f'expected {self.WORKERS} new workers, found {self.workers(process)}')
+
+    def request(self, port, method, path, body=None):
+        # 每个请求使用新连接，任何未暂停的工作进程都可以接受它
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+        try:
+            connection.request(method, path, json.dumps(body) if body is not None else None,
+                               {'Content-Type': 'application/json'})
+            response = connection.getresponse()
+            return response.status, json.loads(response.read())
+        finally:
+            connection.close()
+
+    def module_statuses(self, port, workers):
+        """各工作进程返回的模块状态：暂停其它工作进程，使请求只能由该进程处理"""
+        statuses = {}
+        for pid in workers:
+            paused = workers - {pid}
+            for other in paused:
+                os.kill(other, signal.SIGSTOP)
+            try:
+                status, data = self.request(port, 'GET', '/api/data')
+            finally:
+                for other in paused:
+                    os.kill(other, signal.SIGCONT)
+            self.assertEqual(status, 200)
+            statuses[pid] = [module['status'] for module in data['app']['modules']]
+        return statuses
+
+    def assert_served_by_all(self, port, workers, expected):
+        """主进程重新发布快照后，每个工作进程都返回预期的模块状态"""
+        deadline = time.monotonic() + 10
+        while True:
+            statuses = self.module_statuses(port, workers)
+            if all(value == expected for value in statuses.values()) or time.monotonic() > deadline:
+                break
+            time.sleep(0.1)
+        self.assertEqual(statuses, {pid: expected for pid in workers})
+
+    def test_update_reload_and_shutdown(self):
+        """通过某个工作进程做出的修改由所有工作进程返回，SIGHUP 替换工作进程，SIGTERM 停止它们"""
+        process, port = self.run_server('web', '--server', 'prefork', '--workers', str(self.WORKERS))
+        workers = self.wait_for_workers(process)
+
+        self.assertEqual(self.request(port, 'POST', '/api/update/module',
+                                      {'module_name': 'Payment', 'status': 'confirmed'}), (200, {'success': True}))
+        # 工作进程在跨进程文件锁内立即落盘
+        self.assertEqual(self.read_file('app')['modules'][1]['status'], 'confirmed')
+        # 主进程重新加载文件并重新发布共享快照后，其它工作进程才能看到修改
+        self.assert_served_by_all(port, workers, ['confirmed', 'confirmed'])
+
+        self.write_file('app', dict(APP, modules=[dict(APP['modules'][0], status='has_issue'), APP['modules'][1]]))
+        process.send_signal(signal.SIGHUP)
+        new_workers = self.wait_for_workers(process, exclude=workers)
+        # 新工作进程从主进程收到 SIGHUP 时重新加载的快照开始
+        self.assertEqual(self.module_statuses(port, new_workers),
+                         {pid: ['has_issue', 'pending'] for pid in new_workers})
+
+        process.send_signal(signal.SIGTERM)
+        self.assertEqual(process.wait(timeout=60), 0)
+        for pid in new_workers:
+            with self.assertRaises(ProcessLookupError):
+                os.kill(pid, 0)
+
+    def test_compact_writes(self):
+        """使用 --compact 时工作进程以不缩进的紧凑格式写入数据文件"""
+        process, port = self.run_server('web', '--server', 'prefork', '--workers', str(self.WORKERS), '--compact')
+        self.wait_for_workers(process)
+        self.assertEqual(self.request(port, 'POST', '/api/update/module',
+                                      {'module_name': 'Payment', 'status': 'confirmed'}), (200, {'success': True}))
+        with open(self.files['app'], 'rb') as f:
+            raw = f.read()
+        self.assertNotIn(b'\n', raw.strip())
+        self.assertEqual(json.loads(raw)['modules'][1]['status'], 'confirmed')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,11 +3,16 @@
 分析应用模块状态数据，提取模块状态、完成率等信息
 """
 
-import json
 import sys
 import argparse
+from pathlib import Path
 from typing import Dict, List, Any
 
+# 添加 shared 到路径，导入 JSON 编解码模块（安装了 orjson 或 msgspec 时自动使用）
+shared_dir = Path(__file__).parent.parent.parent / "shared"
+sys.path.insert(0, str(shared_dir))
+import json_codec
+
 
 class AppStatusAnalyzer:
     """应用状态分析器"""
@@ -24,8 +29,7 @@ class AppStatusAnalyzer:
     def analyze(self) -> Dict[str, Any]:
         """分析应用状态数据"""
         try:
-            with open(self.input_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = json_codec.load_file(self.input_file)
             
             # 分析模块状态
             self._analyze_module_status(data)
@@ -43,7 +47,7 @@ class AppStatusAnalyzer:
             
         except FileNotFoundError:
             raise Exception(f"应用状态文件不存在: {self.input_file}")
-        except json.JSONDecodeError as e:
+        except json_codec.JSONDecodeError as e:
             raise Exception(f"JSON解析失败: {str(e)}")
         except Exception as e:
             raise Exception(f"分析应用状态失败: {str(e)}")
@@ -129,6 +133,7 @@ def main():
     parser = argparse.ArgumentParser(description='分析应用模块状态数据')
     parser.add_argument('--input', required=True, help='应用状态JSON文件路径')
     parser.add_argument('--output', required=True, help='输出分析结果JSON文件路径')
+    parser.add_argument('--compact', action='store_true', help='以紧凑格式（不缩进）写入输出文件')
     
     args = parser.parse_args()
     
@@ -136,8 +141,7 @@ def main():
         analyzer = AppStatusAnalyzer(args.input)
         analysis = analyzer.analyze()
         
-        with open(args.output, 'w', encoding='utf-8') as f:
-            json.dump(analysis, f, indent=2, ensure_ascii=False)
+        json_codec.dump_file(analysis, args.output, args.compact)
         
         print(f"应用状态分析完成，输出文件: {args.output}")
         print(f"模块数量: {len(analysis['module_status'])}")
@@ -3,12 +3,17 @@
 整合多维数据，生成全流程可视化追踪报告
 """
 
-import json
 import sys
 import argparse
+from pathlib import Path
 from typing import Dict, Any, Optional
 from datetime import datetime
 
+# 添加 shared 到路径，导入 JSON 编解码模块（安装了 orjson 或 msgspec 时自动使用）
+shared_dir = Path(__file__).parent.parent.parent / "shared"
+sys.path.insert(0, str(shared_dir))
+import json_codec
+
 
 class TraceReportGenerator:
     """追踪报告生成器"""
@@ -46,8 +51,7 @@ class TraceReportGenerator:
     def _load_json(self, filepath: str) -> Dict[str, Any]:
         """加载JSON文件"""
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return json_codec.load_file(filepath)
         except Exception as e:
             print(f"警告: 加载文件 {filepath} 失败: {str(e)}", file=sys.stderr)
             return None
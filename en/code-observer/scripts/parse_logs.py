@@ -3,13 +3,18 @@
 解析结构化可观测日志，提取执行路径、函数调用、异常信息
 """
 
-import json
 import re
 import sys
 import argparse
+from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 
+# 添加 shared 到路径，导入 JSON 编解码模块（安装了 orjson 或 msgspec 时自动使用）
+shared_dir = Path(__file__).parent.parent.parent / "shared"
+sys.path.insert(0, str(shared_dir))
+import json_codec
+
 
 class LogParser:
     """日志解析器，提取执行路径、函数调用与异常信息"""
@@ -52,9 +57,9 @@ class LogParser:
         if not lines:
             return False
         try:
-            json.loads(lines[0])
+            json_codec.loads(lines[0])
             return True
-        except json.JSONDecodeError:
+        except json_codec.JSONDecodeError:
             return False
     
     def _parse_json_logs(self, content: str):
@@ -63,7 +68,7 @@ class LogParser:
         
         for line in lines:
             try:
-                entry = json.loads(line.strip())
+                entry = json_codec.loads(line.strip())
                 
                 # 提取执行路径
                 if 'trace_id' in entry or 'span_id' in entry:
@@ -98,7 +103,7 @@ class LogParser:
                         "context": entry.get('context', {})
                     })
                     
-            except json.JSONDecodeError:
+            except json_codec.JSONDecodeError:
                 continue
     
     def _parse_text_logs(self, content: str):
@@ -200,6 +205,7 @@ def main():
     parser = argparse.ArgumentParser(description='解析结构化可观测日志')
     parser.add_argument('--log-file', required=True, help='日志文件路径')
     parser.add_argument('--output', required=True, help='输出JSON文件路径')
+    parser.add_argument('--compact', action='store_true', help='以紧凑格式（不缩进）写入输出文件')
     
     args = parser.parse_args()
     
@@ -207,8 +213,7 @@ def main():
         log_parser = LogParser(args.log_file)
         parsed_data = log_parser.parse()
         
-        with open(args.output, 'w', encoding='utf-8') as f:
-            json.dump(parsed_data, f, indent=2, ensure_ascii=False)
+        json_codec.dump_file(parsed_data, args.output, args.compact)
         
         print(f"日志解析完成，输出文件: {args.output}")
         print(f"执行路径: {parsed_data['summary']['total_execution_paths']}")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+仪表盘静态资源构建脚本
+为 run_web_observability.py 生成离线资源（cox/assets/dashboard/），页面不再依赖 CDN：
+- dashboard.css: 按模板中实际用到的类名预编译并裁剪的 Tailwind CSS
+- icons.svg: 只包含页面用到的 Lucide 图标的 SVG sprite
+
+修改模板中的样式类或图标后重新运行本脚本，并提交生成的文件。
+用法: python build_dashboard_assets.py --lucide-dir <lucide 图标目录> [--tailwind <tailwindcss 可执行文件>]
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+TEMPLATE_FILE = SCRIPTS_DIR / 'run_web_observability.py'
+ASSETS_DIR = SCRIPTS_DIR.parent / 'assets' / 'dashboard'
+
+# 模板中使用的图标名 -> Lucide 图标文件名（部分旧名称在新版 Lucide 中已改名）
+ICONS = {
+    'activity': 'activity',
+    'alert-triangle': 'triangle-alert',
+    'calendar': 'calendar',
+    'check-circle': 'circle-check',
+    'chevron-down': 'chevron-down',
+    'chevron-right': 'chevron-right',
+    'edit': 'square-pen',
+    'git-merge': 'git-merge',
+    'hash': 'hash',
+    'layers': 'layers',
+    'lightbulb': 'lightbulb',
+    'milestone': 'milestone',
+    'refresh-cw': 'refresh-cw',
+    'shield': 'shield',
+    'shield-check': 'shield-check',
+    'trending-up': 'trending-up',
+    'user': 'user',
+    'users': 'users',
+    'zap': 'zap',
+}
+
+TAILWIND_INPUT = """@import "tailwindcss" source(none);
+@source "{template}";
+
+/* 与 Tailwind v3 一致：未指定颜色的边框使用 gray-200 */
+@layer base {{
+  *, ::after, ::before, ::backdrop, ::file-selector-button {{
+    border-color: var(--color-gray-200, currentColor);
+  }}
+}}
+"""
+
+
+def build_sprite(lucide_dir):
+    """把 ICONS 中的图标合并为一个 <symbol> sprite，返回 SVG 文本"""
+    symbols = []
+    for name, source in sorted(ICONS.items()):
+        svg = (Path(lucide_dir) / f'{source}.svg').read_text(encoding='utf-8')
+        body = re.search(r'<svg[^>]*>(.*)</svg>', svg, re.S).group(1)
+        shapes = ''.join(line.strip() for line in body.splitlines())
+        symbols.append(f'<symbol id="{name}" viewBox="0 0 24 24">{shapes}</symbol>')
+    return '<svg xmlns="http://www.w3.org/2000/svg">' + ''.join(symbols) + '</svg>\n'
+
+
+def build_css(tailwind):
+    """调用 Tailwind CLI 扫描页面模板，生成压缩后的 CSS 文本"""
+    with tempfile.TemporaryDirectory() as tmp:
+        input_file = Path(tmp) / 'input.css'
+        output_file = Path(tmp) / 'dashboard.css'
+        input_file.write_text(TAILWIND_INPUT.format(template=TEMPLATE_FILE.as_posix()), encoding='utf-8')
+        subprocess.run([tailwind, '-i', str(input_file), '-o', str(output_file), '--minify'], check=True)
+        return output_file.read_text(encoding='utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='构建可观测性仪表盘的离线 CSS 和图标资源')
+    parser.add_argument('--lucide-dir', required=True,
+                        help='Lucide 图标 SVG 所在目录（如 lucide-static 包的 icons/ 目录）')
+    parser.add_argument('--tailwind', default='tailwindcss',
+                        help='Tailwind CSS v4 命令行程序（默认: tailwindcss）')
+    parser.add_argument('--output-dir', default=str(ASSETS_DIR),
+                        help=f'输出目录（默认: {ASSETS_DIR}）')
+    args = parser.parse_args()
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        sprite = build_sprite(args.lucide_dir)
+        css = build_css(args.tailwind)
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"[ERROR] 构建失败: {e}")
+        sys.exit(1)
+
+    (output_dir / 'icons.svg').write_text(sprite, encoding='utf-8')
+    (output_dir / 'dashboard.css').write_text(css, encoding='utf-8')
+    print(f"[OK] 已生成 {output_dir / 'dashboard.css'} ({len(css.encode('utf-8'))} 字节)")
+    print(f"[OK] 已生成 {output_dir / 'icons.svg'} ({len(ICONS)} 个图标)")
+
+
+if __name__ == '__main__':
+    main()
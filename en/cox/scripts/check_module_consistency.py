@@ -4,10 +4,14 @@
 验证 project_data.json 和 app_status.json 中的模块信息是否一致
 """
 
-import json
 import sys
 from pathlib import Path
 
+# 添加 shared 到路径，导入 JSON 编解码模块（安装了 orjson 或 msgspec 时自动使用）
+shared_dir = Path(__file__).parent.parent.parent / "shared"
+sys.path.insert(0, str(shared_dir))
+import json_codec
+
 
 def check_module_consistency(project_file='project_data.json', app_file='app_status.json'):
     """检查模块一致性
@@ -30,16 +34,14 @@ def check_module_consistency(project_file='project_data.json', app_file='app_sta
     
     # 读取文件
     try:
-        with open(project_file, 'r', encoding='utf-8') as f:
-            project_data = json.load(f)
-    except json.JSONDecodeError as e:
+        project_data = json_codec.load_file(project_file)
+    except json_codec.JSONDecodeError as e:
         print(f"[ERROR] {project_file} 格式错误: {e}")
         return False
     
     try:
-        with open(app_file, 'r', encoding='utf-8') as f:
-            app_data = json.load(f)
-    except json.JSONDecodeError as e:
+        app_data = json_codec.load_file(app_file)
+    except json_codec.JSONDecodeError as e:
         print(f"[ERROR] {app_file} 格式错误: {e}")
         return False
     
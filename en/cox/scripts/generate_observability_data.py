@@ -19,10 +19,16 @@
 
 import json
 import os
+import sys
 import argparse
 from pathlib import Path
 from datetime import datetime, timedelta
 
+# 添加 shared 到路径，导入 JSON 编解码模块（安装了 orjson 或 msgspec 时自动使用）
+shared_dir = Path(__file__).parent.parent.parent / "shared"
+sys.path.insert(0, str(shared_dir))
+import json_codec
+
 
 def check_file_exists(file_path, overwrite=False):
     """检查文件是否存在并警告
@@ -290,6 +296,8 @@ def main():
                        help='自定义迭代名称列表（JSON格式: ["迭代1名称","迭代2名称",...])')
     parser.add_argument('--overwrite', action='store_true',
                        help='强制覆盖已存在的文件（默认会报错）')
+    parser.add_argument('--compact', action='store_true',
+                       help='以紧凑格式（不缩进）写入数据文件，文件更小但不便人工编辑')
 
     args = parser.parse_args()
 
@@ -348,15 +356,13 @@ def main():
     ]
 
     for file_path, data in files_to_write:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        json_codec.dump_file(data, file_path, args.compact)
         
         # 验证写入的文件格式是否正确
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                json.load(f)
+            json_codec.load_file(file_path)
             print(f"[OK] {file_path.name} 格式验证通过")
-        except json.JSONDecodeError as e:
+        except json_codec.JSONDecodeError as e:
             print(f"[ERROR] {file_path.name} 格式错误: {e}")
             exit(1)
 
@@ -4,11 +4,16 @@
 生成结构化的可观测日志，可在终端查看或使用工具分析
 """
 
-import json
+import sys
 import argparse
 from pathlib import Path
 from datetime import datetime
 
+# 添加 shared 到路径，导入 JSON 编解码模块（安装了 orjson 或 msgspec 时自动使用）
+shared_dir = Path(__file__).parent.parent.parent / "shared"
+sys.path.insert(0, str(shared_dir))
+import json_codec
+
 
 class ObservabilityLogGenerator:
     """可观测日志生成器"""
@@ -202,12 +207,11 @@ class ObservabilityLogGenerator:
 def load_json_file(file_path):
     """加载JSON文件"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return json_codec.load_file(file_path)
     except FileNotFoundError:
         print(f"错误: 文件不存在: {file_path}")
         exit(1)
-    except json.JSONDecodeError as e:
+    except json_codec.JSONDecodeError as e:
         print(f"错误: JSON格式错误: {file_path}")
         print(f"详情: {e}")
         exit(1)
@@ -8,163 +8,2314 @@ Modern Observability Dashboard (Static & Web Modes)
   Web 模式（需要 Flask）: python run_web_observability.py --mode web --project ... --app ... --test ...
 """
 
-import json
 import os
 import sys
-import io
 import argparse
 import time
+import threading
+import hashlib
+import gzip
+import select
+import struct
+import base64
+import tempfile
+import pickle
+import signal
+import shutil
+import html
+import re
+import math
+import heapq
+import itertools
+import importlib.util
+from collections import deque, OrderedDict
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
+from urllib.parse import quote
 
-# 尝试导入 Flask，如果失败则提示用户
-try:
-    from flask import Flask, render_template_string, jsonify, request
-    FLASK_AVAILABLE = True
-except ImportError:
-    FLASK_AVAILABLE = False
+# 添加 shared 到路径，导入 JSON 编解码模块（安装了 orjson 或 msgspec 时自动使用）
+shared_dir = Path(__file__).parent.parent.parent / "shared"
+sys.path.insert(0, str(shared_dir))
+import json_codec
+
+# Flask 只在 Web 模式下导入（见 create_app），这里只检查是否已安装，静态模式和导入本模块都不承担导入开销
+FLASK_AVAILABLE = importlib.util.find_spec('flask') is not None
+
+# brotli 为可选依赖：安装后 /api/data 额外提供 br 压缩版本（首次压缩时才导入）
+BROTLI_AVAILABLE = importlib.util.find_spec('brotli') is not None
+
+# SSE 推送：检查数据变化的间隔（秒）与保活注释间隔（秒）
+SSE_POLL_INTERVAL = 0.5
+SSE_KEEPALIVE_INTERVAL = 30
+
+# 后台监听：写入静默多久后重新加载、最长合并延迟、轮询模式的检查间隔（秒）
+WATCH_DEBOUNCE = 0.1
+WATCH_MAX_DELAY = 1.0
+WATCH_POLL_INTERVAL = 0.5
+
+# 增量接口：保留最近多少个数据版本的快照用于生成 JSON Patch
+SNAPSHOT_HISTORY = 16
+
+# 更新接口：内存中的修改最多每隔多久合并落盘一次（秒）
+WRITE_FLUSH_INTERVAL = 0.2
+
+# 多进程模式：工作进程收到停止信号后等待在途请求完成的最长时间（秒）
+WORKER_GRACEFUL_TIMEOUT = 10
+
+# live 模式（标准库服务器）：空闲 keep-alive 连接的超时（秒）与监听队列长度
+LIVE_KEEPALIVE_TIMEOUT = 15
+LIVE_REQUEST_QUEUE_SIZE = 128
+
+# 分页接口：默认和最大每页条数
+PAGE_DEFAULT_LIMIT = 50
+PAGE_MAX_LIMIT = 1000
+
+# 摘要接口：视为已完成的任务状态，以及视为已关闭的异常状态（其余异常均计为未关闭）
+SUMMARY_DONE_STATUSES = ('done', 'completed')
+SUMMARY_CLOSED_STATUSES = ('resolved', 'ignored')
+
+# 搜索接口：默认返回条数，按字切分的中日韩文字（假名、汉字、谚文），以及分词正则
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_CJK_CHARS = '\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff'
+SEARCH_TOKEN_PATTERN = re.compile(f'[{SEARCH_CJK_CHARS}]+|(?:(?![{SEARCH_CJK_CHARS}])[^\\W_])+')
+SEARCH_CJK_PATTERN = re.compile(f'[{SEARCH_CJK_CHARS}]')
+SEARCH_ASCII_PATTERN = re.compile('[0-9a-z]+')
+
+# 多项目模式：项目目录中每个项目的数据文件名、已加载项目的默认内存上限（MB），
+# 以及由数据文件大小估算解析后内存占用的倍数（含解析后的对象和集合索引）
+PROJECT_DATA_FILES = {'project': 'project_data.json', 'app': 'app_status.json', 'test': 'test_metrics.json'}
+PROJECT_CACHE_MEMORY = 512
+PROJECT_MEMORY_FACTOR = 4
+
+# 静态模式：记录输入哈希的 <meta> 名称，以及从输出文件开头读取它的正则
+STATIC_HASH_META = 'cox-input-hash'
+STATIC_HASH_PATTERN = re.compile(rb'<meta name="cox-input-hash" content="([0-9a-f]+)">')
+
+# 静态模式：页面实际渲染的字段，内联数据时只保留这些字段（None 表示原样保留该字段的值，
+# 字典表示对象或对象列表中需要保留的子字段）；修改静态模板的 renderUI 时需同步更新
+STATIC_FIELDS = {
+    'project': {
+        'project_name': None,
+        'current_iteration': None,
+        'iterations': {
+            'iteration_id': None, 'iteration_name': None, 'status': None, 'start_date': None, 'end_date': None,
+            'tasks': {'task_id': None, 'task_name': None, 'status': None, 'assignee': None,
+                      'priority': None, 'risk_level': None},
+            'assumptions': {'hypothesis': None, 'description': None, 'assumption_text': None,
+                            'status': None, 'validated': None, 'validation_date': None},
+        },
+    },
+    'app': {
+        'version': None,
+        'modules': {'module_name': None, 'status': None, 'completion_rate': None, 'issue_description': None},
+    },
+    'test': {
+        'anomalies': {'type': None, 'description': None},
+    },
+}
+
+# 自身指标（/metrics）：耗时（秒）与字节数直方图的分桶上界
+METRICS_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+METRICS_SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+# 自身指标的定义：名称 -> (类型, 说明, 标签名, 直方图分桶)
+SERVER_METRICS = {
+    'cox_dashboard_requests_total': (
+        'counter', 'HTTP requests handled, by route, method and status code.', ('route', 'method', 'status'), None),
+    'cox_dashboard_request_duration_seconds': (
+        'histogram', 'Time spent building HTTP responses, by route.', ('route',), METRICS_LATENCY_BUCKETS),
+    'cox_dashboard_response_size_bytes': (
+        'histogram', 'HTTP response body sizes (streamed responses excluded), by route.', ('route',),
+        METRICS_SIZE_BUCKETS),
+    'cox_dashboard_cache_requests_total': (
+        'counter', 'Lookups in the in-memory caches, by cache and result (hit/miss).', ('cache', 'result'), None),
+    'cox_dashboard_reload_duration_seconds': (
+        'histogram', 'Time spent reloading changed data files into a new snapshot.', (), METRICS_LATENCY_BUCKETS),
+    'cox_dashboard_reload_errors_total': (
+        'counter', 'Data files that failed to load.', (), None),
+    'cox_dashboard_flush_duration_seconds': (
+        'histogram', 'Time spent writing pending updates back to the data files.', (), METRICS_LATENCY_BUCKETS),
+}
+
+# 剖析模式（--profile）：默认每多少个请求剖析一次、保留最近多少个请求的记录、接口默认返回的条数
+PROFILE_SAMPLE_RATE = 10
+PROFILE_HISTORY = 256
+PROFILE_TOP = 20
+
+# 预压缩级别：每个数据版本只压缩一次，因此可以选择较高的压缩比
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# 页面离线资源：预编译的 Tailwind CSS 和 Lucide 图标 sprite（由 build_dashboard_assets.py 生成）
+ASSETS_DIR = Path(__file__).resolve().parent.parent / 'assets' / 'dashboard'
+DASHBOARD_ASSETS = {'dashboard.css': 'text/css', 'icons.svg': 'image/svg+xml'}
+ASSET_MAX_AGE = 365 * 24 * 3600
+
+# 把 <i data-lucide="name"> 占位替换为引用 sprite 的 <svg>，与 lucide.createIcons() 的用法一致
+ICON_SCRIPT = """
+    <script>
+        const ICON_SPRITE = '%s';
+        function createIcons(root = document) {
+            root.querySelectorAll('i[data-lucide]').forEach(el => {
+                const name = el.getAttribute('data-lucide');
+                const svg = document.createElementNS('http://www.w3.org/2000/svg', 'svg');
+                for (const attr of el.attributes) {
+                    if (attr.name !== 'data-lucide') svg.setAttribute(attr.name, attr.value);
+                }
+                svg.setAttribute('class', `lucide lucide-${name} ${el.getAttribute('class') || ''}`.trim());
+                for (const [key, value] of [['width', 24], ['height', 24], ['viewBox', '0 0 24 24'], ['fill', 'none'],
+                        ['stroke', 'currentColor'], ['stroke-width', 2], ['stroke-linecap', 'round'], ['stroke-linejoin', 'round']]) {
+                    svg.setAttribute(key, value);
+                }
+                const use = document.createElementNS('http://www.w3.org/2000/svg', 'use');
+                use.setAttribute('href', `${ICON_SPRITE}#${name}`);
+                svg.appendChild(use);
+                el.replaceWith(svg);
+            });
+        }
+    </script>"""
+
+_dashboard_assets = None
+
+
+def load_dashboard_assets():
+    """读取页面离线资源，返回 {文件名: {'content': bytes, 'version': 内容哈希}}（进程内只读取一次）"""
+    global _dashboard_assets
+    if _dashboard_assets is None:
+        assets = {}
+        for name in DASHBOARD_ASSETS:
+            content = (ASSETS_DIR / name).read_bytes()
+            assets[name] = {'content': content, 'version': hashlib.sha1(content).hexdigest()[:12]}
+        _dashboard_assets = assets
+    return _dashboard_assets
+
+
+def render_asset_tags(mode):
+    """生成页面引用离线资源的标签，返回 (head 中的标签, body 开头的标签)
+
+    web 模式通过带版本号的 /assets/ 地址引用（可长期缓存）；static 模式把 CSS 和图标内联，单个文件即可离线打开。
+    """
+    assets = load_dashboard_assets()
+    css = assets['dashboard.css']
+    sprite = assets['icons.svg']
+    if mode == 'web':
+        head = (f'<link rel="stylesheet" href="/assets/dashboard.css?v={css["version"]}">'
+                + ICON_SCRIPT % f'/assets/icons.svg?v={sprite["version"]}')
+        return head, ''
+    head = '<style>\n' + css['content'].decode('utf-8') + '\n    </style>' + ICON_SCRIPT % ''
+    body = sprite['content'].decode('utf-8').strip().replace('<svg ', '<svg style="display: none" ', 1)
+    return head, body
+
+
+def compress_payload(raw, encoding):
+    """按内容编码压缩响应体，encoding 为 identity、gzip 或 br"""
+    if encoding == 'identity':
+        return raw
+    if encoding == 'gzip':
+        return gzip.compress(raw, compresslevel=GZIP_LEVEL)
+    if encoding == 'br' and BROTLI_AVAILABLE:
+        import brotli
+        return brotli.compress(raw, quality=BROTLI_QUALITY)
+    raise ValueError(f"不支持的内容编码: {encoding}")
+
+
+def escape_pointer_token(key):
+    """按 RFC 6901 转义 JSON Pointer 片段"""
+    return str(key).replace('~', '~0').replace('/', '~1')
+
+
+def make_json_patch(old, new, path=''):
+    """生成把 old 变为 new 的 RFC 6902 JSON Patch 操作列表
+
+    字典逐键比较；列表逐下标比较，长度变化时在末尾追加或从后往前删除。
+    未变化的子树（同一对象）直接跳过，因此只改动一个模块状态时开销很小。
+    """
+    if old is new:
+        return []
+    if type(old) is not type(new) or not isinstance(old, (dict, list)):
+        return [] if old == new and type(old) is type(new) else [{'op': 'replace', 'path': path, 'value': new}]
+    ops = []
+    if isinstance(old, dict):
+        for key in old:
+            if key not in new:
+                ops.append({'op': 'remove', 'path': f"{path}/{escape_pointer_token(key)}"})
+        for key, value in new.items():
+            child = f"{path}/{escape_pointer_token(key)}"
+            if key in old:
+                ops.extend(make_json_patch(old[key], value, child))
+            else:
+                ops.append({'op': 'add', 'path': child, 'value': value})
+    else:
+        common = min(len(old), len(new))
+        for index in range(common):
+            ops.extend(make_json_patch(old[index], new[index], f"{path}/{index}"))
+        for index in range(common, len(new)):
+            ops.append({'op': 'add', 'path': f"{path}/{index}", 'value': new[index]})
+        for index in range(len(old) - 1, common - 1, -1):
+            ops.append({'op': 'remove', 'path': f"{path}/{index}"})
+    return ops
+
+
+def file_signature(path, missing_ok=False):
+    """文件签名：(mtime_ns, size, inode)
+
+    仅比较秒级 mtime 会漏掉同一秒内的多次写入；加入纳秒 mtime、文件大小和 inode
+    后，原地改写与 os.replace 原子替换都能被识别。
+    missing_ok 为 True 时文件不存在（例如被删除）返回 None，与任何已有签名都不相同，即视为发生了变化。
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        if missing_ok:
+            return None
+        raise
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class InotifyWatch:
+    """基于 Linux inotify 的目录监听（通过 ctypes 调用 libc，无第三方依赖）
+
+    监听数据文件所在目录而不是文件本身，这样 os.replace 原子替换后仍能继续收到事件。
+    """
+    IN_MODIFY = 0x002
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self, files):
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 失败')
+        mask = self.IN_MODIFY | self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE | self.IN_DELETE
+        # wd -> {文件名: 数据类型}
+        self._targets = {}
+        for name, path in files.items():
+            directory, filename = os.path.split(os.path.abspath(path))
+            wd = libc.inotify_add_watch(self.fd, os.fsencode(directory), mask)
+            if wd < 0:
+                os.close(self.fd)
+                raise OSError(ctypes.get_errno(), f'inotify_add_watch 失败: {directory}')
+            self._targets.setdefault(wd, {})[filename] = name
+
+    def wait(self, timeout):
+        """等待最多 timeout 秒，返回发生变化的数据类型集合"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            buffer = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        names = set()
+        offset = 0
+        while offset + self.EVENT_HEADER.size <= len(buffer):
+            wd, _mask, _cookie, length = self.EVENT_HEADER.unpack_from(buffer, offset)
+            offset += self.EVENT_HEADER.size
+            filename = os.fsdecode(buffer[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            name = self._targets.get(wd, {}).get(filename)
+            if name:
+                names.add(name)
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+class DataFileWatcher(threading.Thread):
+    """后台数据文件监听线程
+
+    Linux 上使用 inotify，其它平台（或 inotify 不可用时）退回为定时比较文件签名。
+    检测到变化后等待写入静默 WATCH_DEBOUNCE 秒（最长 WATCH_MAX_DELAY 秒）再重新加载，
+    连续多次写入只触发一次解析。
+    """
+
+    def __init__(self, data_manager, debounce=None, poll_interval=None):
+        super().__init__(name='observability-watcher', daemon=True)
+        self.data_manager = data_manager
+        self.debounce = WATCH_DEBOUNCE if debounce is None else debounce
+        self.poll_interval = WATCH_POLL_INTERVAL if poll_interval is None else poll_interval
+        self._stopped = threading.Event()
+        self._seen = {}
+        self._inotify = None
+        if sys.platform.startswith('linux'):
+            try:
+                self._inotify = InotifyWatch(data_manager.files)
+            except (OSError, AttributeError) as e:
+                print(f"[WARNING] inotify 不可用，改用轮询监听: {e}")
+        self.backend = 'inotify' if self._inotify else 'polling'
+
+    def _poll(self, timeout):
+        """轮询模式：等待 timeout 秒后比较文件签名（文件被删除也算作变化）"""
+        if self._stopped.wait(timeout):
+            return set()
+        changed = set()
+        for name, path in self.data_manager.files.items():
+            try:
+                signature = file_signature(path, missing_ok=True)
+            except OSError:
+                continue
+            if self._seen.get(name) != signature:
+                self._seen[name] = signature
+                changed.add(name)
+        return changed
+
+    def _wait_for_changes(self, timeout):
+        if self._inotify is not None:
+            return self._inotify.wait(timeout)
+        return self._poll(timeout)
+
+    def wait_for_changes(self, timeout):
+        """等待最多 timeout 秒，返回发生变化的数据类型集合
+
+        去抖：持续收到写入事件时继续等待，直到静默或达到最长延迟。
+        """
+        changed = self._wait_for_changes(timeout)
+        if changed:
+            deadline = time.monotonic() + WATCH_MAX_DELAY
+            while time.monotonic() < deadline:
+                more = self._wait_for_changes(self.debounce)
+                if not more:
+                    break
+                changed |= more
+        return changed
+
+    def remember_signatures(self):
+        """以各数据文件当前的签名作为轮询比较的基准（不启动线程、直接调用 wait_for_changes 时使用）"""
+        self._seen = {name: file_signature(path, missing_ok=True) for name, path in self.data_manager.files.items()}
+
+    def run(self):
+        self._seen = dict(self.data_manager.last_modified)
+        try:
+            while not self._stopped.is_set():
+                changed = self.wait_for_changes(self.poll_interval)
+                if changed:
+                    self.data_manager.load_if_changed(force=changed)
+        finally:
+            self.close()
+
+    def stop(self):
+        self._stopped.set()
+
+    def close(self):
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+
+def decode_assumption_id(assumption_id):
+    """没有 assumption_id 的假设由前端用假设内容的 base64 编码作为临时 ID，这里尝试解码"""
+    try:
+        return base64.b64decode(assumption_id).decode('utf-8')
+    except Exception:
+        return None
+
+
+def assumption_content(assumption):
+    return assumption.get('hypothesis') or assumption.get('description') or assumption.get('assumption_text')
+
+
+def content_key(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def build_assumption_index(project_data):
+    """建立假设索引：('id', assumption_id) 与 ('content', 内容哈希) -> (迭代下标, 假设下标)
+
+    同一键出现多次时保留第一次出现的位置，与逐个扫描时的匹配顺序一致。
+    """
+    index = {}
+    for i, iteration in enumerate(project_data.get('iterations', [])):
+        for j, assumption in enumerate(iteration.get('assumptions', [])):
+            if 'assumption_id' in assumption:
+                index.setdefault(('id', assumption['assumption_id']), (i, j))
+            content = assumption_content(assumption)
+            if content:
+                index.setdefault(('content', content_key(content)), (i, j))
+    return index
+
+
+def lookup_assumption(index, assumption_id):
+    """在假设索引中查找位置，先按 assumption_id，再按 base64 解码后的内容哈希"""
+    position = index.get(('id', assumption_id))
+    if position is None:
+        decoded_id = decode_assumption_id(assumption_id)
+        if decoded_id:
+            position = index.get(('content', content_key(decoded_id)))
+    return position
+
+
+def find_assumption(project_data, assumption_id):
+    """查找假设位置，返回 (迭代下标, 假设下标)，找不到时返回 None（线性扫描）"""
+    return lookup_assumption(build_assumption_index(project_data), assumption_id)
+
+
+def set_module_status(app_data, module_name, status, issue_description=''):
+    """写时复制地更新模块状态，返回 (新数据, 是否找到模块)
+
+    只复制被修改的模块及其所在列表，其余数据与旧快照共享，旧快照保持不变。
+    """
+    modules = app_data.get('modules', [])
+    for index, module in enumerate(modules):
+        if module.get('module_name') == module_name:
+            new_modules = list(modules)
+            new_modules[index] = dict(module, status=status,
+                                      issue_description=issue_description if status == 'has_issue' else '')
+            new_app = dict(app_data, modules=new_modules)
+            new_app['last_updated'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            return new_app, True
+    return app_data, False
+
+
+def set_assumption_status(project_data, position, status):
+    """写时复制地更新 position 处假设的状态，返回 (新数据, 是否找到假设)"""
+    if position is None:
+        return project_data, False
+    i, j = position
+    iterations = list(project_data['iterations'])
+    iteration = dict(iterations[i])
+    assumptions = list(iteration['assumptions'])
+    validation_date = datetime.now().strftime('%Y-%m-%d') if status == 'validated' else None
+    assumptions[j] = dict(assumptions[j], status=status, validation_date=validation_date)
+    iteration['assumptions'] = assumptions
+    iterations[i] = iteration
+    return dict(project_data, iterations=iterations), True
+
+
+def build_update(item, locate_assumption=find_assumption):
+    """把一条更新请求转换为 (数据类型, mutate, 目标不存在时的错误信息)
+
+    item 形如 {"type": "module", "module_name": ..., "status": ..., "issue_description": ...}
+    或 {"type": "assumption", "assumption_id": ..., "status": ...}；参数不完整时抛出 ValueError。
+    locate_assumption(project_data, assumption_id) 用于定位假设，Web 模式下传入索引查找。
+    """
+    kind = item.get('type')
+    status = item.get('status')
+    if kind == 'module':
+        module_name = item.get('module_name')
+        if not module_name or not status:
+            raise ValueError('模块更新需要 module_name 和 status')
+        issue_description = item.get('issue_description', '')
+        return ('app',
+                lambda app_data: set_module_status(app_data, module_name, status, issue_description),
+                f'模块不存在: {module_name}')
+    if kind == 'assumption':
+        assumption_id = item.get('assumption_id')
+        if not assumption_id or not status:
+            raise ValueError('假设更新需要 assumption_id 和 status')
+        return ('project',
+                lambda project_data: set_assumption_status(
+                    project_data, locate_assumption(project_data, assumption_id), status),
+                f'假设不存在: {assumption_id}')
+    raise ValueError(f'未知的更新类型: {kind}')
+
+
+def apply_update(data_manager, item):
+    """执行单条更新，返回更新接口的响应内容 {"success": ..., "error": ...}"""
+    try:
+        name, mutate, not_found = build_update(item, data_manager.find_assumption)
+        if not data_manager.writer.update(name, mutate):
+            return {'success': False, 'error': not_found}
+        return {'success': True}
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
+
+
+def apply_batch_update(data_manager, data):
+    """执行批量更新，返回批量更新接口的响应内容
+
+    data 为 {"updates": [...]} 或直接为列表，每一项的格式见 build_update。
+    全部条目有效时一次性生效，每个受影响的文件只写一次；任意条目失败时全部不生效。
+    响应中的 results 按顺序给出每一项的结果，applied 表示是否已生效。
+    """
+    try:
+        items = data if isinstance(data, list) else (data or {}).get('updates')
+        if not isinstance(items, list) or not items:
+            return {'success': False, 'applied': False, 'error': 'updates 必须是非空数组', 'results': []}
+
+        results = [None] * len(items)
+        updates, positions = [], []
+        for index, item in enumerate(items):
+            try:
+                name, mutate, not_found = build_update(item if isinstance(item, dict) else {},
+                                                       data_manager.find_assumption)
+            except ValueError as e:
+                results[index] = {'success': False, 'error': str(e)}
+                continue
+            updates.append((name, mutate))
+            positions.append((index, not_found))
+
+        valid = all(results[i] is None for i in range(len(items)))
+        outcomes = data_manager.writer.update_many(updates, dry_run=not valid)
+        for (index, not_found), ok in zip(positions, outcomes):
+            results[index] = {'success': True} if ok else {'success': False, 'error': not_found}
+        applied = valid and all(outcomes)
+        return {'success': applied, 'applied': applied, 'results': results}
+    except Exception as e:
+        return {'success': False, 'applied': False, 'error': str(e), 'results': []}
+
+
+# 分页接口的集合定义：数据来源、可过滤字段（查询参数 -> 字段）和可排序字段
+# 任务分布在各迭代中，parent_field 表示展开后附加到每条任务上的所属迭代字段
+COLLECTIONS = {
+    'iterations': {
+        'source': 'project',
+        'filters': {'status': 'status', 'iteration': 'iteration_id'},
+        'sorts': ('iteration_id', 'iteration_name', 'status', 'start_date', 'end_date'),
+    },
+    'tasks': {
+        'source': 'project',
+        'parent_field': 'iteration_id',
+        'filters': {'status': 'status', 'owner': 'assignee', 'iteration': 'iteration_id',
+                    'priority': 'priority'},
+        'sorts': ('task_id', 'task_name', 'status', 'assignee', 'priority', 'iteration_id'),
+    },
+    'modules': {
+        'source': 'app',
+        'filters': {'status': 'status', 'owner': 'owner'},
+        'sorts': ('module_name', 'status', 'owner', 'completion_rate', 'last_update'),
+    },
+    'anomalies': {
+        'source': 'test',
+        'filters': {'status': 'status', 'severity': 'severity', 'type': 'type'},
+        'sorts': ('anomaly_id', 'type', 'severity', 'status', 'occurrence_count',
+                  'first_occurred', 'last_occurred'),
+    },
+}
+
+
+def collection_rows(name, source_data):
+    """从数据文件内容中取出集合的条目，返回 (条目列表, 所属迭代列表或 None)"""
+    if name == 'iterations':
+        return list(source_data.get('iterations', [])), None
+    if name == 'tasks':
+        items, parents = [], []
+        for iteration in source_data.get('iterations', []):
+            tasks = iteration.get('tasks', [])
+            items.extend(tasks)
+            parents.extend([iteration.get('iteration_id')] * len(tasks))
+        return items, parents
+    if name == 'modules':
+        return list(source_data.get('modules', [])), None
+    return list(source_data.get('anomalies', [])), None
+
+
+def sort_value(value):
+    """排序键：数字按数值比较，其他值按字符串比较"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return (0, value, '')
+    return (1, 0, str(value))
+
+
+class CollectionIndex:
+    """分页接口的集合索引
+
+    重新加载时为每个过滤参数建立 值 -> 位置列表 的倒排表；排序结果按排序字段在首次使用时计算并缓存。
+    相同排序值的条目保持数据文件中的顺序，同一数据版本内分页结果稳定。
+    """
+
+    def __init__(self, name, source_data):
+        spec = COLLECTIONS[name]
+        self.name = name
+        self.filters = spec['filters']
+        self.sorts = spec['sorts']
+        self.parent_field = spec.get('parent_field')
+        self.items, self.parents = collection_rows(name, source_data)
+        self.postings = {}
+        for param, field in self.filters.items():
+            postings = {}
+            for position in range(len(self.items)):
+                value = self.field(position, field)
+                if value is not None:
+                    postings.setdefault(str(value), []).append(position)
+            self.postings[param] = postings
+        self._orders = {}
+        self._lock = threading.Lock()
+
+    def field(self, position, field):
+        if self.parents is not None and field == self.parent_field:
+            return self.parents[position]
+        item = self.items[position]
+        return item.get(field) if isinstance(item, dict) else None
+
+    def order(self, sort, descending=False):
+        """按 sort 字段排序后的位置列表，缺少该字段的条目始终排在最后"""
+        key = (sort, descending)
+        with self._lock:
+            if key not in self._orders:
+                present, missing = [], []
+                for position in range(len(self.items)):
+                    (missing if self.field(position, sort) is None else present).append(position)
+                present.sort(key=lambda position: sort_value(self.field(position, sort)), reverse=descending)
+                order = present + missing
+                rank = [0] * len(order)
+                for i, position in enumerate(order):
+                    rank[position] = i
+                self._orders[key] = (order, rank)
+            return self._orders[key]
+
+    def render(self, position):
+        item = self.items[position]
+        if self.parents is None:
+            return item
+        return dict(item, **{self.parent_field: self.parents[position]})
+
+    def query(self, filters=None, sort=None, descending=False, offset=0, limit=PAGE_DEFAULT_LIMIT):
+        """返回 (匹配总数, 当前页条目)
+
+        filters 为 {查询参数: [取值, ...]}，同一参数的多个取值取并集，不同参数之间取交集；
+        sort 为空时按数据文件中的顺序返回。
+        """
+        selected = None
+        for param, values in (filters or {}).items():
+            postings = self.postings[param]
+            positions = set()
+            for value in values:
+                positions.update(postings.get(value, ()))
+            selected = positions if selected is None else selected & positions
+        if sort:
+            order, rank = self.order(sort, descending)
+            matched = order if selected is None else sorted(selected, key=rank.__getitem__)
+        else:
+            matched = range(len(self.items)) if selected is None else sorted(selected)
+        return len(matched), [self.render(position) for position in matched[offset:offset + limit]]
+
+
+def count_by(items, field):
+    """按字段取值计数，缺少该字段的条目计入 unknown"""
+    counts = {}
+    for item in items:
+        value = item.get(field) or 'unknown'
+        counts[value] = counts.get(value, 0) + 1
+    return counts
+
+
+def summarize_project(project):
+    """项目数据的汇总：各迭代按状态统计的任务数、任务总数，以及每个负责人的任务数和完成数"""
+    iterations, owners = [], {}
+    for iteration in project.get('iterations', []):
+        tasks = iteration.get('tasks') or []
+        iterations.append({
+            'iteration_id': iteration.get('iteration_id'),
+            'iteration_name': iteration.get('iteration_name'),
+            'status': iteration.get('status'),
+            'total': len(tasks),
+            'by_status': count_by(tasks, 'status')
+        })
+        for task in tasks:
+            owner = task.get('assignee')
+            if owner:
+                stats = owners.setdefault(owner, {'tasks': 0, 'completed': 0})
+                stats['tasks'] += 1
+                if str(task.get('status', '')).lower() in SUMMARY_DONE_STATUSES:
+                    stats['completed'] += 1
+    by_status = {}
+    for iteration in iterations:
+        for status, count in iteration['by_status'].items():
+            by_status[status] = by_status.get(status, 0) + count
+    return {
+        'project_name': project.get('project_name'),
+        'current_iteration': project.get('current_iteration'),
+        'iterations': iterations,
+        'tasks': {'total': sum(iteration['total'] for iteration in iterations), 'by_status': by_status},
+        'owners': owners
+    }
+
+
+def summarize_app(app):
+    """应用状态的汇总：模块状态分布，以及每个负责人的模块数"""
+    modules = app.get('modules') or []
+    return {
+        'app_version': app.get('version'),
+        'modules': {'total': len(modules), 'by_status': count_by(modules, 'status')},
+        'owners': count_by([module for module in modules if module.get('owner')], 'owner')
+    }
+
+
+def summarize_test(test):
+    """测试指标的汇总：测试通过率、按测试数加权的覆盖率，以及未关闭异常按严重程度的分布"""
+    suites = test.get('test_suites') or []
+    totals = {key: sum(suite.get(key) or 0 for suite in suites)
+              for key in ('total_tests', 'passed_tests', 'failed_tests', 'skipped_tests')}
+    covered = [suite for suite in suites if isinstance(suite.get('coverage'), (int, float))]
+    covered_tests = sum(suite.get('total_tests') or 0 for suite in covered)
+    if covered_tests:
+        coverage = sum(suite['coverage'] * (suite.get('total_tests') or 0) for suite in covered) / covered_tests
+    else:
+        coverage = sum(suite['coverage'] for suite in covered) / len(covered) if covered else None
+    anomalies = test.get('anomalies') or []
+    unresolved = [anomaly for anomaly in anomalies if anomaly.get('status') not in SUMMARY_CLOSED_STATUSES]
+    return {
+        'tests': dict(totals, suites=len(suites),
+                      pass_rate=totals['passed_tests'] / totals['total_tests'] if totals['total_tests'] else None,
+                      coverage=coverage),
+        'anomalies': {'total': len(anomalies), 'open': len(unresolved),
+                      'open_by_severity': count_by(unresolved, 'severity')}
+    }
+
+
+# 摘要接口：各数据类型的汇总函数，重新加载时只为内容变化的数据类型重新计算
+SUMMARIES = {'project': summarize_project, 'app': summarize_app, 'test': summarize_test}
+
+
+def merge_summary(rollups):
+    """把各数据类型的汇总合并为 /api/summary 的响应；负责人同时统计任务和模块"""
+    project, app, test = rollups['project'], rollups['app'], rollups['test']
+    owners = {}
+    for owner, stats in project['owners'].items():
+        owners[owner] = {'tasks': stats['tasks'], 'completed': stats['completed'], 'modules': 0}
+    for owner, count in app['owners'].items():
+        owners.setdefault(owner, {'tasks': 0, 'completed': 0, 'modules': 0})['modules'] = count
+    for stats in owners.values():
+        # 与前端 Math.round 一致：0.5 向上取整，而不是 round() 的银行家舍入
+        stats['completion'] = int(stats['completed'] / stats['tasks'] * 100 + 0.5) if stats['tasks'] else 0
+    summary = {key: value for key, value in project.items() if key != 'owners'}
+    summary.update((key, value) for key, value in app.items() if key != 'owners')
+    summary.update(test)
+    summary['owners'] = owners
+    return summary
+
+
+# 搜索接口的条目类型：数据来源、ID 字段、标题字段（取第一个非空值）和参与索引的字段及其权重
+SEARCH_TYPES = {
+    'tasks': {
+        'source': 'project', 'id': 'task_id', 'title': ('task_name',),
+        'fields': {'task_id': 3, 'task_name': 3, 'description': 1, 'notes': 1},
+    },
+    'assumptions': {
+        'source': 'project', 'id': 'assumption_id', 'title': ('hypothesis', 'description', 'assumption_text'),
+        'fields': {'assumption_id': 3, 'hypothesis': 2, 'description': 2, 'assumption_text': 2, 'notes': 1},
+    },
+    'modules': {
+        'source': 'app', 'id': 'module_id', 'title': ('module_name',),
+        'fields': {'module_id': 3, 'module_name': 3, 'description': 1, 'notes': 1, 'issue_description': 1},
+    },
+    'anomalies': {
+        'source': 'test', 'id': 'anomaly_id', 'title': ('description',),
+        'fields': {'anomaly_id': 3, 'description': 2, 'notes': 1, 'issue_description': 1},
+    },
+}
+
+
+def search_terms(text, query=False):
+    """把文本切分为检索词
+
+    字母和数字按单词切分并转为小写；中日韩文字没有空格分隔，索引时取单字和相邻两字，
+    查询时取相邻两字（只有一个字时取单字），因此“支付接口”能匹配“修复支付接口超时”。
+    """
+    text = str(text)
+    if text.isascii():
+        return SEARCH_ASCII_PATTERN.findall(text.lower())
+    terms = []
+    for token in SEARCH_TOKEN_PATTERN.findall(text.casefold()):
+        if SEARCH_CJK_PATTERN.match(token):
+            bigrams = [token[i:i + 2] for i in range(len(token) - 1)]
+            if query:
+                terms.extend(bigrams or [token])
+            else:
+                terms.extend(token)
+                terms.extend(bigrams)
+        else:
+            terms.append(token)
+    return terms
+
+
+def search_rows(name, source_data):
+    """遍历数据文件中参与搜索的条目，生成 (类型, JSON Pointer 路径, 条目)"""
+    if name == 'project':
+        for i, iteration in enumerate(source_data.get('iterations', [])):
+            for kind in ('tasks', 'assumptions'):
+                for j, item in enumerate(iteration.get(kind, [])):
+                    yield kind, f'/project/iterations/{i}/{kind}/{j}', item
+    else:
+        kind = 'modules' if name == 'app' else 'anomalies'
+        for i, item in enumerate(source_data.get(kind, [])):
+            yield kind, f'/{name}/{kind}/{i}', item
+
+
+class SearchIndex:
+    """一类条目（任务、假设、模块或异常）的全文倒排索引
+
+    检索词 -> ((权重, 条目位置集合), ...)，按权重从高到低排列；权重为检索词在各字段中的出现次数
+    乘以字段权重（见 SEARCH_TYPES）。同一检索词的条目通常只有少数几种权重，搜索时按权重组合
+    从高分到低分求集合交集，取够一页即可停止，无需为每个匹配条目计算得分。
+    """
+
+    def __init__(self, kind, rows):
+        self.kind = kind
+        self.rows = rows
+        fields = SEARCH_TYPES[kind]['fields'].items()
+        buckets = {}
+        for position, (path, item) in enumerate(rows):
+            weights = {}
+            for field, weight in fields:
+                value = item.get(field)
+                if value:
+                    for term in search_terms(value):
+                        weights[term] = weights.get(term, 0) + weight
+            for key in weights.items():
+                bucket = buckets.get(key)
+                if bucket is None:
+                    buckets[key] = [position]
+                else:
+                    bucket.append(position)
+        grouped = {}
+        for (term, weight), positions in buckets.items():
+            grouped.setdefault(term, []).append((weight, frozenset(positions)))
+        self.postings = {term: tuple(sorted(entries, key=lambda entry: -entry[0])) if len(entries) > 1
+                         else tuple(entries) for term, entries in grouped.items()}
+
+    def frequency(self, term):
+        """包含检索词的条目数"""
+        return sum(len(positions) for _, positions in self.postings.get(term, ()))
+
+    def search(self, terms, idf, count):
+        """返回 (匹配条目数, 得分最高的至多 count 条 [(-得分, 位置), ...])，得分相同时按位置排列"""
+        postings = [self.postings.get(term) for term in terms]
+        if not all(postings):
+            return 0, []
+        matched = [entries[0][1] if len(entries) == 1 else frozenset().union(*(s for _, s in entries))
+                   for entries in postings]
+        matched.sort(key=len)
+        matched = matched[0].intersection(*matched[1:])
+        weights = [idf[term] for term in terms]
+        combos = math.prod(len(entries) for entries in postings)
+        if combos > len(matched):
+            # 权重组合比匹配条目还多时逐条计算得分
+            scored = [(-round(sum(next(weight for weight, positions in entries if position in positions) * factor
+                                  for entries, factor in zip(postings, weights)), 9), position)
+                      for position in matched]
+            return len(matched), heapq.nsmallest(count, scored)
+        # 同一权重组合内的条目得分相同；得分相同的组合合并后再按位置取前若干条
+        scored = []
+        for combo in itertools.product(*postings):
+            score = round(sum(weight * factor for (weight, _), factor in zip(combo, weights)), 9)
+            scored.append((-score, [positions for _, positions in combo]))
+        scored.sort(key=lambda entry: entry[0])
+        hits = []
+        for score, group in itertools.groupby(scored, key=lambda entry: entry[0]):
+            positions = set()
+            for _, sets in group:
+                positions |= sets[0].intersection(*sets[1:]) if len(sets) > 1 else sets[0]
+            needed = count - len(hits)
+            chosen = sorted(positions) if len(positions) <= needed else heapq.nsmallest(needed, positions)
+            hits.extend((score, position) for position in chosen[:needed])
+            if len(hits) >= count:
+                break
+        return len(matched), hits
+
+    def render(self, position, score):
+        path, item = self.rows[position]
+        spec = SEARCH_TYPES[self.kind]
+        return {
+            'type': self.kind,
+            'id': item.get(spec['id']),
+            'title': next((item[field] for field in spec['title'] if item.get(field)), None),
+            'status': item.get('status'),
+            'path': path,
+            'score': round(score, 3)
+        }
+
+
+def build_search_indexes(name, source_data):
+    """为数据文件 name 中的各类条目建立搜索索引，返回 {类型: SearchIndex}"""
+    rows = {kind: [] for kind, spec in SEARCH_TYPES.items() if spec['source'] == name}
+    for kind, path, item in search_rows(name, source_data):
+        if isinstance(item, dict):
+            rows[kind].append((path, item))
+    return {kind: SearchIndex(kind, kind_rows) for kind, kind_rows in rows.items()}
+
+
+def search_indexes(indexes, query, offset=0, limit=SEARCH_DEFAULT_LIMIT):
+    """在多个索引中搜索，返回 (命中总数, 当前页命中)
+
+    查询中的每个检索词都必须出现；得分为各检索词的 权重 × idf 之和（idf 按全部索引统计），
+    得分相同时依次按 indexes 的顺序和条目在数据文件中的顺序排列。
+    """
+    terms = list(dict.fromkeys(search_terms(query, query=True)))
+    if not terms:
+        return 0, []
+    rows = sum(len(index.rows) for index in indexes)
+    idf = {}
+    for term in terms:
+        frequency = sum(index.frequency(term) for index in indexes)
+        if not frequency:
+            return 0, []
+        idf[term] = math.log(1 + rows / frequency)
+    total, scored = 0, []
+    for order, index in enumerate(indexes):
+        matched, hits = index.search(terms, idf, offset + limit)
+        total += matched
+        scored.extend((score, order, position) for score, position in hits)
+    page = heapq.nsmallest(offset + limit, scored)[offset:]
+    return total, [indexes[order].render(position, -score) for score, order, position in page]
+
+
+class ServerMetrics:
+    """服务器自身的运行指标，以 Prometheus 文本格式输出
+
+    只用标准库实现计数器和直方图，与 collect_data.py 导出的项目指标无关。
+    多进程模式下每个工作进程各自统计。
+    """
+
+    def __init__(self, definitions):
+        self.definitions = definitions
+        self._lock = threading.Lock()
+        # 名称 -> {标签值元组: 计数器的值，或直方图的 [各分桶计数, 总和, 次数]}
+        self._values = {name: {} for name in definitions}
+
+    def inc(self, name, *labels, amount=1):
+        with self._lock:
+            values = self._values[name]
+            values[labels] = values.get(labels, 0) + amount
+
+    def observe(self, name, value, *labels):
+        buckets = self.definitions[name][3]
+        with self._lock:
+            series = self._values[name].get(labels)
+            if series is None:
+                series = self._values[name][labels] = [[0] * len(buckets), 0.0, 0]
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    @staticmethod
+    def format_labels(names, values, extra=()):
+        pairs = list(zip(names, values)) + list(extra)
+        if not pairs:
+            return ''
+        escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+                   for _, value in pairs)
+        return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+    def render(self):
+        """输出全部指标（text/plain; version=0.0.4）"""
+        lines = []
+        with self._lock:
+            for name, (kind, help_text, label_names, buckets) in self.definitions.items():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {kind}')
+                values = self._values[name]
+                if not values and not label_names:
+                    values = {(): 0 if kind == 'counter' else [[0] * len(buckets), 0.0, 0]}
+                for labels, value in sorted(values.items()):
+                    if kind == 'counter':
+                        lines.append(f'{name}{self.format_labels(label_names, labels)} {value}')
+                        continue
+                    counts, total, count = value
+                    cumulative = 0
+                    for bound, bucket_count in zip(buckets + ('+Inf',), counts + [0]):
+                        cumulative = count if bound == '+Inf' else cumulative + bucket_count
+                        label_text = self.format_labels(label_names, labels, [('le', bound)])
+                        lines.append(f'{name}_bucket{label_text} {cumulative}')
+                    label_text = self.format_labels(label_names, labels)
+                    lines.append(f'{name}_sum{label_text} {total}')
+                    lines.append(f'{name}_count{label_text} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+class RequestProfiler:
+    """--profile 模式下的请求剖析
+
+    每个请求都记录耗时；每 sample_rate 个请求用 cProfile 剖析一次（同一时刻只剖析一个请求，
+    其余请求只计时）。最近 capacity 个请求的耗时和剖析结果保存在环形缓冲区中，
+    由 /debug/profile 汇总为最慢的请求和累计耗时最多的函数。
+    """
+
+    def __init__(self, sample_rate=PROFILE_SAMPLE_RATE, capacity=PROFILE_HISTORY):
+        self.sample_rate = max(1, sample_rate)
+        self._requests = deque(maxlen=capacity)
+        # 每个元素为一次剖析的 {函数: (调用次数, 自身耗时, 累计耗时)}
+        self._profiles = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        # cProfile 同一时刻只能有一个处于启用状态（Python 3.12 起跨线程也是如此）
+        self._active = threading.Lock()
+        self._seen = 0
+
+    def start(self):
+        """请求开始时调用：轮到剖析且没有其它请求正在剖析时返回已启用的 cProfile，否则返回 None"""
+        with self._lock:
+            self._seen += 1
+            if self._seen % self.sample_rate:
+                return None
+        if not self._active.acquire(blocking=False):
+            return None
+        import cProfile
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # 其它剖析工具（如调试器）已占用
+            self._active.release()
+            return None
+        return profiler
+
+    def stop(self, profiler):
+        """停止剖析并返回 {函数: (调用次数, 自身耗时, 累计耗时)}"""
+        try:
+            profiler.disable()
+        finally:
+            self._active.release()
+        profiler.create_stats()
+        return {func: (calls, own, total) for func, (_, calls, own, total, _) in profiler.stats.items()}
+
+    def record(self, method, path, route, status, duration, profiler=None):
+        """请求结束时调用，记录耗时；profiler 为 start() 的返回值"""
+        stats = self.stop(profiler) if profiler is not None else None
+        entry = {
+            'method': method,
+            'path': path,
+            'route': route,
+            'status': status,
+            'duration_ms': round(duration * 1000, 3),
+            'time': datetime.now().strftime('%H:%M:%S'),
+            'profiled': stats is not None
+        }
+        with self._lock:
+            self._requests.append(entry)
+            if stats is not None:
+                self._profiles.append(stats)
+
+    def discard(self, profiler):
+        """请求异常结束、没有机会 record() 时释放剖析器"""
+        if profiler is not None:
+            self.stop(profiler)
+
+    def report(self, limit=PROFILE_TOP, sort='cumulative'):
+        """汇总缓冲区：最慢的最近请求，以及所有剖析结果中按 sort（cumulative 或 tottime）排序的函数"""
+        import pstats
+        with self._lock:
+            requests = list(self._requests)
+            profiles = list(self._profiles)
+        totals = {}
+        for stats in profiles:
+            for func, (calls, own, total) in stats.items():
+                current = totals.get(func, (0, 0.0, 0.0))
+                totals[func] = (current[0] + calls, current[1] + own, current[2] + total)
+        column = 1 if sort == 'tottime' else 2
+        top = sorted(totals.items(), key=lambda item: item[1][column], reverse=True)[:limit]
+        return {
+            'sample_rate': self.sample_rate,
+            'requests_recorded': len(requests),
+            'requests_profiled': len(profiles),
+            'slowest_requests': sorted(requests, key=lambda entry: entry['duration_ms'], reverse=True)[:limit],
+            'functions': [{
+                'function': pstats.func_std_string(func),
+                'calls': calls,
+                'tottime_ms': round(own * 1000, 3),
+                'cumtime_ms': round(total * 1000, 3)
+            } for func, (calls, own, total) in top]
+        }
+
+
+class DataWriter:
+    """更新接口的唯一写入通道
+
+    修改在同一把锁内串行地作用于内存中的当前快照并立即发布，读取方马上可见；
+    落盘则合并到 flush_interval 秒内执行一次：先写临时文件，再用 os.replace 原子替换。
+    这样多线程并发点击不会互相覆盖，也不会在每次点击时重写整个大文件。
+    已发布、尚未落盘的修改按顺序保存在 _pending 中：其它程序在此期间改写了数据文件时，
+    重新加载会把这些修改重放到新数据上，已经返回成功的修改不会丢失，也不会覆盖外部写入。
+    """
+
+    def __init__(self, data_manager, flush_interval=None, lock_path=None, compact=False):
+        self.data_manager = data_manager
+        self.flush_interval = WRITE_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        # 为 True 时落盘使用紧凑格式（不缩进），文件更小、写入更快，但不便人工阅读
+        self.compact = compact
+        # 多进程模式下的跨进程文件锁；设置后每次修改前都会按磁盘文件校正内存数据
+        self.lock_path = lock_path
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._dirty = set()
+        # 数据类型 -> 已发布、尚未落盘的 mutate 列表（按发布顺序）
+        self._pending = {}
+        self._timer = None
+        # 关闭后（见 close）不再接受修改
+        self.closed = False
+
+    def update(self, name, mutate):
+        """对数据 name 执行 mutate(当前数据) -> (新数据, 是否成功)，返回是否成功
+
+        mutate 必须写时复制：返回新对象而不是修改传入的数据；返回原对象表示没有修改。
+        """
+        return self.update_many([(name, mutate)])[0]
+
+    def update_many(self, updates, dry_run=False):
+        """按顺序执行一组 (数据类型, mutate)，全部成功才发布，返回每条的成功标志
+
+        后一条修改作用在前一条的结果上；任意一条失败时全部丢弃，内存与文件都保持不变。
+        所有受影响的数据在同一个版本中发布，落盘时每个文件只写一次。
+        dry_run 为 True 时只检查每条能否执行，不发布任何修改。写入器已关闭时抛出 RuntimeError。
+        """
+        with self._process_lock():
+            # 修改必须基于最新的文件内容：即使后台监听线程在运行，也在加载锁内核对一次文件签名，
+            # 其它程序（或其它工作进程）刚写过的文件先重新加载，再在其上修改
+            with self.data_manager._writer_reload_lock():
+                self.data_manager._reload()
+                # 同时持有数据管理器的锁，保证修改基于的快照与发布前的快照是同一个
+                with self._lock, self.data_manager._lock:
+                    if self.closed:
+                        raise RuntimeError('项目已卸载，请刷新页面后重试')
+                    current = self.data_manager.get_all_data(reload=False)
+                    working = dict(current)
+                    results = []
+                    for name, mutate in updates:
+                        working[name], ok = mutate(working[name])
+                        results.append(bool(ok))
+                    if dry_run or not all(results):
+                        return results
+                    changed = {name: data for name, data in working.items() if data is not current[name]}
+                    if changed:
+                        self.data_manager.publish(changed)
+                        self._dirty.update(changed)
+                        for name, mutate in updates:
+                            if name in changed:
+                                self._pending.setdefault(name, []).append(mutate)
+                        self._schedule_flush()
+            if changed and self.flush_interval <= 0:
+                self.flush()
+            return results
+
+    def close(self):
+        """关闭写入器：之后的修改一律失败，再把已接受的修改落盘
+
+        ProjectRegistry 淘汰项目时调用。被淘汰的数据管理器可能仍被在途请求持有，
+        它此后接受的修改既没有定时落盘的保证，也会与重新加载同一项目的新管理器互相覆盖。
+        在 _lock 内设置标志：正在进行的修改要么已经发布（由下面的 flush 落盘），要么看到已关闭而失败。
+        """
+        with self._lock:
+            self.closed = True
+        self.flush()
+
+    def replay(self, loaded):
+        """把尚未落盘的修改按顺序重放到重新加载的数据 loaded 上（调用方需持有 self._lock）
+
+        loaded 为 {数据类型: 从文件读取的数据}，就地替换为重放后的数据，返回重放过修改的数据类型。
+        目标在新数据中已不存在的修改（如模块已被删除）原样跳过。
+        """
+        replayed = set()
+        for name, mutations in self._pending.items():
+            if name in loaded:
+                data = loaded[name]
+                for mutate in mutations:
+                    data, _ = mutate(data)
+                if data is not loaded[name]:
+                    loaded[name] = data
+                    replayed.add(name)
+        return replayed
+
+    @contextmanager
+    def _process_lock(self):
+        """多进程模式下用 flock 串行化各工作进程的“读取-修改-写入”"""
+        if not self.lock_path:
+            yield
+            return
+        import fcntl
+        with open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _schedule_flush(self):
+        # flush_interval 为 0 时由 update_many 在释放锁之前同步落盘
+        if self.flush_interval <= 0:
+            return
+        # 非守护线程：进程正常退出或 Ctrl+C 时仍会等待最后一次落盘完成
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_interval, self.flush)
+            self._timer.start()
+
+    def flush(self):
+        """立即把所有待写入的数据落盘
+
+        落盘期间持有数据管理器的加载锁：先重新加载被其它程序改写过的文件（待写入的修改重放到新数据上），
+        替换文件前再核对一次签名，期间又被改写的文件放弃本次写入，重新加载后再写，不覆盖外部写入。
+        """
+        with self._flush_lock, self.data_manager._writer_reload_lock():
+            while True:
+                self.data_manager._reload()
+                with self._lock:
+                    if self._timer is not None:
+                        self._timer.cancel()
+                        self._timer = None
+                    dirty, self._dirty = self._dirty, set()
+                    snapshot = self.data_manager.get_all_data(reload=False)
+                if not dirty:
+                    return
+                started = time.perf_counter()
+                skipped = set()
+                for name in dirty:
+                    path = self.data_manager.files[name]
+                    raw = json_codec.dumps(snapshot[name], self.compact)
+                    directory, filename = os.path.split(os.path.abspath(path))
+                    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f'.{filename}.', suffix='.tmp')
+                    try:
+                        with os.fdopen(fd, 'wb') as f:
+                            f.write(raw)
+                            f.flush()
+                            os.fsync(f.fileno())
+                            written = os.fstat(f.fileno())
+                        if self.data_manager.changed_on_disk(name):
+                            os.remove(tmp_path)
+                            skipped.add(name)
+                            continue
+                        os.replace(tmp_path, path)
+                    except BaseException:
+                        if os.path.exists(tmp_path):
+                            os.remove(tmp_path)
+                        with self._lock:
+                            self._dirty.update(dirty)
+                        raise
+                    # 签名取自刚写入的临时文件本身：替换之后到达的外部写入签名不同，仍会被重新加载
+                    self.data_manager.mark_written(name, raw, (written.st_mtime_ns, written.st_size, written.st_ino))
+                    with self._lock:
+                        self._pending.pop(name, None)
+                server_metrics.observe('cox_dashboard_flush_duration_seconds', time.perf_counter() - started)
+                if not skipped:
+                    return
+                with self._lock:
+                    self._dirty.update(skipped)
+
+
+class DataSnapshot:
+    """某一数据版本的不可变快照
+
+    数据、版本和集合索引在构造后不再修改：重新加载或发布修改时构造新快照，再整体替换
+    ObservabilityData.snapshot 这一个引用。读取方先取得快照引用，之后的所有读取都基于它，
+    无需加锁，也不会看到新旧数据混合的中间状态。
+    响应体、JSON Patch、摘要和搜索索引在首次请求时生成并缓存在快照上，随快照一起被替换，无需手动失效。
+    """
+    __slots__ = ('data', 'etag', 'version', 'history', 'collections', 'rollups', 'searches', 'encoded',
+                 'patches', 'summary_payload', '_lock')
+
+    def __init__(self, data=None, etag=None, version=0, history=(), collections=None, rollups=None,
+                 searches=None):
+        self.data = data or {}
+        self.etag = etag
+        self.version = version
+        # 此前若干版本的 (etag, 数据)，用于生成 JSON Patch
+        self.history = history
+        self.collections = collections or {}
+        # 各数据类型的汇总结果（见 SUMMARIES），沿用自上一版本或在首次请求摘要时计算
+        self.rollups = rollups or {}
+        # 各数据文件的搜索索引，沿用自上一版本或在首次搜索时建立
+        self.searches = searches or {}
+        # 按需生成的缓存：内容编码 -> 响应体字节，(起始版本, 内容编码) -> JSON Patch 字节，以及摘要的 JSON 字节
+        self.encoded = {}
+        self.patches = {}
+        self.summary_payload = None
+        # 只保护上面的缓存：同一快照的并发请求只序列化、压缩一次
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        return self.data.get(name, {})
+
+    def collection(self, name):
+        """返回集合索引，未预先建立时在首次查询时建立"""
+        index = self.collections.get(name)
+        if index is None:
+            with self._lock:
+                index = self.collections.get(name)
+                if index is None:
+                    index = self.collections[name] = CollectionIndex(
+                        name, self.data.get(COLLECTIONS[name]['source']) or {})
+        return index
+
+    def search_index(self, name):
+        """返回数据文件 name 中各类条目的搜索索引 {类型: SearchIndex}，尚未建立时在首次搜索时建立"""
+        with self._lock:
+            if name in self.searches:
+                server_metrics.inc('cox_dashboard_cache_requests_total', 'search', 'hit')
+            else:
+                server_metrics.inc('cox_dashboard_cache_requests_total', 'search', 'miss')
+                self.searches[name] = build_search_indexes(name, self.get(name))
+            return self.searches[name]
+
+    def payload(self, encoding='identity'):
+        """返回本版本数据的预序列化字节，encoding 为 identity、gzip 或 br"""
+        with self._lock:
+            if encoding in self.encoded:
+                server_metrics.inc('cox_dashboard_cache_requests_total', 'payload', 'hit')
+                return self.encoded[encoding]
+            server_metrics.inc('cox_dashboard_cache_requests_total', 'payload', 'miss')
+            if 'identity' not in self.encoded:
+                self.encoded['identity'] = json_codec.dumps(
+                    {name: self.get(name) for name in ('project', 'app', 'test')}, compact=True)
+            self.encoded[encoding] = compress_payload(self.encoded['identity'], encoding)
+            return self.encoded[encoding]
+
+    def patch(self, since, encoding='identity'):
+        """返回从版本 since 到本版本的 JSON Patch 字节，encoding 为 identity、gzip 或 br
+
+        since 已被淘汰或未知时返回 None。与完整数据一样，每个起始版本只生成、压缩一次。
+        """
+        with self._lock:
+            if (since, encoding) in self.patches:
+                server_metrics.inc('cox_dashboard_cache_requests_total', 'patch', 'hit')
+                return self.patches[since, encoding]
+            server_metrics.inc('cox_dashboard_cache_requests_total', 'patch', 'miss')
+            if (since, 'identity') not in self.patches:
+                base = next((data for etag, data in self.history if etag == since), None)
+                if base is None:
+                    return None
+                ops = []
+                for name in ('project', 'app', 'test'):
+                    ops.extend(make_json_patch(base.get(name, {}), self.get(name), f"/{escape_pointer_token(name)}"))
+                self.patches[since, 'identity'] = json_codec.dumps(ops, compact=True)
+            self.patches[since, encoding] = compress_payload(self.patches[since, 'identity'], encoding)
+            return self.patches[since, encoding]
+
+    def summary(self):
+        """返回本版本的摘要（JSON 字节）：只为尚无汇总结果的数据类型遍历数据，再合并各部分"""
+        with self._lock:
+            if self.summary_payload is not None:
+                server_metrics.inc('cox_dashboard_cache_requests_total', 'summary', 'hit')
+                return self.summary_payload
+            server_metrics.inc('cox_dashboard_cache_requests_total', 'summary', 'miss')
+            for name, summarize in SUMMARIES.items():
+                if name not in self.rollups:
+                    self.rollups[name] = summarize(self.get(name))
+            summary = dict(merge_summary(self.rollups), version=self.etag)
+            self.summary_payload = json_codec.dumps(summary, compact=True)
+            return self.summary_payload
+
+    def cached_bytes(self):
+        """已缓存的响应体、补丁和摘要字节数"""
+        with self._lock:
+            return (sum(map(len, self.encoded.values())) + sum(map(len, self.patches.values()))
+                    + len(self.summary_payload or b''))
 
-# 修复 Windows 编码问题
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
 class ObservabilityData:
-    """可观测数据管理 (已优化)"""
+    """可观测数据管理 (已优化)
+
+    当前数据保存在不可变的 DataSnapshot 中，读取方无锁读取；重新加载和发布修改时整体替换快照。
+    同一时刻只有一个线程重新加载文件（single-flight），其余请求线程不等待，继续使用当前快照。
+    """
+    # 是否在加载时建立分页接口的集合索引（不处理请求的进程可以关闭）
+    index_collections = True
+
     def __init__(self, project_file, app_file, test_file):
         self.files = {
             'project': project_file,
             'app': app_file,
             'test': test_file
         }
+        # 各文件最近一次加载时的签名 (mtime_ns, size, inode)，只在持有 _reload_lock 时修改
         self.last_modified = {}
-        self._cache = {}
+        # 当前快照：替换这一个引用即发布新版本
+        self.snapshot = DataSnapshot()
+        self._version_changed = threading.Condition()
+        # 内容哈希：仅在重新加载时计算，组合后作为 /api/data 的 ETag
+        self._digests = {}
+        # _reload_lock 保证只有一个线程读取、解析文件；_lock 串行化快照的替换（加载结果与写入器的修改）
+        self._reload_lock = threading.Lock()
+        # 正在等待 _reload_lock 的写入器数量（见 _writer_reload_lock），只在持有 _writers_lock 时修改
+        self._writers_waiting = 0
+        self._writers_lock = threading.Lock()
+        self._lock = threading.RLock()
+        self._watcher = None
+        # 假设索引：仅在 project_data.json 重新加载后的首次查找时重建
+        self._assumption_index = None
+        # 各数据文件最近一次读取或写入的字节数，用于估算内存占用
+        self._sizes = {}
+        self.writer = DataWriter(self)
+
+    @property
+    def etag(self):
+        """当前数据版本的内容哈希"""
+        return self.snapshot.etag
+
+    @property
+    def version(self):
+        """数据版本号：每次替换快照后递增，供 SSE 推送判断是否需要发送事件"""
+        return self.snapshot.version
+
+    def start_watching(self, debounce=None, poll_interval=None):
+        """启动后台监听线程；启动后请求线程只读取当前快照，不再检查文件"""
+        if self._watcher is None:
+            # 先注册监听再加载：加载期间发生的写入会留下 inotify 事件，不会被漏掉
+            self._watcher = DataFileWatcher(self, debounce=debounce, poll_interval=poll_interval)
+            self.load_if_changed()
+            self._watcher.start()
+        return self._watcher
+
+    def stop_watching(self):
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher.join()
+            self._watcher = None
+
+    def ensure_fresh(self, wait=False):
+        """未启用后台监听时，在请求内检查文件变化
+
+        已有线程在重新加载、或有写入器在等待加载锁时直接返回，调用方继续使用当前快照；
+        wait 为 True 或尚未加载过数据时等待正在进行的加载完成，再检查一次。
+        """
+        if self._watcher is None:
+            self.load_if_changed(wait=wait or not self.snapshot.version)
+
+    def load_if_changed(self, force=(), wait=True):
+        """重新加载签名发生变化的文件；force 中的数据类型无论签名是否变化都重新读取
+
+        wait 为 False 且其它线程正在加载、或有写入器在等待加载锁时不做任何事，返回 False。
+        """
+        if not wait and self._writers_waiting:
+            return False
+        if not self._reload_lock.acquire(blocking=wait):
+            return False
+        try:
+            return self._reload(force)
+        finally:
+            self._reload_lock.release()
 
-    def load_if_changed(self):
-        changed = False
+    @contextmanager
+    def _writer_reload_lock(self):
+        """写入器获取 _reload_lock：等待期间请求线程不再以非阻塞方式抢占加载锁
+
+        threading.Lock 不保证公平。外部程序持续改写文件时，请求线程会不断抢到锁并重新加载，
+        阻塞等待的写入器可能一直拿不到锁。写入器登记为等待中后，请求线程直接使用当前快照，
+        文件变化由写入器在修改前的重新加载中一并处理。
+        """
+        with self._writers_lock:
+            self._writers_waiting += 1
+        try:
+            self._reload_lock.acquire()
+        finally:
+            with self._writers_lock:
+                self._writers_waiting -= 1
+        try:
+            yield
+        finally:
+            self._reload_lock.release()
+
+    def _reload(self, force=()):
+        """load_if_changed 的实现，调用方需持有 _reload_lock（写入器在修改和落盘前调用）"""
+        started = time.perf_counter()
+        changed = self._load_if_changed(force)
+        if changed:
+            server_metrics.observe('cox_dashboard_reload_duration_seconds', time.perf_counter() - started)
+        return changed
+
+    def _load_if_changed(self, force):
+        # 读取和解析不持有 _lock，写入器可以照常发布修改；只有替换快照时才短暂持有
+        updates = {}
         for name, path in self.files.items():
             try:
-                mtime = os.path.getmtime(path)
-                if name not in self.last_modified or mtime > self.last_modified[name]:
-                    self.last_modified[name] = mtime
-                    with open(path, 'r', encoding='utf-8') as f:
-                        self._cache[name] = json.load(f)
-                    changed = True
+                signature = file_signature(path)
+                if name in force or self.last_modified.get(name) != signature:
+                    self.last_modified[name] = signature
+                    with open(path, 'rb') as f:
+                        raw = f.read()
+                    digest = hashlib.sha1(raw).hexdigest()
+                    self._sizes[name] = len(raw)
+                    # 仅 touch 或内容未变的改写不会触发解析和版本变化
+                    if digest != self._digests.get(name):
+                        updates[name] = json_codec.loads(raw)
+                        self._digests[name] = digest
             except Exception as e:
+                server_metrics.inc('cox_dashboard_reload_errors_total')
                 print(f"Error loading {path}: {e}")
-        return changed
+        if updates:
+            self._install_loaded(updates, self._digest_etag())
+        return bool(updates)
+
+    def _install_loaded(self, updates, etag):
+        """发布重新加载的数据 updates（{数据类型: 新数据}），调用方需持有 _reload_lock
+
+        以替换时的快照为基础，其它数据类型上已发布的修改不会丢失；被重新加载的数据类型上
+        尚未落盘的修改由写入器重放到新数据上，之后落盘时写出的是外部修改与这些修改合并后的结果。
+        """
+        with self.writer._lock, self._lock:
+            if 'project' in updates:
+                self._assumption_index = None
+            if self.writer.replay(updates):
+                # 数据已不等于文件内容，不能再使用内容哈希作为版本
+                seed = f"{etag}|replay|{self.snapshot.version + 1}"
+                etag = hashlib.sha1(seed.encode('utf-8')).hexdigest()[:16]
+            self._install(dict(self.snapshot.data, **updates), etag)
+
+    def changed_on_disk(self, name):
+        """文件 name 是否在最近一次加载或写入之后被其它程序改写（调用方需持有 _reload_lock）"""
+        try:
+            return file_signature(self.files[name]) != self.last_modified.get(name)
+        except OSError:
+            return False
 
-    def get_all_data(self):
-        self.load_if_changed()
+    def _digest_etag(self):
+        """由各文件内容哈希组合出的数据版本"""
+        combined = '|'.join(self._digests.get(name, '') for name in self.files)
+        return hashlib.sha1(combined.encode('ascii')).hexdigest()[:16]
+
+    def _install(self, data, etag):
+        """以 data 构造新快照并替换当前快照（调用方需持有 self._lock）"""
+        previous = self.snapshot
+        collections = self._build_collections(data, previous) if self.index_collections else {}
+        history = previous.history + ((previous.etag, previous.data),) if previous.version else ()
+        # 数据来源未变化（同一对象）的汇总结果和搜索索引沿用到新快照，其余在首次使用时重新计算
+        rollups = {name: previous.rollups[name] for name in SUMMARIES
+                   if name in previous.rollups and data.get(name) is previous.data.get(name)}
+        searches = {name: index for name, index in previous.searches.items()
+                    if data.get(name) is previous.data.get(name)}
+        self.snapshot = DataSnapshot(data, etag, previous.version + 1,
+                                     history[-SNAPSHOT_HISTORY:], collections, rollups, searches)
+        with self._version_changed:
+            self._version_changed.notify_all()
+
+    def _build_collections(self, data, previous):
+        """为新快照建立集合索引；数据来源未变化（同一对象）的集合沿用旧索引"""
+        collections = {}
+        for name, spec in COLLECTIONS.items():
+            source = spec['source']
+            if name in previous.collections and data.get(source) is previous.data.get(source):
+                collections[name] = previous.collections[name]
+                server_metrics.inc('cox_dashboard_cache_requests_total', 'collection', 'hit')
+            else:
+                collections[name] = CollectionIndex(name, data.get(source) or {})
+                server_metrics.inc('cox_dashboard_cache_requests_total', 'collection', 'miss')
+        return collections
+
+    def query_collection(self, name, filters=None, sort=None, descending=False,
+                         offset=0, limit=PAGE_DEFAULT_LIMIT, snapshot=None):
+        """分页查询集合，返回 (数据版本, 匹配总数, 当前页条目)
+
+        iteration 过滤值 current 表示 project_data.json 中的 current_iteration。
+        snapshot 为调用方已取得的快照（例如已用它的版本判断过 304），默认使用当前快照。
+        """
+        snapshot = snapshot or self.snapshot
+        if filters and 'iteration' in filters:
+            current = snapshot.get('project').get('current_iteration')
+            filters = dict(filters, iteration=[current if value == 'current' else value
+                                               for value in filters['iteration']])
+        total, items = snapshot.collection(name).query(filters, sort, descending, offset, limit)
+        return snapshot.etag, total, items
+
+    def search(self, query, types=None, offset=0, limit=SEARCH_DEFAULT_LIMIT, snapshot=None):
+        """全文搜索任务、假设、模块和异常，返回 (数据版本, 命中总数, 当前页命中)
+
+        types 为条目类型列表（见 SEARCH_TYPES），为空时搜索全部类型；snapshot 同 query_collection。
+        """
+        snapshot = snapshot or self.snapshot
+        indexes = [snapshot.search_index(spec['source'])[kind] for kind, spec in SEARCH_TYPES.items()
+                   if not types or kind in types]
+        total, hits = search_indexes(indexes, query, offset, limit)
+        return snapshot.etag, total, hits
+
+    def publish(self, updates):
+        """发布内存中修改后的数据（尚未落盘），updates 为 {数据类型: 新数据}"""
+        with self._lock:
+            previous = self.snapshot
+            seed = f"{previous.etag}|{','.join(sorted(updates))}|{previous.version + 1}"
+            self._install(dict(previous.data, **updates), hashlib.sha1(seed.encode('utf-8')).hexdigest()[:16])
+
+    def find_assumption(self, project_data, assumption_id):
+        """通过假设索引 O(1) 定位假设
+
+        写入器只修改假设状态、不改变假设位置和内容，因此索引在发布修改后仍然有效，
+        只需在重新加载 project_data.json 后重建。索引按传入的 project_data 建立：
+        重放未落盘的修改时，传入的是尚未发布的新加载数据。
+        """
+        with self._lock:
+            if self._assumption_index is None:
+                self._assumption_index = build_assumption_index(project_data)
+            return lookup_assumption(self._assumption_index, assumption_id)
+
+    def mark_written(self, name, raw, signature):
+        """记录写入器刚落盘的文件签名和内容哈希，避免监听到自己的写入后重复解析
+
+        调用方需持有 _reload_lock。signature 为写入的文件本身的签名，而不是替换后再读取路径得到的签名，
+        这样替换之后到达的外部写入不会被误认为是自己的写入。
+        """
+        self.last_modified[name] = signature
+        self._digests[name] = hashlib.sha1(raw).hexdigest()
+        self._sizes[name] = len(raw)
+
+    def memory_estimate(self):
+        """估算当前占用的内存字节数：解析后的数据（按文件大小估算）加上已缓存的响应体"""
+        return PROJECT_MEMORY_FACTOR * sum(self._sizes.values()) + self.snapshot.cached_bytes()
+
+    def get_encoded_payload(self, encoding='identity'):
+        """返回当前版本数据的预序列化字节，encoding 为 identity、gzip 或 br
+
+        同一数据版本只序列化、压缩一次，之后的请求直接复用缓存的字节。
+        """
+        return self.snapshot.payload(encoding)
+
+    def get_patch_payload(self, since, encoding='identity'):
+        """返回从版本 since 到当前版本的 JSON Patch 字节；since 已被淘汰或未知时返回 None"""
+        return self.snapshot.patch(since, encoding)
+
+    def get_update(self, since=None, encoding='identity'):
+        """返回 (当前版本, 类型, 数据体)，类型为 'patch' 或 'full'
+
+        since 等于当前版本时数据体为 None；since 仍在快照环中时返回增量补丁，
+        否则退回为完整数据。补丁和完整数据都按 encoding 压缩。
+        """
+        snapshot = self.snapshot
+        if since and since == snapshot.etag:
+            return snapshot.etag, 'patch', None
+        if since:
+            patch = snapshot.patch(since, encoding)
+            if patch is not None:
+                return snapshot.etag, 'patch', patch
+        return snapshot.etag, 'full', snapshot.payload(encoding)
+
+    def wait_for_change(self, known_version, timeout):
+        """等待数据版本超过 known_version，最多等待 timeout 秒，返回当前版本号
+
+        多个 SSE 连接共享同一个版本号：任意一个连接检测到文件变化后，
+        其余等待中的连接会被立即唤醒，无需各自再次读取文件。
+        """
+        self.ensure_fresh()
+        with self._version_changed:
+            self._version_changed.wait_for(lambda: self.version != known_version, timeout=timeout)
+            return self.version
+
+    def get_all_data(self, reload=True):
+        """返回三类数据；last_updated 不再放入数据体，以便相同内容的响应可被缓存"""
+        if reload:
+            self.ensure_fresh()
+        snapshot = self.snapshot
         return {
-            'project': self._cache.get('project', {}),
-            'app': self._cache.get('app', {}),
-            'test': self._cache.get('test', {}),
-            'last_updated': datetime.now().strftime('%H:%M:%S')
+            'project': snapshot.get('project'),
+            'app': snapshot.get('app'),
+            'test': snapshot.get('test')
+        }
+
+
+class SnapshotPublisher(ObservabilityData):
+    """多进程模式下主进程使用的数据管理
+
+    主进程负责监听并解析数据文件，每次加载后把快照序列化（pickle）写入共享快照文件，
+    各工作进程只需反序列化快照，而不必各自重新解析 JSON。
+    """
+    # 主进程不处理请求，集合索引由各工作进程自行建立
+    index_collections = False
+
+    def __init__(self, project_file, app_file, test_file, snapshot_path):
+        super().__init__(project_file, app_file, test_file)
+        self.snapshot_path = snapshot_path
+
+    def _install(self, data, etag):
+        super()._install(data, etag)
+        state = {
+            'etag': etag,
+            'data': data,
+            'digests': dict(self._digests),
+            'signatures': dict(self.last_modified)
         }
+        tmp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.snapshot_path)
+
+
+class SnapshotReader(ObservabilityData):
+    """多进程模式下工作进程使用的数据管理
+
+    读取请求只检查共享快照文件的签名（一次 stat），变化时加载主进程写出的快照；
+    更新请求在跨进程文件锁内按磁盘内容校正后直接落盘，避免不同进程互相覆盖。
+    """
+
+    def __init__(self, project_file, app_file, test_file, snapshot_path, lock_path, compact=False):
+        super().__init__(project_file, app_file, test_file)
+        self.snapshot_path = snapshot_path
+        self._snapshot_signature = None
+        self.writer = DataWriter(self, flush_interval=0, lock_path=lock_path, compact=compact)
+
+    def ensure_fresh(self, wait=False):
+        try:
+            signature = file_signature(self.snapshot_path)
+        except OSError:
+            return
+        if signature == self._snapshot_signature:
+            return
+        wait = wait or not self.snapshot.version
+        if not wait and self._writers_waiting:
+            return
+        if not self._reload_lock.acquire(blocking=wait):
+            return
+        try:
+            if signature == self._snapshot_signature:
+                return
+            started = time.perf_counter()
+            with open(self.snapshot_path, 'rb') as f:
+                state = pickle.load(f)
+            self._snapshot_signature = signature
+            updates = {}
+            for name in self.files:
+                theirs = state['signatures'].get(name)
+                ours = self.last_modified.get(name)
+                # 本进程刚写入、主进程尚未重新加载的文件保留本进程的数据
+                if theirs is None or (ours is not None and ours[0] > theirs[0]):
+                    continue
+                self.last_modified[name] = theirs
+                if state['digests'].get(name) != self._digests.get(name):
+                    updates[name] = state['data'][name]
+                    self._digests[name] = state['digests'][name]
+            if updates:
+                etag = self._digest_etag()
+                self._install_loaded(updates, state['etag'] if etag == state['etag'] else etag)
+                server_metrics.observe('cox_dashboard_reload_duration_seconds', time.perf_counter() - started)
+        finally:
+            self._reload_lock.release()
+
+
+class ProjectRegistry:
+    """多项目模式：一个进程托管多个项目
+
+    项目来自项目目录（每个子目录包含 PROJECT_DATA_FILES 中的三个文件，目录名即项目名）
+    或清单文件（{"项目名": {"project": ..., "app": ..., "test": ...}}，相对路径以清单所在目录为基准）。
+    各项目的 ObservabilityData 在首次访问时加载并启动监听；已加载项目按最近使用顺序保存，
+    估算内存之和超过 memory_limit 时淘汰最久未访问的项目：在注册表锁内移出，释放锁后再停止监听、
+    关闭写入器并落盘（落盘不阻塞其它项目的查找）。之后该项目的请求会加载新的数据管理器，
+    旧写入器落盘的修改由新管理器的文件监听重新加载；仍持有旧管理器的在途修改请求返回失败。
+    """
+
+    def __init__(self, projects_dir=None, manifest=None, memory_limit=PROJECT_CACHE_MEMORY * 1024 * 1024,
+                 flush_interval=None, compact=False):
+        self.projects_dir = Path(projects_dir) if projects_dir else None
+        self.manifest = Path(manifest) if manifest else None
+        self.memory_limit = memory_limit
+        self.flush_interval = flush_interval
+        self.compact = compact
+        self._manifest_cache = (None, {})
+        self._loaded = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _manifest_projects(self):
+        """读取清单文件（按签名缓存，修改清单后无需重启）"""
+        signature = file_signature(self.manifest)
+        if self._manifest_cache[0] != signature:
+            entries = json_codec.load_file(self.manifest)
+            base = self.manifest.parent
+            projects = {name: {key: str(base / files[key]) for key in PROJECT_DATA_FILES}
+                        for name, files in entries.items()}
+            self._manifest_cache = (signature, projects)
+        return self._manifest_cache[1]
+
+    def resolve(self, name):
+        """返回项目 name 的数据文件 {数据类型: 路径}；项目不存在时返回 None"""
+        if self.manifest and name in self._manifest_projects():
+            return self._manifest_projects()[name]
+        if self.projects_dir and not name.startswith('.'):
+            directory = self.projects_dir / name
+            files = {key: str(directory / filename) for key, filename in PROJECT_DATA_FILES.items()}
+            if directory.parent == self.projects_dir and all(os.path.isfile(path) for path in files.values()):
+                return files
+        return None
+
+    def names(self):
+        """所有可用的项目名"""
+        names = set(self._manifest_projects()) if self.manifest else set()
+        if self.projects_dir and self.projects_dir.is_dir():
+            names.update(entry.name for entry in self.projects_dir.iterdir()
+                         if entry.is_dir() and self.resolve(entry.name))
+        return sorted(names)
+
+    def get(self, name):
+        """返回项目 name 的数据管理器（按需加载）；项目不存在时返回 None"""
+        with self._lock:
+            manager = self._loaded.get(name)
+            if manager is not None:
+                self._loaded.move_to_end(name)
+                server_metrics.inc('cox_dashboard_cache_requests_total', 'project', 'hit')
+                return manager
+        files = self.resolve(name)
+        if files is None:
+            return None
+        server_metrics.inc('cox_dashboard_cache_requests_total', 'project', 'miss')
+        # 在注册表锁之外解析数据文件，加载大项目时不阻塞其它项目的请求
+        manager = ObservabilityData(files['project'], files['app'], files['test'])
+        if self.flush_interval is not None:
+            manager.writer.flush_interval = self.flush_interval
+        manager.writer.compact = self.compact
+        manager.load_if_changed()
+        with self._lock:
+            if name in self._loaded:
+                self._loaded.move_to_end(name)
+                return self._loaded[name]
+            manager.start_watching()
+            self._loaded[name] = manager
+            evicted = self._evict()
+        for evicted_name, evicted_manager, size in evicted:
+            self._retire(evicted_manager)
+            print(f"[INFO] 已卸载项目: {evicted_name}（估算内存 {size // 1024} KB）")
+        return manager
+
+    def _evict(self):
+        """移出最久未访问的项目直到估算内存不超过上限（至少保留最近访问的一个），调用方需持有 _lock
+
+        返回被移出的 [(项目名, 数据管理器, 估算内存)]，由调用方在释放 _lock 后调用 _retire。
+        """
+        sizes = {name: manager.memory_estimate() for name, manager in self._loaded.items()}
+        total = sum(sizes.values())
+        evicted = []
+        while total > self.memory_limit and len(self._loaded) > 1:
+            name, manager = self._loaded.popitem(last=False)
+            total -= sizes[name]
+            evicted.append((name, manager, sizes[name]))
+        return evicted
+
+    @staticmethod
+    def _retire(manager):
+        """停止已移出项目的监听，关闭写入器并落盘（不持有 _lock，落盘期间其它项目照常查找）"""
+        manager.stop_watching()
+        manager.writer.close()
+
+    def loaded(self):
+        """已加载的项目名（按最近访问从旧到新）"""
+        with self._lock:
+            return list(self._loaded)
+
+    def close(self):
+        """停止所有项目的监听，关闭写入器并落盘"""
+        with self._lock:
+            managers = list(self._loaded.values())
+            self._loaded.clear()
+        for manager in managers:
+            self._retire(manager)
+
+
+def data_response(data_manager, encoding='identity', since=None, if_none_match=None):
+    """生成 /api/data 的响应，返回 (状态码, 响应头, 响应体)，Web 模式和 live 模式共用
+
+    客户端携带的 If-None-Match 与当前内容哈希一致时返回 304（if_none_match(etag) 判断是否一致）；
+    带 since 时返回从该版本到当前版本的 JSON Patch（application/json-patch+json），
+    该版本已不在快照环中时退回为完整数据。补丁与完整数据一样按 encoding 预压缩。
+    响应头 X-Data-Version 给出当前版本。
+    """
+    headers = {
+        'Cache-Control': 'no-cache',
+        'Vary': 'Accept-Encoding',
+        'X-Last-Updated': datetime.now().strftime('%H:%M:%S')
+    }
+    if since:
+        version, kind, payload = data_manager.get_update(since, encoding)
+        headers['X-Data-Version'] = version
+        if payload is None:
+            return 304, headers, b''
+        if kind == 'patch':
+            headers['Content-Type'] = 'application/json-patch+json'
+            if encoding != 'identity':
+                headers['Content-Encoding'] = encoding
+            return 200, headers, payload
+    # ETag 与响应体取自同一个快照；不同内容编码是不同的表示，ETag 需要区分
+    snapshot = data_manager.snapshot
+    etag = snapshot.etag
+    if etag:
+        headers['X-Data-Version'] = etag
+        if encoding != 'identity':
+            etag = f"{etag}-{encoding}"
+        headers['ETag'] = f'"{etag}"'
+        if if_none_match is not None and if_none_match(etag):
+            return 304, headers, b''
+    headers['Content-Type'] = 'application/json'
+    if encoding != 'identity':
+        headers['Content-Encoding'] = encoding
+    return 200, headers, snapshot.payload(encoding)
+
+
+def sse_events(data_manager, sent_etag=None):
+    """SSE 推送通道的事件流（字节），Web 模式和 live 模式共用：仅在数据变化时生成一次事件
+
+    事件 id 为数据版本。客户端已有上一版本（包括断线重连时浏览器自动携带的
+    Last-Event-ID，即 sent_etag）时发送 patch 事件，数据为 {"since": 起始版本, "patch": [...]}；
+    否则发送包含完整数据的默认事件。长时间没有变化时发送注释行，用于探测断开的连接。
+    """
+    sent_version = None
+    last_sent = time.monotonic()
+    while True:
+        version = data_manager.wait_for_change(sent_version, SSE_POLL_INTERVAL)
+        if version != sent_version:
+            sent_version = version
+            etag, kind, payload = data_manager.get_update(sent_etag)
+            if payload is None:
+                continue
+            if kind == 'patch':
+                body = f'{{"since":"{sent_etag}","patch":'.encode('utf-8') + payload + b'}'
+                yield f"event: patch\nid: {etag}\ndata: ".encode('utf-8') + body + b"\n\n"
+            else:
+                yield f"id: {etag}\ndata: ".encode('utf-8') + payload + b"\n\n"
+            sent_etag = etag
+            last_sent = time.monotonic()
+        elif time.monotonic() - last_sent >= SSE_KEEPALIVE_INTERVAL:
+            # 注释行不会触发客户端事件，仅用于探测断开的连接
+            yield b": keep-alive\n\n"
+            last_sent = time.monotonic()
 
 
 # 全局变量
 data_manager = None
-app = None
+# 多项目模式下的项目注册表（/p/<项目名>/... 路由）
+project_registry = None
+# Flask 应用：首次调用 get_app()（或访问模块属性 app）时才导入 Flask 并注册路由
+web_app = None
+# 首页缓存：模板没有按请求变化的变量，渲染一次后复用（--dev 模式下不缓存）
+dashboard_page = None
+# 服务器自身的运行指标（/metrics）
+server_metrics = ServerMetrics(SERVER_METRICS)
+# 请求剖析器（仅 --profile 模式下创建，/debug/profile）
+request_profiler = None
+
+def get_app():
+    """返回 Flask 应用，首次调用时创建"""
+    global web_app
+    if web_app is None:
+        web_app = create_app()
+    return web_app
+
+
+def __getattr__(name):
+    """兼容 from run_web_observability import app：访问时才创建 Flask 应用"""
+    if name == 'app':
+        return get_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def build_dashboard_page():
+    """渲染首页并生成各内容编码版本，返回 {'etag': ..., 'identity': bytes, 'gzip': bytes, ...}
+
+    模板中没有按请求变化的变量，直接使用模板文本，Web 模式和 live 模式共用。
+    """
+    raw = get_dashboard_html('web').encode('utf-8')
+    page = {'etag': hashlib.sha1(raw).hexdigest()[:16]}
+    for encoding in ('identity', 'gzip', 'br'):
+        if encoding != 'br' or BROTLI_AVAILABLE:
+            page[encoding] = compress_payload(raw, encoding)
+    return page
 
-# Flask 应用和路由（仅 Web 模式使用）
-if FLASK_AVAILABLE:
+
+def get_dashboard_page(dev=False):
+    """返回缓存的首页；开发模式（dev）下每次重新渲染，便于调试模板"""
+    global dashboard_page
+    if dev:
+        return build_dashboard_page()
+    if dashboard_page is None:
+        server_metrics.inc('cox_dashboard_cache_requests_total', 'page', 'miss')
+        dashboard_page = build_dashboard_page()
+    else:
+        server_metrics.inc('cox_dashboard_cache_requests_total', 'page', 'hit')
+    return dashboard_page
+
+
+def create_app():
+    """创建 Flask 应用并注册路由（仅 Web 模式使用）"""
+    from flask import Flask, Response, jsonify, request, g
     app = Flask(__name__)
 
+    @app.url_value_preprocessor
+    def pull_project(endpoint, values):
+        """/p/<项目名>/... 路由：取出项目名，视图本身不需要 project 参数"""
+        g.project = values.pop('project', None) if values else None
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+        if request_profiler is not None:
+            g.request_profile = request_profiler.start()
+
+    @app.after_request
+    def record_request_metrics(response):
+        """按路由规则（而不是实际路径）统计请求数、耗时和响应大小，避免标签数量无限增长"""
+        started = g.get('request_started')
+        if started is not None:
+            route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+            server_metrics.inc('cox_dashboard_requests_total', route, request.method, response.status_code)
+            server_metrics.observe('cox_dashboard_request_duration_seconds', time.perf_counter() - started, route)
+            if not response.is_streamed and response.content_length is not None:
+                server_metrics.observe('cox_dashboard_response_size_bytes', response.content_length, route)
+            if request_profiler is not None:
+                request_profiler.record(request.method, request.full_path.rstrip('?'), route, response.status_code,
+                                        time.perf_counter() - started, g.pop('request_profile', None))
+        return response
+
+    @app.teardown_request
+    def release_request_profile(exc):
+        if request_profiler is not None:
+            request_profiler.discard(g.pop('request_profile', None))
+
+    @app.before_request
+    def select_data_manager():
+        """确定本次请求使用的数据管理器（g.data_manager）：/p/<项目名>/ 下为该项目，否则为默认项目"""
+        project = getattr(g, 'project', None)
+        if project is None:
+            g.data_manager = data_manager
+            if data_manager is None and request.path.startswith('/api/') and request.endpoint != 'list_projects':
+                return jsonify({'success': False, 'error': '未指定项目，请使用 /p/<项目名>/api/...'}), 404
+            return None
+        g.data_manager = project_registry.get(project) if project_registry else None
+        if g.data_manager is None:
+            return jsonify({'success': False, 'error': f'项目不存在: {project}'}), 404
+        return None
+
+    def negotiate_encoding(accept_encodings):
+        """根据 Accept-Encoding 选择预压缩版本，优先 br，其次 gzip"""
+        for encoding in ('br', 'gzip'):
+            if encoding == 'br' and not BROTLI_AVAILABLE:
+                continue
+            if accept_encodings[encoding]:
+                return encoding
+        return 'identity'
+
+    def render_project_index():
+        """多项目模式且未指定默认项目时的首页：列出所有项目"""
+        head_assets, _ = render_asset_tags('web')
+        links = ''.join(
+            f'<li><a class="text-blue-400" href="/p/{quote(name)}/">{html.escape(name)}</a></li>'
+            for name in project_registry.names())
+        return (f'<!DOCTYPE html><html lang="zh" class="dark"><head><meta charset="UTF-8">'
+                f'<title>Cox coding</title>{head_assets}</head>'
+                f'<body class="p-6 lg:p-10 bg-zinc-950 text-zinc-200"><h1 class="text-2xl font-bold mb-4">Projects</h1>'
+                f'<ul class="space-y-2">{links}</ul></body></html>')
+
     @app.route('/')
+    @app.route('/p/<project>/')
     def index():
-        return render_template_string(get_dashboard_html('web'))
+        if g.data_manager is None:
+            return render_project_index()
+        page = get_dashboard_page(app.config.get('DASHBOARD_DEV'))
+        encoding = negotiate_encoding(request.accept_encodings)
+        etag = page['etag'] if encoding == 'identity' else f"{page['etag']}-{encoding}"
+        headers = {'Cache-Control': 'no-cache', 'Vary': 'Accept-Encoding'}
+        if request.if_none_match.contains(etag):
+            response = Response(status=304, headers=headers)
+        else:
+            response = Response(page[encoding], mimetype='text/html', headers=headers)
+            if encoding != 'identity':
+                response.headers['Content-Encoding'] = encoding
+        response.set_etag(etag)
+        return response
+
+    @app.route('/api/projects')
+    def list_projects():
+        """多项目模式下的项目列表，loaded 表示是否已加载到内存"""
+        if project_registry is None:
+            return jsonify({'projects': []})
+        loaded = set(project_registry.loaded())
+        return jsonify({'projects': [{'name': name, 'loaded': name in loaded}
+                                     for name in project_registry.names()]})
 
     @app.route('/api/data')
+    @app.route('/p/<project>/api/data')
     def get_data():
-        return jsonify(data_manager.get_all_data())
+        """返回全部数据，ETag、304 和 ?since=<版本> 增量补丁的处理见 data_response"""
+        g.data_manager.ensure_fresh()
+        status, headers, body = data_response(g.data_manager, negotiate_encoding(request.accept_encodings),
+                                              request.args.get('since'), request.if_none_match.contains)
+        return Response(body or None, status=status, headers=headers)
+
+    @app.route('/api/summary')
+    @app.route('/p/<project>/api/summary')
+    def get_summary():
+        """返回面板顶部指标卡片和团队概览所需的汇总数据（每个数据版本只计算一次）
+
+        包括各迭代按状态统计的任务数、模块状态分布、测试通过率和覆盖率、未关闭异常按严重程度的分布，
+        以及每个负责人的任务数、模块数和完成率。ETag 与 /api/data 相同。
+        """
+        g.data_manager.ensure_fresh()
+        snapshot = g.data_manager.snapshot
+        headers = {'Cache-Control': 'no-cache'}
+        if snapshot.etag:
+            headers['X-Data-Version'] = snapshot.etag
+        if snapshot.etag and request.if_none_match.contains(snapshot.etag):
+            response = Response(status=304, headers=headers)
+        else:
+            response = Response(snapshot.summary(), mimetype='application/json', headers=headers)
+        if snapshot.etag:
+            response.set_etag(snapshot.etag)
+        return response
+
+    @app.route('/api/stream')
+    @app.route('/p/<project>/api/stream')
+    def stream_data():
+        """SSE 推送通道：仅在数据文件变化时发送一次事件，事件格式见 sse_events"""
+        return Response(sse_events(g.data_manager, request.headers.get('Last-Event-ID')),
+                        mimetype='text/event-stream', headers={
+                            'Cache-Control': 'no-cache',
+                            'X-Accel-Buffering': 'no'
+                        })
+
+    def parse_collection_query(name, args):
+        """解析分页接口的查询参数，参数不合法时抛出 ValueError"""
+        spec = COLLECTIONS[name]
+        try:
+            offset = int(args.get('offset', 0))
+            limit = int(args.get('limit', PAGE_DEFAULT_LIMIT))
+        except ValueError:
+            raise ValueError('offset 和 limit 必须是整数') from None
+        if offset < 0 or limit < 1:
+            raise ValueError('offset 不能为负数，limit 必须大于 0')
+        sort = args.get('sort') or None
+        descending = bool(sort) and sort.startswith('-')
+        if descending:
+            sort = sort[1:]
+        if sort and sort not in spec['sorts']:
+            raise ValueError(f"不支持的排序字段: {sort}（可选: {', '.join(spec['sorts'])}）")
+        filters = {}
+        for param in spec['filters']:
+            values = [value for value in args.get(param, '').split(',') if value]
+            if values:
+                filters[param] = values
+        return filters, sort, descending, offset, min(limit, PAGE_MAX_LIMIT)
+
+    @app.route('/api/<any(iterations, tasks, modules, anomalies):collection>')
+    @app.route('/p/<project>/api/<any(iterations, tasks, modules, anomalies):collection>')
+    def get_collection(collection):
+        """分页查询迭代、任务、模块或异常
+
+        查询参数：offset/limit 分页；sort=字段（前缀 - 表示降序）；
+        过滤参数见 COLLECTIONS，多个取值用逗号分隔，如 /api/tasks?iteration=current&status=todo,in_progress。
+        """
+        try:
+            filters, sort, descending, offset, limit = parse_collection_query(collection, request.args)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        g.data_manager.ensure_fresh()
+        # 304 判断与查询使用同一个快照，避免两步之间发布的新版本被当作客户端已有的版本
+        snapshot = g.data_manager.snapshot
+        if request.if_none_match.contains(snapshot.etag):
+            response = Response(status=304, headers={'Cache-Control': 'no-cache'})
+            response.set_etag(snapshot.etag)
+            return response
+        etag, total, items = g.data_manager.query_collection(collection, filters, sort, descending, offset, limit,
+                                                             snapshot=snapshot)
+        response = jsonify({'items': items, 'total': total, 'offset': offset, 'limit': limit})
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Data-Version'] = etag
+        response.set_etag(etag)
+        return response
+
+    @app.route('/api/search')
+    @app.route('/p/<project>/api/search')
+    def search_items():
+        """全文搜索任务、假设、模块和异常的名称、描述、备注和问题描述
+
+        查询参数：q 搜索词（多个词需同时出现）；type 限定条目类型，多个取值用逗号分隔，
+        如 /api/search?q=支付&type=tasks,modules；offset/limit 分页。命中按相关度排序，
+        path 为条目在数据中的 JSON Pointer 路径，如 /project/iterations/0/tasks/3。
+        """
+        query = request.args.get('q', '').strip()
+        types = [value for value in request.args.get('type', '').split(',') if value]
+        try:
+            offset = int(request.args.get('offset', 0))
+            limit = int(request.args.get('limit', SEARCH_DEFAULT_LIMIT))
+        except ValueError:
+            return jsonify({'success': False, 'error': 'offset 和 limit 必须是整数'}), 400
+        if not query:
+            return jsonify({'success': False, 'error': '缺少搜索词 q'}), 400
+        if offset < 0 or limit < 1:
+            return jsonify({'success': False, 'error': 'offset 不能为负数，limit 必须大于 0'}), 400
+        unknown = [value for value in types if value not in SEARCH_TYPES]
+        if unknown:
+            return jsonify({'success': False, 'error': f"不支持的条目类型: {', '.join(unknown)}"
+                                                       f"（可选: {', '.join(SEARCH_TYPES)}）"}), 400
+        g.data_manager.ensure_fresh()
+        snapshot = g.data_manager.snapshot
+        if request.if_none_match.contains(snapshot.etag):
+            response = Response(status=304, headers={'Cache-Control': 'no-cache'})
+            response.set_etag(snapshot.etag)
+            return response
+        limit = min(limit, PAGE_MAX_LIMIT)
+        etag, total, hits = g.data_manager.search(query, types, offset, limit, snapshot=snapshot)
+        response = jsonify({'query': query, 'hits': hits, 'total': total, 'offset': offset, 'limit': limit})
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Data-Version'] = etag
+        response.set_etag(etag)
+        return response
+
+    @app.route('/metrics')
+    def metrics():
+        """服务器自身的 Prometheus 指标：请求、缓存、重新加载和落盘，与项目数据无关"""
+        return Response(server_metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+    @app.route('/debug/profile')
+    def debug_profile():
+        """--profile 模式下最近请求的剖析汇总；?limit= 返回条数，?sort=cumulative|tottime 函数排序方式"""
+        if request_profiler is None:
+            return jsonify({'success': False, 'error': '未启用剖析模式，请使用 --profile 启动'}), 404
+        try:
+            limit = int(request.args.get('limit', PROFILE_TOP))
+        except ValueError:
+            return jsonify({'success': False, 'error': 'limit 必须是整数'}), 400
+        sort = request.args.get('sort', 'cumulative')
+        if sort not in ('cumulative', 'tottime'):
+            return jsonify({'success': False, 'error': 'sort 只能是 cumulative 或 tottime'}), 400
+        return jsonify(request_profiler.report(max(1, limit), sort))
 
     @app.route('/favicon.ico')
     def favicon():
         return '', 204
 
+    @app.route('/assets/<name>')
+    def dashboard_asset(name):
+        """页面离线资源；地址带内容版本号（?v=），因此可按 immutable 长期缓存"""
+        if name not in DASHBOARD_ASSETS:
+            return '', 404
+        asset = load_dashboard_assets()[name]
+        encoding = negotiate_encoding(request.accept_encodings)
+        if encoding not in asset:
+            asset[encoding] = compress_payload(asset['content'], encoding)
+        etag = asset['version'] if encoding == 'identity' else f"{asset['version']}-{encoding}"
+        headers = {'Cache-Control': f'public, max-age={ASSET_MAX_AGE}, immutable', 'Vary': 'Accept-Encoding'}
+        if request.if_none_match.contains(etag):
+            response = Response(status=304, headers=headers)
+        else:
+            response = Response(asset[encoding], mimetype=DASHBOARD_ASSETS[name], headers=headers)
+            if encoding != 'identity':
+                response.headers['Content-Encoding'] = encoding
+        response.set_etag(etag)
+        return response
+
+    def apply_single_update(kind):
+        item = request.get_json(silent=True)
+        if not isinstance(item, dict):
+            return jsonify({'success': False, 'error': '请求体必须是 JSON 对象'}), 400
+        return jsonify(apply_update(g.data_manager, dict(item, type=kind)))
+
     @app.route('/api/update/module', methods=['POST'])
+    @app.route('/p/<project>/api/update/module', methods=['POST'])
     def update_module_status():
         """更新模块状态和问题描述（仅交互模式）"""
-        try:
-            data = request.json
-            module_name = data.get('module_name')
-            new_status = data.get('status')
-            issue_description = data.get('issue_description', '')
-            
-            # 读取 app_status.json
-            with open(data_manager.files['app'], 'r', encoding='utf-8') as f:
-                app_data = json.load(f)
-            
-            # 更新模块状态
-            for module in app_data['modules']:
-                if module['module_name'] == module_name:
-                    module['status'] = new_status
-                    if new_status == 'has_issue':
-                        module['issue_description'] = issue_description
-                    else:
-                        module['issue_description'] = ''
-                    break
-            
-            # 更新 last_updated
-            app_data['last_updated'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            
-            # 写回文件
-            with open(data_manager.files['app'], 'w', encoding='utf-8') as f:
-                json.dump(app_data, f, ensure_ascii=False, indent=2)
-            
-            return jsonify({'success': True})
-        except Exception as e:
-            return jsonify({'success': False, 'error': str(e)})
+        return apply_single_update('module')
 
     @app.route('/api/update/assumption', methods=['POST'])
+    @app.route('/p/<project>/api/update/assumption', methods=['POST'])
     def update_assumption_status():
         """更新假设状态（仅交互模式）"""
-        try:
-            import base64
-            data = request.json
-            assumption_id = data.get('assumption_id')
-            new_status = data.get('status')
-
-            # 读取 project_data.json
-            with open(data_manager.files['project'], 'r', encoding='utf-8') as f:
-                project_data = json.load(f)
-
-            # 更新假设状态
-            for iteration in project_data['iterations']:
-                for assumption in iteration.get('assumptions', []):
-                    # 优先使用 assumption_id 匹配，如果没有则尝试解码 base64 并匹配 hypothesis/description/assumption_text
-                    match_found = False
-
-                    if 'assumption_id' in assumption and assumption['assumption_id'] == assumption_id:
-                        match_found = True
-                    else:
-                        # 尝试解码 base64 并匹配假设内容
-                        try:
-                            decoded_id = base64.b64decode(assumption_id).decode('utf-8')
-                            hypothesis_content = assumption.get('hypothesis') or assumption.get('description') or assumption.get('assumption_text')
-                            if hypothesis_content == decoded_id:
-                                match_found = True
-                        except:
-                            pass
-
-                    if match_found:
-                        assumption['status'] = new_status
-                        if new_status == 'validated':
-                            assumption['validation_date'] = datetime.now().strftime('%Y-%m-%d')
-                        else:
-                            assumption['validation_date'] = None
-                        break
-
-            # 写回文件
-            with open(data_manager.files['project'], 'w', encoding='utf-8') as f:
-                json.dump(project_data, f, ensure_ascii=False, indent=2)
-
-            return jsonify({'success': True})
-        except Exception as e:
-            return jsonify({'success': False, 'error': str(e)})
+        return apply_single_update('assumption')
+
+    @app.route('/api/update/batch', methods=['POST'])
+    @app.route('/p/<project>/api/update/batch', methods=['POST'])
+    def update_batch():
+        """批量更新模块/假设状态（仅交互模式）
+
+        请求体为 {"updates": [...]}（或直接为列表），处理方式见 apply_batch_update。
+        """
+        data = request.get_json(silent=True)
+        if not isinstance(data, (dict, list)):
+            return jsonify({'success': False, 'applied': False, 'error': '请求体必须是 JSON 对象或数组',
+                            'results': []}), 400
+        return jsonify(apply_batch_update(g.data_manager, data))
+
+    return app
+
 
 def get_dashboard_html(mode='static'):
     """现代化 UI 模板 - 采用 Tailwind CSS 和 Lucid Icons (中文默认 & 语言切换)"""
+    head_assets, body_assets = render_asset_tags(mode)
     return """
 <!DOCTYPE html>
 <html lang="en" class="dark">
@@ -172,8 +2323,7 @@ def get_dashboard_html(mode='static'):
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Cox coding - Transparent & Smooth Interactive Experience</title>
-    <script src="https://cdn.tailwindcss.com"></script>
-    <script src="https://unpkg.com/lucide@latest"></script>
+    <!-- DASHBOARD_ASSETS -->
     <style>
         body {
             font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, "Noto Sans SC", "Microsoft YaHei", sans-serif;
@@ -200,9 +2350,12 @@ def get_dashboard_html(mode='static'):
         ::-webkit-scrollbar-track { background: #09090b; }
         ::-webkit-scrollbar-thumb { background: #27272a; border-radius: 10px; }
         .hidden { display: none; }
+        /* 长列表：屏幕外的行跳过布局和绘制，滚动时再渲染 */
+        .list-row { content-visibility: auto; contain-intrinsic-size: auto 64px; }
     </style>
 </head>
 <body class="p-6 lg:p-10">
+    <!-- ICON_SPRITE -->
     <div class="max-w-7xl mx-auto">
         <!-- Header -->
         <header class="flex flex-col md:flex-row md:items-center justify-between mb-10 gap-6">
@@ -508,15 +2661,28 @@ def get_dashboard_html(mode='static'):
             if(window.lastData) renderUI(window.lastData);
         }
 
+        // 接口前缀：多项目模式下页面位于 /p/<项目名>/，接口也在该路径下
+        const API_BASE = window.location.pathname.replace(/[/]+$/, '');
+
         async function refreshData() {
             const btnIcon = document.getElementById('refresh-icon');
             if(btnIcon) btnIcon.classList.add('animate-spin');
             
             try {
-                // Web 交互模式：从 Flask API 读取数据
-                const response = await fetch('/api/data');
-                const data = await response.json();
+                // Web 交互模式：从 Flask API 读取数据；已有数据时只请求增量补丁
+                const since = (window.lastData && window.lastVersion) ? `?since=${encodeURIComponent(window.lastVersion)}` : '';
+                const response = await fetch(`${API_BASE}/api/data` + since, { cache: since ? 'no-store' : 'default' });
+                if (response.status === 304) {
+                    window.lastData.last_updated = response.headers.get('X-Last-Updated') || currentTimeText();
+                    renderUI(window.lastData);
+                    return;
+                }
+                const isPatch = (response.headers.get('Content-Type') || '').includes('json-patch');
+                const body = await response.json();
+                const data = isPatch ? applyJsonPatch(window.lastData, body) : body;
+                data.last_updated = response.headers.get('X-Last-Updated') || currentTimeText();
                 window.lastData = data;
+                window.lastVersion = response.headers.get('X-Data-Version');
                 renderUI(data);
             } catch (e) {
                 console.error("Refresh failed", e);
@@ -525,6 +2691,118 @@ def get_dashboard_html(mode='static'):
             }
         }
 
+        // 数据体中不含更新时间（便于 ETag 缓存），由响应头或本地时间补充
+        function currentTimeText() {
+            return new Date().toTimeString().slice(0, 8);
+        }
+
+        // 按 RFC 6902 将 JSON Patch 应用到 doc（原地修改），返回新的文档
+        function applyJsonPatch(doc, ops) {
+            for (const op of ops) {
+                if (op.path === '') {
+                    doc = op.value;
+                    continue;
+                }
+                const keys = op.path.split('/').slice(1).map(k => k.replace(/~1/g, '/').replace(/~0/g, '~'));
+                const last = keys.pop();
+                let target = doc;
+                for (const k of keys) target = target[k];
+                if (Array.isArray(target)) {
+                    const index = last === '-' ? target.length : parseInt(last, 10);
+                    if (op.op === 'add') target.splice(index, 0, op.value);
+                    else if (op.op === 'remove') target.splice(index, 1);
+                    else target[index] = op.value;
+                } else if (op.op === 'remove') {
+                    delete target[last];
+                } else {
+                    target[last] = op.value;
+                }
+            }
+            return doc;
+        }
+
+        // 实时推送：服务端仅在数据文件变化时发送事件，空闲时没有轮询请求
+        function connectStream() {
+            if (!window.EventSource) return false;
+            const source = new EventSource(`${API_BASE}/api/stream`);
+            source.onmessage = (event) => {
+                const data = JSON.parse(event.data);
+                data.last_updated = currentTimeText();
+                window.lastData = data;
+                window.lastVersion = event.lastEventId;
+                renderUI(data);
+            };
+            source.addEventListener('patch', (event) => {
+                const message = JSON.parse(event.data);
+                // 本地版本与补丁起点不一致（例如刚手动刷新过）时改为主动拉取
+                if (!window.lastData || message.since !== window.lastVersion) {
+                    refreshData();
+                    return;
+                }
+                const data = applyJsonPatch(window.lastData, message.patch);
+                data.last_updated = currentTimeText();
+                window.lastData = data;
+                window.lastVersion = event.lastEventId;
+                renderUI(data);
+            });
+            // 断开后浏览器会自动重连，这里只记录日志
+            source.onerror = () => console.warn("Stream disconnected, reconnecting...");
+            return true;
+        }
+
+        // 区块内容与上次相同时不触碰 DOM；变化时整体替换并只为该区块创建图标
+        function setHtml(container, html) {
+            if (container._html === html) return;
+            container.innerHTML = html;
+            container._html = html;
+            container._keyed = null;
+            createIcons(container);
+        }
+
+        // 按 key 增量更新列表：条目 HTML 与上次相同则保留原节点，只替换变化的条目，图标只为新节点创建
+        // onReplace(旧节点, 新节点) 用于把旧节点中单独维护的子列表移到新节点中；返回与 items 顺序一致的节点
+        function renderKeyed(container, items, keyOf, render, emptyHtml, onReplace) {
+            if (!items.length) {
+                setHtml(container, emptyHtml);
+                return [];
+            }
+            if (!container._keyed) {
+                container.innerHTML = '';
+                container._html = null;
+                container._keyed = new Map();
+            }
+            const previous = container._keyed;
+            const next = new Map();
+            const nodes = [];
+            let cursor = container.firstChild;
+            items.forEach((item, i) => {
+                let key = String(keyOf(item, i));
+                while (next.has(key)) key += '#';
+                const html = render(item);
+                let entry = previous.get(key);
+                if (!entry || entry.html !== html) {
+                    const template = document.createElement('template');
+                    template.innerHTML = html.trim();
+                    const node = template.content.firstElementChild;
+                    createIcons(node);
+                    if (entry) {
+                        if (onReplace) onReplace(entry.node, node);
+                        if (cursor === entry.node) cursor = cursor.nextSibling;
+                        entry.node.remove();
+                    }
+                    entry = { html, node };
+                }
+                previous.delete(key);
+                next.set(key, entry);
+                nodes.push(entry.node);
+                if (entry.node === cursor) cursor = cursor.nextSibling;
+                else container.insertBefore(entry.node, cursor);
+            });
+            previous.forEach(entry => entry.node.remove());
+            container._keyed = next;
+            return nodes;
+        }
+
         function renderUI(data) {
             try {
                 const t = translations[currentLang];
@@ -536,124 +2814,24 @@ def get_dashboard_html(mode='static'):
                 // 项目信息
                 document.getElementById('project-info').textContent = `${p.project_name} • v${a.version || '1.0'}`;
 
-                // 指标卡片
-                const totalTasks = p.iterations?.reduce((sum, iter) => sum + (iter.tasks?.length || 0), 0) || 0;
-                const passRate = (test.test_suites?.length) 
-                    ? ((test.test_suites.reduce((s, x) => s + (x.passed_tests/x.total_tests), 0) / test.test_suites.length) * 100).toFixed(0) 
-                    : 0;
-                const passRateDisplay = isNaN(parseFloat(passRate)) ? '暂未开放' : passRate + '%';
-            
-            document.getElementById('top-metrics').innerHTML = `
-                ${renderMetricCard(t.metricIterations, p.iterations?.length || 0, 'milestone', 'text-blue-400')}
-                ${renderMetricCard(t.metricTasks, totalTasks, 'check-circle', 'text-emerald-400')}
-                ${renderMetricCard(t.metricPassRate, passRateDisplay, 'shield', 'text-amber-400')}
-                ${renderMetricCard(t.metricAnomalies, test.anomalies?.length || 0, 'zap', 'text-red-400')}
-            `;
+                // 指标卡片和团队概览：使用服务端汇总的 /api/summary，与当前数据版本一致时直接复用
+                if (window.lastSummary && window.lastSummary.version === window.lastVersion) {
+                    renderSummary(window.lastSummary);
+                } else {
+                    loadSummary();
+                }
 
-            // 迭代列表（按迭代分组显示任务）
+            // 迭代列表（按迭代分组显示任务）：迭代和任务都按 key 增量更新，折叠的迭代不更新任务列表
             document.getElementById('task-count').textContent = `${p.iterations?.length || 0} ${t.metricIterations}`;
-            document.getElementById('task-list').innerHTML = (p.iterations || []).map(iter => {
-                const taskList = iter.tasks || [];
-                const completedTasks = taskList.filter(t => t.status === 'completed' || t.status === 'done').length;
-                const progress = taskList.length > 0 ? (completedTasks / taskList.length * 100).toFixed(0) : 0;
-                const isCurrent = iter.iteration_id === p.current_iteration;
-                const isCollapsed = !isCurrent && collapsedIterations.has(iter.iteration_id);
-                
-                return `
-                    <div class="bg-zinc-900/40 rounded-xl border ${isCurrent ? 'border-blue-500/30 bg-blue-500/5' : 'border-zinc-800/50'} overflow-hidden">
-                        <!-- 迭代头部（可点击切换折叠/展开） -->
-                        <div class="p-4 border-b border-zinc-800/50 cursor-pointer hover:bg-zinc-800/30 transition-colors" onclick="toggleIteration('${iter.iteration_id}')">
-                            <div class="flex items-center justify-between mb-2">
-                                <div class="flex items-center gap-3">
-                                    ${isCurrent ? '<span class="text-xs bg-blue-500 text-white px-2 py-0.5 rounded font-medium">当前</span>' : ''}
-                                    <i data-lucide="${isCollapsed ? 'chevron-right' : 'chevron-down'}" class="w-4 h-4 text-zinc-500 transition-transform"></i>
-                                    <h3 class="font-bold text-base text-zinc-200">${iter.iteration_name}</h3>
-                                </div>
-                                ${getStatusBadge(iter.status)}
-                            </div>
-                            <div class="flex items-center gap-4 text-xs text-zinc-500">
-                                <span><i data-lucide="calendar" class="w-3 h-3 inline mr-1"></i>${iter.start_date || '-'} ~ ${iter.end_date || '-'}</span>
-                                <span><i data-lucide="hash" class="w-3 h-3 inline mr-1"></i>${iter.iteration_id}</span>
-                            </div>
-                        </div>
-                        
-                        <!-- 迭代进度和任务列表（折叠时隐藏） -->
-                        <div class="${isCollapsed ? 'hidden' : ''}">
-                            <!-- 迭代进度 -->
-                            <div class="px-4 py-3 bg-zinc-900/20">
-                                <div class="flex items-center justify-between text-xs mb-1">
-                                    <span class="text-zinc-400">任务进度</span>
-                                    <span class="text-zinc-300">${completedTasks}/${iter.tasks?.length || 0} 已完成 (${progress}%)</span>
-                                </div>
-                                <div class="w-full bg-zinc-800 h-1.5 rounded-full overflow-hidden">
-                                    <div class="bg-gradient-to-r from-blue-500 to-emerald-500 h-full transition-all duration-500" style="width: ${progress}%"></div>
-                                </div>
-                            </div>
-                            
-                            <!-- 任务列表 -->
-                            <div class="p-4 space-y-2">
-                                ${(iter.tasks?.length || 0) > 0 ? iter.tasks.map(task => `
-                                    <div class="flex items-center justify-between p-3 bg-zinc-900/40 rounded-lg border border-zinc-800/30 hover:border-zinc-700/50 transition-colors">
-                                        <div class="flex items-center gap-3">
-                                            <div class="w-1.5 h-6 rounded-full ${task.status === 'completed' || task.status === 'done' ? 'bg-emerald-500' : task.status === 'in_progress' ? 'bg-blue-500' : 'bg-zinc-600'}"></div>
-                                            <div class="flex-1">
-                                                <p class="font-medium text-sm text-zinc-200">${task.task_name}</p>
-                                                <div class="flex items-center gap-3 mt-1 text-xs text-zinc-500">
-                                                    <span>${task.task_id}</span>
-                                                    ${task.assignee ? `<span><i data-lucide="user" class="w-3 h-3 inline mr-1"></i>${task.assignee}</span>` : ''}
-                                                    ${task.priority ? `<span class="px-1.5 py-0.5 rounded ${task.priority === 'high' || task.priority === 'critical' ? 'bg-red-500/10 text-red-400' : 'bg-zinc-700/50 text-zinc-400'}">${getPriorityLabel(task.priority)}</span>` : ''}
-                                                    ${task.risk_level ? `<span class="px-1.5 py-0.5 rounded ${task.risk_level === 'high' ? 'bg-orange-500/10 text-orange-400' : 'bg-emerald-500/10 text-emerald-400'}">${getRiskLabel(task.risk_level)}</span>` : ''}
-                                                </div>
-                                            </div>
-                                        </div>
-                                        ${getStatusBadge(task.status)}
-                                    </div>
-                                `).join('') : '<p class="text-sm text-zinc-500 text-center py-4">尚未详细计划</p>'}
-                            </div>
-                        </div>
-                        </div>
-                        
-                        <!-- 涉及的模块（折叠时也显示） -->
-                        ${(iter.modules && iter.modules.length > 0) ? `
-                            <div class="px-4 py-3 border-t border-zinc-800/50">
-                                <div class="flex items-center gap-2 text-xs text-zinc-500 mb-2">
-                                    <i data-lucide="layers" class="w-3 h-3"></i>
-                                    <span>涉及的模块 (${iter.modules?.length || 0})</span>
-                                </div>
-                                <div class="flex flex-wrap gap-2">
-                                    ${(iter.modules || []).map(mod => `
-                                        <div class="px-3 py-1.5 bg-zinc-900/60 rounded-lg border border-zinc-800/50">
-                                            <p class="text-xs font-medium text-zinc-300">${mod.module_name}</p>
-                                            <p class="text-[10px] text-zinc-500 mt-0.5">预期完成率: ${(mod.expected_completion * 100).toFixed(0)}%</p>
-                                        </div>
-                                    `).join('')}
-                                </div>
-                            </div>
-                        ` : ''}
-                        
-                        <!-- 开发假设（折叠时也显示） -->
-                        ${(iter.assumptions?.length || 0) > 0 ? `
-                            <div class="px-4 py-3 border-t border-zinc-800/50">
-                                <div class="flex items-center gap-2 text-xs text-zinc-500 mb-2">
-                                    <i data-lucide="lightbulb" class="w-3 h-3"></i>
-                                    <span>开发假设 (${iter.assumptions.length})</span>
-                                </div>
-                                ${(iter.assumptions || []).slice(0, 2).map(assump => {
-                                    let status = assump.status;
-                                    if (!status && assump.validated !== undefined) {
-                                        status = assump.validated === true ? 'validated' : 'pending';
-                                    }
-                                    return `<div class="text-xs text-zinc-400 mb-1">
-                                        <span class="${status === 'validated' ? 'text-emerald-400' : status === 'invalidated' ? 'text-red-400' : 'text-amber-400'}">●</span>
-                                        ${assump.hypothesis || assump.description || assump.assumption_text || '无描述'}
-                                    </div>`;
-                                }).join('')}
-                                ${(iter.assumptions?.length || 0) > 2 ? `<p class="text-xs text-zinc-500">...还有 ${(iter.assumptions?.length || 0) - 2} 个假设</p>` : ''}
-                            </div>
-                        ` : ''}
-                    </div>
-                `;
-            }).join('');
+            const iterations = p.iterations || [];
+            const iterationNodes = renderKeyed(document.getElementById('task-list'), iterations,
+                iter => iter.iteration_id, iter => renderIteration(iter, p.current_iteration), '',
+                (oldNode, newNode) => newNode.querySelector('[data-task-list]').replaceWith(oldNode.querySelector('[data-task-list]')));
+            iterations.forEach((iter, i) => {
+                if (iter.iteration_id !== p.current_iteration && collapsedIterations.has(iter.iteration_id)) return;
+                renderKeyed(iterationNodes[i].querySelector('[data-task-list]'), iter.tasks || [], task => task.task_id, renderTask,
+                    '<p class="text-sm text-zinc-500 text-center py-4">尚未详细计划</p>');
+            });
 
             // 模块成熟度（交互模式：只显示已宣称开发好的模块，支持状态更新）
             const developedModules = (a.modules || []).filter(m => 
@@ -662,7 +2840,7 @@ def get_dashboard_html(mode='static'):
                 m.status === 'has_issue'
             );
             
-            document.getElementById('module-grid').innerHTML = developedModules.map(m => `
+            renderKeyed(document.getElementById('module-grid'), developedModules, m => m.module_name, m => `
                 <div class="p-4 bg-zinc-900/40 rounded-xl border border-zinc-800/50" data-module="${m.module_name}">
                     <div class="flex justify-between items-start mb-3">
                         <p class="font-bold text-sm text-zinc-200">${m.module_name}</p>
@@ -685,10 +2863,10 @@ def get_dashboard_html(mode='static'):
                         </div>
                     ` : ''}
                 </div>
-            `).join('');
+            `, '');
 
             // 测试套件
-            document.getElementById('test-suites').innerHTML = (test.test_suites || []).map(s => `
+            setHtml(document.getElementById('test-suites'), (test.test_suites || []).map(s => `
                 <div>
                     <div class="flex justify-between text-sm mb-2 font-semibold">
                         <span>${s.suite_name}</span>
@@ -700,11 +2878,11 @@ def get_dashboard_html(mode='static'):
                         <div class="bg-zinc-700 rounded-r-sm" style="flex: ${s.skipped_tests}"></div>
                     </div>
                 </div>
-            `).join('');
+            `).join(''));
 
             // 异常
-            document.getElementById('anomaly-list').innerHTML = (test.anomalies?.length || 0)
-                ? test.anomalies.map(anom => `
+            renderKeyed(document.getElementById('anomaly-list'), test.anomalies || [],
+                (anom, i) => anom.anomaly_id || `${anom.type}#${i}`, anom => `
                     <div class="p-3 bg-red-500/10 rounded-lg border border-red-500/20 text-xs">
                         <p class="font-bold text-red-400 mb-1 flex items-center justify-between">
                             ${anom.type}
@@ -712,22 +2890,20 @@ def get_dashboard_html(mode='static'):
                         </p>
                         <p class="text-zinc-400 line-clamp-1">${anom.description}</p>
                     </div>
-                `).join('')
-                : `<p class="text-zinc-500 text-sm text-center py-4">${t.healthy}</p>`;
+                `, `<p class="text-zinc-500 text-sm text-center py-4">${t.healthy}</p>`);
 
             // 假设分析（交互模式：支持状态更新）
             const allAssumptions = p.iterations.flatMap(i => i.assumptions || []);
-            document.getElementById('assumptions-list').innerHTML = allAssumptions.length
-                ? allAssumptions.map(assump => `
-                    <div class="p-3 bg-zinc-900/40 rounded-lg border border-zinc-800/50">
+            renderKeyed(document.getElementById('assumptions-list'), allAssumptions,
+                assump => assump.assumption_id || assump.hypothesis || assump.description || assump.assumption_text, assump => `
+                    <div class="list-row p-3 bg-zinc-900/40 rounded-lg border border-zinc-800/50">
                         <p class="text-sm font-semibold text-zinc-200 mb-2">${assump.hypothesis || assump.description || assump.assumption_text || '无描述'}</p>
                         <div class="flex items-center justify-between">
                             ${renderAssumptionStatusSelect(assump)}
                             ${assump.validation_date ? `<span class="text-[10px] text-zinc-500">${assump.validation_date}</span>` : ''}
                         </div>
                     </div>
-                `).join('')
-                : `<p class="text-zinc-500 text-sm text-center py-4">${t.noAssumptions}</p>`;
+                `, `<p class="text-zinc-500 text-sm text-center py-4">${t.noAssumptions}</p>`);
 
             // 性能趋势
             if (test.performance_history?.length > 0) {
@@ -736,30 +2912,6 @@ def get_dashboard_html(mode='static'):
                 document.getElementById('performance-chart').innerHTML = `<p class="text-zinc-500 text-sm text-center py-8">${t.noPerf}</p>`;
             }
 
-            // 团队概览
-            const teamStats = analyzeTeamData(p, a);
-            document.getElementById('team-list').innerHTML = (Object.keys(teamStats).length || 0)
-                ? Object.entries(teamStats).map(([member, stats]) => `
-                    <div class="flex items-center justify-between p-3 bg-zinc-900/40 rounded-lg border border-zinc-800/50">
-                        <div class="flex items-center gap-3">
-                            <div class="w-8 h-8 rounded-full bg-purple-500/20 flex items-center justify-center">
-                                <span class="text-sm font-bold text-purple-400">${member.charAt(0).toUpperCase()}</span>
-                            </div>
-                            <div>
-                                <p class="text-sm font-semibold text-zinc-200">${member}</p>
-                                <p class="text-[10px] text-zinc-500">${stats.tasks} tasks • ${stats.modules} modules</p>
-                            </div>
-                        </div>
-                        <div class="text-right">
-                            <p class="text-lg font-bold text-purple-400">${stats.completion}%</p>
-                            <p class="text-[10px] text-zinc-500 uppercase">${t.completeSuffix}</p>
-                        </div>
-                    </div>
-                `).join('')
-                : `<p class="text-zinc-500 text-sm text-center py-4">${t.noTeam}</p>`;
-
-            lucide.createIcons();
-            
             // 根据数据情况隐藏无数据链路的板块（通过 CSS）
             // 测试覆盖率板块：所有套件的 total_tests 都为 0 时隐藏
             const hasRealTestData = test.test_suites.some(s => s.total_tests > 0);
@@ -800,29 +2952,50 @@ def get_dashboard_html(mode='static'):
             }
         }
 
-        function analyzeTeamData(project, app) {
-            const teamStats = {};
-            project.iterations.forEach(iter => {
-                iter.tasks.forEach(task => {
-                    if (task.assignee) {
-                        if (!teamStats[task.assignee]) teamStats[task.assignee] = { tasks: 0, modules: 0, completed: 0, total: 0 };
-                        teamStats[task.assignee].tasks++;
-                        teamStats[task.assignee].total++;
-                        if (['done', 'completed'].includes(task.status.toLowerCase())) teamStats[task.assignee].completed++;
-                    }
-                });
-            });
-            app.modules.forEach(m => {
-                if (m.owner) {
-                    if (!teamStats[m.owner]) teamStats[m.owner] = { tasks: 0, modules: 0, completed: 0, total: 0 };
-                    teamStats[m.owner].modules++;
-                }
-            });
-            Object.keys(teamStats).forEach(member => {
-                const s = teamStats[member];
-                s.completion = s.total > 0 ? Math.round((s.completed / s.total) * 100) : 0;
-            });
-            return teamStats;
+        // 顶部指标卡片与团队概览的数据由服务端按数据版本预先汇总，页面不必遍历全部迭代和任务；
+        // 首次加载时与 /api/data 并行请求，数据较大时指标卡片也能先显示
+        async function loadSummary() {
+            try {
+                const response = await fetch(`${API_BASE}/api/summary`, { cache: 'no-cache' });
+                if (!response.ok) return;
+                window.lastSummary = await response.json();
+                renderSummary(window.lastSummary);
+            } catch (e) {
+                console.error("Summary failed", e);
+            }
+        }
+
+        function renderSummary(summary) {
+            const t = translations[currentLang];
+            const passRateDisplay = summary.tests.pass_rate === null ? '暂未开放' : `${Math.round(summary.tests.pass_rate * 100)}%`;
+            setHtml(document.getElementById('top-metrics'), `
+                ${renderMetricCard(t.metricIterations, summary.iterations.length, 'milestone', 'text-blue-400')}
+                ${renderMetricCard(t.metricTasks, summary.tasks.total, 'check-circle', 'text-emerald-400')}
+                ${renderMetricCard(t.metricPassRate, passRateDisplay, 'shield', 'text-amber-400')}
+                ${renderMetricCard(t.metricAnomalies, summary.anomalies.total, 'zap', 'text-red-400')}
+            `);
+
+            // 团队概览
+            const teamStats = summary.owners;
+            setHtml(document.getElementById('team-list'), (Object.keys(teamStats).length || 0)
+                ? Object.entries(teamStats).map(([member, stats]) => `
+                    <div class="flex items-center justify-between p-3 bg-zinc-900/40 rounded-lg border border-zinc-800/50">
+                        <div class="flex items-center gap-3">
+                            <div class="w-8 h-8 rounded-full bg-purple-500/20 flex items-center justify-center">
+                                <span class="text-sm font-bold text-purple-400">${member.charAt(0).toUpperCase()}</span>
+                            </div>
+                            <div>
+                                <p class="text-sm font-semibold text-zinc-200">${member}</p>
+                                <p class="text-[10px] text-zinc-500">${stats.tasks} tasks • ${stats.modules} modules</p>
+                            </div>
+                        </div>
+                        <div class="text-right">
+                            <p class="text-lg font-bold text-purple-400">${stats.completion}%</p>
+                            <p class="text-[10px] text-zinc-500 uppercase">${t.completeSuffix}</p>
+                        </div>
+                    </div>
+                `).join('')
+                : `<p class="text-zinc-500 text-sm text-center py-4">${t.noTeam}</p>`);
         }
 
         function renderPerformanceChart(perfHistory) {
@@ -878,6 +3051,111 @@ def get_dashboard_html(mode='static'):
             });
         }
 
+        // 单个迭代卡片；任务列表容器 [data-task-list] 由 renderKeyed 单独维护
+        function renderIteration(iter, currentIteration) {
+            const taskList = iter.tasks || [];
+            const completedTasks = taskList.filter(t => t.status === 'completed' || t.status === 'done').length;
+            const progress = taskList.length > 0 ? (completedTasks / taskList.length * 100).toFixed(0) : 0;
+            const isCurrent = iter.iteration_id === currentIteration;
+            const isCollapsed = !isCurrent && collapsedIterations.has(iter.iteration_id);
+            
+            return `
+                <div class="bg-zinc-900/40 rounded-xl border ${isCurrent ? 'border-blue-500/30 bg-blue-500/5' : 'border-zinc-800/50'} overflow-hidden">
+                    <!-- 迭代头部（可点击切换折叠/展开） -->
+                    <div class="p-4 border-b border-zinc-800/50 cursor-pointer hover:bg-zinc-800/30 transition-colors" onclick="toggleIteration('${iter.iteration_id}')">
+                        <div class="flex items-center justify-between mb-2">
+                            <div class="flex items-center gap-3">
+                                ${isCurrent ? '<span class="text-xs bg-blue-500 text-white px-2 py-0.5 rounded font-medium">当前</span>' : ''}
+                                <i data-lucide="${isCollapsed ? 'chevron-right' : 'chevron-down'}" class="w-4 h-4 text-zinc-500 transition-transform"></i>
+                                <h3 class="font-bold text-base text-zinc-200">${iter.iteration_name}</h3>
+                            </div>
+                            ${getStatusBadge(iter.status)}
+                        </div>
+                        <div class="flex items-center gap-4 text-xs text-zinc-500">
+                            <span><i data-lucide="calendar" class="w-3 h-3 inline mr-1"></i>${iter.start_date || '-'} ~ ${iter.end_date || '-'}</span>
+                            <span><i data-lucide="hash" class="w-3 h-3 inline mr-1"></i>${iter.iteration_id}</span>
+                        </div>
+                    </div>
+                    
+                    <!-- 迭代进度和任务列表（折叠时隐藏） -->
+                    <div class="${isCollapsed ? 'hidden' : ''}">
+                        <!-- 迭代进度 -->
+                        <div class="px-4 py-3 bg-zinc-900/20">
+                            <div class="flex items-center justify-between text-xs mb-1">
+                                <span class="text-zinc-400">任务进度</span>
+                                <span class="text-zinc-300">${completedTasks}/${iter.tasks?.length || 0} 已完成 (${progress}%)</span>
+                            </div>
+                            <div class="w-full bg-zinc-800 h-1.5 rounded-full overflow-hidden">
+                                <div class="bg-gradient-to-r from-blue-500 to-emerald-500 h-full transition-all duration-500" style="width: ${progress}%"></div>
+                            </div>
+                        </div>
+                        
+                        <!-- 任务列表 -->
+                        <div class="p-4 space-y-2" data-task-list></div>
+                    </div>
+                    
+                    <!-- 涉及的模块（折叠时也显示） -->
+                    ${(iter.modules && iter.modules.length > 0) ? `
+                        <div class="px-4 py-3 border-t border-zinc-800/50">
+                            <div class="flex items-center gap-2 text-xs text-zinc-500 mb-2">
+                                <i data-lucide="layers" class="w-3 h-3"></i>
+                                <span>涉及的模块 (${iter.modules?.length || 0})</span>
+                            </div>
+                            <div class="flex flex-wrap gap-2">
+                                ${(iter.modules || []).map(mod => `
+                                    <div class="px-3 py-1.5 bg-zinc-900/60 rounded-lg border border-zinc-800/50">
+                                        <p class="text-xs font-medium text-zinc-300">${mod.module_name}</p>
+                                        <p class="text-[10px] text-zinc-500 mt-0.5">预期完成率: ${(mod.expected_completion * 100).toFixed(0)}%</p>
+                                    </div>
+                                `).join('')}
+                            </div>
+                        </div>
+                    ` : ''}
+                    
+                    <!-- 开发假设（折叠时也显示） -->
+                    ${(iter.assumptions?.length || 0) > 0 ? `
+                        <div class="px-4 py-3 border-t border-zinc-800/50">
+                            <div class="flex items-center gap-2 text-xs text-zinc-500 mb-2">
+                                <i data-lucide="lightbulb" class="w-3 h-3"></i>
+                                <span>开发假设 (${iter.assumptions.length})</span>
+                            </div>
+                            ${(iter.assumptions || []).slice(0, 2).map(assump => {
+                                let status = assump.status;
+                                if (!status && assump.validated !== undefined) {
+                                    status = assump.validated === true ? 'validated' : 'pending';
+                                }
+                                return `<div class="text-xs text-zinc-400 mb-1">
+                                    <span class="${status === 'validated' ? 'text-emerald-400' : status === 'invalidated' ? 'text-red-400' : 'text-amber-400'}">●</span>
+                                    ${assump.hypothesis || assump.description || assump.assumption_text || '无描述'}
+                                </div>`;
+                            }).join('')}
+                            ${(iter.assumptions?.length || 0) > 2 ? `<p class="text-xs text-zinc-500">...还有 ${(iter.assumptions?.length || 0) - 2} 个假设</p>` : ''}
+                        </div>
+                    ` : ''}
+                </div>
+            `;
+        }
+
+        function renderTask(task) {
+            return `
+                <div class="list-row flex items-center justify-between p-3 bg-zinc-900/40 rounded-lg border border-zinc-800/30 hover:border-zinc-700/50 transition-colors">
+                    <div class="flex items-center gap-3">
+                        <div class="w-1.5 h-6 rounded-full ${task.status === 'completed' || task.status === 'done' ? 'bg-emerald-500' : task.status === 'in_progress' ? 'bg-blue-500' : 'bg-zinc-600'}"></div>
+                        <div class="flex-1">
+                            <p class="font-medium text-sm text-zinc-200">${task.task_name}</p>
+                            <div class="flex items-center gap-3 mt-1 text-xs text-zinc-500">
+                                <span>${task.task_id}</span>
+                                ${task.assignee ? `<span><i data-lucide="user" class="w-3 h-3 inline mr-1"></i>${task.assignee}</span>` : ''}
+                                ${task.priority ? `<span class="px-1.5 py-0.5 rounded ${task.priority === 'high' || task.priority === 'critical' ? 'bg-red-500/10 text-red-400' : 'bg-zinc-700/50 text-zinc-400'}">${getPriorityLabel(task.priority)}</span>` : ''}
+                                ${task.risk_level ? `<span class="px-1.5 py-0.5 rounded ${task.risk_level === 'high' ? 'bg-orange-500/10 text-orange-400' : 'bg-emerald-500/10 text-emerald-400'}">${getRiskLabel(task.risk_level)}</span>` : ''}
+                            </div>
+                        </div>
+                    </div>
+                    ${getStatusBadge(task.status)}
+                </div>
+            `;
+        }
+
         function renderMetricCard(label, value, icon, iconColor) {
             return `
                 <div class="glass-card rounded-2xl p-5 flex items-center gap-5">
@@ -962,7 +3240,7 @@ def get_dashboard_html(mode='static'):
             const input = document.getElementById(`issue-input-${moduleName}`);
             const issueDescription = input ? input.value : '';
             
-            fetch('/api/update/module', {
+            fetch(`${API_BASE}/api/update/module`, {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({
@@ -990,7 +3268,7 @@ def get_dashboard_html(mode='static'):
         function updateModuleStatus(moduleName, newStatus) {
             const issueDescription = newStatus === 'has_issue' ? '' : '';
             
-            fetch('/api/update/module', {
+            fetch(`${API_BASE}/api/update/module`, {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({
@@ -1015,7 +3293,7 @@ def get_dashboard_html(mode='static'):
 
         // 更新假设状态
         function updateAssumptionStatus(assumptionId, newStatus) {
-            fetch('/api/update/assumption', {
+            fetch(`${API_BASE}/api/update/assumption`, {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({
@@ -1037,17 +3315,19 @@ def get_dashboard_html(mode='static'):
             });
         }
 
-        // 初始化
+        // 初始化：优先使用 SSE 推送，不支持时退回一次性拉取
         setLanguage('en');
-        refreshData();
+        loadSummary();
+        if (!connectStream()) refreshData();
     </script>
 </body>
 </html>
-    """
+    """.replace('<!-- DASHBOARD_ASSETS -->', head_assets).replace('<!-- ICON_SPRITE -->', body_assets)
 
 
 def get_static_html_template():
     """获取静态 HTML 模板（简化版，移除交互功能）"""
+    head_assets, body_assets = render_asset_tags('static')
     return """
 <!DOCTYPE html>
 <html lang="en">
@@ -1055,8 +3335,7 @@ def get_static_html_template():
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Cox Observability Panel - Static Mode</title>
-    <script src="https://cdn.tailwindcss.com"></script>
-    <script src="https://unpkg.com/lucide@latest/dist/umd/lucide.js"></script>
+    <!-- DASHBOARD_ASSETS -->
     <style>
         body {
             background: linear-gradient(135deg, #09090b 0%, #18181b 50%, #09090b 100%);
@@ -1078,6 +3357,7 @@ def get_static_html_template():
     </style>
 </head>
 <body class="text-zinc-100 antialiased p-4 lg:p-8">
+    <!-- ICON_SPRITE -->
     <div class="max-w-7xl mx-auto">
         <!-- Header -->
         <header class="mb-8 flex items-center justify-between">
@@ -1347,7 +3627,7 @@ def get_static_html_template():
                     `).join('')
                     : '<p class="text-zinc-500 text-sm text-center py-4">系统状态良好</p>';
 
-                lucide.createIcons();
+                createIcons();
             } catch (e) {
                 console.error("Render failed:", e);
                 console.error("Data:", data);
@@ -1379,10 +3659,55 @@ def get_static_html_template():
     </script>
 </body>
 </html>
+    """.replace('<!-- DASHBOARD_ASSETS -->', head_assets).replace('<!-- ICON_SPRITE -->', body_assets)
+
+
+def project_fields(value, fields):
+    """按 STATIC_FIELDS 的结构裁剪数据：对象只保留列出的字段，列表逐项裁剪"""
+    if fields is None:
+        return value
+    if isinstance(value, list):
+        return [project_fields(item, fields) for item in value]
+    if isinstance(value, dict):
+        return {key: project_fields(value[key], sub) for key, sub in fields.items() if key in value}
+    return value
+
+
+def encode_static_data(data, embed='json'):
+    """把裁剪后的数据编码为可以直接放进 <script> 的文本
+
+    embed='json' 返回 JS 对象字面量；embed='gzip' 返回 gzip 压缩后 base64 编码的字符串字面量，
+    由浏览器通过 DecompressionStream 解压。'</' 被转义，数据中的 </script> 不会提前结束脚本。
     """
+    raw = json_codec.dumps(data, compact=True).replace(b'</', b'<\\/')
+    if embed == 'gzip':
+        blob = gzip.compress(raw, compresslevel=GZIP_LEVEL, mtime=0)
+        return f"'{base64.b64encode(blob).decode('ascii')}'"
+    return raw.decode('utf-8')
+
+
+def static_input_hash(raw_files, template, embed='json'):
+    """静态页面的输入哈希：由各数据文件的原始内容、页面模板（含内联资源）和内联方式共同决定"""
+    digest = hashlib.sha1(hashlib.sha1(template.encode('utf-8')).digest())
+    digest.update(f"embed:{embed}".encode('utf-8'))
+    for key, raw in raw_files.items():
+        digest.update(f"{key}:".encode('utf-8'))
+        digest.update(hashlib.sha1(raw).digest() if raw is not None else b'-')
+    return digest.hexdigest()
 
 
-def generate_static_html(data_manager, output_file):
+def read_static_input_hash(output_file):
+    """读取已生成页面 <head> 开头记录的输入哈希；文件不存在或没有记录时返回 None"""
+    try:
+        with open(output_file, 'rb') as f:
+            head = f.read(4096)
+    except OSError:
+        return None
+    match = STATIC_HASH_PATTERN.search(head)
+    return match.group(1).decode('ascii') if match else None
+
+
+def generate_static_html(data_manager, output_file, embed='json'):
     """生成静态 HTML 文件
     
     静态模式：将所有数据内联到 HTML 文件中，避免 CORS 问题
@@ -1391,51 +3716,91 @@ def generate_static_html(data_manager, output_file):
     - 完全避免浏览器的 CORS 限制
     - 用户体验好，直接打开 HTML 即可查看
     - 静态模式只提供纯展示功能，不包含交互元素
+
+    页面中记录了输入哈希（数据文件内容 + 模板），输入没有变化时不重写输出文件，
+    避免频繁调用时惊动文件监听和同步工具。
+
+    只内联页面实际渲染的字段（见 STATIC_FIELDS）；embed='gzip' 时数据以 gzip + base64
+    的形式内联，在浏览器中解压，适合体积很大的项目。
     """
     # 1. 读取所有数据文件
-    data = {}
+    raw_files = {}
     for key, src_path in data_manager.files.items():
-        src_file = Path(src_path)
-        if src_file.exists():
-            with open(src_file, 'r', encoding='utf-8') as f:
-                data[key] = json.load(f)
-            print(f"[INFO] 已读取数据文件: {src_file.name}")
-        else:
+        try:
+            raw_files[key] = Path(src_path).read_bytes()
+        except FileNotFoundError:
+            # 监听模式下文件可能在检查之后、读取之前被删除，因此直接读取并处理不存在的情况
             print(f"[WARNING] 数据文件不存在: {src_path}")
+            raw_files[key] = None
+
+    # 获取静态 HTML 模板（简化版，不含交互功能），与数据一起决定输出内容
+    html_template = get_static_html_template()
+    input_hash = static_input_hash(raw_files, html_template, embed)
+    output_file_path = Path(output_file)
+    if read_static_input_hash(output_file_path) == input_hash:
+        print(f"[INFO] 输入未变化，跳过写入: {output_file_path.absolute()}")
+        return str(output_file_path.absolute())
+
+    data = {}
+    for key, raw in raw_files.items():
+        if raw is None:
             data[key] = {}
+            continue
+        data[key] = project_fields(json_codec.loads(raw), STATIC_FIELDS[key])
+        print(f"[INFO] 已读取数据文件: {Path(data_manager.files[key]).name}")
     
     # 2. 准备内联数据 JavaScript 代码
-    inline_data_js = f"""
+    embedded = encode_static_data(data, embed)
+    if embed == 'gzip':
+        data_js = f"""
+    // 静态模式：数据以 gzip + base64 形式内联到 HTML 中，首次渲染时在浏览器中解压
+    const staticDataGzip = {embedded};
+    let staticData = null;
+    
+    async function loadStaticData() {{
+        if (staticData === null) {{
+            const bytes = Uint8Array.from(atob(staticDataGzip), c => c.charCodeAt(0));
+            const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+            staticData = JSON.parse(await new Response(stream).text());
+            staticData.last_updated = new Date().toLocaleTimeString('zh-CN', {{hour: '2-digit', minute: '2-digit', second: '2-digit'}});
+        }}
+        return staticData;
+    }}"""
+    else:
+        data_js = f"""
     // 静态模式：数据已内联到 HTML 中
-    const staticData = {{
-        project: {json.dumps(data['project'], ensure_ascii=False)},
-        app: {json.dumps(data['app'], ensure_ascii=False)},
-        test: {json.dumps(data['test'], ensure_ascii=False)},
-        last_updated: new Date().toLocaleTimeString('zh-CN', {{hour: '2-digit', minute: '2-digit', second: '2-digit'}})
-    }};
+    const staticData = {embedded};
+    staticData.last_updated = new Date().toLocaleTimeString('zh-CN', {{hour: '2-digit', minute: '2-digit', second: '2-digit'}});
+    
+    async function loadStaticData() {{
+        return staticData;
+    }}"""
+    inline_data_js = data_js + """
     
     // 刷新数据（静态模式直接使用内联数据，不支持实时刷新）
-    async function refreshData() {{
+    async function refreshData() {
         const btnIcon = document.getElementById('refresh-icon');
         if(btnIcon) btnIcon.classList.add('animate-spin');
         
-        try {{
+        try {
             // 静态模式：使用内联数据
+            const staticData = await loadStaticData();
             window.lastData = staticData;
             renderUI(staticData);
-        }} catch (e) {{
+        } catch (e) {
             console.error("Render failed", e);
-        }} finally {{
+        } finally {
             if(btnIcon) setTimeout(() => btnIcon.classList.remove('animate-spin'), 600);
-        }}
-    }}
+        }
+    }
     
     // 禁用自动刷新（静态模式无法实时更新数据）
     // setInterval(refreshData, 30000);
     """
     
-    # 3. 获取静态 HTML 模板（简化版，不含交互功能）
-    html_template = get_static_html_template()
+    # 3. 在 <head> 开头记录输入哈希，下次生成时只需读取文件开头即可比较
+    html_template = html_template.replace(
+        '<meta charset="UTF-8">', f'<meta charset="UTF-8">\n    <meta name="{STATIC_HASH_META}" content="{input_hash}">', 1)
     
     # 4. 插入内联数据到 HTML 中
     # 在 refreshData(); 之前插入 staticData 变量定义
@@ -1443,12 +3808,19 @@ def generate_static_html(data_manager, output_file):
     if marker in html_template:
         html_template = html_template.replace(marker, inline_data_js + "\n        " + marker)
     
-    # 5. 写入 HTML 文件
-    output_file_path = Path(output_file)
+    # 5. 写入 HTML 文件：先写临时文件再原子替换，浏览器或同步工具不会读到半个文件
     output_file_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    with open(output_file_path, 'w', encoding='utf-8') as f:
-        f.write(html_template)
+    fd, tmp_path = tempfile.mkstemp(dir=output_file_path.parent, prefix=f'.{output_file_path.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(html_template)
+        # mkstemp 创建的文件只有属主可读，生成的页面需要与普通文件一样可被他人读取
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, output_file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
     
     print(f"\n[OK] 静态 HTML 已生成: {output_file_path.absolute()}")
     print(f"[INFO] 可以直接用浏览器打开查看")
@@ -1458,55 +3830,569 @@ def generate_static_html(data_manager, output_file):
     return str(output_file_path.absolute())
 
 
-def main():
+def watch_static_html(data_manager, output_file, debounce=None, embed='json'):
+    """静态监听模式：数据文件变化后（合并 debounce 秒内的连续写入）重新生成静态页面
+
+    只复用 Web 模式的文件监听（inotify 或轮询），不加载数据管理器、也不建立集合索引：
+    生成静态页面时直接读取数据文件。被删除的数据文件同样算作变化，页面按缺失的文件重新生成；
+    输入哈希未变化的生成（例如只改动了文件时间）不会重写输出文件。
+    """
+    watcher = DataFileWatcher(data_manager, debounce=debounce)
+    watcher.remember_signatures()
+    generate_static_html(data_manager, output_file, embed)
+    print(f"[INFO] 监控中: {len(data_manager.files)} 个数据源（{watcher.backend}），按 Ctrl+C 停止")
+    try:
+        while True:
+            if not watcher.wait_for_changes(watcher.poll_interval):
+                continue
+            try:
+                generate_static_html(data_manager, output_file, embed)
+            except (OSError, ValueError) as e:
+                # 数据文件写到一半或内容不合法时保留上一次的输出，等待下一次变化
+                print(f"[WARNING] 重新生成失败: {e}")
+    except KeyboardInterrupt:
+        print("\n[INFO] 已停止监听")
+    finally:
+        watcher.close()
+
+
+def run_prefork_server(host, port, workers, files, compact=False):
+    """多进程（prefork）模式运行 Web 服务（仅支持 POSIX）
+
+    主进程绑定端口、监听数据文件并写出共享快照，然后 fork 出 workers 个工作进程；
+    每个工作进程在同一个监听套接字上以多线程方式处理请求，compact 为 True 时以紧凑格式落盘。
+    SIGHUP：重新读取数据文件并平滑替换全部工作进程；SIGINT/SIGTERM：停止服务。
+    """
     global data_manager
+    from werkzeug.serving import make_server
+
+    runtime_dir = tempfile.mkdtemp(prefix='cox-observability-')
+    snapshot_path = os.path.join(runtime_dir, 'snapshot.pickle')
+    lock_path = os.path.join(runtime_dir, 'write.lock')
+
+    publisher = SnapshotPublisher(files['project'], files['app'], files['test'], snapshot_path)
+    publisher.load_if_changed()
+    server = make_server(host, port, get_app(), threaded=True)
+    # 所有工作进程共享监听套接字，select 就绪后只有一个进程能 accept 成功；
+    # 阻塞套接字会让其余进程卡在 accept() 中，既无法处理后续请求也无法响应 SIGTERM
+    server.socket.setblocking(False)
+
+    def run_worker():
+        global data_manager
+        # 终端信号由主进程统一处理
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        data_manager = SnapshotReader(files['project'], files['app'], files['test'], snapshot_path, lock_path,
+                                      compact=compact)
+        data_manager.ensure_fresh()
+        stopping = threading.Event()
+
+        def stop(signum, frame):
+            stopping.set()
+            # shutdown() 会等待 serve_forever 退出，不能在主线程的信号处理函数中直接调用
+            threading.Thread(target=server.shutdown, daemon=True).start()
+
+        signal.signal(signal.SIGTERM, stop)
+        baseline = threading.active_count()
+        server.serve_forever()
+        # 等待在途请求完成（SSE 长连接会在超时后断开，浏览器会自动重连到新的工作进程）
+        deadline = time.monotonic() + WORKER_GRACEFUL_TIMEOUT
+        while threading.active_count() > baseline and time.monotonic() < deadline:
+            time.sleep(0.1)
+        os._exit(0)
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            try:
+                run_worker()
+            finally:
+                os._exit(1)
+        return pid
+
+    def spawn_workers(count):
+        """暂停文件监听后 fork 出 count 个工作进程，返回它们的 PID 集合
+
+        fork 出的子进程只保留调用 fork 的线程：监听线程若恰好持有 _reload_lock 等锁，
+        这些锁在子进程中将永远无法释放。因此 fork 前先停止并等待监听线程退出，
+        fork 完成后再重新启动（启动时会补上暂停期间的文件变化）。
+        """
+        publisher.stop_watching()
+        try:
+            return {spawn() for _ in range(count)}
+        finally:
+            publisher.start_watching()
+
+    events = []
+    signal.signal(signal.SIGHUP, lambda signum, frame: events.append('reload'))
+    signal.signal(signal.SIGTERM, lambda signum, frame: events.append('stop'))
+    signal.signal(signal.SIGINT, lambda signum, frame: events.append('stop'))
+
+    children = spawn_workers(workers)
+    print(f"[INFO] 已启动 {workers} 个工作进程（主进程 PID {os.getpid()}，发送 SIGHUP 可平滑重载）")
+
+    try:
+        while True:
+            if 'stop' in events:
+                break
+            if 'reload' in events:
+                events.clear()
+                print("[INFO] 收到 SIGHUP，重新加载数据并替换工作进程")
+                publisher.load_if_changed(force=set(files))
+                old_children, children = children, spawn_workers(workers)
+                for pid in old_children:
+                    os.kill(pid, signal.SIGTERM)
+            # 回收退出的工作进程；非主动替换导致的退出需要补充新进程
+            while True:
+                try:
+                    pid, _status = os.waitpid(-1, os.WNOHANG)
+                except ChildProcessError:
+                    break
+                if pid == 0:
+                    break
+                if pid in children:
+                    children.discard(pid)
+                    print(f"[WARNING] 工作进程 {pid} 意外退出，正在重新启动")
+                    children |= spawn_workers(1)
+            time.sleep(0.2)
+    finally:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in children:
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        publisher.stop_watching()
+        server.server_close()
+        shutil.rmtree(runtime_dir, ignore_errors=True)
+
+
+def parse_accept_encoding(header):
+    """解析 Accept-Encoding 请求头，返回 {内容编码: q 值}"""
+    qualities = {}
+    for part in (header or '').split(','):
+        coding, *params = [value.strip() for value in part.split(';')]
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.lower()] = quality
+    return qualities
+
+
+def etag_matches(header, etag):
+    """If-None-Match 请求头是否包含 etag（忽略弱校验前缀 W/）"""
+    for tag in (header or '').split(','):
+        tag = tag.strip()
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        if tag == '*' or tag.strip('"') == etag:
+            return True
+    return False
+
+
+def create_live_server(host, port, dev=False):
+    """创建 live 模式的 HTTP 服务器，只依赖标准库（未安装 Flask 时代替 Web 模式）
+
+    基于 http.server 的 ThreadingHTTPServer，每个连接一个线程，支持 HTTP/1.1 keep-alive。
+    提供首页、/api/data、/api/summary、/api/stream、更新接口和 /metrics，数据来自全局的 data_manager，
+    响应与 Web 模式一致：按 Accept-Encoding 返回预压缩的 gzip/br 响应体，支持 ETag/304 和增量补丁。
+    """
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+    from urllib.parse import urlsplit, parse_qs
+
+    class LiveRequestHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        server_version = 'CoxLive'
+        # 空闲的 keep-alive 连接超过该时间后关闭，释放处理线程
+        timeout = LIVE_KEEPALIVE_TIMEOUT
+        # 响应头和响应体分两次写出，关闭 Nagle 算法，避免与客户端的延迟确认相互等待
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            self.dispatch(get_routes)
+
+        def do_POST(self):
+            # 先读完请求体，无论路由是否存在，连接上的下一个请求都能正确解析
+            try:
+                length = int(self.headers.get('Content-Length') or 0)
+            except ValueError:
+                length = -1
+            if length < 0:
+                # 无法确定请求体的边界，也就无法解析连接上的下一个请求：更新接口返回 400（见 read_json），并关闭连接
+                self.body = None
+                self.close_connection = True
+            else:
+                self.body = self.rfile.read(length) if length > 0 else b''
+            self.dispatch(post_routes)
+
+        def log_request(self, code='-', size='-'):
+            # 不逐条打印访问日志（错误仍由 log_error 输出）
+            pass
+
+        def log_error(self, format, *args):
+            # 空闲的 keep-alive 连接超时关闭属于正常情况
+            if not format.startswith('Request timed out'):
+                super().log_error(format, *args)
+
+        def dispatch(self, routes):
+            """按路由规则分发请求，并与 Web 模式一样按路由规则统计请求数和耗时"""
+            started = time.perf_counter()
+            url = urlsplit(self.path)
+            self.query = parse_qs(url.query)
+            self.route = '/assets/<name>' if url.path.startswith('/assets/') else url.path
+            handler = routes.get(self.route)
+            if handler is not None:
+                try:
+                    status = handler(self, url.path)
+                except ConnectionError:
+                    # 客户端在响应发送完之前断开
+                    self.close_connection = True
+                    return
+                except Exception as e:
+                    self.log_error('%s %s 处理失败: %r', self.command, url.path, e)
+                    status = self.send_json({'success': False, 'error': str(e)}, 500)
+            elif self.route in get_routes or self.route in post_routes:
+                status = self.send_json({'success': False, 'error': f'不支持的请求方法: {self.command}'}, 405)
+            else:
+                self.route = 'unmatched'
+                status = self.send_json({'success': False, 'error': f'地址不存在: {url.path}'}, 404)
+            server_metrics.inc('cox_dashboard_requests_total', self.route, self.command, status)
+            server_metrics.observe('cox_dashboard_request_duration_seconds', time.perf_counter() - started,
+                                   self.route)
+
+        def send(self, status, body=b'', headers=None):
+            """发送完整响应（带 Content-Length，连接可继续复用），返回状态码"""
+            self.send_response(status)
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            if self.close_connection:
+                self.send_header('Connection', 'close')
+            if status in (204, 304):
+                self.end_headers()
+                return status
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            server_metrics.observe('cox_dashboard_response_size_bytes', len(body), self.route)
+            return status
+
+        def send_json(self, obj, status=200):
+            return self.send(status, json_codec.dumps(obj, compact=True), {'Content-Type': 'application/json'})
+
+        def arg(self, name):
+            values = self.query.get(name)
+            return values[0] if values else None
+
+        def negotiate_encoding(self):
+            """根据 Accept-Encoding 选择预压缩版本，优先 br，其次 gzip"""
+            qualities = parse_accept_encoding(self.headers.get('Accept-Encoding'))
+            for encoding in ('br', 'gzip'):
+                if encoding == 'br' and not BROTLI_AVAILABLE:
+                    continue
+                if qualities.get(encoding, qualities.get('*', 0)) > 0:
+                    return encoding
+            return 'identity'
+
+        def if_none_match(self, etag):
+            return etag_matches(self.headers.get('If-None-Match'), etag)
+
+        def send_cached(self, content, etag, content_type, encoding, cache_control):
+            """发送预压缩的静态内容（首页或离线资源），If-None-Match 命中时返回 304"""
+            headers = {'Cache-Control': cache_control, 'Vary': 'Accept-Encoding', 'ETag': f'"{etag}"'}
+            if self.if_none_match(etag):
+                return self.send(304, headers=headers)
+            headers['Content-Type'] = content_type
+            if encoding != 'identity':
+                headers['Content-Encoding'] = encoding
+            return self.send(200, content, headers)
+
+        def index(self, path):
+            page = get_dashboard_page(dev)
+            encoding = self.negotiate_encoding()
+            etag = page['etag'] if encoding == 'identity' else f"{page['etag']}-{encoding}"
+            return self.send_cached(page[encoding], etag, 'text/html; charset=utf-8', encoding, 'no-cache')
+
+        def favicon(self, path):
+            return self.send(204)
+
+        def dashboard_asset(self, path):
+            """页面离线资源；地址带内容版本号（?v=），因此可按 immutable 长期缓存"""
+            name = path[len('/assets/'):]
+            if name not in DASHBOARD_ASSETS:
+                return self.send(404)
+            asset = load_dashboard_assets()[name]
+            encoding = self.negotiate_encoding()
+            if encoding not in asset:
+                asset[encoding] = compress_payload(asset['content'], encoding)
+            etag = asset['version'] if encoding == 'identity' else f"{asset['version']}-{encoding}"
+            return self.send_cached(asset[encoding], etag, DASHBOARD_ASSETS[name], encoding,
+                                    f'public, max-age={ASSET_MAX_AGE}, immutable')
+
+        def get_data(self, path):
+            data_manager.ensure_fresh()
+            status, headers, body = data_response(data_manager, self.negotiate_encoding(), self.arg('since'),
+                                                  self.if_none_match)
+            return self.send(status, body, headers)
+
+        def get_summary(self, path):
+            data_manager.ensure_fresh()
+            snapshot = data_manager.snapshot
+            headers = {'Cache-Control': 'no-cache'}
+            if snapshot.etag:
+                headers['X-Data-Version'] = snapshot.etag
+                headers['ETag'] = f'"{snapshot.etag}"'
+                if self.if_none_match(snapshot.etag):
+                    return self.send(304, headers=headers)
+            headers['Content-Type'] = 'application/json'
+            return self.send(200, snapshot.summary(), headers)
+
+        def stream_data(self, path):
+            """SSE 推送通道：事件流没有长度，发送完毕（客户端断开）后关闭连接"""
+            self.close_connection = True
+            self.send_response(200)
+            for key, value in (('Content-Type', 'text/event-stream'), ('Cache-Control', 'no-cache'),
+                               ('X-Accel-Buffering', 'no'), ('Connection', 'close')):
+                self.send_header(key, value)
+            self.end_headers()
+            try:
+                for event in sse_events(data_manager, self.headers.get('Last-Event-ID')):
+                    self.wfile.write(event)
+            except OSError:
+                # 客户端断开连接
+                pass
+            return 200
+
+        def metrics(self, path):
+            body = server_metrics.render().encode('utf-8')
+            return self.send(200, body, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'})
+
+        def read_json(self):
+            """解析请求体 JSON，请求体为空时返回 None；Content-Length 不合法或 JSON 格式错误时抛出 ValueError"""
+            if self.body is None:
+                raise ValueError('Content-Length 不合法')
+            try:
+                return json_codec.loads(self.body) if self.body.strip() else None
+            except ValueError as e:
+                raise ValueError(f'请求体不是合法的 JSON: {e}') from None
+
+        def update_module_status(self, path):
+            return self.apply_single_update('module')
+
+        def update_assumption_status(self, path):
+            return self.apply_single_update('assumption')
+
+        def apply_single_update(self, kind):
+            try:
+                item = self.read_json()
+            except ValueError as e:
+                return self.send_json({'success': False, 'error': str(e)}, 400)
+            if not isinstance(item, dict):
+                return self.send_json({'success': False, 'error': '请求体必须是 JSON 对象'}, 400)
+            return self.send_json(apply_update(data_manager, dict(item, type=kind)))
+
+        def update_batch(self, path):
+            try:
+                data = self.read_json()
+            except ValueError as e:
+                return self.send_json({'success': False, 'applied': False, 'error': str(e), 'results': []}, 400)
+            if not isinstance(data, (dict, list)):
+                return self.send_json({'success': False, 'applied': False, 'error': '请求体必须是 JSON 对象或数组',
+                                       'results': []}, 400)
+            return self.send_json(apply_batch_update(data_manager, data))
+
+    get_routes = {
+        '/': LiveRequestHandler.index,
+        '/favicon.ico': LiveRequestHandler.favicon,
+        '/assets/<name>': LiveRequestHandler.dashboard_asset,
+        '/api/data': LiveRequestHandler.get_data,
+        '/api/summary': LiveRequestHandler.get_summary,
+        '/api/stream': LiveRequestHandler.stream_data,
+        '/metrics': LiveRequestHandler.metrics,
+    }
+    post_routes = {
+        '/api/update/module': LiveRequestHandler.update_module_status,
+        '/api/update/assumption': LiveRequestHandler.update_assumption_status,
+        '/api/update/batch': LiveRequestHandler.update_batch,
+    }
+
+    class LiveServer(ThreadingHTTPServer):
+        # SSE 长连接的处理线程不阻止进程退出
+        daemon_threads = True
+        request_queue_size = LIVE_REQUEST_QUEUE_SIZE
+
+    return LiveServer((host, port), LiveRequestHandler)
+
+
+def raise_keyboard_interrupt(signum, frame):
+    """SIGTERM（docker stop、systemd 等）按 Ctrl+C 处理：服务器正常退出，并把待写入的修改落盘"""
+    raise KeyboardInterrupt
+
+
+def main():
+    global data_manager, project_registry, request_profiler
+
+    # 修复 Windows 编码问题（只在作为脚本运行时调整，导入本模块不会替换 sys.stdout）
+    if hasattr(sys.stdout, 'reconfigure'):
+        sys.stdout.reconfigure(encoding='utf-8')
     
     parser = argparse.ArgumentParser(
-        description='Modern Observability Dashboard - 静态/Web 两种模式',
-        epilog='示例:\n  静态模式: python run_web_observability.py --mode static --project project.json --app app.json --test test.json --output observability.html\n  Web 模式: python run_web_observability.py --mode web --project project.json --app app.json --test test.json',
+        description='Modern Observability Dashboard - 静态/Web/Live 三种模式',
+        epilog='示例:\n  静态模式: python run_web_observability.py --mode static --project project.json --app app.json --test test.json --output observability.html\n  Web 模式: python run_web_observability.py --mode web --project project.json --app app.json --test test.json\n  Live 模式: python run_web_observability.py --mode live --project project.json --app app.json --test test.json',
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
     
-    parser.add_argument('--project', required=True, help='项目数据文件路径')
-    parser.add_argument('--app', required=True, help='应用状态文件路径')
-    parser.add_argument('--test', required=True, help='测试指标文件路径')
-    parser.add_argument('--mode', choices=['static', 'web'], default='static',
-                       help='运行模式: static=生成静态HTML（无需Flask）, web=启动Web服务器（需要Flask）')
+    parser.add_argument('--project', help='项目数据文件路径')
+    parser.add_argument('--app', help='应用状态文件路径')
+    parser.add_argument('--test', help='测试指标文件路径')
+    parser.add_argument('--mode', choices=['static', 'web', 'live'], default='static',
+                       help='运行模式: static=生成静态HTML（无需Flask）, web=启动Web服务器（需要Flask）, '
+                            'live=启动标准库实现的服务器（无需Flask，支持实时刷新和更新操作）')
     parser.add_argument('--output', default='observability.html',
                        help='静态模式下的输出文件路径（默认: observability.html）')
-    parser.add_argument('--host', default='127.0.0.1', help='Web 模式下的服务器地址')
-    parser.add_argument('--port', type=int, default=5000, help='Web 模式下的服务器端口')
+    parser.add_argument('--embed', choices=['json', 'gzip'], default='json',
+                       help='静态模式下内联数据的方式: json=JS 对象字面量, gzip=gzip+base64，在浏览器中解压（适合大型项目，'
+                            '需要支持 DecompressionStream 的浏览器）')
+    parser.add_argument('--watch', action='store_true',
+                       help='静态模式下持续监听数据文件，变化后自动重新生成（输入未变化时不重写输出文件）')
+    parser.add_argument('--debounce', type=int, default=int(WATCH_DEBOUNCE * 1000),
+                       help=f'--watch 时合并连续写入的静默时间（毫秒，默认: {int(WATCH_DEBOUNCE * 1000)}）')
+    parser.add_argument('--host', default='127.0.0.1', help='Web/Live 模式下的服务器地址')
+    parser.add_argument('--port', type=int, default=5000, help='Web/Live 模式下的服务器端口')
+    parser.add_argument('--flush-interval', type=int, default=int(WRITE_FLUSH_INTERVAL * 1000),
+                       help='Web/Live 模式下更新操作合并落盘的最长间隔（毫秒，默认: 200；prefork 模式下立即落盘）')
+    parser.add_argument('--compact', action='store_true',
+                       help='Web/Live 模式下更新操作以紧凑格式（不缩进）写回数据文件，大文件写入更快、体积更小')
+    parser.add_argument('--server', choices=['dev', 'prefork'], default='dev',
+                       help='Web 模式下的服务器: dev=单进程多线程, prefork=多进程（仅 Linux/macOS）')
+    parser.add_argument('--dev', action='store_true',
+                       help='Web/Live 模式下的开发模式：每次请求重新渲染首页，不使用页面缓存')
+    parser.add_argument('--workers', type=int, default=max(2, os.cpu_count() or 1),
+                       help='prefork 服务器的工作进程数（默认: CPU 核数，至少 2）')
+    parser.add_argument('--profile', action='store_true',
+                       help='Web 模式下的剖析模式：记录最近请求的耗时并抽样用 cProfile 剖析，结果见 /debug/profile')
+    parser.add_argument('--profile-rate', type=int, default=PROFILE_SAMPLE_RATE,
+                       help=f'剖析模式下每多少个请求剖析一次（默认: {PROFILE_SAMPLE_RATE}，1 表示每个请求都剖析）')
+    parser.add_argument('--projects-dir',
+                       help='Web 模式下的多项目目录：每个子目录包含 project_data.json、app_status.json、test_metrics.json，'
+                            '通过 /p/<子目录名>/ 访问')
+    parser.add_argument('--manifest',
+                       help='Web 模式下的多项目清单（JSON）：{"项目名": {"project": ..., "app": ..., "test": ...}}')
+    parser.add_argument('--cache-memory', type=int, default=PROJECT_CACHE_MEMORY,
+                       help=f'多项目模式下已加载项目的估算内存上限（MB，默认: {PROJECT_CACHE_MEMORY}），超出时卸载最久未访问的项目')
     
     args = parser.parse_args()
+    if args.mode == 'live' and (args.projects_dir or args.manifest):
+        parser.error('live 模式暂不支持多项目，请使用 --mode web')
 
-    # 验证文件
-    for f in [args.project, args.app, args.test]:
-        if not os.path.exists(f):
-            print(f"[ERROR] 文件不存在: {f}")
-            exit(1)
-
-    data_manager = ObservabilityData(args.project, args.app, args.test)
+    multi_project = args.mode == 'web' and (args.projects_dir or args.manifest)
+    single_files = [args.project, args.app, args.test]
+    if any(single_files) or not multi_project:
+        if not all(single_files):
+            parser.error('需要同时指定 --project、--app 和 --test（Web 模式下也可以改用 --projects-dir 或 --manifest）')
+        # 验证文件
+        for f in single_files:
+            if not os.path.exists(f):
+                print(f"[ERROR] 文件不存在: {f}")
+                exit(1)
+        data_manager = ObservabilityData(args.project, args.app, args.test)
+        data_manager.writer.flush_interval = args.flush_interval / 1000
+        data_manager.writer.compact = args.compact
+    if multi_project:
+        for path in [args.projects_dir, args.manifest]:
+            if path and not os.path.exists(path):
+                print(f"[ERROR] 文件不存在: {path}")
+                exit(1)
+        project_registry = ProjectRegistry(args.projects_dir, args.manifest,
+                                           memory_limit=args.cache_memory * 1024 * 1024,
+                                           flush_interval=args.flush_interval / 1000,
+                                           compact=args.compact)
 
     if args.mode == 'static':
         # 静态模式：生成静态 HTML
         print("\n[INFO] 运行模式: 静态生成")
         print("[INFO] 正在生成静态 HTML 文件...")
-        generate_static_html(data_manager, args.output)
+        if args.watch:
+            watch_static_html(data_manager, args.output, debounce=args.debounce / 1000, embed=args.embed)
+        else:
+            generate_static_html(data_manager, args.output, args.embed)
         
     elif args.mode == 'web':
         # Web 模式：启动 Flask 服务器
         if not FLASK_AVAILABLE:
             print("\n[ERROR] Web 模式需要 Flask，但未检测到 Flask 安装")
             print("[INFO] 请先安装 Flask: pip install flask")
-            print("[INFO] 或者使用静态模式: --mode static")
+            print("[INFO] 或者使用无需 Flask 的 live 模式: --mode live，或静态模式: --mode static")
             exit(1)
         
         print("\n[INFO] 运行模式: Web 交互")
         print(f"[INFO] 本地地址: http://{args.host}:{args.port}")
-        print(f"[INFO] 监控中: {len(data_manager.files)} 个数据源")
+        app = get_app()
+        app.config['DASHBOARD_DEV'] = args.dev
+        if args.profile:
+            request_profiler = RequestProfiler(args.profile_rate)
+            print(f"[INFO] 剖析模式: 每 {request_profiler.sample_rate} 个请求剖析一次，结果见 /debug/profile")
+        # 启动时预先渲染首页（prefork 模式下工作进程直接继承）
+        get_dashboard_page(args.dev)
+        if args.server == 'prefork':
+            if project_registry is not None:
+                print("[ERROR] prefork 服务器暂不支持多项目模式，请使用 --server dev")
+                exit(1)
+            if not hasattr(os, 'fork'):
+                print("[ERROR] prefork 服务器需要 os.fork，当前平台不支持，请使用 --server dev")
+                exit(1)
+            print("[INFO] 按 Ctrl+C 停止服务器\n")
+            run_prefork_server(args.host, args.port, args.workers, data_manager.files, compact=args.compact)
+            return
+        if data_manager is not None:
+            watcher = data_manager.start_watching()
+            print(f"[INFO] 监控中: {len(data_manager.files)} 个数据源（{watcher.backend}）")
+        if project_registry is not None:
+            print(f"[INFO] 多项目模式: {len(project_registry.names())} 个项目，通过 /p/<项目名>/ 访问（按需加载）")
         print("[INFO] 按 Ctrl+C 停止服务器\n")
         
-        app.run(host=args.host, port=args.port, debug=False, threaded=True)
+        signal.signal(signal.SIGTERM, raise_keyboard_interrupt)
+        try:
+            app.run(host=args.host, port=args.port, debug=False, threaded=True)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            # 不依赖落盘定时器：退出前显式写出尚未落盘的修改
+            if data_manager is not None:
+                data_manager.stop_watching()
+                data_manager.writer.flush()
+            if project_registry is not None:
+                project_registry.close()
+
+    elif args.mode == 'live':
+        # Live 模式：标准库 HTTP 服务器，不需要 Flask
+        print("\n[INFO] 运行模式: Live（标准库服务器，无需 Flask）")
+        print(f"[INFO] 本地地址: http://{args.host}:{args.port}")
+        get_dashboard_page(args.dev)
+        server = create_live_server(args.host, args.port, dev=args.dev)
+        watcher = data_manager.start_watching()
+        print(f"[INFO] 监控中: {len(data_manager.files)} 个数据源（{watcher.backend}）")
+        print("[INFO] 按 Ctrl+C 停止服务器\n")
+
+        signal.signal(signal.SIGTERM, raise_keyboard_interrupt)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            data_manager.stop_watching()
+            data_manager.writer.flush()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+JSON 编解码模块
+
+各脚本读写数据文件的统一入口：安装了 orjson 或 msgspec 时使用它们（通常快数倍），
+否则使用标准库 json。输出格式与 json.dumps(..., ensure_ascii=False, indent=2) 相同：
+UTF-8 编码、不转义非 ASCII 字符、缩进两格；compact=True 时不缩进、不加空格。
+但并非逐字节一致：快速后端对部分浮点数的写法不同（如 orjson 把 1e-05 写为 0.00001、1e+20 写为 1e20），
+解析出的值相同。需要与标准库逐字节一致时请指定 json 后端。
+NaN 和 ±Infinity 与标准库一样写为 NaN、Infinity（快速后端会把它们静默写成 null，因此这种数据交给标准库输出）。
+
+环境变量 COX_JSON_BACKEND 可指定后端（orjson、msgspec 或 json），便于排查问题。
+注意：orjson 会把超出 64 位的整数解析为浮点数，需要精确大整数时请指定 json 后端。
+"""
+
+import os
+import json
+import math
+
+JSONDecodeError = json.JSONDecodeError
+
+
+def _json_loads(data):
+    return json.loads(data)
+
+
+def _json_dumps(obj, compact=False):
+    if compact:
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def _has_non_finite(obj):
+    """obj 中是否含有 NaN 或 ±Infinity"""
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, float):
+            if not math.isfinite(item):
+                return True
+        elif isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+    return False
+
+
+def _check_finite(obj, raw):
+    """快速后端把 NaN、±Infinity 静默写成 null：输出中有 null 时才逐项检查，含有这些值时抛出 ValueError"""
+    if b'null' in raw and _has_non_finite(obj):
+        raise ValueError('NaN 和 Infinity 需要由标准库 json 输出')
+    return raw
+
+
+# 可用的后端：名称 -> (loads, dumps)
+BACKENDS = {'json': (_json_loads, _json_dumps)}
+
+try:
+    import orjson
+
+    def _orjson_dumps(obj, compact=False):
+        # 与标准库一致：非字符串的键转换为字符串
+        option = orjson.OPT_NON_STR_KEYS if compact else orjson.OPT_NON_STR_KEYS | orjson.OPT_INDENT_2
+        return _check_finite(obj, orjson.dumps(obj, option=option))
+
+    BACKENDS['orjson'] = (orjson.loads, _orjson_dumps)
+except ImportError:
+    pass
+
+try:
+    import msgspec
+
+    _msgspec_encoder = msgspec.json.Encoder()
+    _msgspec_decoder = msgspec.json.Decoder()
+
+    def _msgspec_loads(data):
+        try:
+            return _msgspec_decoder.decode(data)
+        except msgspec.DecodeError as e:
+            raise JSONDecodeError(str(e), data if isinstance(data, str) else '', 0) from e
+
+    def _msgspec_dumps(obj, compact=False):
+        raw = _check_finite(obj, _msgspec_encoder.encode(obj))
+        return raw if compact else msgspec.json.format(raw, indent=2)
+
+    BACKENDS['msgspec'] = (_msgspec_loads, _msgspec_dumps)
+except ImportError:
+    pass
+
+BACKEND = os.environ.get('COX_JSON_BACKEND') or next(
+    name for name in ('orjson', 'msgspec', 'json') if name in BACKENDS)
+if BACKEND not in BACKENDS:
+    raise ImportError(f"JSON 后端不可用: {BACKEND}（可用: {', '.join(BACKENDS)}）")
+_loads, _dumps = BACKENDS[BACKEND]
+
+
+def loads(data):
+    """
+    解析 JSON
+
+    Args:
+        data: JSON 文本（str 或 UTF-8 编码的 bytes）
+
+    Returns:
+        解析后的对象；格式错误时抛出 JSONDecodeError
+    """
+    try:
+        return _loads(data)
+    except ValueError:
+        if _loads is _json_loads:
+            raise
+        # 快速后端不接受的写法（NaN、Infinity 等）交给标准库，真正的格式错误由标准库报告
+        return _json_loads(data)
+
+
+def dumps(obj, compact=False):
+    """
+    序列化为 JSON
+
+    Args:
+        obj: 要序列化的对象
+        compact: 为 True 时输出紧凑格式，否则缩进两格
+
+    Returns:
+        bytes: UTF-8 编码的 JSON
+    """
+    try:
+        return _dumps(obj, compact)
+    except (TypeError, ValueError, OverflowError):
+        if _dumps is _json_dumps:
+            raise
+        # 快速后端不支持的类型（超出 64 位的整数、NaN 和 Infinity 等）交给标准库
+        return _json_dumps(obj, compact)
+
+
+def load_file(path):
+    """读取并解析 JSON 文件"""
+    with open(path, 'rb') as f:
+        return loads(f.read())
+
+
+def dump_file(obj, path, compact=False):
+    """把对象写入 JSON 文件"""
+    with open(path, 'wb') as f:
+        f.write(dumps(obj, compact))
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark: JSON Codec Backends on Large Data Files
+
+Benchmark Objectives:
+1. Generate a synthetic project data file of about 10 MB (the size of a large real project)
+2. Measure loads, indented dumps and compact dumps for every available backend of shared/json_codec
+3. Report median time and the speedup of each backend relative to the standard library
+
+Usage:
+    python tests/benchmark_json_codec.py
+    python tests/benchmark_json_codec.py --size-mb 50 --repeat 3
+
+Install orjson or msgspec to compare them with the standard library:
+    pip install orjson msgspec
+"""
+
+import sys
+import time
+import argparse
+import statistics
+from pathlib import Path
+
+# Add project root and shared directories to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'shared'))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import json_codec
+from benchmark_web_observability import make_dataset
+
+# Tasks in the sample used to estimate how many tasks make up the requested file size
+SAMPLE_TASKS = 1000
+
+
+def make_document(size_mb, seed=0):
+    """Generate project data whose indented JSON is about size_mb megabytes"""
+    sample = json_codec.BACKENDS['json'][1](make_dataset(SAMPLE_TASKS, seed)['project'])
+    task_count = max(SAMPLE_TASKS, round(size_mb * 1024 * 1024 / len(sample) * SAMPLE_TASKS))
+    return make_dataset(task_count, seed)['project'], task_count
+
+
+def time_call(run, repeat):
+    """Return the median time of repeat calls to run()"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def run_benchmarks(document, repeat):
+    """Time every backend, return {backend: {operation: seconds}}"""
+    raw = json_codec.BACKENDS['json'][1](document)
+    results = {}
+    for name, (loads, dumps) in json_codec.BACKENDS.items():
+        # Every backend has to produce the same file as the standard library
+        if dumps(document) != raw or loads(raw) != document:
+            raise AssertionError(f'{name} output differs from the standard library')
+        results[name] = {
+            'loads': time_call(lambda: loads(raw), repeat),
+            'dumps_indent': time_call(lambda: dumps(document), repeat),
+            'dumps_compact': time_call(lambda: dumps(document, True), repeat)
+        }
+    return results, len(raw), len(json_codec.BACKENDS['json'][1](document, True))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the JSON codec backends on a large data file')
+    parser.add_argument('--size-mb', type=float, default=10, help='Approximate size of the data file (default: 10)')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per operation (default: 5)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed of the synthetic data')
+    args = parser.parse_args()
+
+    document, task_count = make_document(args.size_mb, args.seed)
+    results, indent_size, compact_size = run_benchmarks(document, args.repeat)
+    print(f'[INFO] {task_count} tasks: {indent_size / 1024 / 1024:.1f} MB indented, '
+          f'{compact_size / 1024 / 1024:.1f} MB compact')
+    print(f"[INFO] Default backend: {json_codec.BACKEND} (available: {', '.join(results)})")
+
+    baseline = results['json']
+    for operation in baseline:
+        print(f'\n{operation}')
+        for name, timings in results.items():
+            speedup = baseline[operation] / timings[operation]
+            print(f'  {name:<10} {timings[operation] * 1000:10.1f} ms {speedup:6.1f}x')
+
+
+if __name__ == '__main__':
+    main()
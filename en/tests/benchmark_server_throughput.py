@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Benchmark: HTTP Throughput of Live Mode (stdlib server) and Web Mode (Flask)
+
+Benchmark Objectives:
+1. Start run_web_observability.py in each mode as a separate process on a synthetic dataset
+2. Drive /, /api/data (gzip), /api/data (304) and /api/summary from several client processes,
+   each reusing one HTTP connection when the server keeps it alive
+3. Report requests per second and mean latency per mode, and live mode relative to web mode
+
+Usage:
+    python tests/benchmark_server_throughput.py
+    python tests/benchmark_server_throughput.py --tasks 10000 --clients 8 --duration 5
+
+Web mode is skipped when Flask is not installed.
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import tempfile
+import subprocess
+import http.client
+from multiprocessing import Pool
+from pathlib import Path
+
+# Add project root and tests directories to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from cox.scripts import run_web_observability as observability
+from benchmark_web_observability import write_dataset
+
+SCRIPT = Path(__file__).parent.parent / 'cox' / 'scripts' / 'run_web_observability.py'
+# Requests of each scenario: (method, path, headers); the 304 scenario fills in the current ETag
+SCENARIOS = {
+    'index': ('GET', '/', {'Accept-Encoding': 'gzip'}),
+    'api_data_gzip': ('GET', '/api/data', {'Accept-Encoding': 'gzip'}),
+    'api_data_304': ('GET', '/api/data', {'Accept-Encoding': 'gzip'}),
+    'api_summary': ('GET', '/api/summary', {}),
+}
+STARTUP_TIMEOUT = 30
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(mode, files, port):
+    """Start the dashboard in mode and wait until it accepts connections"""
+    project, app, test = files
+    process = subprocess.Popen([sys.executable, str(SCRIPT), '--mode', mode, '--port', str(port),
+                                '--project', project, '--app', app, '--test', test],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f'{mode} server did not start within {STARTUP_TIMEOUT} s')
+
+
+def run_client(job):
+    """Send requests over one connection for duration seconds, return (requests, reconnects)"""
+    port, method, path, headers, duration = job
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    requests = connects = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        if connection.sock is None:
+            connects += 1
+        connection.request(method, path, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        if response.status not in (200, 304):
+            raise RuntimeError(f'{path} returned {response.status}')
+        requests += 1
+    connection.close()
+    return requests, connects
+
+
+def measure(port, scenario, clients, duration):
+    method, path, headers = SCENARIOS[scenario]
+    if scenario == 'api_data_304':
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+        connection.request(method, path, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        headers = dict(headers, **{'If-None-Match': response.getheader('ETag')})
+        connection.close()
+    with Pool(clients) as pool:
+        results = pool.map(run_client, [(port, method, path, headers, duration)] * clients)
+    requests = sum(count for count, _ in results)
+    connects = sum(count for _, count in results)
+    return {
+        'requests_per_s': requests / duration,
+        'mean_latency_ms': clients * duration / requests * 1000 if requests else None,
+        'connections_per_request': connects / requests if requests else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare HTTP throughput of live mode and web mode')
+    parser.add_argument('--tasks', type=int, default=1000, help='Tasks in the synthetic dataset (default: 1000)')
+    parser.add_argument('--clients', type=int, default=max(2, os.cpu_count() or 1),
+                        help='Concurrent client processes (default: CPU count, at least 2)')
+    parser.add_argument('--duration', type=float, default=3, help='Seconds per scenario (default: 3)')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='Comma-separated scenarios (default: all)')
+    parser.add_argument('--output', help='Write results to this JSON file')
+    args = parser.parse_args()
+
+    scenarios = [name for name in args.scenarios.split(',') if name]
+    modes = ['live'] + (['web'] if observability.FLASK_AVAILABLE else [])
+    if 'web' not in modes:
+        print('[INFO] Flask not installed, web mode skipped')
+    print(f'[INFO] {args.tasks} tasks, {args.clients} clients, {args.duration:g} s per scenario')
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        files = write_dataset(workdir, args.tasks)
+        for mode in modes:
+            port = free_port()
+            process = start_server(mode, files, port)
+            try:
+                results[mode] = {scenario: measure(port, scenario, args.clients, args.duration)
+                                 for scenario in scenarios}
+            finally:
+                process.terminate()
+                process.wait()
+
+    print(f"\n{'scenario':<16} {'mode':<6} {'req/s':>10} {'latency':>12} {'conn/req':>9}")
+    for scenario in scenarios:
+        for mode in modes:
+            result = results[mode][scenario]
+            relative = ''
+            if mode == 'live' and 'web' in results:
+                relative = f"  {result['requests_per_s'] / results['web'][scenario]['requests_per_s']:.1f}x web"
+            print(f"{scenario:<16} {mode:<6} {result['requests_per_s']:10.0f} "
+                  f"{result['mean_latency_ms']:9.2f} ms {result['connections_per_request']:9.2f}{relative}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'tasks': args.tasks, 'clients': args.clients, 'duration': args.duration,
+                       'results': results}, f, indent=2)
+        print(f'[OK] Results written to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
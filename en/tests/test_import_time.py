@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Unit Test: Startup Cost of run_web_observability
+
+Test Objectives:
+1. Importing the script does not import Flask or replace sys.stdout
+2. Static mode generates the page without ever importing Flask
+3. Import time measured with `python -X importtime` stays within the budget
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+import subprocess
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+SCRIPT = PROJECT_ROOT / 'cox' / 'scripts' / 'run_web_observability.py'
+MODULE = 'cox.scripts.run_web_observability'
+
+# Cumulative import time budget of the module in milliseconds (warm bytecode cache);
+# importing Flask alone costs more than this
+IMPORT_TIME_BUDGET_MS = 100
+
+
+class TestImportTime(unittest.TestCase):
+    """Test startup cost of the dashboard script"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        # Measure with a bytecode cache, as in normal use, without writing into the source tree
+        self.env = dict(os.environ, PYTHONPYCACHEPREFIX=os.path.join(self.temp_dir, 'pycache'))
+        self.env.pop('PYTHONDONTWRITEBYTECODE', None)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def run_python(self, *args):
+        result = subprocess.run([sys.executable, *args], cwd=PROJECT_ROOT, env=self.env,
+                                capture_output=True, text=True, timeout=60)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        return result
+
+    def test_import_has_no_side_effects(self):
+        """Importing the module leaves Flask unloaded and sys.stdout untouched"""
+        code = (f"import sys; stdout = sys.stdout; import {MODULE}; "
+                "print('flask' in sys.modules, sys.stdout is stdout)")
+        self.assertEqual(self.run_python('-c', code).stdout.split(), ['False', 'True'])
+
+    def test_static_mode_does_not_import_flask(self):
+        """Static generation through main() never imports Flask"""
+        files = []
+        for name in ('project', 'app', 'test'):
+            path = os.path.join(self.temp_dir, f'{name}.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({'project_name': 'Import Test', 'iterations': [], 'modules': []}, f)
+            files += [f'--{name}', path]
+        output = os.path.join(self.temp_dir, 'observability.html')
+        argv = [str(SCRIPT), '--mode', 'static', *files, '--output', output]
+        code = (f"import sys, runpy; sys.argv = {argv!r}; runpy.run_path(sys.argv[0], run_name='__main__'); "
+                "print('FLASK', 'flask' in sys.modules)")
+        result = self.run_python('-c', code)
+        self.assertTrue(os.path.exists(output), "Static web page file not generated")
+        self.assertIn('FLASK False', result.stdout)
+
+    def test_import_time_budget(self):
+        """Cumulative import time reported by -X importtime stays within the budget"""
+        self.run_python('-c', f'import {MODULE}')  # warm up the bytecode cache
+        timings = []
+        for _ in range(3):
+            stderr = self.run_python('-X', 'importtime', '-c', f'import {MODULE}').stderr
+            line = next(line for line in stderr.splitlines() if line.rstrip().endswith(f'| {MODULE}'))
+            timings.append(int(line.split('|')[1]) / 1000)
+        best = min(timings)
+        print(f"\nImport time of {MODULE}: {best:.1f} ms (budget {IMPORT_TIME_BUDGET_MS} ms)")
+        self.assertLess(best, IMPORT_TIME_BUDGET_MS, f"Import took {best:.1f} ms")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Unit Test: JSON Codec Backends (shared/json_codec.py)
+
+Test Objectives:
+1. Every available backend (json, orjson, msgspec) round-trips data files, indented and compact
+2. NaN and ±Infinity are written as NaN/Infinity like the standard library, never silently as null
+3. Values a fast backend cannot write or read fall back to the standard library, real errors still raise
+4. COX_JSON_BACKEND selects the backend, an unavailable backend fails at import
+"""
+
+import os
+import sys
+import math
+import subprocess
+import tempfile
+import shutil
+import unittest
+from unittest import mock
+from contextlib import contextmanager
+from pathlib import Path
+
+SHARED_DIR = Path(__file__).parent.parent / 'shared'
+
+# Add shared directory to Python path
+sys.path.insert(0, str(SHARED_DIR))
+
+import json_codec
+
+DOCUMENT = {
+    'project_name': '支付系统',
+    'iterations': [
+        {'iteration_id': 'ITER-1', 'progress': 0.625, 'tasks': [
+            {'task_id': 'TASK-1', 'done': True, 'owner': None, 'hours': 12},
+        ]},
+    ],
+    'tags': [],
+}
+
+
+class TestJsonCodec(unittest.TestCase):
+    """Test each backend through the json_codec entry points"""
+
+    @staticmethod
+    def backends():
+        """Names of the installed backends"""
+        return [name for name in ('json', 'orjson', 'msgspec') if name in json_codec.BACKENDS]
+
+    @contextmanager
+    def backend(self, name):
+        """Route json_codec.loads/dumps to backend name inside its own subtest"""
+        loads, dumps = json_codec.BACKENDS[name]
+        with self.subTest(backend=name), mock.patch.object(json_codec, '_loads', loads), \
+                mock.patch.object(json_codec, '_dumps', dumps):
+            yield
+
+    def test_round_trip(self):
+        """Indented and compact output parse back to the same data, non-ASCII text is not escaped"""
+        for name in self.backends():
+            with self.backend(name):
+                indented = json_codec.dumps(DOCUMENT)
+                compact = json_codec.dumps(DOCUMENT, compact=True)
+                self.assertIsInstance(indented, bytes)
+                self.assertEqual(json_codec.loads(indented), DOCUMENT)
+                self.assertEqual(json_codec.loads(compact.decode('utf-8')), DOCUMENT)
+                self.assertIn('支付系统'.encode('utf-8'), compact)
+                self.assertIn(b'\n  "project_name": ', indented)
+                self.assertNotIn(b'\n', compact)
+                self.assertNotIn(b': ', compact)
+
+    def test_file_round_trip(self):
+        """dump_file and load_file write and read the same data"""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        path = os.path.join(temp_dir, 'data.json')
+        for name in self.backends():
+            with self.backend(name):
+                json_codec.dump_file(DOCUMENT, path)
+                self.assertEqual(json_codec.load_file(path), DOCUMENT)
+
+    def test_non_finite_floats(self):
+        """NaN and ±Infinity are written like the standard library does and read back"""
+        data = {'rate': float('nan'), 'limits': [float('inf'), float('-inf'), None, 1.5]}
+        expected = json_codec.BACKENDS['json'][1](data, True)
+        self.assertEqual(expected, b'{"rate":NaN,"limits":[Infinity,-Infinity,null,1.5]}')
+        for name in self.backends():
+            with self.backend(name):
+                self.assertEqual(json_codec.dumps(data, compact=True), expected)
+                self.assertEqual(json_codec.dumps(data), json_codec.BACKENDS['json'][1](data))
+                parsed = json_codec.loads(expected)
+                self.assertTrue(math.isnan(parsed['rate']))
+                self.assertEqual(parsed['limits'], [float('inf'), float('-inf'), None, 1.5])
+                # Genuine nulls are still written by the backend itself
+                self.assertEqual(json_codec.loads(json_codec.dumps({'owner': None})), {'owner': None})
+
+    def test_fallback_and_errors(self):
+        """Integers beyond 64 bits fall back to the standard library, malformed JSON and unknown types raise"""
+        big = {'id': 2 ** 70}
+        for name in self.backends():
+            with self.backend(name):
+                self.assertEqual(json_codec.dumps(big, compact=True), b'{"id":1180591620717411303424}')
+                self.assertEqual(json_codec.loads(b'{"id":1180591620717411303424}'), big)
+                with self.assertRaises(json_codec.JSONDecodeError):
+                    json_codec.loads(b'{"id": ')
+                with self.assertRaises(TypeError):
+                    json_codec.dumps({'when': object()})
+
+    def test_backend_selection(self):
+        """COX_JSON_BACKEND picks the backend at import, an unavailable one raises ImportError"""
+        code = 'import json_codec; print(json_codec.BACKEND)'
+        for name in ('json', 'orjson', 'msgspec'):
+            with self.subTest(backend=name):
+                result = subprocess.run([sys.executable, '-c', code], cwd=SHARED_DIR, capture_output=True,
+                                        text=True, timeout=60, env=dict(os.environ, COX_JSON_BACKEND=name))
+                if name in json_codec.BACKENDS:
+                    self.assertEqual(result.stdout.strip(), name, result.stderr)
+                else:
+                    self.assertNotEqual(result.returncode, 0)
+                    self.assertIn('ImportError', result.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Test: Full-Text Search over Tasks, Assumptions, Modules and Anomalies
+
+Test Objectives:
+1. Mixed Chinese and English text is tokenized so that any Chinese substring and any English word can be found
+2. Every query word has to match, and matches in IDs and names rank above matches in descriptions and notes
+3. Hits carry the JSON Pointer path of the item, and the type filter and pagination work
+4. Updating one data file rebuilds only that file's index
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add project root directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from cox.scripts import run_web_observability as observability
+
+PROJECT = {
+    'project_name': 'Search',
+    'current_iteration': 'ITER-2',
+    'iterations': [
+        {'iteration_id': 'ITER-1', 'tasks': [
+            {'task_id': 'TASK-1', 'task_name': 'Login page', 'status': 'done', 'notes': 'Payment link in footer'},
+        ], 'assumptions': []},
+        {'iteration_id': 'ITER-2', 'tasks': [
+            {'task_id': 'TASK-2', 'task_name': '修复支付接口超时', 'status': 'todo',
+             'description': 'Retry the payment gateway call'},
+            {'task_id': 'TASK-3', 'task_name': 'Payment refactor', 'status': 'in_progress'},
+        ], 'assumptions': [
+            {'assumption_id': 'ASM-1', 'hypothesis': '用户愿意使用扫码支付', 'status': 'pending'},
+        ]},
+    ],
+}
+APP = {'modules': [
+    {'module_id': 'MOD-1', 'module_name': 'Payment', 'status': 'has_issue', 'issue_description': '回调超时'},
+    {'module_id': 'MOD-2', 'module_name': 'Login', 'status': 'confirmed'},
+]}
+TEST = {'test_suites': [], 'anomalies': [
+    {'anomaly_id': 'ANOM-1', 'description': '支付接口 timeout under load', 'status': 'open'},
+]}
+
+
+class TestSearch(unittest.TestCase):
+    """Test the search index and the /api/search endpoint"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        files = []
+        for name, data in (('project', PROJECT), ('app', APP), ('test', TEST)):
+            files.append(os.path.join(self.temp_dir, f'{name}.json'))
+            with open(files[-1], 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+        self.data_manager = observability.ObservabilityData(*files)
+        self.data_manager.load_if_changed()
+
+    def tearDown(self):
+        self.data_manager.writer.flush()
+        shutil.rmtree(self.temp_dir)
+
+    def search(self, query, types=None, offset=0, limit=observability.SEARCH_DEFAULT_LIMIT):
+        return self.data_manager.search(query, types, offset, limit)[1:]
+
+    def test_tokenization(self):
+        """English words are lowercased, Chinese text is split into characters and character pairs"""
+        self.assertEqual(observability.search_terms('Payment API-v2'), ['payment', 'api', 'v2'])
+        self.assertEqual(observability.search_terms('支付接口 OK'),
+                         ['支', '付', '接', '口', '支付', '付接', '接口', 'ok'])
+        self.assertEqual(observability.search_terms('支付接口', query=True), ['支付', '付接', '接口'])
+        self.assertEqual(observability.search_terms('付', query=True), ['付'])
+
+    def test_chinese_substring(self):
+        """A Chinese query matches the items containing it anywhere in their text"""
+        total, hits = self.search('支付接口')
+        self.assertEqual(total, 2)
+        self.assertEqual({hit['id'] for hit in hits}, {'TASK-2', 'ANOM-1'})
+        total, hits = self.search('支付')
+        self.assertEqual({hit['id'] for hit in hits}, {'TASK-2', 'ASM-1', 'ANOM-1'})
+
+    def test_ranking_and_paths(self):
+        """Name matches rank first, every word must match, and hits point back into the data"""
+        total, hits = self.search('payment')
+        self.assertEqual(total, 4)
+        self.assertEqual({hit['id'] for hit in hits[:2]}, {'TASK-3', 'MOD-1'})
+        self.assertEqual({hit['id'] for hit in hits[2:]}, {'TASK-1', 'TASK-2'})
+        paths = {hit['id']: hit['path'] for hit in hits}
+        self.assertEqual(paths['TASK-3'], '/project/iterations/1/tasks/1')
+        self.assertEqual(paths['MOD-1'], '/app/modules/0')
+
+        total, hits = self.search('超时 payment')
+        self.assertEqual([hit['id'] for hit in hits], ['TASK-2', 'MOD-1'])
+        self.assertEqual(self.search('payment nothing'), (0, []))
+
+    def test_type_filter_and_pagination(self):
+        """type limits the item types, offset/limit page through the ranked hits"""
+        total, hits = self.search('支付', types=['assumptions'])
+        self.assertEqual((total, [hit['id'] for hit in hits]), (1, ['ASM-1']))
+        ranked = [hit['id'] for hit in self.search('payment')[1]]
+        total, hits = self.search('payment', offset=1, limit=2)
+        self.assertEqual(total, 4)
+        self.assertEqual([hit['id'] for hit in hits], ranked[1:3])
+
+    def test_incremental_rebuild(self):
+        """A module update rebuilds the app index and keeps the project index"""
+        self.search('payment')
+        project_index = self.data_manager.snapshot.searches['project']
+        ok = self.data_manager.writer.update('app', lambda app: observability.set_module_status(app, 'Payment', 'confirmed'))
+        self.assertTrue(ok)
+        self.assertNotIn('app', self.data_manager.snapshot.searches)
+        self.assertEqual(self.search('回调'), (0, []))
+        self.assertIs(self.data_manager.snapshot.searches['project'], project_index)
+
+    @unittest.skipUnless(observability.FLASK_AVAILABLE, 'Flask is not installed')
+    def test_search_endpoint(self):
+        """/api/search returns ranked hits and rejects invalid parameters"""
+        observability.data_manager = self.data_manager
+        client = observability.get_app().test_client()
+        response = client.get('/api/search', query_string={'q': '支付接口', 'type': 'tasks'})
+        self.assertEqual(response.status_code, 200)
+        body = response.get_json()
+        self.assertEqual((body['total'], body['hits'][0]['id']), (1, 'TASK-2'))
+        self.assertEqual(client.get('/api/search?q=payment', headers={'If-None-Match': response.headers['ETag']})
+                         .status_code, 304)
+        self.assertEqual(client.get('/api/search').status_code, 400)
+        self.assertEqual(client.get('/api/search?q=payment&type=users').status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
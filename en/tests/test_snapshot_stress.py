@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Stress Test: Immutable Snapshots and Single-Flight Reloads of ObservabilityData
+
+Test Objectives:
+1. Readers running alongside writers and file reloads never see project and app data from different versions
+2. Every data version has exactly one response body, whichever thread serialized it
+3. When many request threads notice the same file change, only one of them parses the file,
+   and the others keep serving the previous snapshot without waiting
+4. Updates that are published but not yet written survive a reload of a file another program rewrote,
+   and writing them back never overwrites or hides that program's write
+5. A writer waiting for the reload lock is not starved by request threads that keep reloading changed files
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from pathlib import Path
+
+# Add project root directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from cox.scripts import run_web_observability as observability
+
+READER_THREADS = 8
+WRITER_UPDATES = 200
+EDITOR_REWRITES = 200
+# Upper bound in seconds for the writer and the editor of the consistency test to finish
+STRESS_TIMEOUT = 60
+# Parsing delay injected in the single-flight test, and how long a non-reloading reader may take
+SLOW_PARSE = 0.5
+FAST_READ = 0.25
+
+
+class TestSnapshotStress(unittest.TestCase):
+    """Stress test snapshot swapping under concurrent readers, writers and reloads"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.files = {name: os.path.join(self.temp_dir, f'{name}.json') for name in ('project', 'app', 'test')}
+        self.write_file('project', {'project_name': 'Stress', 'generation': 0, 'iterations': []})
+        self.write_file('app', {'generation': 0, 'modules': []})
+        self.write_file('test', {'revision': 0, 'test_suites': [], 'anomalies': []})
+        self.data_manager = observability.ObservabilityData(self.files['project'], self.files['app'], self.files['test'])
+        self.data_manager.load_if_changed()
+
+    def tearDown(self):
+        self.data_manager.writer.flush()
+        shutil.rmtree(self.temp_dir)
+
+    def write_file(self, name, data, mtime=None):
+        # Replace atomically so that reloads never read a half-written file
+        tmp_path = f'{self.files[name]}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.files[name])
+        if mtime is not None:
+            # Make sure the signature changes even on filesystems with coarse timestamps
+            os.utime(self.files[name], (mtime, mtime))
+
+    def test_readers_see_consistent_snapshots(self):
+        """Project and app are always published together and every etag has a single payload"""
+        data_manager = self.data_manager
+        data_manager.writer.flush_interval = 0
+        stop = threading.Event()
+        errors = []
+        payloads = {}
+        payloads_lock = threading.Lock()
+
+        def set_generation(generation):
+            return lambda data: (dict(data, generation=generation), True)
+
+        def writer():
+            for generation in range(1, WRITER_UPDATES + 1):
+                if stop.is_set():
+                    return
+                data_manager.writer.update_many([('project', set_generation(generation)),
+                                                 ('app', set_generation(generation))])
+
+        def external_editor():
+            # Another tool keeps rewriting test_metrics.json, forcing reloads during the updates
+            for revision in range(1, EDITOR_REWRITES + 1):
+                if stop.is_set():
+                    return
+                self.write_file('test', {'revision': revision, 'test_suites': [], 'anomalies': []},
+                                mtime=time.time() + revision)
+                time.sleep(0.005)
+
+        def reader():
+            last_version = 0
+            while not stop.is_set():
+                data = data_manager.get_all_data()
+                if data['project']['generation'] != data['app']['generation']:
+                    errors.append(f"mixed data: project {data['project']['generation']}, "
+                                  f"app {data['app']['generation']}")
+                etag, kind, payload = data_manager.get_update()
+                body = json.loads(payload)
+                if body['project']['generation'] != body['app']['generation']:
+                    errors.append(f'mixed payload for {etag}')
+                with payloads_lock:
+                    if payloads.setdefault(etag, payload) != payload:
+                        errors.append(f'two different payloads for {etag}')
+                version = data_manager.version
+                if version < last_version:
+                    errors.append(f'version went back from {last_version} to {version}')
+                last_version = version
+                # Yield briefly so the readers cannot starve the writer of the GIL
+                time.sleep(0.001)
+
+        workers = [threading.Thread(target=writer), threading.Thread(target=external_editor)]
+        readers = [threading.Thread(target=reader) for _ in range(READER_THREADS)]
+        for thread in workers + readers:
+            thread.start()
+        try:
+            deadline = time.monotonic() + STRESS_TIMEOUT
+            for thread in workers:
+                thread.join(timeout=max(0, deadline - time.monotonic()))
+            unfinished = [thread for thread in workers if thread.is_alive()]
+        finally:
+            # Stop every thread before tearDown removes the files, even when an assertion fails
+            stop.set()
+            for thread in workers + readers:
+                thread.join()
+
+        self.assertEqual(unfinished, [], 'the writer or the editor did not finish in time')
+        self.assertEqual(errors[:5], [])
+        final = data_manager.get_all_data()
+        self.assertEqual(final['project']['generation'], WRITER_UPDATES)
+        self.assertEqual(final['app']['generation'], WRITER_UPDATES)
+        self.assertEqual(final['test']['revision'], EDITOR_REWRITES)
+        # Every update was written back to disk
+        with open(self.files['app'], 'r', encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['generation'], WRITER_UPDATES)
+
+    def test_waiting_writer_has_priority(self):
+        """While a writer waits for the reload lock, request threads serve the current snapshot instead of reloading"""
+        data_manager = self.data_manager
+        self.write_file('app', {'generation': 1, 'modules': []}, mtime=time.time() + 10)
+        data_manager._writers_waiting = 1
+        try:
+            self.assertFalse(data_manager.load_if_changed(wait=False))
+            self.assertEqual(data_manager.get_all_data()['app']['generation'], 0)
+        finally:
+            data_manager._writers_waiting = 0
+        # The writer itself, and blocking loads, still reload
+        self.assertTrue(data_manager.load_if_changed())
+        self.assertEqual(data_manager.get_all_data()['app']['generation'], 1)
+
+    def test_single_flight_reload(self):
+        """Only one thread parses a changed file; the others keep reading the previous snapshot"""
+        data_manager = self.data_manager
+        parses = []
+        original_loads = observability.json_codec.loads
+
+        def slow_loads(raw):
+            parses.append(threading.get_ident())
+            time.sleep(SLOW_PARSE)
+            return original_loads(raw)
+
+        self.write_file('project', {'project_name': 'Stress', 'generation': 1, 'iterations': []},
+                        mtime=time.time() + 10)
+        barrier = threading.Barrier(READER_THREADS)
+        results = []
+
+        def reader():
+            barrier.wait()
+            started = time.perf_counter()
+            generation = data_manager.get_all_data()['project']['generation']
+            results.append((time.perf_counter() - started, generation))
+
+        observability.json_codec.loads = slow_loads
+        try:
+            threads = [threading.Thread(target=reader) for _ in range(READER_THREADS)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(timeout=30)
+        finally:
+            observability.json_codec.loads = original_loads
+
+        self.assertEqual(len(parses), 1)
+        self.assertEqual(len(results), READER_THREADS)
+        # The reloading thread returns the new data; everyone else returned the old data at once
+        slow = [result for result in results if result[0] >= SLOW_PARSE]
+        fast = [result for result in results if result[0] < FAST_READ]
+        self.assertEqual(len(slow), 1)
+        self.assertEqual(slow[0][1], 1)
+        self.assertEqual(len(fast), READER_THREADS - 1)
+        self.assertTrue(all(generation == 0 for _, generation in fast))
+        self.assertEqual(data_manager.get_all_data()['project']['generation'], 1)
+
+    def test_writer_waits_for_reload(self):
+        """An update issued during a reload applies on top of the freshly loaded data"""
+        data_manager = self.data_manager
+        original_loads = observability.json_codec.loads
+        loading = threading.Event()
+
+        def slow_loads(raw):
+            loading.set()
+            time.sleep(SLOW_PARSE)
+            return original_loads(raw)
+
+        self.write_file('app', {'generation': 5, 'modules': []}, mtime=time.time() + 10)
+        observability.json_codec.loads = slow_loads
+        try:
+            reload_thread = threading.Thread(target=data_manager.get_all_data)
+            reload_thread.start()
+            self.assertTrue(loading.wait(5))
+            ok = data_manager.writer.update('app', lambda app: (dict(app, generation=app['generation'] + 1), True))
+            reload_thread.join()
+        finally:
+            observability.json_codec.loads = original_loads
+
+        self.assertTrue(ok)
+        self.assertEqual(data_manager.get_all_data()['app']['generation'], 6)
+
+
+class TestExternalWrites(unittest.TestCase):
+    """Pending updates and files rewritten by another program at the same time"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.files = {name: os.path.join(self.temp_dir, f'{name}.json') for name in ('project', 'app', 'test')}
+        self.assumptions = [{'assumption_id': 'ASM-1', 'status': 'pending'},
+                            {'assumption_id': 'ASM-2', 'status': 'pending'}]
+        self.write_file('project', {'iterations': [{'iteration_id': 'ITER-1', 'assumptions': self.assumptions}]})
+        self.write_file('app', self.app_data('pending', 'pending'))
+        self.write_file('test', {'test_suites': [], 'anomalies': []})
+        self.data_manager = observability.ObservabilityData(self.files['project'], self.files['app'], self.files['test'])
+        self.data_manager.load_if_changed()
+
+    def tearDown(self):
+        self.data_manager.stop_watching()
+        self.data_manager.writer.flush()
+        shutil.rmtree(self.temp_dir)
+
+    @staticmethod
+    def app_data(login, payment):
+        return {'modules': [{'module_name': 'Login', 'status': login}, {'module_name': 'Payment', 'status': payment}]}
+
+    def write_file(self, name, data):
+        # Plain in-place write, the way an editor or another tool would
+        with open(self.files[name], 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+    def click(self, module_name, status):
+        ok = self.data_manager.writer.update(
+            'app', lambda app: observability.set_module_status(app, module_name, status))
+        self.assertTrue(ok)
+
+    def statuses(self):
+        """Module statuses in memory and on disk"""
+        memory = [module['status'] for module in self.data_manager.get_all_data(reload=False)['app']['modules']]
+        with open(self.files['app'], 'r', encoding='utf-8') as f:
+            disk = [module['status'] for module in json.load(f)['modules']]
+        return memory, disk
+
+    def test_reload_replays_pending_updates(self):
+        """A click waiting to be flushed is applied again on top of the externally rewritten file"""
+        self.data_manager.writer.flush_interval = 5
+        self.click('Login', 'confirmed')
+        ok = self.data_manager.writer.update('project', lambda project: observability.set_assumption_status(
+            project, self.data_manager.find_assumption(project, 'ASM-2'), 'validated'))
+        self.assertTrue(ok)
+
+        self.write_file('app', self.app_data('pending', 'has_issue'))
+        # The other program also inserts an assumption, moving ASM-2 to another position
+        assumptions = [{'assumption_id': 'ASM-0', 'status': 'pending'}] + self.assumptions
+        self.write_file('project', {'iterations': [{'iteration_id': 'ITER-1', 'assumptions': assumptions}]})
+        self.assertTrue(self.data_manager.load_if_changed())
+
+        memory = self.data_manager.get_all_data(reload=False)
+        self.assertEqual([a['status'] for a in memory['project']['iterations'][0]['assumptions']],
+                         ['pending', 'pending', 'validated'])
+        self.assertEqual(self.statuses()[0], ['confirmed', 'has_issue'])
+        self.data_manager.writer.flush()
+        self.assertEqual(self.statuses(), (['confirmed', 'has_issue'], ['confirmed', 'has_issue']))
+        self.assertFalse(self.data_manager.load_if_changed())
+
+    def test_external_write_then_click_with_watcher(self):
+        """A click right after an external write is applied to that write, even before the watcher reloads it"""
+        self.data_manager.writer.flush_interval = 0
+        self.data_manager.start_watching(debounce=0.05, poll_interval=0.05)
+        self.write_file('app', self.app_data('optimized', 'has_issue'))
+        self.click('Login', 'confirmed')
+        self.assertEqual(self.statuses(), (['confirmed', 'has_issue'], ['confirmed', 'has_issue']))
+        # Let the watcher see the file events; it must not bring back the external content without the click
+        time.sleep(0.5)
+        self.assertEqual(self.statuses(), (['confirmed', 'has_issue'], ['confirmed', 'has_issue']))
+        self.assertFalse(self.data_manager.load_if_changed())
+
+    def test_flush_retries_when_file_changes_during_write(self):
+        """A write that lands while the flush is writing its temporary file is merged instead of overwritten"""
+        self.data_manager.writer.flush_interval = 5
+        self.click('Login', 'confirmed')
+        real_fsync = os.fsync
+        external = [self.app_data('pending', 'has_issue')]
+
+        def fsync_then_external_write(fd):
+            real_fsync(fd)
+            if external:
+                self.write_file('app', external.pop())
+
+        with mock.patch('os.fsync', side_effect=fsync_then_external_write):
+            self.data_manager.writer.flush()
+        self.assertEqual(self.statuses(), (['confirmed', 'has_issue'], ['confirmed', 'has_issue']))
+        self.assertFalse(self.data_manager.load_if_changed())
+
+    def test_write_after_flush_is_not_hidden(self):
+        """A write that lands right after the flush replaced the file is still reloaded"""
+        self.data_manager.writer.flush_interval = 0
+        real_replace = os.replace
+        external = [self.app_data('optimized', 'optimized')]
+
+        def replace_then_external_write(src, dst):
+            real_replace(src, dst)
+            if dst == self.files['app'] and external:
+                self.write_file('app', external.pop())
+
+        with mock.patch('os.replace', side_effect=replace_then_external_write):
+            self.click('Login', 'confirmed')
+        self.assertTrue(self.data_manager.load_if_changed())
+        self.assertEqual(self.statuses(), (['optimized', 'optimized'], ['optimized', 'optimized']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -183,5 +183,155 @@ class TestStaticObservability(unittest.TestCase):
         print(f"3. First iteration contains 2 tasks: 'Task 1' and 'Task 2'")
         print(f"4. Task status displayed correctly (todo/in_progress)")
 
+    def test_static_regeneration_skips_unchanged_input(self):
+        """Test that unchanged input does not rewrite the static page"""
+        from cox.scripts.run_web_observability import ObservabilityData, generate_static_html, read_static_input_hash
+
+        app_path = os.path.join(self.temp_dir, 'app_status.json')
+        data_manager = ObservabilityData(
+            os.path.join(self.temp_dir, 'project_data.json'),
+            app_path,
+            os.path.join(self.temp_dir, 'test_metrics.json')
+        )
+
+        generate_static_html(data_manager, self.output_html)
+        first_hash = read_static_input_hash(self.output_html)
+        self.assertIsNotNone(first_hash, "Input hash not recorded in HTML")
+
+        # Same input: the output file is left untouched
+        first_mtime = os.stat(self.output_html).st_mtime_ns
+        generate_static_html(data_manager, self.output_html)
+        self.assertEqual(os.stat(self.output_html).st_mtime_ns, first_mtime)
+
+        # Changed data file: the page is regenerated with a new hash
+        with open(app_path, 'r', encoding='utf-8') as f:
+            app_status = json.load(f)
+        app_status['version'] = '1.0.1'
+        with open(app_path, 'w', encoding='utf-8') as f:
+            json.dump(app_status, f, ensure_ascii=False, indent=2)
+        generate_static_html(data_manager, self.output_html)
+        self.assertNotEqual(read_static_input_hash(self.output_html), first_hash)
+        with open(self.output_html, 'r', encoding='utf-8') as f:
+            self.assertIn('1.0.1', f.read(), "Updated data not written to HTML")
+
+    def test_static_embeds_rendered_fields_only(self):
+        """Test that only rendered fields are inlined, optionally as a gzip blob"""
+        import base64
+        import gzip
+        from cox.scripts.run_web_observability import ObservabilityData, generate_static_html
+
+        project_path = os.path.join(self.temp_dir, 'project_data.json')
+        with open(project_path, 'r', encoding='utf-8') as f:
+            project_data = json.load(f)
+        project_data['iterations'][0]['tasks'][0]['description'] = 'NOT-RENDERED-FIELD'
+        with open(project_path, 'w', encoding='utf-8') as f:
+            json.dump(project_data, f, ensure_ascii=False, indent=2)
+        data_manager = ObservabilityData(
+            project_path,
+            os.path.join(self.temp_dir, 'app_status.json'),
+            os.path.join(self.temp_dir, 'test_metrics.json')
+        )
+
+        generate_static_html(data_manager, self.output_html)
+        with open(self.output_html, 'r', encoding='utf-8') as f:
+            html_content = f.read()
+        self.assertIn('TASK-001', html_content)
+        self.assertNotIn('NOT-RENDERED-FIELD', html_content, "Unrendered field inlined to HTML")
+
+        # gzip embedding: data is only present inside the compressed blob
+        gzip_html = os.path.join(self.temp_dir, 'observability_gzip.html')
+        generate_static_html(data_manager, gzip_html, embed='gzip')
+        with open(gzip_html, 'r', encoding='utf-8') as f:
+            html_content = f.read()
+        self.assertIn('DecompressionStream', html_content)
+        self.assertNotIn('TASK-001', html_content)
+        blob = html_content.split("const staticDataGzip = '", 1)[1].split("'", 1)[0]
+        data = json.loads(gzip.decompress(base64.b64decode(blob)))
+        self.assertEqual(data['project']['iterations'][0]['tasks'][0]['task_id'], 'TASK-001')
+        self.assertNotIn('description', data['project']['iterations'][0]['tasks'][0])
+
+    def test_static_inlines_assets(self):
+        """Test that the static page inlines the stylesheet and icon sprite and loads nothing from a CDN"""
+        from cox.scripts.run_web_observability import ObservabilityData, generate_static_html, load_dashboard_assets
+
+        data_manager = ObservabilityData(
+            os.path.join(self.temp_dir, 'project_data.json'),
+            os.path.join(self.temp_dir, 'app_status.json'),
+            os.path.join(self.temp_dir, 'test_metrics.json')
+        )
+        generate_static_html(data_manager, self.output_html)
+        with open(self.output_html, 'r', encoding='utf-8') as f:
+            html_content = f.read()
+
+        for cdn in ('cdn.tailwindcss.com', 'unpkg.com', 'lucide@', 'lucide.createIcons'):
+            self.assertNotIn(cdn, html_content, f"Static page still references {cdn}")
+        self.assertNotIn('/assets/', html_content, "Static page links assets it cannot load offline")
+
+        assets = load_dashboard_assets()
+        css = assets['dashboard.css']['content'].decode('utf-8')
+        self.assertIn('<style>\n' + css, html_content, "Stylesheet not inlined")
+        # The sprite is inlined hidden, and icons reference its symbols by fragment only
+        sprite = assets['icons.svg']['content'].decode('utf-8').strip()
+        self.assertIn(sprite.replace('<svg ', '<svg style="display: none" ', 1), html_content, "Icon sprite not inlined")
+        self.assertIn("const ICON_SPRITE = '';", html_content)
+
+    def test_watch_regenerates_on_change_and_deletion(self):
+        """Test that --watch regenerates the page after a data file is changed or deleted"""
+        import signal
+        import subprocess
+        import time
+
+        script = Path(__file__).parent.parent / 'cox' / 'scripts' / 'run_web_observability.py'
+        app_path = os.path.join(self.temp_dir, 'app_status.json')
+        process = subprocess.Popen([sys.executable, str(script), '--mode', 'static', '--watch', '--debounce', '50',
+                                    '--project', os.path.join(self.temp_dir, 'project_data.json'),
+                                    '--app', app_path, '--test', os.path.join(self.temp_dir, 'test_metrics.json'),
+                                    '--output', self.output_html],
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.addCleanup(process.kill)
+
+        def wait_for_page(check, message):
+            deadline = time.monotonic() + 30
+            while time.monotonic() < deadline:
+                if os.path.exists(self.output_html):
+                    with open(self.output_html, 'r', encoding='utf-8') as f:
+                        if check(f.read()):
+                            return
+                time.sleep(0.1)
+            self.fail(message)
+
+        wait_for_page(lambda html: 'TASK-001' in html and '9.9.9' not in html, "Initial page not generated")
+        with open(app_path, 'r', encoding='utf-8') as f:
+            app_status = json.load(f)
+        app_status['version'] = '9.9.9'
+        with open(app_path, 'w', encoding='utf-8') as f:
+            json.dump(app_status, f)
+        wait_for_page(lambda html: '9.9.9' in html, "Page not regenerated after a data file changed")
+
+        # A deleted data file is a change too: the page is regenerated without its data
+        os.remove(app_path)
+        wait_for_page(lambda html: '9.9.9' not in html and 'TASK-001' in html,
+                      "Page not regenerated after a data file was deleted")
+
+        process.send_signal(signal.SIGINT)
+        self.assertEqual(process.wait(timeout=30), 0)
+
+    def test_watch_does_not_load_data(self):
+        """Test that --watch only watches the files and does not load the data manager or build its indexes"""
+        from unittest import mock
+        from cox.scripts import run_web_observability as observability
+
+        data_manager = observability.ObservabilityData(
+            os.path.join(self.temp_dir, 'project_data.json'),
+            os.path.join(self.temp_dir, 'app_status.json'),
+            os.path.join(self.temp_dir, 'test_metrics.json')
+        )
+        with mock.patch.object(observability.DataFileWatcher, 'wait_for_changes', side_effect=KeyboardInterrupt):
+            observability.watch_static_html(data_manager, self.output_html)
+        self.assertTrue(os.path.exists(self.output_html))
+        self.assertEqual(data_manager.version, 0)
+        self.assertEqual(data_manager.snapshot.collections, {})
+        self.assertIsNone(data_manager._watcher)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,1183 @@
+#!/usr/bin/env python3
+"""
+Test: Web Mode API (Flask test client)
+
+Test Objectives:
+1. /api/stream sends the full data first, then a patch event after each change, and keep-alive comments when idle
+2. /api/data carries a content-hash ETag and X-Last-Updated, and answers a matching If-None-Match with 304
+3. /api/data and the page are compressed once per version and sent as br or gzip according to Accept-Encoding
+4. The background watcher debounces bursts of writes into one reload and falls back to polling without inotify
+5. JSON Patches turn the old data into the new data, /api/data?since= sends them compressed like full payloads
+   and falls back to the full data once the version has left the history
+6. Update requests whose body is not a JSON object get 400, and SIGTERM writes pending updates before exiting
+7. A batch update applies all of its items in one version, or none of them when any item fails
+8. Assumptions are found through an index by id or by the base64 of their content, rebuilt after a reload
+9. The dashboard page is rendered once, revalidated with its ETag and re-rendered on every request with --dev
+10. The collection endpoints filter, sort and paginate, reject invalid parameters and revalidate with the data ETag
+11. The project registry evicts the least recently used projects, writing their pending updates and rejecting
+    late updates to the evicted data manager
+12. /metrics reports request, cache, reload and flush metrics in the Prometheus text format
+13. /debug/profile reports the slowest recent requests and the most expensive functions of the sampled ones
+14. The prefork server shares updates between its workers, replaces them on SIGHUP and stops cleanly on SIGTERM
+15. The page links versioned local assets instead of CDNs, served as immutable with ETag/304 and gzip
+16. /api/summary counts tasks, modules, tests and anomalies per owner, revalidates with the data ETag,
+    handles empty collections and rounds completion half up like the page
+"""
+
+import os
+import sys
+import gzip
+import base64
+import copy
+import json
+import shutil
+import signal
+import socket
+import tempfile
+import subprocess
+import http.client
+import time
+import unittest
+from unittest import mock
+from pathlib import Path
+
+# Add project root directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from cox.scripts import run_web_observability as observability
+
+SCRIPT = Path(__file__).parent.parent / 'cox' / 'scripts' / 'run_web_observability.py'
+
+PROJECT = {
+    'project_name': 'API',
+    'current_iteration': 'ITER-2',
+    'iterations': [
+        {'iteration_id': 'ITER-1', 'status': 'completed', 'tasks': [
+            {'task_id': 'TASK-1', 'task_name': 'Login page', 'status': 'completed', 'assignee': 'Alice',
+             'priority': 'high'},
+        ], 'assumptions': [
+            {'assumption_id': 'ASM-1', 'hypothesis': 'Users log in daily', 'status': 'pending'},
+        ]},
+        {'iteration_id': 'ITER-2', 'status': 'in_progress', 'tasks': [
+            {'task_id': 'TASK-2', 'task_name': 'Payment', 'status': 'todo', 'assignee': 'Bob', 'priority': 'high'},
+            {'task_id': 'TASK-3', 'task_name': 'Refund', 'status': 'in_progress', 'assignee': 'Alice',
+             'priority': 'low'},
+            {'task_id': 'TASK-4', 'task_name': 'Invoice', 'status': 'todo', 'assignee': 'Alice',
+             'priority': 'medium'},
+        ], 'assumptions': [
+            {'hypothesis': 'Users pay by card', 'status': 'pending'},
+        ]},
+    ],
+}
+APP = {'modules': [
+    {'module_name': 'Login', 'status': 'confirmed', 'owner': 'Alice', 'completion_rate': 100},
+    {'module_name': 'Payment', 'status': 'pending', 'owner': 'Bob', 'completion_rate': 40},
+]}
+TEST = {'test_suites': [], 'anomalies': [
+    {'anomaly_id': 'ANOM-1', 'type': 'error', 'severity': 'high', 'status': 'open'},
+]}
+
+
+class WebApiTestCase(unittest.TestCase):
+    """Write the mock data files and point the Flask app at them"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.files = {}
+        for name, data in (('project', PROJECT), ('app', APP), ('test', TEST)):
+            self.files[name] = os.path.join(self.temp_dir, f'{name}.json')
+            self.write_file(name, data)
+        self.previous_manager = observability.data_manager
+        self.data_manager = observability.ObservabilityData(self.files['project'], self.files['app'],
+                                                            self.files['test'])
+        self.data_manager.writer.flush_interval = 0
+        observability.data_manager = self.data_manager
+        self.client = observability.get_app().test_client() if observability.FLASK_AVAILABLE else None
+        # Count metrics and cache the page from scratch in every test
+        for name, value in (('server_metrics', observability.ServerMetrics(observability.SERVER_METRICS)),
+                            ('dashboard_page', None)):
+            patcher = mock.patch.object(observability, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.data_manager.stop_watching()
+        self.data_manager.writer.flush()
+        observability.data_manager = self.previous_manager
+        shutil.rmtree(self.temp_dir)
+
+    def write_file(self, name, data):
+        with open(self.files[name], 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+    def read_file(self, name):
+        with open(self.files[name], 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def metric(self, sample, text=None):
+        """Value of the /metrics sample line named sample (with its labels), 0 when it has not been recorded"""
+        if text is None:
+            text = observability.server_metrics.render()
+        for line in text.splitlines():
+            name, _, value = line.rpartition(' ')
+            if name == sample:
+                return float(value)
+        return 0
+
+    @staticmethod
+    def kill_server(process):
+        """Kill the server and, through its own process group, any worker processes it forked"""
+        if hasattr(os, 'killpg'):
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        process.kill()
+        process.wait()
+
+    def run_server(self, mode, *args):
+        """Start the dashboard in mode with a long flush interval and extra args, return (process, port)"""
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            port = sock.getsockname()[1]
+        process = subprocess.Popen([sys.executable, str(SCRIPT), '--mode', mode, '--port', str(port),
+                                    '--flush-interval', '60000', '--project', self.files['project'],
+                                    '--app', self.files['app'], '--test', self.files['test'], *args],
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+        self.addCleanup(self.kill_server, process)
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                return process, port
+            except OSError:
+                time.sleep(0.1)
+        self.fail(f'{mode} server did not start')
+
+    def update_module(self, module_name, status):
+        response = self.client.post('/api/update/module', json={'module_name': module_name, 'status': status})
+        self.assertEqual(response.get_json(), {'success': True})
+
+
+@unittest.skipUnless(observability.FLASK_AVAILABLE, 'Flask is not installed')
+class TestStream(WebApiTestCase):
+    """Test the /api/stream Server-Sent Events channel"""
+
+    def open_stream(self, headers=None):
+        response = self.client.get('/api/stream', headers=headers, buffered=False)
+        self.addCleanup(response.close)
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        return iter(response.response)
+
+    def test_full_then_patch(self):
+        """The first event carries the whole data, the next one a JSON Patch against it"""
+        events = self.open_stream()
+        first = next(events)
+        self.assertTrue(first.startswith(b'id: ') and first.endswith(b'\n\n'), first)
+        header, data = first.split(b'\ndata: ', 1)
+        etag = header[len(b'id: '):].decode('ascii')
+        self.assertEqual(etag, self.data_manager.etag)
+        self.assertEqual(json.loads(data)['app']['modules'][1]['status'], 'pending')
+
+        self.update_module('Payment', 'confirmed')
+        event = next(events)
+        lines = event.rstrip(b'\n').split(b'\n')
+        self.assertEqual(lines[0], b'event: patch')
+        self.assertEqual(lines[1], f'id: {self.data_manager.etag}'.encode('ascii'))
+        patch = json.loads(lines[2][len(b'data: '):])
+        self.assertEqual(patch['since'], etag)
+        self.assertIn({'op': 'replace', 'path': '/app/modules/1/status', 'value': 'confirmed'}, patch['patch'])
+
+    def test_reconnect_with_last_event_id(self):
+        """A reconnecting client gets a patch against its Last-Event-ID instead of the whole data"""
+        self.data_manager.load_if_changed()
+        etag = self.data_manager.etag
+        self.update_module('Login', 'has_issue')
+        event = next(self.open_stream({'Last-Event-ID': etag}))
+        self.assertTrue(event.startswith(b'event: patch\n'), event)
+        self.assertEqual(json.loads(event.split(b'data: ', 1)[1])['since'], etag)
+
+    def test_keep_alive_comment(self):
+        """Without changes the stream sends comment lines only"""
+        with mock.patch.object(observability, 'SSE_POLL_INTERVAL', 0.01), \
+                mock.patch.object(observability, 'SSE_KEEPALIVE_INTERVAL', 0):
+            events = self.open_stream()
+            next(events)
+            self.assertEqual(next(events), b': keep-alive\n\n')
+            self.assertEqual(next(events), b': keep-alive\n\n')
+
+
+@unittest.skipUnless(observability.FLASK_AVAILABLE, 'Flask is not installed')
+class TestDataRevalidation(WebApiTestCase):
+    """Test ETag revalidation of /api/data"""
+
+    def test_etag_and_304(self):
+        """The ETag is the content hash; a matching If-None-Match gets an empty 304"""
+        response = self.client.get('/api/data')
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers['ETag']
+        self.assertEqual(etag, f'"{self.data_manager.etag}"')
+        self.assertRegex(response.headers['X-Last-Updated'], r'^\d{2}:\d{2}:\d{2}$')
+        self.assertEqual(response.headers['Cache-Control'], 'no-cache')
+        self.assertEqual(set(response.get_json()), {'project', 'app', 'test'})
+
+        response = self.client.get('/api/data', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+        self.assertEqual(response.headers['ETag'], etag)
+        self.assertIn('X-Last-Updated', response.headers)
+
+    def test_etag_follows_content(self):
+        """Touching a file keeps the ETag, changing its content replaces it"""
+        etag = self.client.get('/api/data').headers['ETag']
+        os.utime(self.files['test'], (1, 1))
+        self.assertEqual(self.client.get('/api/data', headers={'If-None-Match': etag}).status_code, 304)
+
+        self.write_file('test', dict(TEST, anomalies=[]))
+        response = self.client.get('/api/data', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+        self.assertEqual(response.get_json()['test']['anomalies'], [])
+
+
+@unittest.skipUnless(observability.FLASK_AVAILABLE, 'Flask is not installed')
+class TestCompression(WebApiTestCase):
+    """Test precompressed responses and content negotiation"""
+
+    def test_gzip_payload(self):
+        """gzip responses decode to the identity body and have their own ETag"""
+        identity = self.client.get('/api/data')
+        response = self.client.get('/api/data', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(response.headers['Vary'], 'Accept-Encoding')
+        self.assertEqual(response.headers['ETag'], f'"{self.data_manager.etag}-gzip"')
+        self.assertEqual(gzip.decompress(response.data), identity.data)
+        self.assertEqual(self.client.get('/api/data', headers={'Accept-Encoding': 'gzip',
+                                                               'If-None-Match': response.headers['ETag']}
+                                         ).status_code, 304)
+        # The identity ETag does not validate the gzip representation
+        self.assertEqual(self.client.get('/api/data', headers={'Accept-Encoding': 'gzip',
+                                                               'If-None-Match': identity.headers['ETag']}
+                                         ).status_code, 200)
+
+    def test_negotiation(self):
+        """br is preferred when brotli is installed, q=0 refuses an encoding"""
+        def encoding(accept):
+            return self.client.get('/api/data', headers={'Accept-Encoding': accept}).headers.get('Content-Encoding')
+
+        self.assertEqual(encoding('br, gzip'), 'br' if observability.BROTLI_AVAILABLE else 'gzip')
+        self.assertIsNone(encoding('gzip;q=0'))
+        self.assertIsNone(encoding('deflate'))
+        self.assertIsNone(encoding(''))
+
+    def test_compressed_once_per_version(self):
+        """Repeated requests reuse the compressed bytes until the data changes"""
+        with mock.patch.object(observability, 'compress_payload', wraps=observability.compress_payload) as compress:
+            for _ in range(3):
+                self.client.get('/api/data', headers={'Accept-Encoding': 'gzip'})
+            self.assertEqual([call[0][1] for call in compress.call_args_list], ['gzip'])
+            self.update_module('Payment', 'confirmed')
+            response = self.client.get('/api/data', headers={'Accept-Encoding': 'gzip'})
+            self.assertEqual([call[0][1] for call in compress.call_args_list], ['gzip', 'gzip'])
+        self.assertEqual(json.loads(gzip.decompress(response.data))['app']['modules'][1]['status'], 'confirmed')
+
+    def test_page(self):
+        """The dashboard page is served compressed with an ETag per encoding"""
+        response = self.client.get('/', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertIn(b'<!DOCTYPE html>', gzip.decompress(response.data))
+        self.assertTrue(response.headers['ETag'].endswith('-gzip"'))
+        identity = self.client.get('/')
+        self.assertNotIn('Content-Encoding', identity.headers)
+        self.assertEqual(identity.data, gzip.decompress(response.data))
+
+
+class TestWatcher(WebApiTestCase):
+    """Test the background data file watcher"""
+
+    def start_watching(self, backend):
+        """Start the watcher on backend and count its reloads"""
+        inotify = observability.InotifyWatch if backend == 'inotify' else mock.Mock(side_effect=OSError('unavailable'))
+        with mock.patch.object(observability, 'InotifyWatch', inotify):
+            watcher = self.data_manager.start_watching(debounce=0.2, poll_interval=0.02)
+        self.assertEqual(watcher.backend, backend)
+        return mock.patch.object(self.data_manager, 'load_if_changed', wraps=self.data_manager.load_if_changed)
+
+    def wait_for_version(self, version, timeout=5):
+        deadline = time.monotonic() + timeout
+        while self.data_manager.version == version and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertNotEqual(self.data_manager.version, version, 'the watcher did not reload the changed file')
+
+    def test_debounce(self):
+        """A burst of writes to several files is reloaded once, after the writes stop"""
+        backends = ['polling'] + (['inotify'] if sys.platform.startswith('linux') else [])
+        for backend in backends:
+            with self.subTest(backend=backend):
+                self.data_manager.stop_watching()
+                with self.start_watching(backend) as reload:
+                    version = self.data_manager.version
+                    for count in range(5):
+                        self.write_file('test', dict(TEST, anomalies=TEST['anomalies'] * (count + 2), backend=backend))
+                        self.write_file('app', dict(APP, revision=count, backend=backend))
+                        time.sleep(0.02)
+                    self.wait_for_version(version)
+                    time.sleep(0.3)
+                    self.assertEqual(reload.call_count, 1)
+                    self.assertEqual(reload.call_args[1]['force'], {'test', 'app'})
+                data = self.data_manager.get_all_data(reload=False)
+                self.assertEqual(len(data['test']['anomalies']), 6)
+                self.assertEqual(data['app']['revision'], 4)
+
+    def test_polling_fallback(self):
+        """Without inotify the watcher compares file signatures and requests no longer stat the files"""
+        self.start_watching('polling')
+        version = self.data_manager.version
+        self.write_file('project', dict(PROJECT, project_name='Polled'))
+        self.wait_for_version(version)
+        self.assertEqual(self.data_manager.get_all_data()['project']['project_name'], 'Polled')
+        with mock.patch.object(observability, 'file_signature') as signature:
+            self.data_manager.get_all_data()
+        signature.assert_not_called()
+
+
+def apply_patch(document, ops):
+    """Apply RFC 6902 add/remove/replace operations to a copy of document"""
+    document = copy.deepcopy(document)
+    for op in ops:
+        tokens = [token.replace('~1', '/').replace('~0', '~') for token in op['path'].split('/')[1:]]
+        parent = document
+        for token in tokens[:-1]:
+            parent = parent[int(token) if isinstance(parent, list) else token]
+        key = int(tokens[-1]) if isinstance(parent, list) else tokens[-1]
+        if op['op'] == 'remove':
+            del parent[key]
+        elif op['op'] == 'add' and isinstance(parent, list):
+            parent.insert(key, op['value'])
+        else:
+            parent[key] = op['value']
+    return document
+
+
+class TestJsonPatch(WebApiTestCase):
+    """Test JSON Patch generation and the ?since= responses"""
+
+    def test_patch_ops(self):
+        """Dictionaries are compared by key and lists by index, keys are escaped as JSON Pointer tokens"""
+        shared = {'large': list(range(100))}
+        old = {'a': 1, 'gone': True, 'a/b': {'m~n': 1}, 'list': [1, 2, 3], 'shared': shared, 'kind': [1]}
+        new = {'a': 2, 'a/b': {'m~n': 2}, 'list': [1, 5], 'shared': shared, 'kind': {'x': 1}, 'added': None}
+        ops = observability.make_json_patch(old, new)
+        self.assertEqual(ops, [
+            {'op': 'remove', 'path': '/gone'},
+            {'op': 'replace', 'path': '/a', 'value': 2},
+            {'op': 'replace', 'path': '/a~1b/m~0n', 'value': 2},
+            {'op': 'replace', 'path': '/list/1', 'value': 5},
+            {'op': 'remove', 'path': '/list/2'},
+            {'op': 'replace', 'path': '/kind', 'value': {'x': 1}},
+            {'op': 'add', 'path': '/added', 'value': None},
+        ])
+        self.assertEqual(apply_patch(old, ops), new)
+        self.assertEqual(observability.make_json_patch([1], [1, 2, 3], '/x'),
+                         [{'op': 'add', 'path': '/x/1', 'value': 2}, {'op': 'add', 'path': '/x/2', 'value': 3}])
+        self.assertEqual(observability.make_json_patch(old, old), [])
+        # 1 and True compare equal but are different JSON values
+        self.assertEqual(observability.make_json_patch({'v': 1}, {'v': True}),
+                         [{'op': 'replace', 'path': '/v', 'value': True}])
+
+    @unittest.skipUnless(observability.FLASK_AVAILABLE, 'Flask is not installed')
+    def test_since(self):
+        """?since= returns a patch that turns that version into the current one, compressed when accepted"""
+        response = self.client.get('/api/data')
+        old_etag, old_data = response.headers['X-Data-Version'], response.get_json()
+        self.update_module('Payment', 'has_issue')
+        self.client.post('/api/update/assumption', json={'assumption_id': 'ASM-1', 'status': 'validated'})
+        current = self.client.get('/api/data').get_json()
+
+        response = self.client.get(f'/api/data?since={old_etag}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/json-patch+json')
+        self.assertEqual(response.headers['X-Data-Version'], self.data_manager.etag)
+        self.assertEqual(apply_patch(old_data, json.loads(response.data)), current)
+
+        response = self.client.get(f'/api/data?since={old_etag}', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.mimetype, 'application/json-patch+json')
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(apply_patch(old_data, json.loads(gzip.decompress(response.data))), current)
+
+        response = self.client.get(f'/api/data?since={self.data_manager.etag}')
+        self.assertEqual((response.status_code, response.data), (304, b''))
+
+    @unittest.skipUnless(observability.FLASK_AVAILABLE, 'Flask is not installed')
+    def test_since_evicted(self):
+        """A version that has left the history ring, or was never issued, gets the full data"""
+        old_etag = self.client.get('/api/data').headers['X-Data-Version']
+        for index in range(observability.SNAPSHOT_HISTORY + 1):
+            self.update_module('Payment', 'confirmed' if index % 2 else 'has_issue')
+        self.assertIsNone(self.data_manager.get_patch_payload(old_etag))
+        for since in (old_etag, 'unknown'):
+            response = self.client.get(f'/api/data?since={since}', headers={'Accept-Encoding': 'gzip'})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.mimetype, 'application/json')
+            self.assertEqual(response.headers['ETag'], f'"{self.data_manager.etag}-gzip"')
+            self.assertEqual(json.loads(gzip.decompress(response.data))['app']['modules'][1]['status'], 'has_issue')
+
+
+class TestUpdateRequests(WebApiTestCase):
+    """Test request validation of the update endpoints and writing on shutdown"""
+
+    @unittest.skipUnless(observability.FLASK_AVAILABLE, 'Flask is not installed')
+    def test_body_must_be_object(self):
+        """Lists, scalars and invalid JSON are rejected with 400 instead of failing with 500"""
+        for path in ('/api/update/module', '/api/update/assumption'):
+            for body in ('[]', '[{"module_name": "Login"}]', '"Login"', 'null', '{not json'):
+                with self.subTest(path=path, body=body):
+                    response = self.client.post(path, data=body, content_type='application/json')
+                    self.assertEqual(response.status_code, 400)
+                    self.assertFalse(response.get_json()['success'])
+        for body in ('"updates"', '3', '{not json'):
+            with self.subTest(path='/api/update/batch', body=body):
+                response = self.client.post('/api/update/batch', data=body, content_type='application/json')
+                self.assertEqual(response.status_code, 400)
+                self.assertFalse(response.get_json()['applied'])
+        self.assertEqual(self.read_file('app'), APP)
+
+    def test_sigterm_writes_pending_updates(self):
+        """Stopping the server with SIGTERM writes the updates still waiting for the flush timer"""
+        modes = (['web'] if observability.FLASK_AVAILABLE else []) + ['live']
+        for mode in modes:
+            with self.subTest(mode=mode):
+                status = f'{mode}-stopped'
+                process, port = self.run_server(mode)
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+                connection.request('POST', '/api/update/module', json.dumps({'module_name': 'Login', 'status': status}),
+                                   {'Content-Type': 'application/json'})
+                self.assertEqual(json.loads(connection.getresponse().read()), {'success': True})
+                connection.close()
+                self.assertNotEqual(self.read_file('app')['modules'][0]['status'], status)
+                process.send_signal(signal.SIGTERM)
+                self.assertEqual(process.wait(timeout=30), 0)
+                self.assertEqual(self.read_file('app')['modules'][0]['status'], status)
+
+
+class TestBatchUpdates(WebApiTestCase):
+    """Test the all-or-nothing batch updates"""
+
+    def assert_unchanged(self, version, etag):
+        self.assertEqual((self.data_manager.version, self.data_manager.etag), (version, etag))
+        data = self.data_manager.get_all_data()
+        self.assertEqual(data['app'], APP)
+        self.assertEqual(data['project'], PROJECT)
+        self.assertEqual(self.read_file('app'), APP)
+        self.assertEqual(self.read_file('project'), PROJECT)
+
+    def test_writer_rolls_back(self):
+        """When the second mutation fails, the first one is neither published nor written"""
+        self.data_manager.load_if_changed()
+        version, etag = self.data_manager.version, self.data_manager.etag
+        results = self.data_manager.writer.update_many([
+            ('app', lambda app: observability.set_module_status(app, 'Login', 'has_issue', 'Crash')),
+            ('app', lambda app: observability.set_module_status(app, 'Missing', 'confirmed')),
+        ])
+        self.assertEqual(results, [True, False])
+        self.assert_unchanged(version, etag)
+
+    @unittest.skipUnless(observability.FLASK_AVAILABLE, 'Flask is not installed')
+    def test_batch_endpoint(self):
+        """A failing or invalid second item leaves memory, files and version untouched"""
+        self.data_manager.load_if_changed()
+        version, etag = self.data_manager.version, self.data_manager.etag
+        first = {'type': 'assumption', 'assumption_id': 'ASM-1', 'status': 'validated'}
+        for second, error in (({'type': 'module', 'module_name': 'Missing', 'status': 'confirmed'}, 'Missing'),
+                              ({'type': 'module', 'module_name': 'Payment'}, 'status'),
+                              ({'type': 'task', 'status': 'done'}, 'task')):
+            with self.subTest(second=second):
+                body = self.client.post('/api/update/batch', json={'updates': [first, second]}).get_json()
+                self.assertEqual((body['success'], body['applied']), (False, False))
+                self.assertFalse(body['results'][1]['success'])
+                self.assertIn(error, body['results'][1]['error'])
+                self.assert_unchanged(version, etag)
+
+        body = self.client.post('/api/update/batch', json={'updates': [
+            first, {'type': 'module', 'module_name': 'Payment', 'status': 'confirmed'}]}).get_json()
+        self.assertEqual(body, {'success': True, 'applied': True, 'results': [{'success': True}, {'success': True}]})
+        # Both files change in one new version
+        self.assertEqual(self.data_manager.version, version + 1)
+        self.assertEqual(self.read_file('app')['modules'][1]['status'], 'confirmed')
+        self.assertEqual(self.read_file('project')['iterations'][0]['assumptions'][0]['status'], 'validated')
+
+
+class TestAssumptionIndex(WebApiTestCase):
+    """Test locating assumptions through the assumption index"""
+
+    def set_status(self, assumption_id, status):
+        return observability.apply_update(self.data_manager, {'type': 'assumption', 'assumption_id': assumption_id,
+                                                              'status': status})
+
+    @staticmethod
+    def content_id(text):
+        return base64.b64encode(text.encode('utf-8')).decode('ascii')
+
+    def test_lookup(self):
+        """The index finds the same positions as a linear scan, by id first and then by content"""
+        project = copy.deepcopy(PROJECT)
+        # A later duplicate of ASM-1 must not shadow the first one
+        project['iterations'][1]['assumptions'].append({'assumption_id': 'ASM-1', 'hypothesis': 'Duplicate'})
+        index = observability.build_assumption_index(project)
+        for assumption_id, position in (('ASM-1', (0, 0)),
+                                        (self.content_id('Users pay by card'), (1, 0)),
+                                        (self.content_id('Users log in daily'), (0, 0)),
+                                        (self.content_id('Nobody'), None),
+                                        ('not base64!', None)):
+            with self.subTest(assumption_id=assumption_id):
+                self.assertEqual(observability.lookup_assumption(index, assumption_id), position)
+                self.assertEqual(observability.find_assumption(project, assumption_id), position)
+
+    def test_index_is_reused_and_rebuilt_after_reload(self):
+        """Status updates reuse the index, rewriting project_data.json rebuilds it"""
+        build = mock.Mock(wraps=observability.build_assumption_index)
+        with mock.patch.object(observability, 'build_assumption_index', build):
+            self.assertEqual(self.set_status('ASM-1', 'validated'), {'success': True})
+            self.assertEqual(self.set_status('ASM-1', 'invalidated'), {'success': True})
+            self.assertEqual(build.call_count, 1)
+
+            project = self.read_file('project')
+            project['iterations'][0]['assumptions'].insert(0, {'assumption_id': 'ASM-0', 'hypothesis': 'New'})
+            self.write_file('project', project)
+            self.assertEqual(self.set_status('ASM-1', 'validated'), {'success': True})
+            self.assertEqual(build.call_count, 2)
+
+        assumptions = self.read_file('project')['iterations'][0]['assumptions']
+        self.assertEqual([a.get('status') for a in assumptions], [None, 'validated'])
+
+    @unittest.skipUnless(observability.FLASK_AVAILABLE, 'Flask is not installed')
+    def test_update_endpoint(self):
+        """/api/update/assumption accepts both kinds of id and reports unknown ones"""
+        for assumption_id, position in (('ASM-1', (0, 0)), (self.content_id('Users pay by card'), (1, 0))):
+            with self.subTest(assumption_id=assumption_id):
+                response = self.client.post('/api/update/assumption',
+                                            json={'assumption_id': assumption_id, 'status': 'validated'})
+                self.assertEqual(response.get_json(), {'success': True})
+                i, j = position
+                assumption = self.read_file('project')['iterations'][i]['assumptions'][j]
+                self.assertEqual(assumption['status'], 'validated')
+                self.assertTrue(assumption['validation_date'])
+
+        body = self.client.post('/api/update/assumption',
+                                json={'assumption_id': 'ASM-9', 'status': 'validated'}).get_json()
+        self.assertFalse(body['success'])
+
+
+@unittest.skipUnless(observability.FLASK_AVAILABLE, 'Flask is not installed')
+class TestDashboardPage(WebApiTestCase):
+    """Test the cached dashboard page"""
+
+    PAGE_HIT = 'cox_dashboard_cache_requests_total{cache="page",result="hit"}'
+    PAGE_MISS = 'cox_dashboard_cache_requests_total{cache="page",result="miss"}'
+
+    def test_rendered_once(self):
+        """The page is rendered on the first request only, and a matching ETag gets 304"""
+        build = mock.Mock(wraps=observability.build_dashboard_page)
+        with mock.patch.object(observability, 'build_dashboard_page', build):
+            response = self.client.get('/', headers={'Accept-Encoding': 'gzip'})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+            self.assertIn(b'<!DOCTYPE html>', gzip.decompress(response.data))
+            etag = response.headers['ETag']
+
+            self.assertEqual(self.client.get('/', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+                             .status_code, 304)
+            response = self.client.get('/')
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response.headers['ETag'], etag)
+            self.assertIn(b'<!DOCTYPE html>', response.data)
+            # Data changes do not invalidate the page, which loads its data from /api/data
+            self.update_module('Payment', 'confirmed')
+            self.assertEqual(self.client.get('/', headers={'If-None-Match': response.headers['ETag']})
+                             .status_code, 304)
+
+        self.assertEqual(build.call_count, 1)
+        self.assertEqual((self.metric(self.PAGE_MISS), self.metric(self.PAGE_HIT)), (1, 3))
+
+    def test_dev_mode_renders_every_request(self):
+        """With --dev the template is rendered again for every request and never cached"""
+        build = mock.Mock(wraps=observability.build_dashboard_page)
+        app = observability.get_app()
+        with mock.patch.object(observability, 'build_dashboard_page', build), \
+                mock.patch.dict(app.config, {'DASHBOARD_DEV': True}):
+            for _ in range(2):
+                self.assertEqual(self.client.get('/').status_code, 200)
+        self.assertEqual(build.call_count, 2)
+        self.assertIsNone(observability.dashboard_page)
+        self.assertEqual((self.metric(self.PAGE_MISS), self.metric(self.PAGE_HIT)), (0, 0))
+
+
+@unittest.skipUnless(observability.FLASK_AVAILABLE, 'Flask is not installed')
+class TestDashboardAssets(WebApiTestCase):
+    """Test the offline page assets served under /assets/"""
+
+    def asset_urls(self):
+        """The versioned /assets/ URLs referenced by the dashboard page"""
+        page = self.client.get('/').get_data(as_text=True)
+        assets = observability.load_dashboard_assets()
+        return {name: f"/assets/{name}?v={assets[name]['version']}" for name in observability.DASHBOARD_ASSETS
+                if f"/assets/{name}?v={assets[name]['version']}" in page}
+
+    def test_page_uses_local_assets(self):
+        """The page links the versioned local stylesheet and icon sprite instead of the Tailwind and Lucide CDNs"""
+        page = self.client.get('/').get_data(as_text=True)
+        for cdn in ('cdn.tailwindcss.com', 'unpkg.com', 'lucide@', 'lucide.createIcons'):
+            self.assertNotIn(cdn, page)
+        self.assertEqual(set(self.asset_urls()), set(observability.DASHBOARD_ASSETS))
+        self.assertIn('function createIcons(', page)
+
+    def test_cache_headers_and_304(self):
+        """Assets are cacheable as immutable and revalidate with their content-hash ETag"""
+        for name, url in self.asset_urls().items():
+            with self.subTest(name=name):
+                asset = observability.load_dashboard_assets()[name]
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.mimetype, observability.DASHBOARD_ASSETS[name])
+                self.assertEqual(response.data, asset['content'])
+                self.assertIn('immutable', response.headers['Cache-Control'])
+                self.assertIn(f'max-age={observability.ASSET_MAX_AGE}', response.headers['Cache-Control'])
+                self.assertEqual(response.headers['ETag'], f'"{asset["version"]}"')
+
+                revalidated = self.client.get(url, headers={'If-None-Match': response.headers['ETag']})
+                self.assertEqual(revalidated.status_code, 304)
+                self.assertEqual(revalidated.data, b'')
+                self.assertIn('immutable', revalidated.headers['Cache-Control'])
+
+    def test_gzip_negotiation(self):
+        """Assets are gzip-compressed when accepted, with an ETag of their own for the compressed body"""
+        url = self.asset_urls()['dashboard.css']
+        identity = self.client.get(url)
+        response = self.client.get(url, headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(response.headers['Vary'], 'Accept-Encoding')
+        self.assertEqual(gzip.decompress(response.data), identity.data)
+        self.assertNotEqual(response.headers['ETag'], identity.headers['ETag'])
+        self.assertEqual(self.client.get(url, headers={'Accept-Encoding': 'gzip',
+                                                       'If-None-Match': response.headers['ETag']}).status_code, 304)
+        # The identity ETag does not match the gzip variant
+        self.assertEqual(self.client.get(url, headers={'Accept-Encoding': 'gzip',
+                                                       'If-None-Match': identity.headers['ETag']}).status_code, 200)
+
+    def test_unknown_asset(self):
+        """Names outside DASHBOARD_ASSETS get 404"""
+        for name in ('missing.css', 'build_dashboard_assets.py', '..%2Frun_web_observability.py'):
+            with self.subTest(name=name):
+                self.assertEqual(self.client.get(f'/assets/{name}').status_code, 404)
+
+
+@unittest.skipUnless(observability.FLASK_AVAILABLE, 'Flask is not installed')
+class TestCollections(WebApiTestCase):
+    """Test the paginated /api/<collection> endpoints"""
+
+    def query(self, path):
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200, response.get_json())
+        return response.get_json()
+
+    def ids(self, path, field='task_id'):
+        return [item[field] for item in self.query(path)['items']]
+
+    def test_filters(self):
+        """iteration=current resolves to current_iteration, comma-separated values match any of them"""
+        body = self.query('/api/tasks?iteration=current&status=todo')
+        self.assertEqual([item['task_id'] for item in body['items']], ['TASK-2', 'TASK-4'])
+        self.assertEqual(body['total'], 2)
+        # Tasks carry the id of their iteration
+        self.assertEqual({item['iteration_id'] for item in body['items']}, {'ITER-2'})
+
+        self.assertEqual(self.ids('/api/tasks?status=todo,completed&owner=Alice'), ['TASK-1', 'TASK-4'])
+        self.assertEqual(self.ids('/api/tasks?iteration=ITER-1'), ['TASK-1'])
+        self.assertEqual(self.ids('/api/tasks?owner=Nobody'), [])
+        self.assertEqual(self.ids('/api/modules?owner=Bob', 'module_name'), ['Payment'])
+        self.assertEqual(self.ids('/api/iterations?status=completed', 'iteration_id'), ['ITER-1'])
+        self.assertEqual(self.ids('/api/anomalies?severity=high', 'anomaly_id'), ['ANOM-1'])
+
+    def test_sort_and_pages(self):
+        """sort=field and sort=-field order the items, offset/limit select a page of the same order"""
+        self.assertEqual(self.ids('/api/tasks?sort=task_name'), ['TASK-4', 'TASK-1', 'TASK-2', 'TASK-3'])
+        self.assertEqual(self.ids('/api/tasks?sort=-task_name'), ['TASK-3', 'TASK-2', 'TASK-1', 'TASK-4'])
+        self.assertEqual(self.ids('/api/modules?sort=-completion_rate', 'module_name'), ['Login', 'Payment'])
+        # Equal values keep the order of the data file in both directions
+        self.assertEqual(self.ids('/api/tasks?sort=assignee'), ['TASK-1', 'TASK-3', 'TASK-4', 'TASK-2'])
+        self.assertEqual(self.ids('/api/tasks?sort=-assignee'), ['TASK-2', 'TASK-1', 'TASK-3', 'TASK-4'])
+
+        body = self.query('/api/tasks?sort=-task_name&offset=1&limit=2')
+        self.assertEqual([item['task_id'] for item in body['items']], ['TASK-2', 'TASK-1'])
+        self.assertEqual((body['total'], body['offset'], body['limit']), (4, 1, 2))
+        self.assertEqual(self.ids('/api/tasks?offset=10'), [])
+        self.assertEqual(self.query(f'/api/tasks?limit={observability.PAGE_MAX_LIMIT + 1}')['limit'],
+                         observability.PAGE_MAX_LIMIT)
+
+    def test_invalid_parameters(self):
+        """Bad paging values and unknown sort fields get 400 with an error message"""
+        for query in ('limit=abc', 'offset=-1', 'limit=0', 'sort=secret', 'sort=-secret'):
+            with self.subTest(query=query):
+                response = self.client.get(f'/api/tasks?{query}')
+                self.assertEqual(response.status_code, 400)
+                self.assertFalse(response.get_json()['success'])
+        self.assertEqual(self.client.get('/api/unknown').status_code, 404)
+
+    def test_revalidation(self):
+        """Pages share the data ETag, so they revalidate with 304 until the data changes"""
+        response = self.client.get('/api/tasks?limit=1')
+        etag = response.headers['ETag']
+        self.assertEqual(response.headers['X-Data-Version'], etag.strip('"'))
+        response = self.client.get('/api/tasks?limit=1', headers={'If-None-Match': etag})
+        self.assertEqual((response.status_code, response.data), (304, b''))
+
+        self.update_module('Payment', 'confirmed')
+        response = self.client.get('/api/modules?status=confirmed', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['module_name'] for item in response.get_json()['items']], ['Login', 'Payment'])
+
+    def test_one_snapshot_per_request(self):
+        """The ETag checked for 304 and the page come from the same snapshot when a version is published meanwhile"""
+        self.data_manager.load_if_changed()
+        for path, method in (('/api/modules?status=pending', 'query_collection'), ('/api/search?q=Payment', 'search')):
+            with self.subTest(path=path):
+                original = getattr(self.data_manager, method)
+
+                def publish_then_query(*args, **kwargs):
+                    # Another request publishes an update after this one checked the ETag
+                    self.update_module('Payment', 'has_issue')
+                    return original(*args, **kwargs)
+
+                snapshot = self.data_manager.snapshot
+                with mock.patch.object(self.data_manager, method, publish_then_query):
+                    response = self.client.get(path, headers={'If-None-Match': '"stale"'})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.headers['ETag'], f'"{snapshot.etag}"')
+                self.assertNotEqual(self.data_manager.etag, snapshot.etag)
+                if method == 'query_collection':
+                    self.assertEqual([item['module_name'] for item in response.get_json()['items']], ['Payment'])
+                # The client then revalidates against the newer version and gets it
+                self.assertEqual(self.client.get(path, headers={'If-None-Match': response.headers['ETag']})
+                                 .status_code, 200)
+
+
+@unittest.skipUnless(observability.FLASK_AVAILABLE, 'Flask is not installed')
+class TestSummary(WebApiTestCase):
+    """Test the /api/summary endpoint"""
+
+    def test_summary(self):
+        """The summary counts tasks, modules, tests and open anomalies, and owners across tasks and modules"""
+        response = self.client.get('/api/summary')
+        self.assertEqual(response.status_code, 200)
+        summary = response.get_json()
+        self.assertEqual(summary['version'], self.data_manager.etag)
+        self.assertEqual((summary['project_name'], summary['current_iteration']), ('API', 'ITER-2'))
+        self.assertEqual([(item['iteration_id'], item['total']) for item in summary['iterations']],
+                         [('ITER-1', 1), ('ITER-2', 3)])
+        self.assertEqual(summary['tasks'], {'total': 4, 'by_status': {'completed': 1, 'todo': 2, 'in_progress': 1}})
+        self.assertEqual(summary['modules'], {'total': 2, 'by_status': {'confirmed': 1, 'pending': 1}})
+        self.assertEqual((summary['tests']['pass_rate'], summary['tests']['coverage']), (None, None))
+        self.assertEqual(summary['anomalies'], {'total': 1, 'open': 1, 'open_by_severity': {'high': 1}})
+        self.assertEqual(summary['owners'], {
+            'Alice': {'tasks': 3, 'completed': 1, 'modules': 1, 'completion': 33},
+            'Bob': {'tasks': 1, 'completed': 0, 'modules': 1, 'completion': 0},
+        })
+
+    def test_revalidation(self):
+        """The summary shares the data ETag and is recomputed after an update"""
+        response = self.client.get('/api/summary')
+        etag = response.headers['ETag']
+        self.assertEqual(etag, f'"{self.data_manager.etag}"')
+        self.assertEqual(response.headers['X-Data-Version'], etag.strip('"'))
+        response = self.client.get('/api/summary', headers={'If-None-Match': etag})
+        self.assertEqual((response.status_code, response.data), (304, b''))
+
+        self.update_module('Payment', 'confirmed')
+        response = self.client.get('/api/summary', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['modules']['by_status'], {'confirmed': 2})
+
+
+class TestSummaryRollups(unittest.TestCase):
+    """Test the per-file rollups behind /api/summary and their merge"""
+
+    def merge(self, project=None, app=None, test=None):
+        return observability.merge_summary({'project': observability.summarize_project(project or {}),
+                                            'app': observability.summarize_app(app or {}),
+                                            'test': observability.summarize_test(test or {})})
+
+    def test_empty_collections(self):
+        """Missing and empty collections give zero counts, no rates and no owners"""
+        for project, app, test in (({}, {}, {}),
+                                   ({'iterations': [{'iteration_id': 'ITER-1', 'tasks': None}]},
+                                    {'modules': []}, {'test_suites': [], 'anomalies': []})):
+            with self.subTest(project=project):
+                summary = self.merge(project, app, test)
+                self.assertEqual(summary['tasks'], {'total': 0, 'by_status': {}})
+                self.assertEqual(summary['modules'], {'total': 0, 'by_status': {}})
+                self.assertEqual(summary['tests'], {'total_tests': 0, 'passed_tests': 0, 'failed_tests': 0,
+                                                    'skipped_tests': 0, 'suites': 0, 'pass_rate': None,
+                                                    'coverage': None})
+                self.assertEqual(summary['anomalies'], {'total': 0, 'open': 0, 'open_by_severity': {}})
+                self.assertEqual(summary['owners'], {})
+        self.assertEqual(self.merge({'iterations': [{'iteration_id': 'ITER-1', 'tasks': None}]})['iterations'],
+                         [{'iteration_id': 'ITER-1', 'iteration_name': None, 'status': None, 'total': 0,
+                           'by_status': {}}])
+        # An owner with modules but no tasks has a completion of 0
+        summary = self.merge(app={'modules': [{'module_name': 'Login', 'owner': 'Alice'}]})
+        self.assertEqual(summary['owners'], {'Alice': {'tasks': 0, 'completed': 0, 'modules': 1, 'completion': 0}})
+        self.assertEqual(summary['modules']['by_status'], {'unknown': 1})
+
+    def test_completion_rounds_half_up(self):
+        """Completion rounds half up like Math.round in the page, not half to even"""
+        for completed, total, completion in ((5, 8, 63), (1, 8, 13), (3, 8, 38), (2, 3, 67), (1, 3, 33),
+                                             (8, 8, 100)):
+            with self.subTest(completed=completed, total=total):
+                tasks = [{'task_id': f'TASK-{index}', 'assignee': 'Alice',
+                          'status': 'done' if index < completed else 'todo'} for index in range(total)]
+                summary = self.merge({'iterations': [{'iteration_id': 'ITER-1', 'tasks': tasks}]})
+                self.assertEqual(summary['owners']['Alice']['completion'], completion)
+
+    def test_test_rollup(self):
+        """Coverage is weighted by test count, closed anomalies are not open"""
+        rollup = observability.summarize_test({
+            'test_suites': [
+                {'total_tests': 30, 'passed_tests': 27, 'failed_tests': 3, 'coverage': 0.9},
+                {'total_tests': 10, 'passed_tests': 10, 'coverage': 0.5},
+                {'total_tests': 5, 'skipped_tests': 5, 'coverage': None},
+            ],
+            'anomalies': [
+                {'anomaly_id': 'ANOM-1', 'severity': 'high', 'status': 'open'},
+                {'anomaly_id': 'ANOM-2', 'status': 'investigating'},
+                {'anomaly_id': 'ANOM-3', 'severity': 'high', 'status': 'resolved'},
+                {'anomaly_id': 'ANOM-4', 'severity': 'low', 'status': 'ignored'},
+            ]})
+        tests = rollup['tests']
+        self.assertEqual((tests['total_tests'], tests['passed_tests'], tests['failed_tests'], tests['skipped_tests'],
+                          tests['suites']), (45, 37, 3, 5, 3))
+        self.assertAlmostEqual(tests['pass_rate'], 37 / 45)
+        self.assertAlmostEqual(tests['coverage'], 0.8)
+        self.assertEqual(rollup['anomalies'], {'total': 4, 'open': 2, 'open_by_severity': {'high': 1, 'unknown': 1}})
+        # Without test counts the coverage is the plain average of the suites
+        coverage = observability.summarize_test({'test_suites': [{'coverage': 0.4}, {'coverage': 0.8}]})
+        self.assertAlmostEqual(coverage['tests']['coverage'], 0.6)
+
+
+class TestProjectRegistry(unittest.TestCase):
+    """Test the multi-project registry and its LRU eviction"""
+
+    def setUp(self):
+        self.projects_dir = tempfile.mkdtemp()
+        for name in ('alpha', 'beta', 'gamma'):
+            os.mkdir(os.path.join(self.projects_dir, name))
+            for key, data in (('project', dict(PROJECT, project_name=name)), ('app', APP), ('test', TEST)):
+                with open(self.path(name, key), 'w', encoding='utf-8') as f:
+                    json.dump(data, f)
+        # All projects have the same files, so they have the same estimate; allow two of them in memory
+        manager = observability.ObservabilityData(*(self.path('alpha', key) for key in ('project', 'app', 'test')))
+        manager.load_if_changed()
+        self.registry = observability.ProjectRegistry(self.projects_dir, memory_limit=manager.memory_estimate() * 2,
+                                                      flush_interval=60)
+
+    def tearDown(self):
+        self.registry.close()
+        shutil.rmtree(self.projects_dir)
+
+    def path(self, name, key):
+        return os.path.join(self.projects_dir, name, observability.PROJECT_DATA_FILES[key])
+
+    def module_status(self, name):
+        with open(self.path(name, 'app'), 'r', encoding='utf-8') as f:
+            return json.load(f)['modules'][1]['status']
+
+    @staticmethod
+    def set_payment(manager, status):
+        return observability.apply_update(manager, {'type': 'module', 'module_name': 'Payment', 'status': status})
+
+    def test_least_recently_used_is_evicted(self):
+        """Loading a third project evicts the one accessed longest ago and closes it"""
+        self.assertEqual(self.registry.names(), ['alpha', 'beta', 'gamma'])
+        self.assertIsNone(self.registry.get('missing'))
+        alpha = self.registry.get('alpha')
+        beta = self.registry.get('beta')
+        self.assertIs(self.registry.get('alpha'), alpha)
+        self.assertEqual(self.registry.loaded(), ['beta', 'alpha'])
+
+        self.registry.get('gamma')
+        self.assertEqual(self.registry.loaded(), ['alpha', 'gamma'])
+        self.assertTrue(beta.writer.closed)
+        self.assertIsNone(beta._watcher)
+        self.assertFalse(alpha.writer.closed)
+        # Accessing an evicted project loads a new data manager
+        self.assertIsNot(self.registry.get('beta'), beta)
+        self.assertEqual(self.registry.loaded(), ['gamma', 'beta'])
+
+    def test_eviction_flushes_outside_the_registry_lock(self):
+        """The evicted project is closed and flushed after the registry lock is released"""
+        alpha = self.registry.get('alpha')
+        self.registry.get('beta')
+        lock_held = []
+        close = alpha.writer.close
+        with mock.patch.object(alpha.writer, 'close', lambda: lock_held.append(self.registry._lock.locked()) or close()):
+            self.registry.get('gamma')
+        self.assertEqual(lock_held, [False])
+        self.assertTrue(alpha.writer.closed)
+
+    def test_eviction_writes_pending_updates_and_rejects_late_ones(self):
+        """Eviction writes the pending updates; a request still holding the old manager can no longer write"""
+        alpha = self.registry.get('alpha')
+        self.assertEqual(self.set_payment(alpha, 'confirmed'), {'success': True})
+        # Within the flush interval the update is only in memory
+        self.assertEqual(self.module_status('alpha'), 'pending')
+
+        self.registry.get('beta')
+        self.registry.get('gamma')
+        self.assertNotIn('alpha', self.registry.loaded())
+        self.assertEqual(self.module_status('alpha'), 'confirmed')
+
+        result = self.set_payment(alpha, 'has_issue')
+        self.assertFalse(result['success'])
+        self.assertIn('error', result)
+        self.assertEqual(alpha.get_all_data()['app']['modules'][1]['status'], 'confirmed')
+        self.assertEqual(self.module_status('alpha'), 'confirmed')
+
+        reloaded = self.registry.get('alpha')
+        self.assertEqual(reloaded.get_all_data()['app']['modules'][1]['status'], 'confirmed')
+        self.assertEqual(self.set_payment(reloaded, 'optimized'), {'success': True})
+        self.registry.close()
+        self.assertEqual(self.module_status('alpha'), 'optimized')
+
+    @unittest.skipUnless(observability.FLASK_AVAILABLE, 'Flask is not installed')
+    def test_project_routes(self):
+        """/p/<project>/api/... uses the registry and /api/projects reports which projects are loaded"""
+        client = observability.get_app().test_client()
+        with mock.patch.object(observability, 'project_registry', self.registry):
+            response = client.post('/p/beta/api/update/module', json={'module_name': 'Payment', 'status': 'confirmed'})
+            self.assertEqual(response.get_json(), {'success': True})
+            self.assertEqual(client.get('/p/beta/api/data').get_json()['project']['project_name'], 'beta')
+            self.assertEqual(client.get('/p/missing/api/data').status_code, 404)
+            self.assertEqual(client.get('/api/projects').get_json()['projects'], [
+                {'name': 'alpha', 'loaded': False}, {'name': 'beta', 'loaded': True},
+                {'name': 'gamma', 'loaded': False}])
+
+
+@unittest.skipUnless(observability.FLASK_AVAILABLE, 'Flask is not installed')
+class TestMetrics(WebApiTestCase):
+    """Test the /metrics endpoint"""
+
+    def scrape(self):
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        return response.get_data(as_text=True)
+
+    def test_empty_registry(self):
+        """Every metric is declared with HELP and TYPE, unlabelled ones start at zero"""
+        text = self.scrape()
+        for name, (kind, _, _, _) in observability.SERVER_METRICS.items():
+            with self.subTest(name=name):
+                self.assertIn(f'# TYPE {name} {kind}\n', text)
+                self.assertIn(f'# HELP {name} ', text)
+        self.assertEqual(self.metric('cox_dashboard_reload_errors_total', text), 0)
+
+    def test_requests_and_caches(self):
+        """Requests are counted by route rule and status, histograms and cache counters follow the requests"""
+        for _ in range(2):
+            self.client.get('/api/data')
+        self.client.get('/api/tasks?status=todo')
+        self.client.get('/api/modules?sort=secret')
+        self.client.get('/missing')
+        self.update_module('Payment', 'confirmed')
+        text = self.scrape()
+
+        collection = '/api/<any(iterations, tasks, modules, anomalies):collection>'
+        for sample, value in (
+                ('cox_dashboard_requests_total{route="/api/data",method="GET",status="200"}', 2),
+                (f'cox_dashboard_requests_total{{route="{collection}",method="GET",status="200"}}', 1),
+                (f'cox_dashboard_requests_total{{route="{collection}",method="GET",status="400"}}', 1),
+                ('cox_dashboard_requests_total{route="unmatched",method="GET",status="404"}', 1),
+                ('cox_dashboard_requests_total{route="/api/update/module",method="POST",status="200"}', 1),
+                ('cox_dashboard_request_duration_seconds_count{route="/api/data"}', 2),
+                ('cox_dashboard_request_duration_seconds_bucket{route="/api/data",le="+Inf"}', 2),
+                ('cox_dashboard_response_size_bytes_count{route="/api/data"}', 2),
+                ('cox_dashboard_cache_requests_total{cache="payload",result="miss"}', 1),
+                ('cox_dashboard_cache_requests_total{cache="payload",result="hit"}', 1),
+                ('cox_dashboard_flush_duration_seconds_count', 1)):
+            with self.subTest(sample=sample):
+                self.assertEqual(self.metric(sample, text), value)
+        # The scrape itself is counted after its body is rendered
+        self.assertEqual(self.metric('cox_dashboard_requests_total{route="/metrics",method="GET",status="200"}'), 1)
+
+    def test_reloads(self):
+        """Reloads that change the data are timed, data files that fail to parse are counted as errors"""
+        self.client.get('/api/data')
+        reloads = self.metric('cox_dashboard_reload_duration_seconds_count', self.scrape())
+        self.assertGreaterEqual(reloads, 1)
+        with open(self.files['app'], 'w', encoding='utf-8') as f:
+            f.write('{not json')
+        self.client.get('/api/data')
+        text = self.scrape()
+        self.assertEqual(self.metric('cox_dashboard_reload_errors_total', text), 1)
+        self.assertEqual(self.metric('cox_dashboard_reload_duration_seconds_count', text), reloads)
+
+        self.write_file('app', dict(APP, last_updated='now'))
+        self.client.get('/api/data')
+        self.assertEqual(self.metric('cox_dashboard_reload_duration_seconds_count', self.scrape()), reloads + 1)
+
+
+@unittest.skipUnless(observability.FLASK_AVAILABLE, 'Flask is not installed')
+class TestProfile(WebApiTestCase):
+    """Test request profiling and /debug/profile"""
+
+    def profile(self, sample_rate=1):
+        profiler = observability.RequestProfiler(sample_rate)
+        patcher = mock.patch.object(observability, 'request_profiler', profiler)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return profiler
+
+    def test_disabled(self):
+        """Without --profile the endpoint does not exist"""
+        response = self.client.get('/debug/profile')
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.get_json()['success'])
+
+    def test_report(self):
+        """Requests are listed slowest first, functions by cumulative or own time"""
+        self.profile()
+        for path in ('/api/data', '/api/tasks?status=todo', '/missing'):
+            self.client.get(path)
+        report = self.client.get('/debug/profile?limit=2').get_json()
+        self.assertEqual((report['sample_rate'], report['requests_recorded'], report['requests_profiled']), (1, 3, 3))
+        self.assertEqual(len(report['slowest_requests']), 2)
+        durations = [entry['duration_ms'] for entry in report['slowest_requests']]
+        self.assertEqual(durations, sorted(durations, reverse=True))
+        self.assertTrue(all(entry['profiled'] for entry in report['slowest_requests']))
+        self.assertEqual(len(report['functions']), 2)
+        self.assertGreaterEqual(report['functions'][0]['cumtime_ms'], report['functions'][1]['cumtime_ms'])
+
+        report = self.client.get('/debug/profile?sort=tottime').get_json()
+        # The first report request is recorded too
+        self.assertEqual(report['requests_recorded'], 4)
+        self.assertIn('/api/tasks?status=todo', [entry['path'] for entry in report['slowest_requests']])
+        self.assertIn('unmatched', [entry['route'] for entry in report['slowest_requests']])
+        own = [function['tottime_ms'] for function in report['functions']]
+        self.assertEqual(own, sorted(own, reverse=True))
+        self.assertIn('calls', report['functions'][0])
+
+    def test_sampling(self):
+        """Only every sample_rate-th request is profiled, all of them are timed"""
+        profiler = self.profile(sample_rate=2)
+        for _ in range(4):
+            self.client.get('/api/data')
+        report = profiler.report()
+        self.assertEqual((report['requests_recorded'], report['requests_profiled']), (4, 2))
+        self.assertEqual([entry['profiled'] for entry in profiler._requests], [False, True, False, True])
+
+    def test_invalid_parameters(self):
+        """A non-integer limit or an unknown sort gets 400"""
+        self.profile()
+        for query in ('limit=abc', 'sort=calls'):
+            with self.subTest(query=query):
+                response = self.client.get(f'/debug/profile?{query}')
+                self.assertEqual(response.status_code, 400)
+                self.assertFalse(response.get_json()['success'])
+
+
+@unittest.skipUnless(observability.FLASK_AVAILABLE and hasattr(os, 'fork') and shutil.which('pgrep'),
+                     'the prefork server needs Flask, os.fork and pgrep')
+class TestPreforkServer(WebApiTestCase):
+    """Test the multi-process (prefork) server"""
+
+    WORKERS = 2
+
+    def workers(self, process):
+        result = subprocess.run(['pgrep', '-P', str(process.pid)], capture_output=True, text=True, timeout=10)
+        return {int(pid) for pid in result.stdout.split()}
+
+    def wait_for_workers(self, process, exclude=()):
+        """Wait until the server runs WORKERS workers, none of them in exclude, and return their PIDs"""
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            workers = self.workers(process)
+            if len(workers) == self.WORKERS and not workers & set(exclude):
+                return workers
+            time.sleep(0.1)
+        self.fail(f'expected {self.WORKERS} new workers, found {self.workers(process)}')
+
+    def request(self, port, method, path, body=None):
+        # A new connection per request, so that any worker that is not paused may accept it
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+        try:
+            connection.request(method, path, json.dumps(body) if body is not None else None,
+                               {'Content-Type': 'application/json'})
+            response = connection.getresponse()
+            return response.status, json.loads(response.read())
+        finally:
+            connection.close()
+
+    def module_statuses(self, port, workers):
+        """Module statuses served by each worker, pausing the other workers so that it has to answer"""
+        statuses = {}
+        for pid in workers:
+            paused = workers - {pid}
+            for other in paused:
+                os.kill(other, signal.SIGSTOP)
+            try:
+                status, data = self.request(port, 'GET', '/api/data')
+            finally:
+                for other in paused:
+                    os.kill(other, signal.SIGCONT)
+            self.assertEqual(status, 200)
+            statuses[pid] = [module['status'] for module in data['app']['modules']]
+        return statuses
+
+    def assert_served_by_all(self, port, workers, expected):
+        """Every worker serves the module statuses expected once the master has republished the snapshot"""
+        deadline = time.monotonic() + 10
+        while True:
+            statuses = self.module_statuses(port, workers)
+            if all(value == expected for value in statuses.values()) or time.monotonic() > deadline:
+                break
+            time.sleep(0.1)
+        self.assertEqual(statuses, {pid: expected for pid in workers})
+
+    def test_update_reload_and_shutdown(self):
+        """Every worker serves an update made through one of them, SIGHUP swaps the workers, SIGTERM stops them"""
+        process, port = self.run_server('web', '--server', 'prefork', '--workers', str(self.WORKERS))
+        workers = self.wait_for_workers(process)
+
+        self.assertEqual(self.request(port, 'POST', '/api/update/module',
+                                      {'module_name': 'Payment', 'status': 'confirmed'}), (200, {'success': True}))
+        # Workers write through immediately, under the cross-process file lock
+        self.assertEqual(self.read_file('app')['modules'][1]['status'], 'confirmed')
+        # The other workers see it after the master reloads the file and republishes the shared snapshot
+        self.assert_served_by_all(port, workers, ['confirmed', 'confirmed'])
+
+        self.write_file('app', dict(APP, modules=[dict(APP['modules'][0], status='has_issue'), APP['modules'][1]]))
+        process.send_signal(signal.SIGHUP)
+        new_workers = self.wait_for_workers(process, exclude=workers)
+        # The new workers start from the snapshot that the master reloaded on SIGHUP
+        self.assertEqual(self.module_statuses(port, new_workers),
+                         {pid: ['has_issue', 'pending'] for pid in new_workers})
+
+        process.send_signal(signal.SIGTERM)
+        self.assertEqual(process.wait(timeout=60), 0)
+        for pid in new_workers:
+            with self.assertRaises(ProcessLookupError):
+                os.kill(pid, 0)
+
+    def test_compact_writes(self):
+        """With --compact the workers write the data files without indentation"""
+        process, port = self.run_server('web', '--server', 'prefork', '--workers', str(self.WORKERS), '--compact')
+        self.wait_for_workers(process)
+        self.assertEqual(self.request(port, 'POST', '/api/update/module',
+                                      {'module_name': 'Payment', 'status': 'confirmed'}), (200, {'success': True}))
+        with open(self.files['app'], 'rb') as f:
+            raw = f.read()
+        self.assertNotIn(b'\n', raw.strip())
+        self.assertEqual(json.loads(raw)['modules'][1]['status'], 'confirmed')
+
+
+if __name__ == '__main__':
+    unittest.main()